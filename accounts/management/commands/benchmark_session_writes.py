@@ -0,0 +1,84 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+
+from jobflick.benchmarking import MEASUREMENT_SETTINGS, MEMBER, client_for, isolated_database, seed_dataset
+
+PATHS = ["/profile/dashboard/", "/profile/about/", "/profile/help/", "/jobs/", "/profile/activity/"]
+ENGINES = ["db", "cached_db", "cache", "signed_cookies"]
+WRITE_PREFIXES = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+# The cache-backed session engines need a real cache behind "default".
+CACHES = {
+    **MEASUREMENT_SETTINGS["CACHES"],
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "benchmark-sessions"},
+}
+
+
+class WriteCounter:
+    """``execute_wrapper`` hook counting write statements, split by table."""
+
+    def __init__(self):
+        self.session = 0
+        self.other = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith(WRITE_PREFIXES):
+            if "django_session" in sql:
+                self.session += 1
+            else:
+                self.other += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = "Count database writes per 1,000 signed-in requests with and without throttled activity tracking."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=1000, help="Requests issued per scenario.")
+        parser.add_argument(
+            "--think-time",
+            type=float,
+            default=5.0,
+            help="Simulated seconds between two requests of the same user.",
+        )
+
+    def handle(self, *args, **options):
+        legacy = {"SESSION_SAVE_EVERY_REQUEST": True, "AUTO_LOGOUT_ACTIVITY_GRANULARITY": 0}
+        scenarios = [("before: save every request", "db", legacy)]
+        scenarios += [(f"after: {engine}", engine, {}) for engine in ENGINES]
+        with isolated_database(), override_settings(**{**MEASUREMENT_SETTINGS, "CACHES": CACHES}):
+            dataset = seed_dataset(scale=20)
+            self.stdout.write(f"{options['requests']} member requests, {options['think_time']:g}s apart")
+            for label, engine, overrides in scenarios:
+                with override_settings(SESSION_ENGINE=f"django.contrib.sessions.backends.{engine}", **overrides):
+                    counter, elapsed = self._measure(dataset, options["requests"], options["think_time"])
+                per_thousand = 1000 / options["requests"]
+                self.stdout.write(
+                    f"{label:<28} session writes/1k={counter.session * per_thousand:7.1f} "
+                    f"other writes/1k={counter.other * per_thousand:6.1f} "
+                    f"{options['requests'] / elapsed:7.1f} req/s"
+                )
+
+    def _measure(self, dataset, total, think_time):
+        client = client_for(MEMBER, dataset)
+        clock = [timezone.now()]
+        counter = WriteCounter()
+        with mock.patch("django.utils.timezone.now", lambda: clock[0]):
+            for path in PATHS:
+                self._get(client, path)
+            started = time.perf_counter()
+            with connection.execute_wrapper(counter):
+                for index in range(total):
+                    clock[0] += timedelta(seconds=think_time)
+                    self._get(client, PATHS[index % len(PATHS)])
+            elapsed = time.perf_counter() - started
+        return counter, elapsed
+
+    def _get(self, client, path):
+        response = client.get(path)
+        assert response.status_code == 200, (path, response.status_code)
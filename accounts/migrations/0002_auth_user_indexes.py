@@ -0,0 +1,25 @@
+from django.db import migrations
+
+# auth.User belongs to django.contrib.auth, so its indexes for the admin
+# panel's user listing and counters are created here with plain SQL.
+INDEXES = [
+    ("accounts_user_joined_idx", "auth_user (date_joined DESC, id DESC)"),
+    # Partial, so the staff count reads only staff rows.
+    ("accounts_user_staff_idx", "auth_user (id) WHERE is_staff"),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=f"CREATE INDEX IF NOT EXISTS {name} ON {definition}",
+            reverse_sql=f"DROP INDEX IF EXISTS {name}",
+        )
+        for name, definition in INDEXES
+    ]
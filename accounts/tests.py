@@ -1,3 +1,86 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+
+class AutoLogoutTests(TestCase):
+	path = "/profile/about/"
+
+	def setUp(self):
+		self.user = get_user_model().objects.create_user("idle-member", "idle@example.com", "idle-pass")
+		self.started = timezone.now()
+		self.client.force_login(self.user)
+
+	def get_at(self, seconds):
+		with mock.patch("django.utils.timezone.now", return_value=self.started + timedelta(seconds=seconds)):
+			return self.client.get(self.path)
+
+	def is_logged_in(self):
+		return "_auth_user_id" in self.client.session
+
+	def test_requests_within_granularity_do_not_write_the_session(self):
+		self.get_at(0)
+		with CaptureQueriesContext(connection) as captured:
+			self.get_at(30)
+		self.assertFalse([query for query in captured if "django_session" in query["sql"] and "UPDATE" in query["sql"]])
+
+	def test_idle_timeout_counts_from_the_last_request(self):
+		delay = settings.AUTO_LOGOUT_DELAY
+		self.get_at(0)
+		self.get_at(30)
+		self.get_at(30 + delay - 1)
+		self.assertTrue(self.is_logged_in())
+		self.get_at(30 + delay - 1 + delay + 1)
+		self.assertFalse(self.is_logged_in())
+
+
+class AdminPanelSessionTests(TestCase):
+	path = "/admin-panel/"
+
+	def setUp(self):
+		from adminpanel.views import ADMIN_SESSION_KEY
+
+		staff = get_user_model().objects.create_user("panel-staff", "panel@example.com", "pass", is_staff=True)
+		self.started = timezone.now()
+		with mock.patch("django.utils.timezone.now", return_value=self.started):
+			session = self.client.session
+			session[ADMIN_SESSION_KEY] = staff.pk
+			session.save()
+
+	def get_at(self, minutes):
+		with mock.patch("django.utils.timezone.now", return_value=self.started + timedelta(minutes=minutes)):
+			return self.client.get(self.path)
+
+	def test_active_admin_sessions_outlive_the_session_age(self):
+		for minutes in range(0, 71, 10):
+			self.assertEqual(self.get_at(minutes).status_code, 200, f"signed out at {minutes} minutes")
+		self.assertEqual(self.get_at(70 + 59).status_code, 200)
+		self.assertEqual(self.get_at(70 + 59 + 61).status_code, 302)
+		self.assertEqual(self.get_at(70 + 59 + 62).status_code, 302)
+
+
+class ServerTimingTests(TestCase):
+	path = "/profile/about/"
+
+	def get_as(self, **fields):
+		user = get_user_model().objects.create_user("timed-member", "timed@example.com", "pass", **fields)
+		self.client.force_login(user)
+		return self.client.get(self.path)
+
+	@override_settings(DEBUG=False)
+	def test_members_do_not_see_server_timings(self):
+		self.assertNotIn("Server-Timing", self.get_as())
+
+	@override_settings(DEBUG=False)
+	def test_staff_see_server_timings(self):
+		self.assertIn("db;dur=", self.get_as(is_staff=True)["Server-Timing"])
+
+	@override_settings(DEBUG=True)
+	def test_debug_shows_server_timings_to_everyone(self):
+		self.assertIn("Server-Timing", self.get_as())
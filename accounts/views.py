@@ -7,12 +7,13 @@ from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout, views as auth_views
 from django.contrib.auth.models import User
-from django.core.mail import send_mail
 from django.shortcuts import redirect, render
 from django.utils import timezone
 
 from .forms import SignupForm
 from .models import EmailOTP
+from mailer.models import OutboundEmail
+from mailer.services import enqueue_email
 from userprofile.models import UserProfile
 
 OTP_EXPIRY = timedelta(minutes=10)
@@ -31,7 +32,14 @@ def _send_verification_email(user: User, code: str) -> None:
         "— JobFlick"
     )
     sender = getattr(settings, "DEFAULT_FROM_EMAIL", "no-reply@jobflick.com")
-    send_mail(subject, message, sender, [user.email], fail_silently=False)
+    enqueue_email(
+        subject,
+        message,
+        [user.email],
+        from_email=sender,
+        priority=OutboundEmail.Priority.HIGH,
+        not_after=timezone.now() + OTP_EXPIRY,
+    )
 
 
 def _create_or_refresh_otp(user: User) -> EmailOTP:
@@ -0,0 +1,203 @@
+"""Datasets the admin panel and ``manage.py export_data`` can export.
+
+Each ``ExportDataset`` names its columns, the ``values_list`` lookups that
+fill them and the filters it accepts. ``export_rows`` applies validated
+filters and iterates server-side with ``.iterator(chunk_size=...)``, so
+``jobflick.exports`` can stream any number of rows in constant memory.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from jobs.models import Job, JobApplication
+from payments.models import WalletTransaction
+from userprofile.models import UserProfile
+
+from .models import SubscriptionLedgerEntry
+
+CHUNK_SIZE = 2000
+
+
+class ExportError(ValueError):
+    """Raised for an unknown dataset or an invalid filter value."""
+
+
+@dataclass(frozen=True)
+class ExportDataset:
+    name: str
+    model: type
+    # (column name, values_list lookup) pairs, in output order.
+    columns: tuple[tuple[str, str], ...]
+    date_field: str
+    # Filter parameter -> (field, allowed values).
+    choice_filters: dict[str, tuple[str, tuple[str, ...]]] = field(default_factory=dict)
+
+    @property
+    def column_names(self) -> tuple[str, ...]:
+        return tuple(name for name, _ in self.columns)
+
+    @property
+    def filter_names(self) -> tuple[str, ...]:
+        return ("since", "until", *self.choice_filters)
+
+
+def _choices(choices_class) -> tuple[str, ...]:
+    return tuple(choices_class.values)
+
+
+DATASETS = {
+    dataset.name: dataset
+    for dataset in (
+        ExportDataset(
+            "transactions",
+            WalletTransaction,
+            (
+                ("reference", "reference"),
+                ("created_at", "created_at"),
+                ("processed_at", "processed_at"),
+                ("username", "user__username"),
+                ("initiated_by", "initiated_by__username"),
+                ("job_tracking_code", "job__tracking_code"),
+                ("direction", "direction"),
+                ("category", "category"),
+                ("status", "status"),
+                ("amount", "amount"),
+                ("balance_before", "balance_before"),
+                ("balance_after", "balance_after"),
+                ("platform_balance_before", "platform_balance_before"),
+                ("platform_balance_after", "platform_balance_after"),
+                ("note", "note"),
+            ),
+            "created_at",
+            {
+                "direction": ("direction", _choices(WalletTransaction.Direction)),
+                "category": ("category", _choices(WalletTransaction.Category)),
+                "status": ("status", _choices(WalletTransaction.Status)),
+            },
+        ),
+        ExportDataset(
+            "users",
+            get_user_model(),
+            (
+                ("id", "id"),
+                ("username", "username"),
+                ("email", "email"),
+                ("first_name", "first_name"),
+                ("last_name", "last_name"),
+                ("is_staff", "is_staff"),
+                ("is_active", "is_active"),
+                ("date_joined", "date_joined"),
+                ("last_login", "last_login"),
+                ("wallet_balance", "profile__wallet_balance"),
+                ("subscription_plan", "profile__subscription_plan"),
+                ("subscription_status", "profile__subscription_status"),
+                ("subscription_expires_at", "profile__subscription_expires_at"),
+            ),
+            "date_joined",
+            {"subscription_status": ("profile__subscription_status", _choices(UserProfile.SubscriptionStatus))},
+        ),
+        ExportDataset(
+            "jobs",
+            Job,
+            (
+                ("tracking_code", "tracking_code"),
+                ("created_at", "created_at"),
+                ("poster", "poster__username"),
+                ("work_title", "work_title"),
+                ("worker_type", "worker_type"),
+                ("location", "location"),
+                ("duration", "duration"),
+                ("amount", "amount"),
+                ("skills", "skills"),
+                ("status", "status"),
+                ("approved_by", "approved_by__username"),
+                ("approved_at", "approved_at"),
+                ("is_filled", "is_filled"),
+                ("filled_at", "filled_at"),
+            ),
+            "created_at",
+            {"status": ("status", _choices(Job.Status))},
+        ),
+        ExportDataset(
+            "applications",
+            JobApplication,
+            (
+                ("id", "id"),
+                ("created_at", "created_at"),
+                ("job_tracking_code", "job__tracking_code"),
+                ("work_title", "job__work_title"),
+                ("applicant", "applicant__username"),
+                ("status", "status"),
+                ("decided_by", "decided_by__username"),
+                ("decision_at", "decision_at"),
+            ),
+            "created_at",
+            {"status": ("status", _choices(JobApplication.Status))},
+        ),
+        ExportDataset(
+            "subscriptions",
+            SubscriptionLedgerEntry,
+            (
+                ("id", "id"),
+                ("created_at", "created_at"),
+                ("username", "user__username"),
+                ("email", "user__email"),
+                ("plan", "plan"),
+                ("amount", "amount"),
+                ("wallet_before", "wallet_before"),
+            ),
+            "created_at",
+            {"plan": ("plan", _choices(UserProfile.SubscriptionPlan))},
+        ),
+    )
+}
+
+
+def get_dataset(name: str) -> ExportDataset:
+    try:
+        return DATASETS[name]
+    except KeyError:
+        raise ExportError(f"Unknown export {name!r}; choose from {', '.join(DATASETS)}.")
+
+
+def _day_start(value: str, param: str) -> datetime:
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is None:
+        raise ExportError(f"{param} must be a date in YYYY-MM-DD format.")
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def export_rows(dataset: ExportDataset, filters=None, *, chunk_size: int = CHUNK_SIZE):
+    """Iterate ``dataset`` rows matching ``filters`` in primary key (insertion) order.
+
+    ``since`` and ``until`` are inclusive dates in the current time zone;
+    the other filters must be one of the dataset's choice values. Empty
+    values are ignored.
+    """
+    queryset = dataset.model._default_manager.all()
+    for param, value in (filters or {}).items():
+        if not value:
+            continue
+        if param == "since":
+            queryset = queryset.filter(**{f"{dataset.date_field}__gte": _day_start(value, param)})
+        elif param == "until":
+            end = _day_start(value, param) + timedelta(days=1)
+            queryset = queryset.filter(**{f"{dataset.date_field}__lt": end})
+        elif param in dataset.choice_filters:
+            field_name, allowed = dataset.choice_filters[param]
+            if value not in allowed:
+                raise ExportError(f"{param} must be one of {', '.join(allowed)}.")
+            queryset = queryset.filter(**{field_name: value})
+        else:
+            raise ExportError(f"{dataset.name} cannot be filtered by {param!r}.")
+    lookups = [lookup for _, lookup in dataset.columns]
+    return queryset.order_by("pk").values_list(*lookups).iterator(chunk_size=chunk_size)
@@ -31,14 +31,20 @@ class AdminLoginForm(forms.Form):
 
 
 class WalletAdjustmentForm(forms.Form):
+    # Looked up by unique key instead of rendered as <select> options, so the
+    # form never loads every user and job on the transactions page.
     recipient = forms.ModelChoiceField(
         queryset=User.objects.all(),
-        widget=forms.Select(attrs={"class": "form-control"}),
+        to_field_name="username",
+        widget=forms.TextInput(attrs={"class": "form-control", "placeholder": "Username"}),
+        error_messages={"invalid_choice": "No user with that username."},
     )
     job = forms.ModelChoiceField(
         queryset=Job.objects.all(),
+        to_field_name="tracking_code",
         required=False,
-        widget=forms.Select(attrs={"class": "form-control"}),
+        widget=forms.TextInput(attrs={"class": "form-control", "placeholder": "Tracking code, e.g. JB-00001AZ"}),
+        error_messages={"invalid_choice": "No job with that tracking code."},
     )
     direction = forms.ChoiceField(
         choices=WalletTransaction.Direction.choices,
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from adminpanel.exports import CHUNK_SIZE, DATASETS, ExportError, export_rows, get_dataset
+from jobflick.exports import CSV, FORMATS, iter_export
+
+
+class Command(BaseCommand):
+    help = "Stream a dataset (transactions, users, jobs, applications, subscriptions) as CSV or JSON Lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=list(DATASETS))
+        parser.add_argument("--format", choices=FORMATS, default=CSV)
+        parser.add_argument("--output", "-o", default="-", help="File to write, '-' for stdout (default).")
+        parser.add_argument("--since", help="First day to include (YYYY-MM-DD).")
+        parser.add_argument("--until", help="Last day to include (YYYY-MM-DD).")
+        parser.add_argument(
+            "--filter",
+            action="append",
+            default=[],
+            metavar="FIELD=VALUE",
+            help="Choice filter such as status=completed or direction=user_to_jobflick; repeatable.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        filters = {"since": options["since"], "until": options["until"]}
+        for item in options["filter"]:
+            param, sep, value = item.partition("=")
+            if not sep:
+                raise CommandError(f"--filter expects FIELD=VALUE, got {item!r}.")
+            filters[param.strip()] = value.strip()
+        try:
+            dataset = get_dataset(options["dataset"])
+            rows = export_rows(dataset, filters, chunk_size=options["chunk_size"])
+        except ExportError as exc:
+            raise CommandError(str(exc))
+
+        chunks = iter_export(options["format"], dataset.column_names, rows)
+        if options["output"] == "-":
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+        with open(options["output"], "w", encoding="utf-8", newline="") as handle:
+            for chunk in chunks:
+                handle.write(chunk)
+        self.stderr.write(f"Wrote {dataset.name} export to {options['output']}.")
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubscriptionLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('plan', models.CharField(choices=[('none', 'No Subscription'), ('one_month', '1 Month'), ('six_months', '6 Months'), ('one_year', '12 Months')], max_length=20)),
+                ('amount', models.PositiveIntegerField()),
+                ('wallet_before', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subscription_ledger_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['plan', '-created_at', '-id'], name='adminpanel_ledger_plan_idx'), models.Index(fields=['created_at'], name='adminpanel_ledger_created_idx')],
+            },
+        ),
+    ]
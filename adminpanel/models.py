@@ -17,6 +17,10 @@ class SubscriptionLedgerEntry(models.Model):
 
 	class Meta:
 		ordering = ["-created_at"]
+		indexes = [
+			models.Index(fields=["plan", "-created_at", "-id"], name="adminpanel_ledger_plan_idx"),
+			models.Index(fields=["created_at"], name="adminpanel_ledger_created_idx"),
+		]
 
 	def __str__(self):
 		return f"{self.user} - {self.amount} BDT ({self.get_plan_display()})"
@@ -0,0 +1,63 @@
+"""Aggregated subscription reporting for the admin panel.
+
+Plan totals are read from the running ``payments.totals`` metrics; revenue
+per period is one grouped query over ``SubscriptionLedgerEntry``.
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from payments import totals
+from userprofile.models import UserProfile
+
+from .models import SubscriptionLedgerEntry
+
+PLAN_ORDER = [
+    UserProfile.SubscriptionPlan.ONE_MONTH,
+    UserProfile.SubscriptionPlan.SIX_MONTHS,
+    UserProfile.SubscriptionPlan.ONE_YEAR,
+]
+
+DAY = "day"
+WEEK = "week"
+MONTH = "month"
+PERIODS = {DAY: TruncDay, WEEK: TruncWeek, MONTH: TruncMonth}
+# How far back the dashboard chart reaches for each period.
+PERIOD_WINDOWS = {DAY: timedelta(days=30), WEEK: timedelta(weeks=12), MONTH: timedelta(days=365)}
+
+
+
+def plan_label(plan: str) -> str:
+    return UserProfile.SUBSCRIPTION_DETAILS.get(plan, {}).get("label", UserProfile.SubscriptionPlan(plan).label)
+
+
+def plan_totals() -> list[dict]:
+    """Entry count and revenue per plan, in ``PLAN_ORDER``, from the ledger totals."""
+    stored = totals.totals_with_counts([totals.plan_key(plan) for plan in PLAN_ORDER])
+    rows = []
+    for plan in PLAN_ORDER:
+        total, count = stored.get(totals.plan_key(plan), (0, 0))
+        rows.append({"plan": plan, "label": plan_label(plan), "count": count, "total": total})
+    return rows
+
+
+def revenue_by_period(period: str = MONTH, *, since=None, plan: str | None = None) -> list[dict]:
+    """Revenue and entry count per ``period`` bucket (oldest first) in the current time zone."""
+    entries = SubscriptionLedgerEntry.objects.order_by()
+    if since is None:
+        since = timezone.now() - PERIOD_WINDOWS[period]
+    entries = entries.filter(created_at__gte=since)
+    if plan:
+        entries = entries.filter(plan=plan)
+    return list(
+        entries.annotate(bucket=PERIODS[period]("created_at"))
+        .values("bucket")
+        .annotate(total=Sum("amount"), count=Count("id"))
+        .order_by("bucket")
+    )
+
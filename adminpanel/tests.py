@@ -1,3 +1,19 @@
-from django.test import TestCase
+import csv
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from jobflick.exports import iter_export
+
+
+class ExportTests(SimpleTestCase):
+	def test_csv_cells_cannot_start_a_formula(self):
+		rows = [('=HYPERLINK("http://x")', "+1", "-2", "@SUM(A1)", "plain", -5, None)]
+		lines = "".join(iter_export("csv", list("abcdefg"), rows)).splitlines()
+		self.assertEqual(
+			list(csv.reader(lines))[1],
+			["'=HYPERLINK(\"http://x\")", "'+1", "'-2", "'@SUM(A1)", "plain", "-5", ""],
+		)
+
+	def test_jsonl_keeps_values_as_they_are(self):
+		lines = "".join(iter_export("jsonl", ["title"], [("=1+1",)])).splitlines()
+		self.assertEqual(lines, ['{"title": "=1+1"}'])
@@ -17,4 +17,12 @@ urlpatterns = [
         views.delete_notification,
         name="adminpanel-delete-notification",
     ),
+    path(
+        "notifications/group/<int:pk>/dismiss/",
+        views.dismiss_group_notification,
+        name="adminpanel-dismiss-group-notification",
+    ),
+    path("exports/<slug:name>/", views.export_data, name="adminpanel-export"),
+    path("performance/reset/", views.reset_performance_stats, name="adminpanel-reset-performance"),
+    path("performance/profiles/<str:name>/", views.download_profile, name="adminpanel-download-profile"),
 ]
@@ -1,19 +1,28 @@
-from datetime import timedelta
+from datetime import datetime, time, timedelta
 from functools import wraps
 
 from django.contrib import messages
 from django.contrib.auth import get_user_model
-from django.db.models import Q, Sum
+from django.db.models import Count
+from django.http import FileResponse, Http404, HttpResponseBadRequest
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
 from django.views.decorators.http import require_POST
 
+from jobflick import exports, profiling
+from jobflick.pagination import paginate
+from jobflick.routers import reading_from_primary, replica_reads
 from jobs.models import Job, JobApplication
-from userprofile.models import Notification, UserProfile
+from pages.stats import TOTAL_USERS, get_platform_stats
+from userprofile import subscriptions
+from userprofile.models import GroupNotification, GroupNotificationDismissal, Notification, UserProfile
 from payments.models import PlatformWallet, WalletTransaction
+from payments import totals
 from payments.services import InsufficientBalanceError, mark_transaction_completed
 
+from . import exports as admin_exports
+from . import reports
 from .forms import AdminLoginForm, WalletAdjustmentForm
 from .models import SubscriptionLedgerEntry
 
@@ -58,6 +67,7 @@ SECTION_COPY = {
 	"transactions": {"title": "Transactions", "subtitle": "Track platform funds."},
 	"subscribers": {"title": "Subscribers", "subtitle": "See who activated paid plans."},
 	"notifications": {"title": "Notifications", "subtitle": "Stay on top of user activity."},
+	"performance": {"title": "Performance", "subtitle": "Request timings per page in this server process."},
 }
 
 
@@ -99,6 +109,7 @@ def logout_view(request):
 
 
 @staff_required
+@replica_reads
 def dashboard_view(request):
 	section = request.GET.get("section", "users").lower()
 	if section not in SECTION_COPY:
@@ -112,90 +123,125 @@ def dashboard_view(request):
 		"admin_user": request.admin_user,
 	}
 	if section == "users":
-		now = timezone.now()
-		start_of_week_date = (now - timedelta(days=now.weekday())).date()
-		context["users"] = User.objects.order_by("-date_joined")
+		today = timezone.localdate()
+		start_of_week = timezone.make_aware(datetime.combine(today - timedelta(days=today.weekday()), time.min))
+		context["users"] = paginate(request, User.objects.all(), ordering=("-date_joined", "-id"))
+		context["users_count"] = get_platform_stats()[TOTAL_USERS]
 		context["admins_count"] = User.objects.filter(is_staff=True).count()
-		context["new_users_count"] = User.objects.filter(date_joined__date__gte=start_of_week_date).count()
+		context["new_users_count"] = User.objects.filter(date_joined__gte=start_of_week).count()
 	elif section == "jobs":
-		context["jobs"] = Job.objects.select_related("poster").order_by("-created_at")
+		context["jobs"] = paginate(request, Job.objects.select_related("poster"))
 	elif section == "post-approvals":
-		context["pending_jobs"] = (
-			Job.objects.filter(status=Job.Status.PENDING)
-			.select_related("poster")
-			.order_by("-created_at")
+		context["pending_jobs"] = paginate(
+			request,
+			Job.objects.filter(status=Job.Status.PENDING).select_related("poster"),
 		)
 	elif section == "approvals":
-		context["applications"] = (
-			JobApplication.objects.select_related("job", "applicant", "decided_by")
-			.order_by("-created_at")
+		context["applications"] = paginate(
+			request,
+			JobApplication.objects.select_related("job", "applicant", "decided_by"),
 		)
 	elif section == "transactions":
-		transactions = (
-			WalletTransaction.objects.select_related("user", "initiated_by", "job")
-			.order_by("-created_at")
+		transactions = WalletTransaction.objects.select_related("user", "initiated_by", "job")
+		ledger_totals = totals.totals(
+			[totals.PAYOUT, totals.COLLECTION, totals.SUBSCRIPTION]
+			+ [totals.category_key(value) for value in WalletTransaction.Category.values]
 		)
-		payout_total = (
-			transactions.filter(
-				direction=WalletTransaction.Direction.JOBFLICK_TO_USER,
-				status=WalletTransaction.Status.COMPLETED,
-			).aggregate(total_amount=Sum("amount"))
-		)
-		collection_total = (
-			transactions.filter(
-				direction=WalletTransaction.Direction.USER_TO_JOBFLICK,
-				status=WalletTransaction.Status.COMPLETED,
-			).aggregate(total_amount=Sum("amount"))
-		)
-		subscription_total = SubscriptionLedgerEntry.objects.aggregate(total_amount=Sum("amount"))
 		context.update(
 			{
-				"transactions": transactions,
-				"payout_total": payout_total.get("total_amount") or 0,
-				"collection_total": collection_total.get("total_amount") or 0,
-				"subscription_total": subscription_total.get("total_amount") or 0,
+				"transactions": paginate(request, transactions),
+				"payout_total": ledger_totals.get(totals.PAYOUT, 0),
+				"collection_total": ledger_totals.get(totals.COLLECTION, 0),
+				"subscription_total": ledger_totals.get(totals.SUBSCRIPTION, 0),
+				"category_totals": [
+					(label, ledger_totals.get(totals.category_key(value), 0))
+					for value, label in WalletTransaction.Category.choices
+				],
 				"platform_balance": PlatformWallet.current_balance(),
 				"wallet_form": WalletAdjustmentForm(),
+				"transaction_filters": [
+					("direction", WalletTransaction.Direction.choices),
+					("category", WalletTransaction.Category.choices),
+					("status", WalletTransaction.Status.choices),
+				],
 			}
 		)
 	elif section == "subscribers":
-		entries = SubscriptionLedgerEntry.objects.select_related("user").order_by("-created_at")
-		plan_order = [
-			UserProfile.SubscriptionPlan.ONE_MONTH,
-			UserProfile.SubscriptionPlan.SIX_MONTHS,
-			UserProfile.SubscriptionPlan.ONE_YEAR,
-		]
-		plan_sections = []
-		for plan_key in plan_order:
-			plan_entries = entries.filter(plan=plan_key)
-			plan_total = plan_entries.aggregate(total_amount=Sum("amount"))
-			plan_sections.append(
-				{
-					"plan": plan_key,
-					"label": UserProfile.SUBSCRIPTION_DETAILS.get(plan_key, {}).get(
-						"label",
-						UserProfile.SubscriptionPlan(plan_key).label,
-					),
-					"entries": plan_entries,
-					"total": plan_total.get("total_amount") or 0,
-				}
+		entries = SubscriptionLedgerEntry.objects.select_related("user")
+		period = request.GET.get("period", reports.MONTH)
+		if period not in reports.PERIODS:
+			period = reports.MONTH
+		plan_sections = reports.plan_totals()
+		for plan in plan_sections:
+			plan["entries"] = paginate(
+				request,
+				entries.filter(plan=plan["plan"]),
+				cursor_param=f"{plan['plan']}_cursor",
 			)
-		overall_total = entries.aggregate(total_amount=Sum("amount"))
+		revenue = reports.revenue_by_period(period)
+		peak = max((bucket["total"] for bucket in revenue), default=0)
+		for bucket in revenue:
+			bucket["percent"] = round(bucket["total"] * 100 / peak) if peak else 0
+		today = timezone.now().date()
+		status_counts = dict(
+			UserProfile.objects.filter(
+				subscription_status__in=[UserProfile.SubscriptionStatus.ACTIVE, UserProfile.SubscriptionStatus.EXPIRED]
+			)
+			.order_by()
+			.values_list("subscription_status")
+			.annotate(total=Count("id"))
+		)
 		context.update(
 			{
 				"plan_sections": plan_sections,
-				"subscription_total": overall_total.get("total_amount") or 0,
+				"subscription_total": sum(plan["total"] for plan in plan_sections),
+				"revenue_period": period,
+				"revenue_periods": list(reports.PERIODS),
+				"revenue_buckets": revenue,
+				"active_subscribers": status_counts.get(UserProfile.SubscriptionStatus.ACTIVE, 0),
+				"expired_subscribers": status_counts.get(UserProfile.SubscriptionStatus.EXPIRED, 0),
+				"reminder_days": subscriptions.reminder_days(),
+				"expiring_soon": paginate(
+					request,
+					subscriptions.expiring_between(today, today + timedelta(days=subscriptions.reminder_days()))
+					.select_related("user"),
+					per_page=10,
+					ordering=("subscription_expires_at", "id"),
+					cursor_param="expiring_cursor",
+					previous_label="Sooner",
+					next_label="Later",
+				),
 			}
 		)
 	elif section == "notifications":
-		notifications = (
-			Notification.objects.filter(user=request.admin_user, is_staff_only=True)
-			.order_by("-created_at")
+		notifications = Notification.objects.filter(user=request.admin_user, is_staff_only=True)
+		# Opening the section marks its notifications read, so it reads
+		# from the primary: the replica may not have the newest ones yet.
+		with reading_from_primary():
+			page = paginate(request, notifications)
+			unread_ids = list(notifications.filter(is_read=False).values_list("id", flat=True))
+			if unread_ids:
+				Notification.objects.filter(id__in=unread_ids).update(is_read=True)
+			group_page = paginate(
+				request,
+				GroupNotification.visible_to(request.admin_user),
+				cursor_param="group_cursor",
+			)
+			# Pages load lazily; fetch them here rather than while rendering.
+			len(page)
+			len(group_page)
+		context["notifications"] = page
+		context["group_notifications"] = group_page
+	elif section == "performance":
+		context.update(
+			{
+				"view_stats": profiling.store.snapshot(),
+				"stats_since": datetime.fromtimestamp(profiling.store.started_at, tz=timezone.get_current_timezone()),
+				"profiling_enabled": profiling.enabled(),
+				"sample_rate": profiling.sample_rate(),
+				"profile_dumps": profiling.list_dumps(),
+			}
 		)
-		unread_ids = list(notifications.filter(is_read=False).values_list("id", flat=True))
-		if unread_ids:
-			Notification.objects.filter(id__in=unread_ids).update(is_read=True)
-		context["notifications"] = notifications
 	return render(request, "adminpanel/dashboard.html", context)
 
 
@@ -318,3 +364,47 @@ def delete_notification(request, pk):
 	notification.delete()
 	messages.success(request, "Notification removed.")
 	return _redirect_to_section("notifications")
+
+
+@staff_required
+@require_POST
+def dismiss_group_notification(request, pk):
+	notification = get_object_or_404(GroupNotification.visible_to(request.admin_user), pk=pk)
+	GroupNotificationDismissal.objects.get_or_create(notification=notification, user=request.admin_user)
+	messages.success(request, "Notification removed.")
+	return _redirect_to_section("notifications")
+
+
+@staff_required
+@require_POST
+def reset_performance_stats(request):
+	profiling.store.reset()
+	messages.success(request, "Performance statistics cleared.")
+	return _redirect_to_section("performance")
+
+
+@staff_required
+def download_profile(request, name):
+	path = profiling.dump_path(name)
+	if path is None:
+		raise Http404("Profile not found.")
+	return FileResponse(path.open("rb"), as_attachment=True, filename=name)
+
+
+@staff_required
+@replica_reads
+def export_data(request, name):
+	if name not in admin_exports.DATASETS:
+		raise Http404("Unknown export.")
+	fmt = request.GET.get("format", exports.CSV)
+	if fmt not in exports.FORMATS:
+		return HttpResponseBadRequest(f"format must be one of {', '.join(exports.FORMATS)}.")
+	dataset = admin_exports.DATASETS[name]
+	try:
+		filters = {param: request.GET.get(param, "").strip() for param in dataset.filter_names}
+		rows = admin_exports.export_rows(dataset, filters)
+	except admin_exports.ExportError as exc:
+		return HttpResponseBadRequest(str(exc))
+	suffix = "-".join(value for value in filters.values() if value)
+	filename = f"{name}-{suffix or 'all'}-{timezone.localdate():%Y%m%d}"
+	return exports.streaming_export(fmt, dataset.column_names, rows, filename=filename)
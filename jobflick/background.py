@@ -0,0 +1,71 @@
+"""Run work after the surrounding transaction commits, off the request path.
+
+Each subsystem picks a delivery mode from its own setting:
+
+``inline``
+    run the callable in the calling thread once the transaction commits.
+``thread``
+    hand the callable to a small shared thread pool once the transaction
+    commits, so the request returns without waiting for it.
+``worker``
+    do nothing; a management command drains the queued work instead.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+INLINE = "inline"
+THREAD = "thread"
+WORKER = "worker"
+MODES = (INLINE, THREAD, WORKER)
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "JOBFLICK_BACKGROUND_THREADS", 2),
+                thread_name_prefix="jobflick-background",
+            )
+            atexit.register(_executor.shutdown, wait=True)
+        return _executor
+
+
+def _run_in_thread(func) -> None:
+    try:
+        func()
+    except Exception:
+        logger.exception("Background task %r failed.", func)
+    finally:
+        # Pool threads hold their own connections; never leave them open.
+        connections.close_all()
+
+
+def submit(func) -> None:
+    """Run ``func()`` in the shared thread pool now, without waiting for a commit."""
+    _get_executor().submit(_run_in_thread, func)
+
+
+def dispatch(func, *, mode: str, using: str = "default") -> None:
+    """Schedule ``func()`` according to ``mode`` once the current transaction commits."""
+    if mode not in MODES:
+        raise ValueError(f"Unknown background mode {mode!r}; expected one of {', '.join(MODES)}.")
+    if mode == WORKER:
+        return
+    if mode == INLINE:
+        transaction.on_commit(func, using=using, robust=True)
+        return
+    transaction.on_commit(lambda: submit(func), using=using)
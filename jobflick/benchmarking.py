@@ -0,0 +1,342 @@
+"""Helpers shared by the ``benchmark_*`` management commands."""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass
+
+from django.db import connections
+
+from jobflick.stats import percentile
+
+
+@contextlib.contextmanager
+def isolated_database(*, file_based: bool = False, verbosity: int = 0):
+    """Run the block against a throwaway database built from the current models.
+
+    Benchmarks seed large volumes of rows, so they never touch the configured
+    database. The Django test environment is active inside the block, so the
+    test client works and outgoing mail lands in the locmem outbox.
+    ``file_based`` forces an on-disk SQLite file instead of the default shared
+    in-memory test database, which multi-threaded benchmarks need for
+    realistic locking behaviour.
+    """
+    from django.test.utils import (
+        setup_databases,
+        setup_test_environment,
+        teardown_databases,
+        teardown_test_environment,
+    )
+
+    connection = connections["default"]
+    test_settings = connection.settings_dict.setdefault("TEST", {})
+    previous_name = test_settings.get("NAME")
+    tmp_path = None
+    if file_based and connection.vendor == "sqlite":
+        handle, tmp_path = tempfile.mkstemp(prefix="jobflick-bench-", suffix=".sqlite3")
+        os.close(handle)
+        os.unlink(tmp_path)
+        test_settings["NAME"] = tmp_path
+    setup_test_environment()
+    old_config = setup_databases(verbosity, False, aliases={"default"}, serialized_aliases=set())
+    try:
+        yield connection
+    finally:
+        teardown_databases(old_config, verbosity)
+        teardown_test_environment()
+        test_settings["NAME"] = previous_name
+        if tmp_path and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+@dataclass(frozen=True)
+class LatencySummary:
+    count: int
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+
+    def __str__(self) -> str:
+        return f"n={self.count} mean={self.mean_ms:.2f}ms p50={self.p50_ms:.2f}ms p95={self.p95_ms:.2f}ms"
+
+
+def summarize(samples: list[float]) -> LatencySummary:
+    """Summarize latency samples recorded in seconds."""
+    millis = [sample * 1000 for sample in samples]
+    return LatencySummary(
+        count=len(millis),
+        mean_ms=statistics.fmean(millis) if millis else 0.0,
+        p50_ms=percentile(millis, 50),
+        p95_ms=percentile(millis, 95),
+    )
+
+
+def time_calls(func, iterations: int) -> LatencySummary:
+    """Call ``func`` ``iterations`` times and summarize the wall-clock latency."""
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+# ---------- View benchmarks and query-count regressions ----------
+
+ANONYMOUS = "anonymous"
+MEMBER = "member"
+STAFF = "staff"
+
+# Settings every view measurement runs under: caches are disabled so the
+# cold path is what gets counted, and background work runs inline so query
+# counts are deterministic.
+MEASUREMENT_SETTINGS = {
+    "CACHES": {
+        "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+        "fragments": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+    },
+    "JOBFLICK_NOTIFICATION_DELIVERY": "inline",
+    "JOBFLICK_MAIL_DELIVERY": "inline",
+    "JOBFLICK_RECOMMENDATION_BUILD": "inline",
+}
+
+
+@dataclass
+class Dataset:
+    """Accounts the seeded rows hang off, plus ids detail URLs need."""
+
+    member: object
+    staff: object
+    member_notification_id: int = 0
+    batches: int = 0
+
+
+def seed_dataset(dataset: Dataset | None = None, *, scale: int = 1) -> Dataset:
+    """Add ``scale`` rows of every kind each listing view shows.
+
+    Call it again with the returned ``dataset`` to grow the same accounts'
+    data; the regression tests compare query counts between the two sizes.
+    """
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from adminpanel.models import SubscriptionLedgerEntry
+    from jobs.facets import reconcile_facet_counts
+    from pages.stats import reconcile_platform_stats
+    from jobs.models import Job, JobApplication
+    from payments.models import WalletTransaction
+    from skills.models import JobSkill
+    from skills.services import sync_skills
+    from userprofile.models import GroupNotification, Notification, UserProfile
+
+    User = get_user_model()
+    if dataset is None:
+        member = User.objects.create_user("bench-member", "member@example.com", "bench-pass")
+        staff = User.objects.create_user("bench-staff", "staff@example.com", "bench-pass", is_staff=True)
+        profile = UserProfile.objects.create(user=member, skills="Wiring, Plumbing", present_address="Uttara, Dhaka")
+        profile.apply_subscription(UserProfile.SubscriptionPlan.ONE_YEAR)
+        profile.save()
+        UserProfile.objects.create(user=staff)
+        dataset = Dataset(member=member, staff=staff)
+    dataset.batches += 1
+    tag = f"b{dataset.batches}"
+    member, staff = dataset.member, dataset.staff
+
+    others = User.objects.bulk_create(
+        [User(username=f"bench-{tag}-{index}", email=f"{tag}-{index}@example.com") for index in range(scale)]
+    )
+    UserProfile.objects.bulk_create([UserProfile(user=user) for user in others])
+
+    def job(poster, index, status):
+        return Job(
+            poster=poster,
+            work_title=f"Gig {tag}-{index}",
+            worker_type="Electrician",
+            duration="2 days",
+            amount=1500,
+            location="Uttara, Dhaka",
+            skills="Wiring",
+            status=status,
+            approved_by=staff if status == Job.Status.APPROVED else None,
+        )
+
+    other_jobs = Job.objects.bulk_create([job(user, index, Job.Status.APPROVED) for index, user in enumerate(others)])
+    member_jobs = Job.objects.bulk_create(
+        [job(member, index, Job.Status.APPROVED) for index in range(scale)]
+        + [job(member, index, Job.Status.PENDING) for index in range(scale)]
+    )
+    sync_skills([*other_jobs, *member_jobs], JobSkill)
+    JobApplication.objects.bulk_create(
+        [JobApplication(job=posted, applicant=member) for posted in other_jobs]
+        + [
+            JobApplication(
+                job=posted,
+                applicant=applicant,
+                status=JobApplication.Status.APPROVED,
+                decided_by=staff,
+                decision_at=timezone.now(),
+            )
+            for posted, applicant in zip(member_jobs, others)
+        ]
+    )
+    WalletTransaction.objects.bulk_create(
+        [
+            WalletTransaction(
+                user=member,
+                initiated_by=staff,
+                job=posted,
+                direction=WalletTransaction.Direction.JOBFLICK_TO_USER,
+                category=WalletTransaction.Category.PAYOUT,
+                amount=100,
+                status=WalletTransaction.Status.COMPLETED,
+            )
+            for posted in member_jobs[:scale]
+        ]
+    )
+    entries = SubscriptionLedgerEntry.objects.bulk_create(
+        [
+            SubscriptionLedgerEntry(user=user, plan=plan, amount=120, wallet_before=2000)
+            for user in [member, *others]
+            for plan in (UserProfile.SubscriptionPlan.ONE_MONTH, UserProfile.SubscriptionPlan.ONE_YEAR)
+        ]
+    )
+    notifications = Notification.objects.bulk_create(
+        [Notification(user=member, message=f"Update {tag}-{index}", subscription_entry=entries[0]) for index in range(scale)]
+        + [Notification(user=staff, message=f"Staff {tag}-{index}", is_staff_only=True) for index in range(scale)]
+    )
+    GroupNotification.objects.bulk_create([GroupNotification(message=f"Team {tag}-{index}") for index in range(scale)])
+    dataset.member_notification_id = notifications[0].pk
+    reconcile_facet_counts()
+    reconcile_platform_stats()
+    return dataset
+
+
+@dataclass(frozen=True)
+class ViewCase:
+    app: str
+    role: str
+    path: object  # str, or a callable taking the Dataset
+
+    def url(self, dataset: Dataset) -> str:
+        return self.path(dataset) if callable(self.path) else self.path
+
+
+def _admin_sections():
+    return ["users", "jobs", "post-approvals", "approvals", "transactions", "subscribers", "notifications", "performance"]
+
+
+# Every page reachable with GET from jobflick/urls.py. Endpoints that only
+# act on POST (status changes, deletes, logout, OTP resend) redirect on GET
+# and are not listed; neither is the Django admin.
+VIEW_CASES = [
+    # Signed-in members are redirected to their dashboard; staff see the page.
+    *(ViewCase("pages", role, "/") for role in (ANONYMOUS, STAFF)),
+    ViewCase("pages", ANONYMOUS, "/?area=uttara"),
+    ViewCase("pages", ANONYMOUS, "/?near=banani"),
+    *(
+        ViewCase("pages", ANONYMOUS, path)
+        for path in ("/about/", "/contact/", "/privacy/", "/terms/", "/faqs/", "/help-center/")
+    ),
+    ViewCase("jobs", MEMBER, "/jobs/"),
+    ViewCase("jobs", MEMBER, "/jobs/?location=Uttara&category=Electrician"),
+    ViewCase("jobs", MEMBER, "/jobs/?location=Dhaka"),
+    ViewCase("jobs", MEMBER, "/jobs/?skill=wiring"),
+    ViewCase("jobs", MEMBER, "/jobs/?q=electrician+wiring"),
+    ViewCase("jobs", MEMBER, "/jobs/?area=uttara"),
+    ViewCase("jobs", MEMBER, "/jobs/?area=uttara&type=electrician&budget=2&state=open"),
+    ViewCase("jobs", MEMBER, "/jobs/?near=me"),
+    ViewCase("jobs", MEMBER, "/jobs/?near=banani&radius=10"),
+    ViewCase("jobs", MEMBER, "/post-job/"),
+    ViewCase("jobs", STAFF, "/applications/"),
+    *(
+        ViewCase("accounts", ANONYMOUS, path)
+        for path in (
+            "/accounts/signup/",
+            "/accounts/login/",
+            "/accounts/password-reset/",
+            "/accounts/password-reset/done/",
+            "/accounts/reset/done/",
+        )
+    ),
+    *(
+        ViewCase("userprofile", MEMBER, f"/profile/{path}")
+        for path in (
+            "dashboard/",
+            "edit/",
+            "subscription/",
+            "subscription/status/",
+            "chat/",
+            "activity/",
+            "transactions/",
+            "help/",
+            "about/",
+            "contact/",
+            "notifications/",
+        )
+    ),
+    ViewCase("userprofile", MEMBER, lambda dataset: f"/profile/notifications/{dataset.member_notification_id}/"),
+    ViewCase("adminpanel", ANONYMOUS, "/admin-panel/login/"),
+    *(ViewCase("adminpanel", STAFF, f"/admin-panel/?section={section}") for section in _admin_sections()),
+]
+
+
+def client_for(role: str, dataset: Dataset):
+    """Return a test client signed in as ``role``."""
+    from django.test import Client
+
+    from adminpanel.views import ADMIN_SESSION_KEY
+
+    client = Client()
+    if role == MEMBER:
+        client.force_login(dataset.member)
+    elif role == STAFF:
+        client.force_login(dataset.staff)
+        session = client.session
+        session[ADMIN_SESSION_KEY] = dataset.staff.pk
+        session.save()
+    return client
+
+
+@dataclass(frozen=True)
+class ViewMeasurement:
+    case: ViewCase
+    url: str
+    status: int
+    queries: int
+    latency: LatencySummary | None = None
+    peak_kib: float = 0.0
+
+
+def count_queries(client, url: str) -> tuple[int, int]:
+    """Return ``(status_code, queries executed)`` for a GET of ``url``.
+
+    One unmeasured request runs first so lazily created rows (counters,
+    sessions) do not count against the view.
+    """
+    from django.test.utils import CaptureQueriesContext
+
+    client.get(url)
+    with CaptureQueriesContext(connections["default"]) as captured:
+        response = client.get(url)
+    return response.status_code, len(captured.captured_queries)
+
+
+def measure_view(case: ViewCase, dataset: Dataset, *, iterations: int = 20) -> ViewMeasurement:
+    """Query count, latency percentiles and peak traced memory of one view."""
+    import tracemalloc
+
+    client = client_for(case.role, dataset)
+    url = case.url(dataset)
+    status, queries = count_queries(client, url)
+    latency = time_calls(lambda: client.get(url), iterations) if iterations else None
+    tracemalloc.start()
+    try:
+        client.get(url)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return ViewMeasurement(case, url, status, queries, latency, peak / 1024)
@@ -0,0 +1,175 @@
+"""Short, unique, human-readable identifiers such as ``JB-000001Z``.
+
+Each prefix owns a counter row in ``pages.IdentifierSequence``. A process
+reserves a block of values with one ``UPDATE`` and then hands them out from
+memory, so generating an identifier normally costs no query and never needs
+an existence check: every value is issued exactly once across processes.
+Values increase within a process and, block by block, over time.
+
+Values are rendered in Crockford base32 (digits and upper-case letters
+without I, L, O and U), zero-padded to ``WIDTH`` characters.
+"""
+
+from __future__ import annotations
+
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, connections, router, transaction
+
+CROCKFORD_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+WIDTH = 7
+DEFAULT_BLOCK_SIZE = 50
+
+_DECODE = {char: index for index, char in enumerate(CROCKFORD_ALPHABET)}
+_DECODE.update({"O": 0, "I": 1, "L": 1})
+
+
+def encode(value: int, width: int = WIDTH) -> str:
+    """Encode a non-negative integer in Crockford base32."""
+    if value < 0:
+        raise ValueError("Identifiers must be non-negative.")
+    chars = []
+    while value:
+        value, remainder = divmod(value, 32)
+        chars.append(CROCKFORD_ALPHABET[remainder])
+    return "".join(reversed(chars)).rjust(width, "0")
+
+
+def decode(text: str) -> int:
+    """Inverse of ``encode``; accepts lower case and the usual I/L/O look-alikes."""
+    value = 0
+    for char in text.upper().replace("-", ""):
+        try:
+            value = value * 32 + _DECODE[char]
+        except KeyError:
+            raise ValueError(f"{text!r} is not a Crockford base32 identifier.") from None
+    return value
+
+
+def _sequence_model():
+    from pages.models import IdentifierSequence
+
+    return IdentifierSequence
+
+
+def _reserve_with(connection, name: str, count: int) -> int:
+    """Advance sequence ``name`` by ``count`` and return its new high-water mark."""
+    table = connection.ops.quote_name(_sequence_model()._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(f"UPDATE {table} SET last_value = last_value + %s WHERE name = %s", [count, name])
+        if cursor.rowcount == 0:
+            cursor.execute(f"INSERT INTO {table} (name, last_value) VALUES (%s, %s)", [name, count])
+        cursor.execute(f"SELECT last_value FROM {table} WHERE name = %s", [name])
+        return cursor.fetchone()[0]
+
+
+def _reserves_inline(using: str) -> bool:
+    """Whether a reservation on ``using`` joins the caller's open transaction.
+
+    SQLite has a single writer, so a second connection would wait on the
+    caller's own write lock; it reserves inside the caller's transaction and
+    its values only become permanent when that transaction commits.
+    """
+    connection = connections[using]
+    return connection.in_atomic_block and connection.vendor == "sqlite"
+
+
+def _reserve(name: str, count: int, using: str) -> range:
+    connection = connections[using]
+    if connection.in_atomic_block and connection.vendor != "sqlite":
+        # Don't hold the sequence row lock until the caller's transaction
+        # commits: reserve on a private autocommit connection instead.
+        side = connections.create_connection(using)
+        try:
+            for attempt in range(2):
+                side.set_autocommit(False)
+                try:
+                    last = _reserve_with(side, name, count)
+                except IntegrityError:
+                    side.rollback()
+                    if attempt:
+                        raise
+                else:
+                    side.commit()
+                    break
+        finally:
+            side.close()
+    else:
+        for attempt in range(2):
+            try:
+                with transaction.atomic(using=using):
+                    last = _reserve_with(connection, name, count)
+            except IntegrityError:
+                # Another process created the sequence row first.
+                if attempt:
+                    raise
+            else:
+                break
+    return range(last - count + 1, last + 1)
+
+
+class _Blocks:
+    """Per-process cache of reserved but unused values, keyed by database and sequence."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._free: dict[tuple, range] = {}
+
+    def take(self, name: str, count: int, using: str) -> list[int]:
+        block_size = getattr(settings, "JOBFLICK_IDENTIFIER_BLOCK_SIZE", DEFAULT_BLOCK_SIZE)
+        # Include the database name so a recreated (e.g. test) database never
+        # receives values reserved against another one.
+        key = (using, str(connections[using].settings_dict["NAME"]), name)
+        with self._lock:
+            free = self._free.get(key, range(0))
+            values = list(free[:count])
+            free = free[count:]
+            missing = count - len(values)
+            if missing:
+                reserved = _reserve(name, max(missing, block_size), using)
+                values.extend(reserved[:missing])
+                if _reserves_inline(using):
+                    # A rollback would hand the block out again, so only
+                    # cache the rest once the reservation has committed.
+                    transaction.on_commit(
+                        lambda: self._release(key, reserved[missing:]), using=using
+                    )
+                else:
+                    free = reserved[missing:]
+            self._free[key] = free
+        return values
+
+    def _release(self, key: tuple, block: range) -> None:
+        with self._lock:
+            if not self._free.get(key):
+                self._free[key] = block
+
+
+_blocks = _Blocks()
+
+
+def next_values(name: str, count: int, *, using: str = "default") -> list[int]:
+    """Return ``count`` fresh values of sequence ``name``, in increasing order."""
+    if count <= 0:
+        return []
+    return _blocks.take(name, count, using)
+
+
+def next_codes(prefix: str, count: int, *, using: str = "default") -> list[str]:
+    """Return ``count`` fresh identifiers like ``f"{prefix}-0000001"``."""
+    return [f"{prefix}-{encode(value)}" for value in next_values(prefix, count, using=using)]
+
+
+def next_code(prefix: str, *, using: str = "default") -> str:
+    return next_codes(prefix, 1, using=using)[0]
+
+
+def assign_codes(objs, field: str, prefix: str, *, using: str | None = None) -> None:
+    """Fill ``field`` on every object in ``objs`` that has none, with one reservation at most."""
+    blank = [obj for obj in objs if not getattr(obj, field)]
+    if not blank:
+        return
+    using = using or router.db_for_write(type(blank[0]))
+    for obj, code in zip(blank, next_codes(prefix, len(blank), using=using)):
+        setattr(obj, field, code)
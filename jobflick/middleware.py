@@ -1,25 +1,167 @@
+import cProfile
+import contextlib
+import random
+import threading
+import time
+
 from django.conf import settings
 from django.contrib.auth import logout
+from django.db import connections
 from django.utils import timezone
 
+from jobflick import profiling, routers
+
 
 class AutoLogoutMiddleware:
-    """Logs out users automatically after AUTO_LOGOUT_DELAY seconds of inactivity."""
+    """Logs out users automatically after AUTO_LOGOUT_DELAY seconds of inactivity.
+
+    The session's ``last_activity`` is only rewritten once it is
+    AUTO_LOGOUT_ACTIVITY_GRANULARITY seconds old, so most requests leave the
+    session untouched and cause no session write. The exact time of the
+    latest request travels in a signed cookie bound to the user, and
+    the idle check uses whichever of the two is newer, so users are logged
+    out exactly AUTO_LOGOUT_DELAY seconds after their last request.
+
+    Admin-panel sign-ins keep their own key in the session instead of going
+    through ``login()``; those sessions are refreshed and expired the same way.
+    """
+
+    cookie_salt = "jobflick.middleware.AutoLogoutMiddleware"
 
     def __init__(self, get_response):
         self.get_response = get_response
 
-    def __call__(self, request):
+    def _identity(self, request):
+        from adminpanel.views import ADMIN_SESSION_KEY
+
         if request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        admin_id = request.session.get(ADMIN_SESSION_KEY)
+        if admin_id:
+            return f"admin:{admin_id}"
+        return None
+
+    def _last_activity(self, request, cookie_name, identity):
+        last_activity = request.session.get("last_activity")
+        signed = request.get_signed_cookie(cookie_name, default=None, salt=f"{self.cookie_salt}:{identity}")
+        if signed is not None:
+            try:
+                last_activity = max(last_activity or 0, float(signed))
+            except ValueError:
+                pass
+        return last_activity
+
+    def __call__(self, request):
+        cookie_name = getattr(settings, "AUTO_LOGOUT_COOKIE_NAME", "jobflick_activity")
+        now = None
+        identity = self._identity(request)
+        if identity is not None:
             now = timezone.now().timestamp()
-            last_activity = request.session.get("last_activity")
+            last_activity = self._last_activity(request, cookie_name, identity)
             max_idle = getattr(settings, "AUTO_LOGOUT_DELAY", 3600)
+            granularity = getattr(settings, "AUTO_LOGOUT_ACTIVITY_GRANULARITY", 60)
 
             if last_activity and now - last_activity > max_idle:
-                logout(request)
+                if request.user.is_authenticated:
+                    logout(request)
                 request.session.flush()
-            else:
+                now = None
+            elif now - request.session.get("last_activity", 0) >= granularity:
                 request.session["last_activity"] = now
 
         response = self.get_response(request)
+        # The view may have signed someone in or out; bind the cookie to
+        # whoever holds the session now.
+        identity = self._identity(request) if now is not None else None
+        if identity is not None:
+            response.set_signed_cookie(
+                cookie_name,
+                repr(now),
+                salt=f"{self.cookie_salt}:{identity}",
+                max_age=getattr(settings, "SESSION_COOKIE_AGE", None),
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite=settings.SESSION_COOKIE_SAMESITE,
+            )
+        elif cookie_name in request.COOKIES:
+            response.delete_cookie(cookie_name, samesite=settings.SESSION_COOKIE_SAMESITE)
+        return response
+
+
+class RequestProfilingMiddleware:
+    """Records per-request DB, template, cache and email time for the admin panel.
+
+    Timings are aggregated per URL name in ``jobflick.profiling.store``; staff
+    users, and everyone while DEBUG is on, also get them in a ``Server-Timing``
+    header. JOBFLICK_PROFILING_SAMPLE_RATE of
+    the requests also run under cProfile and are dumped to
+    JOBFLICK_PROFILING_DIR.
+    """
+
+    # cProfile cannot profile two threads at once on every Python version.
+    _sampling = threading.Lock()
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        profiling.install_hooks()
+
+    def __call__(self, request):
+        if not profiling.enabled():
+            return self.get_response(request)
+
+        timings = profiling.RequestTimings()
+        token = profiling.current.set(timings)
+        profiler = None
+        if random.random() < profiling.sample_rate() and self._sampling.acquire(blocking=False):
+            profiler = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            with contextlib.ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profiling.db_wrapper))
+                if profiler is not None:
+                    profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    if profiler is not None:
+                        profiler.disable()
+        finally:
+            profiling.current.reset(token)
+            if profiler is not None:
+                self._sampling.release()
+
+        total_ms = (time.perf_counter() - started) * 1000
+        match = request.resolver_match
+        view_name = (match.view_name if match else "") or "<unresolved>"
+        profiling.store.record(view_name, total_ms, timings, response.status_code)
+        if profiler is not None:
+            profiling.write_dump(profiler, view_name, total_ms)
+        if settings.DEBUG or getattr(getattr(request, "user", None), "is_staff", False):
+            response["Server-Timing"] = timings.server_timing(total_ms)
+        return response
+
+
+class PrimaryPinMiddleware:
+    """Pins a client to the primary database for a few seconds after it writes.
+
+    Any request that is not ``GET``/``HEAD`` may have written, so its
+    response sets a short-lived cookie that ``jobflick.routers.replica_reads``
+    honours by skipping the replica until the write has replicated.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in ("GET", "HEAD") and routers.replica_configured():
+            response.set_cookie(
+                routers.PIN_COOKIE,
+                "1",
+                max_age=routers.pin_seconds(),
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite=settings.SESSION_COOKIE_SAMESITE,
+            )
         return response
@@ -0,0 +1,353 @@
+"""Keyset (cursor) pagination shared by the listing views.
+
+Pages are addressed by an opaque, signed cursor holding the ordering values
+of the boundary row instead of an OFFSET, so fetching page N costs the same
+index range scan as page 1 and rows inserted meanwhile never shift a page.
+
+Listings ordered by something that is not a column, such as search rank,
+page through an already ranked list of ids with ``paginate_ids`` instead.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cached_property
+from urllib.parse import urlencode
+
+from django.core import signing
+from django.db.models import Q
+
+CURSOR_SALT = "jobflick.pagination"
+POSITION_SALT = "jobflick.pagination.position"
+DEFAULT_ORDERING = ("-created_at", "-id")
+
+
+class InvalidCursor(Exception):
+    """Raised when a cursor token was tampered with or does not fit the ordering."""
+
+
+def _field_name(order: str) -> str:
+    return order.lstrip("-")
+
+
+def _keyset_filter(ordering, values, *, forward: bool) -> Q:
+    """Return rows strictly after ``values`` in ``ordering`` (before when not ``forward``)."""
+    condition = Q()
+    for index, order in enumerate(ordering):
+        descending = order.startswith("-")
+        lookup = "lt" if descending == forward else "gt"
+        clause = Q(**{f"{_field_name(order)}__{lookup}": values[index]})
+        for previous, value in zip(ordering[:index], values[:index]):
+            clause &= Q(**{_field_name(previous): value})
+        condition |= clause
+    return condition
+
+
+def _reverse(ordering):
+    return tuple(order[1:] if order.startswith("-") else f"-{order}" for order in ordering)
+
+
+class KeysetPaginator:
+    """Paginate ``queryset`` on a unique ``ordering`` such as ``("-created_at", "-id")``.
+
+    ``previous_label`` and ``next_label`` caption the links in
+    ``include/cursor_pagination.html``; the defaults suit newest-first listings.
+    """
+
+    def __init__(
+        self,
+        queryset,
+        *,
+        per_page: int = 20,
+        ordering=DEFAULT_ORDERING,
+        cursor_param: str = "cursor",
+        previous_label: str = "Newer",
+        next_label: str = "Older",
+    ):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.cursor_param = cursor_param
+        self.previous_label = previous_label
+        self.next_label = next_label
+
+    def encode_cursor(self, row, *, forward: bool) -> str:
+        values = []
+        for order in self.ordering:
+            field = self.queryset.model._meta.get_field(_field_name(order))
+            values.append(field.value_to_string(row))
+        return signing.dumps({"v": values, "f": forward}, salt=CURSOR_SALT)
+
+    def decode_cursor(self, token: str):
+        try:
+            payload = signing.loads(token, salt=CURSOR_SALT)
+            raw_values = payload["v"]
+            forward = bool(payload["f"])
+        except (signing.BadSignature, KeyError, TypeError):
+            raise InvalidCursor(token)
+        if len(raw_values) != len(self.ordering):
+            raise InvalidCursor(token)
+        values = []
+        for order, raw in zip(self.ordering, raw_values):
+            field = self.queryset.model._meta.get_field(_field_name(order))
+            try:
+                values.append(field.to_python(raw))
+            except Exception:
+                raise InvalidCursor(token)
+        return values, forward
+
+    def page(self, token: str | None = None) -> "KeysetPage":
+        """Return the page addressed by ``token``; bad tokens fall back to the first page."""
+        values, forward = None, True
+        if token:
+            try:
+                values, forward = self.decode_cursor(token)
+            except InvalidCursor:
+                values, forward = None, True
+        return KeysetPage(self, values, forward)
+
+
+class KeysetPage:
+    """One page of results. Rows are fetched lazily on first access."""
+
+    def __init__(self, paginator: KeysetPaginator, values, forward: bool):
+        self.paginator = paginator
+        self.cursor_values = values
+        self.forward = forward
+        self.request = None
+
+    @cached_property
+    def _window(self):
+        paginator = self.paginator
+        queryset = paginator.queryset
+        ordering = paginator.ordering if self.forward else _reverse(paginator.ordering)
+        if self.cursor_values is not None:
+            queryset = queryset.filter(_keyset_filter(paginator.ordering, self.cursor_values, forward=self.forward))
+        rows = list(queryset.order_by(*ordering)[: paginator.per_page + 1])
+        has_more = len(rows) > paginator.per_page
+        rows = rows[: paginator.per_page]
+        if not self.forward:
+            rows.reverse()
+        return rows, has_more
+
+    @property
+    def object_list(self) -> list:
+        return self._window[0]
+
+    @property
+    def has_next(self) -> bool:
+        if self.forward:
+            return self._window[1]
+        return self.cursor_values is not None
+
+    @property
+    def has_previous(self) -> bool:
+        if self.forward:
+            return self.cursor_values is not None and bool(self.object_list)
+        return self._window[1]
+
+    @property
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+    @property
+    def previous_label(self) -> str:
+        return self.paginator.previous_label
+
+    @property
+    def next_label(self) -> str:
+        return self.paginator.next_label
+
+    @property
+    def next_cursor(self) -> str | None:
+        if not (self.has_next and self.object_list):
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1], forward=True)
+
+    @property
+    def previous_cursor(self) -> str | None:
+        if not (self.has_previous and self.object_list):
+            return None
+        return self.paginator.encode_cursor(self.object_list[0], forward=False)
+
+    def _url_for(self, cursor: str | None) -> str | None:
+        return _url_for(self.request, self.paginator.cursor_param, cursor)
+
+    @property
+    def next_url(self) -> str | None:
+        return self._url_for(self.next_cursor)
+
+    @property
+    def previous_url(self) -> str | None:
+        return self._url_for(self.previous_cursor)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def __bool__(self) -> bool:
+        return bool(self.object_list)
+
+
+def _url_for(request, param: str, cursor: str | None) -> str | None:
+    if cursor is None:
+        return None
+    if request is None:
+        return f"?{urlencode({param: cursor})}"
+    params = request.GET.copy()
+    params[param] = cursor
+    return f"?{params.urlencode()}"
+
+
+def paginate(
+    request,
+    queryset,
+    *,
+    per_page: int = 20,
+    ordering=DEFAULT_ORDERING,
+    cursor_param: str = "cursor",
+    previous_label: str = "Newer",
+    next_label: str = "Older",
+) -> KeysetPage:
+    """Return the keyset page of ``queryset`` selected by ``request.GET[cursor_param]``."""
+    paginator = KeysetPaginator(
+        queryset,
+        per_page=per_page,
+        ordering=ordering,
+        cursor_param=cursor_param,
+        previous_label=previous_label,
+        next_label=next_label,
+    )
+    page = paginator.page(request.GET.get(cursor_param))
+    page.request = request
+    return page
+
+
+class PositionPage:
+    """One page of an already ordered id list, addressed by a signed position cursor.
+
+    Offers the same interface as ``KeysetPage``. Only the page's ids are
+    handed to ``load``, which returns their rows in the same order.
+    ``truncated`` marks a list cut short before the last match.
+    """
+
+    def __init__(
+        self,
+        request,
+        ids,
+        load,
+        offset: int,
+        *,
+        per_page: int,
+        cursor_param: str,
+        previous_label: str,
+        next_label: str,
+        truncated: bool,
+    ):
+        self.request = request
+        self.ids = ids
+        self.load = load
+        self.offset = offset
+        self.per_page = per_page
+        self.cursor_param = cursor_param
+        self.previous_label = previous_label
+        self.next_label = next_label
+        self.truncated = truncated
+
+    @cached_property
+    def object_list(self) -> list:
+        ids = self.ids[self.offset : self.offset + self.per_page]
+        return self.load(ids) if ids else []
+
+    @property
+    def has_next(self) -> bool:
+        return self.offset + self.per_page < len(self.ids)
+
+    @property
+    def has_previous(self) -> bool:
+        return self.offset > 0
+
+    @property
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+    def _cursor(self, offset: int) -> str:
+        return signing.dumps({"o": offset}, salt=POSITION_SALT)
+
+    @property
+    def next_url(self) -> str | None:
+        return _url_for(self.request, self.cursor_param, self._cursor(self.offset + self.per_page) if self.has_next else None)
+
+    @property
+    def previous_url(self) -> str | None:
+        previous = self._cursor(max(0, self.offset - self.per_page)) if self.has_previous else None
+        return _url_for(self.request, self.cursor_param, previous)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def __bool__(self) -> bool:
+        return bool(self.object_list)
+
+
+def _position(token: str | None) -> int:
+    if not token:
+        return 0
+    try:
+        offset = signing.loads(token, salt=POSITION_SALT)["o"]
+    except (signing.BadSignature, KeyError, TypeError):
+        return 0
+    return offset if isinstance(offset, int) and offset >= 0 else 0
+
+
+def paginate_ids(
+    request,
+    ids,
+    load,
+    *,
+    per_page: int = 20,
+    cursor_param: str = "cursor",
+    previous_label: str = "Previous",
+    next_label: str = "Next",
+    truncated: bool = False,
+) -> PositionPage:
+    """Return the page of the ordered ``ids`` selected by ``request.GET[cursor_param]``.
+
+    Bad cursors, and cursors past the end, fall back to the first page.
+    """
+    offset = _position(request.GET.get(cursor_param))
+    if offset >= len(ids):
+        offset = 0
+    return PositionPage(
+        request,
+        ids,
+        load,
+        offset,
+        per_page=per_page,
+        cursor_param=cursor_param,
+        previous_label=previous_label,
+        next_label=next_label,
+        truncated=truncated,
+    )
+
+
+@dataclass(frozen=True)
+class CountEstimate:
+    value: int
+    exact: bool
+
+    def __str__(self) -> str:
+        return str(self.value) if self.exact else f"{self.value}+"
+
+
+def approximate_count(queryset, *, cap: int = 1000) -> CountEstimate:
+    """Count ``queryset`` but stop scanning after ``cap`` rows."""
+    counted = queryset.order_by()[: cap + 1].count()
+    if counted > cap:
+        return CountEstimate(cap, exact=False)
+    return CountEstimate(counted, exact=True)
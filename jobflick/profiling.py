@@ -0,0 +1,277 @@
+"""Per-request instrumentation used by ``RequestProfilingMiddleware``.
+
+While a request is being profiled, a ``RequestTimings`` object is active in
+a context variable and the hooks below add to it: SQL via
+``connection.execute_wrapper``, template rendering, cache lookups and email
+sending via thin wrappers installed once per process. Finished requests
+are folded into ``ProfileStore`` histograms keyed by URL name, which the
+admin panel's performance section reads. A configurable fraction of
+requests additionally runs under ``cProfile`` and is dumped to disk.
+
+Aggregates live in process memory, so each worker reports its own traffic.
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextvars
+import functools
+import os
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from jobflick.stats import percentile
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended.
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+RECENT_SAMPLES = 500
+DUMP_NAME_RE = re.compile(r"[\w-]+\.prof")
+
+
+
+def enabled() -> bool:
+    return getattr(settings, "JOBFLICK_PROFILING", True)
+
+
+def sample_rate() -> float:
+    return getattr(settings, "JOBFLICK_PROFILING_SAMPLE_RATE", 0.0)
+
+
+@dataclass
+class RequestTimings:
+    db_ms: float = 0.0
+    queries: int = 0
+    template_ms: float = 0.0
+    cache_ms: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    email_ms: float = 0.0
+    emails: int = 0
+    _template_depth: int = 0
+
+    def server_timing(self, total_ms: float) -> str:
+        return (
+            f"db;dur={self.db_ms:.1f};desc=\"{self.queries} queries\", "
+            f"tpl;dur={self.template_ms:.1f}, cache;dur={self.cache_ms:.1f}, "
+            f"email;dur={self.email_ms:.1f}, total;dur={total_ms:.1f}"
+        )
+
+
+current = contextvars.ContextVar("jobflick_request_timings", default=None)
+
+
+def db_wrapper(execute, sql, params, many, context):
+    """``connection.execute_wrapper`` hook charging SQL time to the active request."""
+    timings = current.get()
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if timings is not None:
+            timings.db_ms += (time.perf_counter() - started) * 1000
+            timings.queries += 1
+
+
+def _timed_template_render(render):
+    @functools.wraps(render)
+    def wrapper(self, *args, **kwargs):
+        timings = current.get()
+        if timings is None or timings._template_depth:
+            return render(self, *args, **kwargs)
+        timings._template_depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            timings._template_depth -= 1
+            timings.template_ms += (time.perf_counter() - started) * 1000
+
+    wrapper._jobflick_profiled = True
+    return wrapper
+
+
+def _timed_cache_get(get, *, many: bool):
+    @functools.wraps(get)
+    def wrapper(self, *args, **kwargs):
+        timings = current.get()
+        if timings is None:
+            return get(self, *args, **kwargs)
+        started = time.perf_counter()
+        value = get(self, *args, **kwargs)
+        timings.cache_ms += (time.perf_counter() - started) * 1000
+        if many:
+            hits = len(value)
+            timings.cache_hits += hits
+            timings.cache_misses += len(args[0]) - hits if args else 0
+        elif value is None:
+            timings.cache_misses += 1
+        else:
+            timings.cache_hits += 1
+        return value
+
+    wrapper._jobflick_profiled = True
+    return wrapper
+
+
+def _timed_send_messages(send_messages):
+    @functools.wraps(send_messages)
+    def wrapper(self, email_messages):
+        timings = current.get()
+        if timings is None:
+            return send_messages(self, email_messages)
+        started = time.perf_counter()
+        try:
+            return send_messages(self, email_messages)
+        finally:
+            timings.email_ms += (time.perf_counter() - started) * 1000
+            timings.emails += len(email_messages)
+
+    wrapper._jobflick_profiled = True
+    return wrapper
+
+
+def _wrap(cls, name, decorator):
+    method = cls.__dict__.get(name)
+    if method is None or getattr(method, "_jobflick_profiled", False):
+        return
+    setattr(cls, name, decorator(method))
+
+
+_install_lock = threading.Lock()
+_installed = False
+
+
+def install_hooks() -> None:
+    """Wrap template, cache and email entry points once per process."""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        from django.core.cache import caches
+        from django.template.backends.django import Template
+
+        _wrap(Template, "render", _timed_template_render)
+        for alias in settings.CACHES:
+            for cls in type(caches[alias]).__mro__:
+                _wrap(cls, "get", functools.partial(_timed_cache_get, many=False))
+                _wrap(cls, "get_many", functools.partial(_timed_cache_get, many=True))
+        backend = import_string(settings.EMAIL_BACKEND)
+        for cls in backend.__mro__:
+            _wrap(cls, "send_messages", _timed_send_messages)
+        _installed = True
+
+
+@dataclass
+class ViewStats:
+    count: int = 0
+    total_ms: float = 0.0
+    db_ms: float = 0.0
+    queries: int = 0
+    template_ms: float = 0.0
+    cache_ms: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    email_ms: float = 0.0
+    errors: int = 0
+    buckets: list = field(default_factory=lambda: [0] * (len(BUCKETS_MS) + 1))
+    recent: deque = field(default_factory=lambda: deque(maxlen=RECENT_SAMPLES))
+
+    def record(self, total_ms: float, timings: RequestTimings, status: int) -> None:
+        self.count += 1
+        self.total_ms += total_ms
+        self.db_ms += timings.db_ms
+        self.queries += timings.queries
+        self.template_ms += timings.template_ms
+        self.cache_ms += timings.cache_ms
+        self.cache_hits += timings.cache_hits
+        self.cache_misses += timings.cache_misses
+        self.email_ms += timings.email_ms
+        self.errors += status >= 500
+        self.buckets[bisect.bisect_left(BUCKETS_MS, total_ms)] += 1
+        self.recent.append(total_ms)
+
+    def summary(self) -> dict:
+        count = self.count or 1
+        lookups = self.cache_hits + self.cache_misses
+        samples = list(self.recent)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": self.total_ms / count,
+            "p50_ms": percentile(samples, 50),
+            "p95_ms": percentile(samples, 95),
+            "db_ms": self.db_ms / count,
+            "queries": self.queries / count,
+            "template_ms": self.template_ms / count,
+            "cache_ms": self.cache_ms / count,
+            "cache_hit_ratio": self.cache_hits / lookups if lookups else None,
+            "email_ms": self.email_ms / count,
+            "histogram": list(zip([*(f"≤{bound}" for bound in BUCKETS_MS), f">{BUCKETS_MS[-1]}"], self.buckets)),
+        }
+
+
+class ProfileStore:
+    """Thread-safe per-URL-name aggregates for this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views: dict[str, ViewStats] = {}
+        self.started_at = time.time()
+
+    def record(self, view_name: str, total_ms: float, timings: RequestTimings, status: int) -> None:
+        with self._lock:
+            self._views.setdefault(view_name, ViewStats()).record(total_ms, timings, status)
+
+    def snapshot(self) -> list[dict]:
+        with self._lock:
+            rows = [{"view": name, **stats.summary()} for name, stats in self._views.items()]
+        return sorted(rows, key=lambda row: row["mean_ms"] * row["count"], reverse=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._views.clear()
+            self.started_at = time.time()
+
+
+store = ProfileStore()
+
+
+def dump_dir() -> Path:
+    configured = getattr(settings, "JOBFLICK_PROFILING_DIR", None)
+    return Path(configured) if configured else Path(settings.BASE_DIR) / ".profiles"
+
+
+def write_dump(profiler, view_name: str, total_ms: float) -> Path:
+    """Save ``profiler`` stats as a ``.prof`` file and prune the oldest dumps."""
+    directory = dump_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    safe_name = re.sub(r"[^\w-]", "_", view_name)
+    path = directory / f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{safe_name}-{total_ms:.0f}ms.prof"
+    profiler.dump_stats(path)
+    dumps = sorted(directory.glob("*.prof"), key=lambda dump: dump.stat().st_mtime)
+    for stale in dumps[: max(0, len(dumps) - getattr(settings, "JOBFLICK_PROFILING_MAX_DUMPS", 200))]:
+        stale.unlink(missing_ok=True)
+    return path
+
+
+def list_dumps(limit: int = 50) -> list[dict]:
+    directory = dump_dir()
+    if not directory.is_dir():
+        return []
+    dumps = sorted(directory.glob("*.prof"), key=lambda dump: dump.stat().st_mtime, reverse=True)
+    return [{"name": dump.name, "size_kib": dump.stat().st_size / 1024} for dump in dumps[:limit]]
+
+
+def dump_path(name: str) -> Path | None:
+    """Return the dump called ``name``, refusing anything outside the dump directory."""
+    if not DUMP_NAME_RE.fullmatch(name):
+        return None
+    path = dump_dir() / name
+    return path if path.is_file() else None
@@ -0,0 +1,147 @@
+"""EXPLAIN-based detection of full table scans in the queries views run.
+
+``explain_view_queries`` replays every GET view in
+``jobflick.benchmarking.VIEW_CASES``, captures the SQL it executes and asks
+the database for each statement's plan. A plan step that reads a whole table
+is reported as a ``ScanFinding``. The ``check_query_plans`` management
+command and ``pages.tests.QueryPlanTests`` are built on it.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+from django.db import connections
+
+# Tables whose size is bounded by configuration rather than traffic, so
+# reading them whole is cheaper than any index lookup.
+SMALL_TABLES = frozenset(
+    {
+        "django_content_type",
+        "auth_permission",
+        "pages_platformstat",
+        "payments_platformwallet",
+        "payments_platformwalletshard",
+    }
+)
+
+# Statements that never read user tables (session writes, savepoints, ...).
+SKIPPED_PREFIXES = ("INSERT", "UPDATE", "DELETE", "SAVEPOINT", "RELEASE", "ROLLBACK", "BEGIN", "COMMIT", "PRAGMA")
+
+# "SCAN jobs_job", "SCAN T0 USING INDEX jobs_job_status_idx", "SCAN jobs_job_fts VIRTUAL TABLE INDEX 0:M"
+_SQLITE_SCAN_RE = re.compile(r"^SCAN (?P<table>\w+)(?: AS \w+)?(?P<rest>.*)$")
+_SQLITE_INDEX_RE = re.compile(r"USING (?:COVERING )?INDEX (?P<name>\w+)")
+_SORT_STEP = "USE TEMP B-TREE FOR ORDER BY"
+_POSTGRES_SCAN_RE = re.compile(r"Seq Scan on (?P<table>\w+)")
+
+
+@dataclass(frozen=True)
+class ScanFinding:
+    url: str
+    table: str
+    detail: str
+    sql: str
+
+    def __str__(self) -> str:
+        return f"{self.url}: {self.detail} ({self.table})\n    {self.sql}"
+
+
+def _alias_map(sql: str) -> dict[str, str]:
+    """Map ``FROM``/``JOIN`` aliases such as Django's ``T4`` back to table names."""
+    aliases = {}
+    for table, alias in re.findall(r'(?:FROM|JOIN)\s+"(\w+)"(?:\s+(?:AS\s+)?(\w+))?', sql):
+        aliases[table] = table
+        if alias and alias.upper() not in {"ON", "WHERE", "INNER", "LEFT", "ORDER", "GROUP", "LIMIT"}:
+            aliases[alias] = table
+    return aliases
+
+
+def partial_indexes(connection) -> set[str]:
+    """Names of the SQLite indexes declared with a ``WHERE`` clause."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql LIKE '% WHERE %'")
+        return {row[0] for row in cursor.fetchall()}
+
+
+def sqlite_plan(connection, sql: str) -> list[str]:
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def postgres_plan(connection, sql: str) -> list[str]:
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN {sql}")
+        return [row[0] for row in cursor.fetchall()]
+
+
+def full_scans(sql: str, *, using: str = "default", allowed=SMALL_TABLES) -> list[tuple[str, str]]:
+    """Return ``(table, plan step)`` for every whole-table read in ``sql``'s plan.
+
+    On SQLite a ``SCAN`` step without an index is always reported; a scan
+    that walks an index is reported only when the statement has no
+    ``LIMIT``, since an ordered walk with a limit stops after a page of rows,
+    and never for a partial index, which only holds the rows the statement
+    asked for.
+    A limited statement that sorts in a temporary B-tree is reported too: it
+    reads every matching row to return one page, which is what a composite
+    index on the filter and ordering columns avoids.
+    """
+    statement = sql.lstrip()
+    if statement.upper().startswith(SKIPPED_PREFIXES):
+        return []
+    connection = connections[using]
+    has_limit = re.search(r"\bLIMIT\b", statement, re.IGNORECASE) is not None
+    aliases = _alias_map(statement)
+    findings = []
+    if connection.vendor == "sqlite":
+        plan = sqlite_plan(connection, statement)
+        partial = partial_indexes(connection)
+        for step in plan:
+            match = _SQLITE_SCAN_RE.match(step.strip())
+            if not match:
+                continue
+            table = aliases.get(match["table"])
+            rest = match["rest"]
+            if table is None or table in allowed or "VIRTUAL TABLE" in rest:
+                continue
+            index = _SQLITE_INDEX_RE.search(rest)
+            if index and (has_limit or index["name"] in partial):
+                continue
+            findings.append((table, step.strip()))
+        if has_limit and _SORT_STEP in plan:
+            table = next(iter(aliases.values()), "")
+            if table and table not in allowed:
+                findings.append((table, _SORT_STEP))
+    elif connection.vendor == "postgresql":
+        for step in postgres_plan(connection, statement):
+            match = _POSTGRES_SCAN_RE.search(step)
+            if match and match["table"] not in allowed:
+                findings.append((match["table"], step.strip()))
+    return findings
+
+
+def explain_view_queries(dataset, cases, *, allowed=SMALL_TABLES) -> list[ScanFinding]:
+    """Request every case in ``cases`` and explain each ``SELECT`` it ran."""
+    from django.test.utils import CaptureQueriesContext
+
+    from .benchmarking import client_for
+
+    connection = connections["default"]
+    findings = []
+    seen = set()
+    for case in cases:
+        client = client_for(case.role, dataset)
+        url = case.url(dataset)
+        client.get(url)
+        with CaptureQueriesContext(connection) as captured:
+            client.get(url)
+        for query in captured.captured_queries:
+            sql = query["sql"]
+            if sql in seen:
+                continue
+            seen.add(sql)
+            for table, detail in full_scans(sql, allowed=allowed):
+                findings.append(ScanFinding(url, table, detail, sql))
+    return findings
@@ -0,0 +1,108 @@
+"""Primary/replica database routing.
+
+When ``settings.DATABASES`` defines a ``replica`` alias, views decorated with
+``replica_reads`` read from it; everything else stays on ``default``:
+
+- writes, and ``select_for_update()`` querysets, which Django routes as
+  writes (``payments.services`` locks wallets this way);
+- reads inside an open transaction on the primary, so code that writes and
+  then reads back (``payments.services``, ``get_or_create``) sees its own
+  rows;
+- every request from a client that wrote within the last
+  ``JOBFLICK_REPLICA_PIN_SECONDS`` (see ``PrimaryPinMiddleware``), so a
+  redirect after a POST never shows data older than the write;
+- reads inside ``reading_from_primary()``, for the parts of a replica view
+  that pick rows to update.
+"""
+
+from __future__ import annotations
+
+import contextlib
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+
+PRIMARY = "default"
+REPLICA = "replica"
+PIN_COOKIE = "jobflick_primary"
+
+_replica_reads: ContextVar[bool] = ContextVar("jobflick_replica_reads", default=False)
+
+
+def replica_configured() -> bool:
+    return REPLICA in settings.DATABASES
+
+
+def pin_seconds() -> int:
+    return getattr(settings, "JOBFLICK_REPLICA_PIN_SECONDS", 5)
+
+
+@contextlib.contextmanager
+def reading_from_replica():
+    """Send reads in the block to the replica, unless one of the rules above pins them."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+@contextlib.contextmanager
+def reading_from_primary():
+    """Keep reads in the block on the primary, even inside a ``replica_reads`` view."""
+    token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def _iter_on_replica(chunks):
+    # Streaming responses run their queries while the body is consumed,
+    # after the view returned, so every chunk is produced inside the block.
+    chunks = iter(chunks)
+    while True:
+        with reading_from_replica():
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                return
+        yield chunk
+
+
+def replica_reads(view):
+    """Serve a read-only view's ``GET`` and ``HEAD`` requests from the replica."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not replica_configured() or request.method not in ("GET", "HEAD") or PIN_COOKIE in request.COOKIES:
+            return view(request, *args, **kwargs)
+        with reading_from_replica():
+            response = view(request, *args, **kwargs)
+        if response.streaming:
+            response.streaming_content = _iter_on_replica(response.streaming_content)
+        return response
+
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get() or not replica_configured():
+            return PRIMARY
+        if connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives its schema from the primary.
+        return db != REPLICA
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -47,15 +48,21 @@ INSTALLED_APPS = [
     'userprofile',
     'adminpanel',
     'payments',
+    'mailer',
+    'skills',
+    'locations',
 ]
 
 MIDDLEWARE = [
+    'jobflick.middleware.RequestProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'jobflick.middleware.AutoLogoutMiddleware',
+    'jobflick.middleware.PrimaryPinMiddleware',
+    'userprofile.middleware.ProfileMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -85,11 +92,94 @@ WSGI_APPLICATION = 'jobflick.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# JOBFLICK_DB_ENGINE selects "sqlite" (default) or "postgresql"; PostgreSQL
+# reads JOBFLICK_DB_NAME, _USER, _PASSWORD, _HOST and _PORT.
+# JOBFLICK_DB_CONN_MAX_AGE keeps connections open between requests (seconds,
+# "none" for no limit). JOBFLICK_DB_POOL_SIZE > 0 uses psycopg's connection
+# pool instead, which needs persistent connections off.
+# JOBFLICK_DB_REPLICA_HOST (PostgreSQL) or JOBFLICK_DB_REPLICA_NAME (an SQLite
+# file refreshed with `manage.py sync_sqlite_replica`) adds a "replica" alias
+# for the views decorated with jobflick.routers.replica_reads.
+
+JOBFLICK_DB_ENGINE = os.environ.get("JOBFLICK_DB_ENGINE", "sqlite")
+JOBFLICK_DB_POOL_SIZE = int(os.environ.get("JOBFLICK_DB_POOL_SIZE", "0"))
+_conn_max_age = os.environ.get("JOBFLICK_DB_CONN_MAX_AGE", "0")
+JOBFLICK_DB_CONN_MAX_AGE = None if _conn_max_age.lower() == "none" else int(_conn_max_age)
+# Requests from a client that wrote this recently skip the replica.
+JOBFLICK_REPLICA_PIN_SECONDS = int(os.environ.get("JOBFLICK_REPLICA_PIN_SECONDS", "5"))
+
+
+def _database_config(*, host=None, name=None):
+    if JOBFLICK_DB_ENGINE == "postgresql":
+        config = {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": name or os.environ.get("JOBFLICK_DB_NAME", "jobflick"),
+            "USER": os.environ.get("JOBFLICK_DB_USER", "jobflick"),
+            "PASSWORD": os.environ.get("JOBFLICK_DB_PASSWORD", ""),
+            "HOST": host or os.environ.get("JOBFLICK_DB_HOST", "127.0.0.1"),
+            "PORT": os.environ.get("JOBFLICK_DB_PORT", "5432"),
+            "CONN_MAX_AGE": JOBFLICK_DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": JOBFLICK_DB_CONN_MAX_AGE != 0,
+        }
+        if JOBFLICK_DB_POOL_SIZE:
+            config["CONN_MAX_AGE"] = 0
+            config["CONN_HEALTH_CHECKS"] = False
+            config["OPTIONS"] = {"pool": {"min_size": 1, "max_size": JOBFLICK_DB_POOL_SIZE}}
+        return config
+    return {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": name or os.environ.get("JOBFLICK_DB_NAME", BASE_DIR / "db.sqlite3"),
+        "CONN_MAX_AGE": JOBFLICK_DB_CONN_MAX_AGE,
+    }
+
+
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+    'default': _database_config(),
+}
+
+_replica_host = os.environ.get("JOBFLICK_DB_REPLICA_HOST")
+_replica_name = os.environ.get("JOBFLICK_DB_REPLICA_NAME")
+if _replica_host or _replica_name:
+    DATABASES["replica"] = {
+        **_database_config(host=_replica_host, name=_replica_name),
+        # Tests run both aliases against the one test database.
+        "TEST": {"MIRROR": "default"},
     }
+
+DATABASE_ROUTERS = ["jobflick.routers.PrimaryReplicaRouter"]
+
+
+# Cache
+# JOBFLICK_CACHE_BACKEND selects "locmem" (default), "file" or "redis". The
+# redis option also works against any local Redis-compatible stand-in
+# listening on JOBFLICK_REDIS_URL.
+
+JOBFLICK_CACHE_BACKEND = os.environ.get("JOBFLICK_CACHE_BACKEND", "locmem")
+JOBFLICK_REDIS_URL = os.environ.get("JOBFLICK_REDIS_URL", "redis://127.0.0.1:6379/0")
+
+
+def _cache_config(alias):
+    if JOBFLICK_CACHE_BACKEND == "file":
+        return {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": BASE_DIR / ".cache" / alias,
+        }
+    if JOBFLICK_CACHE_BACKEND == "redis":
+        return {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": JOBFLICK_REDIS_URL,
+            "KEY_PREFIX": alias,
+        }
+    return {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": f"jobflick-{alias}",
+    }
+
+
+CACHES = {
+    "default": _cache_config("default"),
+    # Rendered template fragments ({% cache ... using="fragments" %}).
+    "fragments": _cache_config("fragments"),
 }
 
 
@@ -147,18 +237,73 @@ AUTH_USER_MODEL = 'auth.User'
 LOGIN_REDIRECT_URL = 'user-dashboard'
 
 # Session control: auto-logout after 1 hour of inactivity
-SESSION_COOKIE_AGE = 3600  # seconds
-SESSION_SAVE_EVERY_REQUEST = True
+# (jobflick.middleware.AutoLogoutMiddleware). The session itself is only
+# rewritten once a minute while the user is active, so it lives one
+# granularity step longer than the idle timeout the middleware enforces.
 AUTO_LOGOUT_DELAY = 3600
+AUTO_LOGOUT_ACTIVITY_GRANULARITY = 60
+SESSION_COOKIE_AGE = AUTO_LOGOUT_DELAY + AUTO_LOGOUT_ACTIVITY_GRANULARITY  # seconds
+SESSION_SAVE_EVERY_REQUEST = False
+
+# JOBFLICK_SESSION_ENGINE: "db" (default), "cached_db", "cache" or
+# "signed_cookies". "cache" needs a shared cache such as JOBFLICK_CACHE_BACKEND=redis.
+SESSION_ENGINE = f"django.contrib.sessions.backends.{os.environ.get('JOBFLICK_SESSION_ENGINE', 'db')}"
 
 # Email Backend Settings
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
-EMAIL_HOST = "smtp.gmail.com"
-EMAIL_PORT = 587
-EMAIL_USE_TLS = True
+# Point EMAIL_HOST/EMAIL_PORT at a local stand-in such as
+# `python -m aiosmtpd -n -l localhost:1025` (with EMAIL_USE_TLS=0) to test delivery.
+EMAIL_BACKEND = os.environ.get("EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend")
+EMAIL_HOST = os.environ.get("EMAIL_HOST", "smtp.gmail.com")
+EMAIL_PORT = int(os.environ.get("EMAIL_PORT", "587"))
+EMAIL_USE_TLS = os.environ.get("EMAIL_USE_TLS", "1") == "1"
+EMAIL_TIMEOUT = 10
 
-EMAIL_HOST_USER = "cituse200@gmail.com"
-EMAIL_HOST_PASSWORD = "kjzeobhwqqawlekj"
+EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER", "cituse200@gmail.com")
+EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD", "kjzeobhwqqawlekj")
 
 DEFAULT_FROM_EMAIL = "Jobflick <cituse200@gmail.com>"
 JOBFLICK_CONTACT_EMAIL = "jobflick0@gmail.com"
+
+# Outbound mail queue (mailer.services): "thread", "inline" or "worker"
+# (`manage.py send_queued_mail`), see jobflick.background.
+JOBFLICK_MAIL_DELIVERY = os.environ.get("JOBFLICK_MAIL_DELIVERY", "thread")
+
+# Job search: FTS5 index on SQLite, swap for "jobs.search.DatabaseSearchBackend" elsewhere
+JOBFLICK_SEARCH_BACKEND = "jobs.search.SQLiteFTSBackend"
+
+# "Jobs near me" (jobs.nearby): SQLite R-tree where the build has it, else the
+# geohash index; "jobs.nearby.GeohashBackend" skips the R-tree entirely.
+JOBFLICK_GEO_BACKEND = "jobs.nearby.SQLiteRTreeBackend"
+
+# Notification fan-out (userprofile.dispatch). Delivery runs after commit in
+# a background thread ("thread"), in the request thread ("inline"), or only
+# via `manage.py deliver_notifications` ("worker"). Staff notifications are
+# either copied per staff account ("fanout") or stored once ("group").
+JOBFLICK_NOTIFICATION_DELIVERY = os.environ.get("JOBFLICK_NOTIFICATION_DELIVERY", "thread")
+JOBFLICK_STAFF_NOTIFICATIONS = os.environ.get("JOBFLICK_STAFF_NOTIFICATIONS", "fanout")
+JOBFLICK_BACKGROUND_THREADS = 2
+
+# Skill recommendations (jobs.recommendations): full index rebuilds run in a
+# background thread while the previous index keeps serving ("thread"), or in
+# the request that needs them ("inline").
+JOBFLICK_RECOMMENDATION_BUILD = os.environ.get("JOBFLICK_RECOMMENDATION_BUILD", "thread")
+
+# Number of rows the Jobflick platform balance is striped across
+# (payments.models.PlatformWalletShard). Raising it is safe at any time.
+JOBFLICK_PLATFORM_WALLET_SHARDS = int(os.environ.get("JOBFLICK_PLATFORM_WALLET_SHARDS", "8"))
+
+# Identifiers reserved per round trip by jobflick.identifiers (tracking codes,
+# transaction references). Unused values are skipped when a process exits.
+JOBFLICK_IDENTIFIER_BLOCK_SIZE = 50
+
+# Request profiling (jobflick.middleware.RequestProfilingMiddleware). Per-URL
+# timings show up under "Performance" in the admin panel; set a sample rate
+# such as 0.01 to also keep cProfile dumps of that fraction of requests.
+JOBFLICK_PROFILING = os.environ.get("JOBFLICK_PROFILING", "1") == "1"
+JOBFLICK_PROFILING_SAMPLE_RATE = float(os.environ.get("JOBFLICK_PROFILING_SAMPLE_RATE", "0"))
+JOBFLICK_PROFILING_DIR = os.environ.get("JOBFLICK_PROFILING_DIR", BASE_DIR / ".profiles")
+JOBFLICK_PROFILING_MAX_DUMPS = 200
+
+# Renewal reminders go out this many days before a subscription ends
+# (`manage.py process_subscriptions`, run daily).
+JOBFLICK_SUBSCRIPTION_REMINDER_DAYS = 7
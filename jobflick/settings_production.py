@@ -0,0 +1,45 @@
+"""Production settings: ``DJANGO_SETTINGS_MODULE=jobflick.settings_production``.
+
+Everything is read from the environment. On top of the development
+defaults this switches to PostgreSQL with connections kept open for a
+minute, and requires a real secret key and host list:
+
+    JOBFLICK_SECRET_KEY=...            (required)
+    JOBFLICK_ALLOWED_HOSTS=jobflick.example.com,www.jobflick.example.com
+    JOBFLICK_DB_NAME / _USER / _PASSWORD / _HOST / _PORT
+    JOBFLICK_DB_CONN_MAX_AGE=60        or JOBFLICK_DB_POOL_SIZE=20 for psycopg's pool
+    JOBFLICK_DB_REPLICA_HOST=...       optional read replica
+    JOBFLICK_CACHE_BACKEND=redis       (default) with JOBFLICK_REDIS_URL, or "file" on a single host
+
+The cache must be shared by every worker and management command: cached
+profiles and unread counts are invalidated through it, and a per-process
+locmem cache would only drop the copy held by the process that made the
+write.
+
+PostgreSQL, Redis and NumPy (for the recommendation index) need the extra packages
+in ``requirements-production.txt``.
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+os.environ.setdefault("JOBFLICK_DB_ENGINE", "postgresql")
+os.environ.setdefault("JOBFLICK_DB_CONN_MAX_AGE", "60")
+os.environ.setdefault("JOBFLICK_CACHE_BACKEND", "redis")
+
+from .settings import *  # noqa: E402,F401,F403
+
+DEBUG = os.environ.get("JOBFLICK_DEBUG", "0") == "1"
+
+SECRET_KEY = os.environ.get("JOBFLICK_SECRET_KEY", "")
+if not SECRET_KEY:
+    raise ImproperlyConfigured("Set JOBFLICK_SECRET_KEY for production.")
+
+if JOBFLICK_CACHE_BACKEND == "locmem":  # noqa: F405
+    raise ImproperlyConfigured("Set JOBFLICK_CACHE_BACKEND to a cache shared between processes (redis or file).")
+
+ALLOWED_HOSTS = [host.strip() for host in os.environ.get("JOBFLICK_ALLOWED_HOSTS", "").split(",") if host.strip()]
+
+SESSION_COOKIE_SECURE = os.environ.get("JOBFLICK_SECURE_COOKIES", "1") == "1"
+CSRF_COOKIE_SECURE = SESSION_COOKIE_SECURE
@@ -0,0 +1,12 @@
+"""Small numeric helpers shared by the profiling middleware and the benchmarks."""
+
+from __future__ import annotations
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples`` (``pct`` between 0 and 100)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
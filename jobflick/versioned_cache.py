@@ -0,0 +1,55 @@
+"""Cached values that a late writer cannot leave stale.
+
+Each value is stored next to a generation token kept under its own key.
+Invalidating replaces the token instead of deleting the value, so a reader
+that loaded from the database before a write committed, and only caches
+its result after the write's invalidation ran, stores it under the old
+token; the next read sees the mismatch and treats it as a miss.
+
+Everything lives in the default cache, which has to be shared by every
+process that writes the underlying rows (``settings_production`` refuses
+the per-process locmem cache).
+"""
+
+from __future__ import annotations
+
+from uuid import uuid4
+
+from django.core.cache import cache
+
+TOKEN_TIMEOUT = 24 * 60 * 60
+
+
+def _token_key(key: str) -> str:
+    return f"{key}:generation"
+
+
+def get(key: str):
+    """Return ``(value, token)`` for ``key``; ``value`` is None on a miss.
+
+    Read the token before loading from the database and hand it to
+    ``store`` with the loaded value.
+    """
+    token_key = _token_key(key)
+    found = cache.get_many([key, token_key])
+    token = found.get(token_key)
+    if token is None:
+        cache.add(token_key, uuid4().hex, TOKEN_TIMEOUT)
+        return None, cache.get(token_key)
+    entry = found.get(key)
+    if entry is not None and entry[0] == token:
+        return entry[1], token
+    return None, token
+
+
+def store(key: str, value, token, timeout: int) -> None:
+    """Cache ``value`` as loaded under generation ``token``."""
+    if token is not None:
+        cache.set(key, (token, value), timeout)
+
+
+def invalidate(keys) -> None:
+    """Start a new generation for each of ``keys``; values cached under the old one become misses."""
+    tokens = {_token_key(key): uuid4().hex for key in keys}
+    if tokens:
+        cache.set_many(tokens, TOKEN_TIMEOUT)
@@ -1,9 +1,23 @@
+from django import forms
 from django.contrib import admin
+
+from skills.forms import SkillsFormMixin
+from skills.models import JobSkill
+
 from .models import Job, JobApplication
 
 
+class JobAdminForm(SkillsFormMixin, forms.ModelForm):
+	skill_link_model = JobSkill
+
+	class Meta:
+		model = Job
+		fields = "__all__"
+
+
 @admin.register(Job)
 class JobAdmin(admin.ModelAdmin):
+	form = JobAdminForm
 	list_display = ("work_title", "worker_type", "location", "amount", "created_at")
 	search_fields = ("work_title", "worker_type", "location", "skills")
 	list_filter = ("worker_type", "location", "created_at")
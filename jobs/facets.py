@@ -0,0 +1,315 @@
+"""Faceted navigation for the job list.
+
+Every approved job counts under one value of each facet: its location,
+worker type, budget range, duration range and open/filled state. Those
+counts live in ``FacetCount`` rows that the receivers in ``jobs.signals``
+adjust whenever a job is posted, approved, filled, edited or deleted, so the
+sidebar never groups the job table per request. ``reconcile_job_facets``
+recomputes them from the job table to correct any drift.
+
+Combined selections are resolved smallest first: the stored counts say
+which selected value is rarest, that value's index yields the candidate
+ids, and the other facets are checked against just those candidates by
+primary key. When even the rarest value covers more than
+``INTERSECT_LIMIT`` jobs the conjunction is left to the database.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Min
+
+from locations.services import gazetteer
+
+from .models import AmountBucket, DurationBucket, FacetCount, Job
+
+LOCATION = "location"
+WORKER_TYPE = "worker_type"
+AMOUNT = "amount"
+DURATION = "duration"
+STATE = "state"
+
+OPEN = "open"
+FILLED = "filled"
+STATE_LABELS = {OPEN: "Open", FILLED: "Filled"}
+
+CACHE_KEY = "jobs:facet-counts"
+CACHE_TIMEOUT = 300
+# Values listed per facet in the sidebar (selected values are always shown).
+TOP_VALUES = 8
+# Largest candidate set intersected by primary key and counted per request.
+INTERSECT_LIMIT = 2000
+
+
+@dataclass(frozen=True)
+class Facet:
+    name: str
+    param: str
+    title: str
+    column: str
+
+    def to_column(self, value: str):
+        """Convert a stored facet value back to the ``Job`` column value (``ValueError`` if invalid)."""
+        if self.name == LOCATION:
+            area = gazetteer().by_slug.get(value)
+            if area is None:
+                raise ValueError(value)
+            return area
+        if self.name == STATE:
+            return value == FILLED
+        if self.name in (AMOUNT, DURATION):
+            return int(value)
+        return value
+
+
+FACETS = (
+    Facet(LOCATION, "area", "Location", "area_id"),
+    Facet(WORKER_TYPE, "type", "Worker type", "worker_type_key"),
+    Facet(AMOUNT, "budget", "Budget", "amount_bucket"),
+    Facet(DURATION, "duration", "Duration", "duration_bucket"),
+    Facet(STATE, "state", "Status", "is_filled"),
+)
+FACETS_BY_NAME = {facet.name: facet for facet in FACETS}
+# Columns read to file a job under its facet values, plus the raw text labels come from.
+VALUE_COLUMNS = ("status", "area_id", "worker_type_key", "amount_bucket", "duration_bucket", "is_filled")
+LABEL_COLUMNS = ("worker_type",)
+
+
+def _area_slug(area_id) -> str:
+    area = gazetteer().areas.get(area_id)
+    return area.slug if area else ""
+
+
+def job_facets(values) -> dict[str, str]:
+    """Facet value of each facet for a job given its column values."""
+    return {
+        LOCATION: _area_slug(values.get("area_id")),
+        WORKER_TYPE: values.get("worker_type_key") or "",
+        AMOUNT: str(int(values.get("amount_bucket") or AmountBucket.UNDER_1K)),
+        DURATION: str(int(values.get("duration_bucket") or DurationBucket.UNSPECIFIED)),
+        STATE: FILLED if values.get("is_filled") else OPEN,
+    }
+
+
+def value_label(facet: str, value: str, values=None) -> str:
+    """Display label of ``value``; free-text facets take it from the job's own ``values``."""
+    if facet == AMOUNT:
+        return AmountBucket(int(value)).label
+    if facet == DURATION:
+        return DurationBucket(int(value)).label
+    if facet == STATE:
+        return STATE_LABELS[value]
+    if facet == LOCATION:
+        area = gazetteer().areas.get(gazetteer().by_slug.get(value))
+        return area.name if area else value
+    text = (values or {}).get(facet) or ""
+    return " ".join(text.split()) or "Unspecified"
+
+
+def job_contribution(values) -> Counter:
+    """Return the ``(facet, value)`` counts a job with these column values adds."""
+    if values.get("status") != Job.Status.APPROVED:
+        return Counter()
+    # Jobs whose location matched no area are simply not listed under one.
+    return Counter(bucket for bucket in job_facets(values).items() if bucket[1])
+
+
+def job_labels(values) -> dict[tuple, str]:
+    return {
+        (facet, value): value_label(facet, value, values) for facet, value in job_facets(values).items() if value
+    }
+
+
+def adjust(deltas, labels=None) -> None:
+    """Apply ``{(facet, value): delta}`` to the counts and drop the cached snapshot on commit."""
+    changed = sorted((bucket, delta) for bucket, delta in deltas.items() if delta)
+    if not changed:
+        return
+    labels = labels or {}
+    with transaction.atomic():
+        for (facet, value), delta in changed:
+            row = FacetCount.objects.filter(facet=facet, value=value)
+            if row.update(count=F("count") + delta):
+                continue
+            try:
+                with transaction.atomic():
+                    FacetCount.objects.create(
+                        facet=facet,
+                        value=value,
+                        label=labels.get((facet, value)) or value_label(facet, value),
+                        count=delta,
+                    )
+            except IntegrityError:
+                row.update(count=F("count") + delta)
+    transaction.on_commit(invalidate)
+
+
+def invalidate() -> None:
+    cache.delete(CACHE_KEY)
+
+
+def compute_facet_counts(using: str = "default") -> dict[tuple, tuple[str, int]]:
+    """Count ``{(facet, value): (label, count)}`` from the job table."""
+    approved = Job.objects.using(using).filter(status=Job.Status.APPROVED).order_by()
+    computed = {}
+    for facet in FACETS:
+        rows = approved.values_list(facet.column).annotate(total=Count("id"), worker_type=Min("worker_type"))
+        for column_value, total, worker_type in rows:
+            values = {facet.column: column_value, "worker_type": worker_type}
+            value = job_facets(values)[facet.name]
+            if value:
+                computed[(facet.name, value)] = (value_label(facet.name, value, values), total)
+    return computed
+
+
+def reconcile_facet_counts() -> dict[tuple, tuple[int, int]]:
+    """Overwrite the counts with freshly computed ones.
+
+    Returns ``{(facet, value): (stored, actual)}`` for every count that had
+    drifted. The existing count rows are locked before the jobs are counted,
+    which keeps job writes adjusting them from committing in between on
+    databases with row locks. It does not cover a write that creates a new
+    ``(facet, value)`` row, and SQLite ignores the lock altogether, so run
+    it while jobs are quiet or run it again if it reports drift.
+    """
+    with transaction.atomic():
+        stored = {
+            (facet, value): count
+            for facet, value, count in FacetCount.objects.select_for_update().values_list("facet", "value", "count")
+        }
+        actual = compute_facet_counts()
+        drift = {
+            bucket: (stored.get(bucket, 0), actual.get(bucket, ("", 0))[1])
+            for bucket in stored.keys() | actual.keys()
+            if stored.get(bucket, 0) != actual.get(bucket, ("", 0))[1]
+        }
+        FacetCount.objects.all().delete()
+        FacetCount.objects.bulk_create(
+            [
+                FacetCount(facet=facet, value=value, label=label, count=count)
+                for (facet, value), (label, count) in actual.items()
+            ]
+        )
+    transaction.on_commit(invalidate)
+    return drift
+
+
+def get_facet_counts() -> dict[str, list[tuple[str, str, int]]]:
+    """The top ``TOP_VALUES`` ``(value, label, count)`` of every facet, from cache.
+
+    Only reads the stored counts; the migrations seed them and
+    ``manage.py reconcile_job_facets`` corrects drift.
+    """
+    snapshot = cache.get(CACHE_KEY)
+    if snapshot is not None:
+        return snapshot
+    rows = FacetCount.objects.filter(count__gt=0).order_by("-count", "value")
+    snapshot = {
+        facet.name: list(rows.filter(facet=facet.name).values_list("value", "label", "count")[:TOP_VALUES])
+        for facet in FACETS
+    }
+    cache.set(CACHE_KEY, snapshot, CACHE_TIMEOUT)
+    return snapshot
+
+
+def selected_facets(params) -> dict[str, str]:
+    """Read the facet selections from query parameters."""
+    selected = {}
+    for facet in FACETS:
+        value = params.get(facet.param, "").strip()
+        if not value:
+            continue
+        try:
+            facet.to_column(value)
+        except ValueError:
+            continue
+        selected[facet.name] = value
+    return selected
+
+
+@dataclass
+class FacetResult:
+    queryset: object
+    selected: dict
+    # Whether the selection is small enough to count per request.
+    bounded: bool
+
+
+def apply_facets(queryset, selected) -> FacetResult:
+    """Restrict ``queryset`` to approved jobs matching every ``selected`` facet value."""
+    if not selected:
+        return FacetResult(queryset, selected, bounded=False)
+    counts = dict(
+        (facet, count)
+        for facet, value, count in FacetCount.objects.filter(
+            facet__in=selected, value__in=set(selected.values())
+        ).values_list("facet", "value", "count")
+        if selected.get(facet) == value
+    )
+    order = sorted(selected, key=lambda name: counts.get(name, 0))
+    filters = {FACETS_BY_NAME[name].column: FACETS_BY_NAME[name].to_column(selected[name]) for name in order}
+    if counts.get(order[0], 0) <= 0:
+        # No usable count (not seeded yet, or drifted): let the database decide.
+        return FacetResult(queryset.filter(**filters), selected, bounded=False)
+    if counts[order[0]] > INTERSECT_LIMIT:
+        return FacetResult(queryset.filter(**filters), selected, bounded=False)
+    if len(order) == 1:
+        return FacetResult(queryset.filter(**filters), selected, bounded=True)
+    rarest = FACETS_BY_NAME[order[0]].column
+    candidates = list(
+        Job.objects.using(queryset.db)
+        .filter(status=Job.Status.APPROVED, **{rarest: filters.pop(rarest)})
+        .values_list("pk", flat=True)
+    )
+    matching = Job.objects.using(queryset.db).filter(pk__in=candidates, **filters).values_list("pk", flat=True)
+    return FacetResult(queryset.filter(pk__in=list(matching)), selected, bounded=True)
+
+
+def facet_sidebar(params, result: FacetResult) -> list[dict]:
+    """Sidebar groups for ``result``: links that toggle each value, with job counts.
+
+    Without a selection the counts come from ``FacetCount``. A bounded
+    selection is counted over its own matching jobs, so every count is the
+    number of results the link leads to. A broad one falls back to the
+    overall counts.
+    """
+    if result.bounded:
+        tallies = {facet.name: Counter() for facet in FACETS}
+        labels = {}
+        rows = result.queryset.select_related(None).prefetch_related(None).order_by()
+        for row in rows.values(*VALUE_COLUMNS, *LABEL_COLUMNS):
+            for facet, value in job_facets(row).items():
+                if not value:
+                    continue
+                tallies[facet][value] += 1
+                labels.setdefault((facet, value), value_label(facet, value, row))
+        values = {
+            facet: [(value, labels[(facet, value)], count) for value, count in tally.most_common(TOP_VALUES)]
+            for facet, tally in tallies.items()
+        }
+    else:
+        values = get_facet_counts()
+    groups = []
+    for facet in FACETS:
+        entries = list(values[facet.name])
+        chosen = result.selected.get(facet.name)
+        if chosen is not None and chosen not in {value for value, _, _ in entries}:
+            entries.append((chosen, value_label(facet.name, chosen, {facet.name: chosen}), 0))
+        links = []
+        for value, label, count in entries:
+            query = params.copy()
+            query.pop("cursor", None)
+            if value == chosen:
+                query.pop(facet.param, None)
+            else:
+                query[facet.param] = value
+            links.append(
+                {"value": value, "label": label, "count": count, "selected": value == chosen, "query": query.urlencode()}
+            )
+        if links:
+            groups.append({"title": facet.title, "param": facet.param, "links": links})
+    return groups
@@ -1,9 +1,14 @@
 from django import forms
 
+from skills.forms import SkillsFormMixin
+from skills.models import JobSkill
+
 from .models import Job
 
 
-class JobForm(forms.ModelForm):
+class JobForm(SkillsFormMixin, forms.ModelForm):
+    skill_link_model = JobSkill
+
     class Meta:
         model = Job
         fields = [
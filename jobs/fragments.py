@@ -0,0 +1,29 @@
+"""Version stamps that key the cached job template fragments.
+
+Each ``Job`` carries its own ``cache_version`` that bumps on every save, so a
+card fragment keyed on ``(job.pk, job.cache_version)`` can never go stale.
+Listing fragments that depend on *which* jobs are shown are keyed on a global
+listing version that bumps whenever any job is saved or deleted.
+"""
+
+import time
+
+from django.core.cache import caches
+
+FRAGMENT_CACHE = "fragments"
+LISTING_VERSION_KEY = "jobs:listing-version"
+
+
+def listing_version() -> int:
+    """Return the current listing stamp, minting one when the cache is cold."""
+    cache = caches[FRAGMENT_CACHE]
+    version = cache.get(LISTING_VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        cache.add(LISTING_VERSION_KEY, version, None)
+        version = cache.get(LISTING_VERSION_KEY, version)
+    return version
+
+
+def bump_listing_version() -> None:
+    caches[FRAGMENT_CACHE].set(LISTING_VERSION_KEY, time.time_ns(), None)
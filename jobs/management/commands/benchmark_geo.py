@@ -0,0 +1,115 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from jobflick.benchmarking import isolated_database, time_calls
+from jobs.models import Job
+from jobs.nearby import BaseGeoBackend, GeohashBackend, SQLiteRTreeBackend
+from locations.gazetteer import COORDINATES, entries
+
+# Bounding box of Bangladesh, for random query origins.
+COUNTRY_LATITUDES = (20.7, 26.6)
+COUNTRY_LONGITUDES = (88.0, 92.7)
+WORKER_TYPES = ["Electrician", "Plumber", "Designer", "Developer", "Tutor", "Driver", "Cook", "Cleaner", "Painter"]
+
+
+class ScanBackend(BaseGeoBackend):
+    """No spatial index: the distance test runs on every geocoded row."""
+
+    def candidates(self, queryset, latitude, longitude, radius_km):
+        return queryset
+
+
+class Command(BaseCommand):
+    help = "Compare radius and k-nearest job queries without an index, on the geohash index and on the R-tree."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="100000,1000000", help="Comma-separated job counts to seed.")
+        parser.add_argument("--radii", default="2,5,10", help="Comma-separated radii in km.")
+        parser.add_argument("--queries", type=int, default=100, help="Queries timed per path, radius and size.")
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument("--k", type=int, default=6, help="Jobs returned by the k-nearest queries.")
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options["sizes"].split(",") if size.strip()]
+        radii = [float(radius) for radius in options["radii"].split(",") if radius.strip()]
+        rng = random.Random(42)
+        for size in sizes:
+            with isolated_database(file_based=True):
+                self._seed(size, rng)
+                self._run(size, radii, options, rng)
+
+    def _seed(self, size, rng):
+        poster = get_user_model().objects.create_user(username="bench-poster", password="unused")
+        # Every job is geocoded by the regular save path from a gazetteer spelling.
+        places = [name for name, _, _, _ in entries()]
+        started = time.perf_counter()
+        batch = []
+        for index in range(size):
+            worker_type = rng.choice(WORKER_TYPES)
+            batch.append(
+                Job(
+                    poster=poster,
+                    work_title=f"{worker_type} needed",
+                    worker_type=worker_type,
+                    duration=f"{rng.randint(1, 14)} days",
+                    amount=rng.randint(500, 50000),
+                    location=f"House {rng.randint(1, 99)}, {rng.choice(places)}",
+                    skills="Wiring",
+                    tracking_code=f"GE-{index:010d}",
+                    status=Job.Status.APPROVED,
+                )
+            )
+            if len(batch) == 5000:
+                Job.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Job.objects.bulk_create(batch)
+        seeded = time.perf_counter() - started
+        started = time.perf_counter()
+        indexed = SQLiteRTreeBackend().rebuild()
+        self.stdout.write(
+            f"{size} jobs seeded in {seeded:.1f}s; R-tree indexed {indexed} points in {time.perf_counter() - started:.1f}s"
+        )
+
+    def _run(self, size, radii, options, rng):
+        backends = {"no index": ScanBackend(), "geohash": GeohashBackend(), "r-tree": SQLiteRTreeBackend()}
+        if not backends["r-tree"].available:
+            self.stdout.write("  SQLite R-tree module unavailable; skipping the r-tree path.")
+            del backends["r-tree"]
+        approved = Job.objects.filter(status=Job.Status.APPROVED)
+        places = list(COORDINATES.values())
+        # Gazetteer points hold thousands of jobs each; random points in the
+        # country mostly have few or none nearby.
+        origins = {
+            "at a place": lambda: rng.choice(places),
+            "anywhere": lambda: (rng.uniform(*COUNTRY_LATITUDES), rng.uniform(*COUNTRY_LONGITUDES)),
+        }
+        page_size = options["page_size"]
+        iterations = options["queries"]
+        for radius in radii:
+            matches = GeohashBackend().within(approved, *places[0], radius).count()
+            self.stdout.write(f"  radius {radius:g} km ({matches} jobs around {next(iter(COORDINATES))})")
+            for where, origin in origins.items():
+                for name, backend in backends.items():
+
+                    def page():
+                        nearby = backend.within(approved, *origin(), radius)
+                        list(nearby.order_by("-created_at", "-id")[:page_size])
+
+                    def count():
+                        backend.within(approved, *origin(), radius).count()
+
+                    label = f"{name}, {where}"
+                    self.stdout.write(f"    {label:<22} first page : {time_calls(page, iterations)}")
+                    self.stdout.write(f"    {label:<22} count      : {time_calls(count, max(1, iterations // 10))}")
+        self.stdout.write(f"  {options['k']} nearest")
+        for where, origin in origins.items():
+            for name, backend in backends.items():
+
+                def nearest():
+                    backend.nearest(approved, *origin(), options["k"])
+
+                self.stdout.write(f"    {name + ', ' + where:<22} : {time_calls(nearest, iterations)}")
@@ -0,0 +1,90 @@
+import random
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobflick.benchmarking import summarize
+from jobs import recommendations
+from jobs.recommendations import RecommendationIndex
+
+from .benchmark_search import SKILLS, WORKER_TYPES
+
+# Long tail of niche skills on top of the common ones, drawn Zipf-like.
+VOCABULARY = SKILLS + [f"skill{index}" for index in range(5000)]
+VOCABULARY_WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+
+
+def _skills(rng, count):
+    return ", ".join(rng.choices(VOCABULARY, VOCABULARY_WEIGHTS, k=count))
+
+
+class Command(BaseCommand):
+    help = (
+        "Offline benchmark of the skill recommendation index: build time and memory, "
+        "incremental update cost and per-user top-K latency on synthetic data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jobs", type=int, default=100_000)
+        parser.add_argument("--users", type=int, default=50_000)
+        parser.add_argument("--top", type=int, default=recommendations.TOP_K)
+        parser.add_argument("--updates", type=int, default=1000, help="Jobs re-indexed in the update phase.")
+        parser.add_argument(
+            "--engine",
+            choices=["auto", "numpy", "python"],
+            default="auto",
+            help="Scoring path; 'auto' uses NumPy when it is installed.",
+        )
+
+    def handle(self, *args, **options):
+        if options["engine"] == "numpy" and recommendations.np is None:
+            raise CommandError("NumPy is not installed.")
+        use_numpy = {"auto": None, "numpy": True, "python": False}[options["engine"]]
+        rng = random.Random(42)
+        jobs = [
+            (
+                job_id,
+                rng.randrange(options["users"]),
+                {
+                    "work_title": f"{rng.choice(WORKER_TYPES)} needed for {rng.choice(VOCABULARY)} work",
+                    "worker_type": rng.choice(WORKER_TYPES),
+                    "skills": _skills(rng, 3),
+                },
+            )
+            for job_id in range(1, options["jobs"] + 1)
+        ]
+        profiles = [_skills(rng, rng.randint(1, 5)) for _ in range(options["users"])]
+
+        index = RecommendationIndex(use_numpy=use_numpy)
+        tracemalloc.start()
+        started = time.perf_counter()
+        for job_id, poster_id, fields in jobs:
+            index.add(job_id, poster_id, fields)
+        build_seconds = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        engine = "numpy" if index.use_numpy else "python"
+        self.stdout.write(
+            f"engine={engine} jobs={len(index)} terms={len(index.postings)} "
+            f"build={build_seconds:.2f}s peak={peak / 1024 / 1024:.1f} MiB"
+        )
+
+        update_samples = []
+        for job_id, poster_id, fields in rng.sample(jobs, min(options["updates"], len(jobs))):
+            started = time.perf_counter()
+            index.remove(job_id)
+            index.add(job_id, poster_id, {**fields, "skills": _skills(rng, 3)})
+            update_samples.append(time.perf_counter() - started)
+        self.stdout.write(f"update (remove + add one job): {summarize(update_samples)}")
+
+        query_samples = []
+        started = time.perf_counter()
+        for user_id, skills in enumerate(profiles):
+            terms = recommendations.tokenize(skills)
+            begun = time.perf_counter()
+            index.top_k(terms, limit=options["top"], exclude_poster=user_id)
+            query_samples.append(time.perf_counter() - begun)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"top-{options['top']} per user: {summarize(query_samples)}")
+        self.stdout.write(f"all {len(profiles)} users in {elapsed:.1f}s ({len(profiles) / elapsed:.0f} users/s)")
@@ -0,0 +1,75 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from jobflick.benchmarking import isolated_database, time_calls
+from jobs.models import Job
+from jobs.search import SQLiteFTSBackend
+
+LOCATIONS = ["Uttara", "Mirpur", "Banani", "Dhanmondi", "Gulshan", "Motijheel", "Mohammadpur", "Badda", "Chattogram", "Sylhet"]
+WORKER_TYPES = ["Electrician", "Plumber", "Designer", "Developer", "Tutor", "Driver", "Cook", "Cleaner", "Painter", "Photographer"]
+SKILLS = ["Wiring", "Django", "React", "Figma", "Cooking", "Driving", "Teaching", "Cleaning", "Photoshop", "Excel"]
+
+
+class Command(BaseCommand):
+    help = "Compare job search latency of the FTS5 index against the legacy icontains path."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma-separated job counts to seed.")
+        parser.add_argument("--queries", type=int, default=200, help="Queries timed per path and size.")
+        parser.add_argument("--page-size", type=int, default=20)
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options["sizes"].split(",") if size.strip()]
+        rng = random.Random(42)
+        for size in sizes:
+            with isolated_database(file_based=True):
+                self._seed(size, rng)
+                self._run(size, options["queries"], options["page_size"], rng)
+
+    def _seed(self, size, rng):
+        poster = get_user_model().objects.create_user(username="bench-poster", password="unused")
+        batch = []
+        for index in range(size):
+            batch.append(
+                Job(
+                    poster=poster,
+                    work_title=f"{rng.choice(WORKER_TYPES)} needed for {rng.choice(SKILLS)} work",
+                    worker_type=rng.choice(WORKER_TYPES),
+                    duration=f"{rng.randint(1, 14)} days",
+                    amount=rng.randint(500, 50000),
+                    location=f"{rng.choice(LOCATIONS)}, Dhaka",
+                    skills=", ".join(rng.sample(SKILLS, 3)),
+                    tracking_code=f"BN-{index:010d}",
+                    status=Job.Status.APPROVED,
+                )
+            )
+            if len(batch) == 5000:
+                Job.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Job.objects.bulk_create(batch)
+        SQLiteFTSBackend().rebuild()
+
+    def _run(self, size, iterations, page_size, rng):
+        backend = SQLiteFTSBackend()
+        approved = Job.objects.filter(status=Job.Status.APPROVED).order_by("-created_at")
+
+        def legacy():
+            location = rng.choice(LOCATIONS)
+            category = rng.choice(WORKER_TYPES)
+            list(approved.filter(location__icontains=location, worker_type__icontains=category)[:page_size])
+
+        def indexed():
+            location = rng.choice(LOCATIONS)
+            category = rng.choice(WORKER_TYPES)
+            list(backend.filter(approved, location=location, category=category)[:page_size])
+
+        def ranked():
+            backend.search(f"{rng.choice(WORKER_TYPES)[:4]} {rng.choice(SKILLS)}", limit=page_size)
+
+        self.stdout.write(f"{size} jobs")
+        self.stdout.write(f"  icontains filter : {time_calls(legacy, iterations)}")
+        self.stdout.write(f"  fts5 filter      : {time_calls(indexed, iterations)}")
+        self.stdout.write(f"  fts5 ranked/bm25 : {time_calls(ranked, iterations)}")
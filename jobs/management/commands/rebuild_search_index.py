@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from jobs.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the job full-text search index from the jobs table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default", help="Database alias to re-index.")
+
+    def handle(self, *args, **options):
+        backend = get_search_backend(options["database"])
+        indexed = backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} jobs with {type(backend).__name__}."))
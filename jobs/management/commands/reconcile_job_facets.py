@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from jobs.facets import reconcile_facet_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute the job list facet counts from the jobs table and correct any drift."
+
+    def handle(self, *args, **options):
+        drift = reconcile_facet_counts()
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Facet counts are in sync."))
+            return
+        for (facet, value), (stored, actual) in sorted(drift.items()):
+            self.stdout.write(f"{facet}={value}: {stored} -> {actual}")
+        self.stdout.write(self.style.WARNING(f"Corrected {len(drift)} drifted facet counts."))
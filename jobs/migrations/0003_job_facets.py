@@ -0,0 +1,193 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:14
+
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Frozen copies of the jobs.models helpers as they were when the facet columns
+# were added, so later changes to them cannot alter this migration.
+DURATION_UNIT_DAYS = {
+    "hour": 1 / 24,
+    "hr": 1 / 24,
+    "day": 1,
+    "week": 7,
+    "wk": 7,
+    "month": 30,
+    "year": 365,
+    "yr": 365,
+    "ঘণ্টা": 1 / 24,
+    "দিন": 1,
+    "সপ্তাহ": 7,
+    "মাস": 30,
+    "বছর": 365,
+}
+DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)?\s*(" + "|".join(DURATION_UNIT_DAYS) + ")", re.IGNORECASE)
+LONG_TERM_WORDS = ("long term", "long-term", "permanent", "ongoing", "full time", "full-time")
+AMOUNT_BUCKET_FLOORS = [(50000, 5), (15000, 4), (5000, 3), (1000, 2), (0, 1)]
+AMOUNT_LABELS = {
+    1: "Under 1,000 BDT",
+    2: "1,000 - 4,999 BDT",
+    3: "5,000 - 14,999 BDT",
+    4: "15,000 - 49,999 BDT",
+    5: "50,000 BDT and above",
+}
+DURATION_LABELS = {
+    0: "Not specified",
+    1: "Less than a day",
+    2: "1 - 6 days",
+    3: "1 - 4 weeks",
+    4: "1 - 6 months",
+    5: "Over 6 months",
+}
+
+
+def amount_bucket(amount):
+    for floor, bucket in AMOUNT_BUCKET_FLOORS:
+        if (amount or 0) >= floor:
+            return bucket
+    return 1
+
+
+def duration_bucket(duration):
+    text = (duration or "").casefold()
+    if any(word in text for word in LONG_TERM_WORDS):
+        return 5
+    match = DURATION_RE.search(text)
+    if not match:
+        return 0
+    days = float(match[1] or 1) * DURATION_UNIT_DAYS[match[2].lower()]
+    if days < 1:
+        return 1
+    if days < 7:
+        return 2
+    if days < 30:
+        return 3
+    if days <= 182:
+        return 4
+    return 5
+
+
+def facet_key(text):
+    return " ".join((text or "").split()).casefold()[:120]
+
+
+def location_facet_key(location):
+    return facet_key((location or "").split(",")[0])
+
+
+def fill_facet_columns(apps, schema_editor):
+    Job = apps.get_model("jobs", "Job")
+    jobs = Job.objects.using(schema_editor.connection.alias).order_by("pk")
+    last_pk = 0
+    while True:
+        batch = list(jobs.filter(pk__gt=last_pk)[:1000])
+        if not batch:
+            return
+        last_pk = batch[-1].pk
+        for job in batch:
+            job.location_key = location_facet_key(job.location)
+            job.worker_type_key = facet_key(job.worker_type)
+            job.amount_bucket = amount_bucket(job.amount)
+            job.duration_bucket = duration_bucket(job.duration)
+        Job.objects.using(schema_editor.connection.alias).bulk_update(
+            batch, ["location_key", "worker_type_key", "amount_bucket", "duration_bucket"]
+        )
+
+
+def count_facets(apps, schema_editor):
+    # Seed the sidebar counts the job signals maintain from here on.
+    Job = apps.get_model("jobs", "Job")
+    FacetCount = apps.get_model("jobs", "FacetCount")
+    using = schema_editor.connection.alias
+    counts, labels = Counter(), {}
+    approved = Job.objects.using(using).filter(status="approved").order_by()
+    columns = ("location", "location_key", "worker_type", "worker_type_key", "amount_bucket", "duration_bucket", "is_filled")
+    for location, location_key, worker_type, worker_type_key, amount, duration, is_filled in approved.values_list(*columns).iterator():
+        buckets = {
+            ("location", location_key): " ".join(location.split(",")[0].split()) or "Unspecified",
+            ("worker_type", worker_type_key): " ".join(worker_type.split()) or "Unspecified",
+            ("amount", str(amount)): AMOUNT_LABELS[amount],
+            ("duration", str(duration)): DURATION_LABELS[duration],
+            ("state", "filled" if is_filled else "open"): "Filled" if is_filled else "Open",
+        }
+        for bucket, label in buckets.items():
+            counts[bucket] += 1
+            labels.setdefault(bucket, label)
+    FacetCount.objects.using(using).bulk_create(
+        [FacetCount(facet=facet, value=value, label=labels[(facet, value)], count=count) for (facet, value), count in counts.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_job_skill_tags'),
+        ('skills', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(max_length=20)),
+                ('value', models.CharField(max_length=120)),
+                ('label', models.CharField(max_length=120)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='amount_bucket',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Under 1,000 BDT'), (2, '1,000 - 4,999 BDT'), (3, '5,000 - 14,999 BDT'), (4, '15,000 - 49,999 BDT'), (5, '50,000 BDT and above')], default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='duration_bucket',
+            field=models.PositiveSmallIntegerField(choices=[(0, 'Not specified'), (1, 'Less than a day'), (2, '1 - 6 days'), (3, '1 - 4 weeks'), (4, '1 - 6 months'), (5, 'Over 6 months')], default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='location_key',
+            field=models.CharField(blank=True, editable=False, max_length=120),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='worker_type_key',
+            field=models.CharField(blank=True, editable=False, max_length=120),
+        ),
+        migrations.RunPython(fill_facet_columns, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'location_key', '-created_at', '-id'], name='jobs_job_facet_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'worker_type_key', '-created_at', '-id'], name='jobs_job_facet_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'amount_bucket', '-created_at', '-id'], name='jobs_job_facet_amount_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'duration_bucket', '-created_at', '-id'], name='jobs_job_facet_duration_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'is_filled', '-created_at', '-id'], name='jobs_job_facet_filled_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='facetcount',
+            index=models.Index(fields=['facet', '-count', 'value'], name='jobs_facetcount_top_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='facetcount',
+            constraint=models.UniqueConstraint(fields=('facet', 'value'), name='jobs_facetcount_uniq'),
+        ),
+        migrations.RunPython(count_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,114 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:18
+
+import re
+import unicodedata
+from collections import Counter
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Frozen copies of locations.gazetteer.location_key and
+# locations.services.match_area as they were when jobs gained an area.
+SEPARATORS = re.compile(r"[\s,.;:/\\|()\[\]{}\-_#&+\"`]+")
+MAX_WORDS = 3
+
+
+def location_key(text):
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    return " ".join(part for part in SEPARATORS.split(text) if part)
+
+
+def match_area(text, aliases, kinds):
+    words = location_key(text).split()
+    best = None
+    for start in range(len(words)):
+        for size in range(min(MAX_WORDS, len(words) - start), 0, -1):
+            area_id = aliases.get(" ".join(words[start : start + size]))
+            if area_id is None:
+                continue
+            rank = (kinds[area_id] != "area", start, -size)
+            if best is None or rank < best[0]:
+                best = (rank, area_id)
+            break
+    return best[1] if best else None
+
+
+def drop_location_counts(apps, schema_editor):
+    # Location facet values change from text keys to area slugs;
+    # resolve_job_areas recounts them.
+    FacetCount = apps.get_model("jobs", "FacetCount")
+    FacetCount.objects.using(schema_editor.connection.alias).filter(facet="location").delete()
+
+
+def resolve_job_areas(apps, schema_editor):
+    """File every existing job under the area its location names and count them.
+
+    Fills the location facet and the home page's open-jobs-per-area
+    counters, which the job signals maintain from here on.
+    """
+    Area = apps.get_model("locations", "Area")
+    AreaAlias = apps.get_model("locations", "AreaAlias")
+    Job = apps.get_model("jobs", "Job")
+    FacetCount = apps.get_model("jobs", "FacetCount")
+    PlatformStat = apps.get_model("pages", "PlatformStat")
+    using = schema_editor.connection.alias
+    areas = {pk: (name, slug, kind) for pk, name, slug, kind in Area.objects.using(using).values_list("pk", "name", "slug", "kind")}
+    aliases = dict(AreaAlias.objects.using(using).values_list("alias", "area_id"))
+    kinds = {pk: kind for pk, (_, _, kind) in areas.items()}
+    approved, open_jobs = Counter(), Counter()
+    jobs = Job.objects.using(using).order_by("pk").only("pk", "location", "status", "is_filled")
+    last_pk = 0
+    while True:
+        batch = list(jobs.filter(pk__gt=last_pk)[:1000])
+        if not batch:
+            break
+        last_pk = batch[-1].pk
+        for job in batch:
+            job.area_id = match_area(job.location, aliases, kinds)
+            if job.area_id is not None and job.status == "approved":
+                approved[job.area_id] += 1
+                open_jobs[job.area_id] += not job.is_filled
+        Job.objects.using(using).bulk_update(batch, ["area"])
+    FacetCount.objects.using(using).bulk_create(
+        [
+            FacetCount(facet="location", value=areas[area_id][1], label=areas[area_id][0], count=count)
+            for area_id, count in approved.items()
+        ]
+    )
+    stats = PlatformStat.objects.using(using)
+    stats.filter(key__startswith="area:").delete()
+    stats.bulk_create([PlatformStat(key=f"area:{area_id}", value=count) for area_id, count in open_jobs.items() if count])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_job_facets'),
+        ('locations', '0002_load_gazetteer'),
+        ('pages', '0001_initial'),
+        ('skills', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_location_counts, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='job',
+            name='jobs_job_facet_location_idx',
+        ),
+        migrations.RemoveField(
+            model_name='job',
+            name='location_key',
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='area',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='locations.area'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'area', '-created_at', '-id'], name='jobs_job_facet_area_idx'),
+        ),
+        migrations.RunPython(resolve_job_areas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+from locations.geo import encode
+
+
+def fill_coordinates(apps, schema_editor):
+    # Jobs take the centre of their area, or of its city when the area has none.
+    Area = apps.get_model("locations", "Area")
+    Job = apps.get_model("jobs", "Job")
+    using = schema_editor.connection.alias
+    areas = {area.pk: area for area in Area.objects.using(using)}
+    for area in areas.values():
+        point = area if area.latitude is not None else areas.get(area.city_id)
+        if point is None or point.latitude is None:
+            continue
+        Job.objects.using(using).filter(area_id=area.pk).update(
+            latitude=point.latitude,
+            longitude=point.longitude,
+            geohash=encode(point.latitude, point.longitude),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_job_area'),
+        ('locations', '0003_area_coordinates'),
+        ('skills', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='geohash',
+            field=models.CharField(blank=True, editable=False, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'geohash', '-created_at', '-id'], name='jobs_job_geohash_idx'),
+        ),
+        migrations.RunPython(fill_coordinates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+from django.db import OperationalError, migrations
+
+# Frozen copy of the index jobs.search.SQLiteFTSBackend reads.
+TABLE = "jobs_job_fts"
+COLUMNS = "work_title, worker_type, skills, location"
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        # Databases that ran the search index before it moved into this
+        # migration hold an older, word-tokenized table.
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        try:
+            cursor.execute(f"CREATE VIRTUAL TABLE {TABLE} USING fts5({COLUMNS}, tokenize = 'trigram')")
+        except OperationalError:
+            # No FTS5 or trigram tokenizer in this SQLite build: search falls back to icontains.
+            return
+        cursor.execute(f"INSERT INTO {TABLE} (rowid, {COLUMNS}) SELECT id, {COLUMNS} FROM jobs_job")
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_job_coordinates'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
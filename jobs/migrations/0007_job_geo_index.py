@@ -0,0 +1,40 @@
+from django.db import OperationalError, migrations
+
+# Frozen copy of the index jobs.nearby.SQLiteRTreeBackend reads.
+TABLE = "jobs_job_geo"
+
+
+def create_geo_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        # Databases that ran the distance search before this migration got the
+        # table from a connection hook; rebuild it here from the job rows.
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        try:
+            cursor.execute(f"CREATE VIRTUAL TABLE {TABLE} USING rtree(id, min_lat, max_lat, min_lng, max_lng)")
+        except OperationalError:
+            # No R-tree module in this SQLite build: distance search uses the geohash index.
+            return
+        cursor.execute(
+            f"INSERT INTO {TABLE} (id, min_lat, max_lat, min_lng, max_lng) "
+            "SELECT id, latitude, latitude, longitude, longitude FROM jobs_job WHERE latitude IS NOT NULL"
+        )
+
+
+def drop_geo_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_job_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_geo_index, drop_geo_index),
+    ]
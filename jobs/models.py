@@ -1,10 +1,100 @@
-from django.apps import apps
+import re
+
 from django.conf import settings
 from django.db import models
 from django.urls import reverse
 from django.utils import timezone
-from django.utils.crypto import get_random_string
 
+from jobflick.identifiers import assign_codes, next_code
+
+
+
+TRACKING_PREFIX = "JB"
+
+DURATION_UNIT_DAYS = {
+	"hour": 1 / 24,
+	"hr": 1 / 24,
+	"day": 1,
+	"week": 7,
+	"wk": 7,
+	"month": 30,
+	"year": 365,
+	"yr": 365,
+	"ঘণ্টা": 1 / 24,
+	"দিন": 1,
+	"সপ্তাহ": 7,
+	"মাস": 30,
+	"বছর": 365,
+}
+DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)?\s*(" + "|".join(DURATION_UNIT_DAYS) + ")", re.IGNORECASE)
+LONG_TERM_WORDS = ("long term", "long-term", "permanent", "ongoing", "full time", "full-time")
+
+
+class AmountBucket(models.IntegerChoices):
+	UNDER_1K = 1, "Under 1,000 BDT"
+	FROM_1K = 2, "1,000 - 4,999 BDT"
+	FROM_5K = 3, "5,000 - 14,999 BDT"
+	FROM_15K = 4, "15,000 - 49,999 BDT"
+	FROM_50K = 5, "50,000 BDT and above"
+
+
+AMOUNT_BUCKET_FLOORS = [
+	(50000, AmountBucket.FROM_50K),
+	(15000, AmountBucket.FROM_15K),
+	(5000, AmountBucket.FROM_5K),
+	(1000, AmountBucket.FROM_1K),
+	(0, AmountBucket.UNDER_1K),
+]
+
+
+class DurationBucket(models.IntegerChoices):
+	UNSPECIFIED = 0, "Not specified"
+	HOURS = 1, "Less than a day"
+	DAYS = 2, "1 - 6 days"
+	WEEKS = 3, "1 - 4 weeks"
+	MONTHS = 4, "1 - 6 months"
+	LONG_TERM = 5, "Over 6 months"
+
+
+def amount_bucket(amount):
+	for floor, bucket in AMOUNT_BUCKET_FLOORS:
+		if (amount or 0) >= floor:
+			return bucket
+	return AmountBucket.UNDER_1K
+
+
+def duration_bucket(duration):
+	"""Bucket free-text durations such as "3 days", "2 weeks" or "a month"."""
+	text = (duration or "").casefold()
+	if any(word in text for word in LONG_TERM_WORDS):
+		return DurationBucket.LONG_TERM
+	match = DURATION_RE.search(text)
+	if not match:
+		return DurationBucket.UNSPECIFIED
+	days = float(match[1] or 1) * DURATION_UNIT_DAYS[match[2].lower()]
+	if days < 1:
+		return DurationBucket.HOURS
+	if days < 7:
+		return DurationBucket.DAYS
+	if days < 30:
+		return DurationBucket.WEEKS
+	if days <= 182:
+		return DurationBucket.MONTHS
+	return DurationBucket.LONG_TERM
+
+
+def facet_key(text):
+	"""Case- and spacing-insensitive key of a free-text facet value."""
+	return " ".join((text or "").split()).casefold()[:120]
+
+
+class JobQuerySet(models.QuerySet):
+	def bulk_create(self, objs, *args, **kwargs):
+		objs = list(objs)
+		assign_codes(objs, "tracking_code", TRACKING_PREFIX, using=self.db)
+		for job in objs:
+			job.assign_facet_columns()
+		return super().bulk_create(objs, *args, **kwargs)
 
 
 class Job(models.Model):
@@ -22,6 +112,7 @@ class Job(models.Model):
 	amount = models.PositiveIntegerField()
 	location = models.CharField(max_length=120)
 	skills = models.CharField(max_length=255)
+	skill_tags = models.ManyToManyField("skills.Skill", through="skills.JobSkill", related_name="jobs", blank=True)
 	tracking_code = models.CharField(max_length=16, unique=True, editable=False, blank=True)
 	status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
 	approved_at = models.DateTimeField(blank=True, null=True)
@@ -34,27 +125,145 @@ class Job(models.Model):
 	)
 	is_filled = models.BooleanField(default=False)
 	filled_at = models.DateTimeField(blank=True, null=True)
+	# Derived from the fields above on save; they back the job list facets (``jobs.facets``)
+	# and, for ``area``, the location filters and home page area tiles.
+	area = models.ForeignKey(
+		"locations.Area",
+		related_name="jobs",
+		on_delete=models.SET_NULL,
+		null=True,
+		blank=True,
+		editable=False,
+	)
+	# Centre of ``area`` and its geohash, for distance search (``jobs.nearby``).
+	latitude = models.FloatField(null=True, blank=True, editable=False)
+	longitude = models.FloatField(null=True, blank=True, editable=False)
+	geohash = models.CharField(max_length=12, blank=True, editable=False)
+	worker_type_key = models.CharField(max_length=120, blank=True, editable=False)
+	amount_bucket = models.PositiveSmallIntegerField(
+		choices=AmountBucket.choices,
+		default=AmountBucket.UNDER_1K,
+		editable=False,
+	)
+	duration_bucket = models.PositiveSmallIntegerField(
+		choices=DurationBucket.choices,
+		default=DurationBucket.UNSPECIFIED,
+		editable=False,
+	)
+	cache_version = models.PositiveIntegerField(default=1, editable=False)
 	created_at = models.DateTimeField(auto_now_add=True)
 
+	objects = JobQuerySet.as_manager()
+
+	# Source field -> facet column derived from it.
+	FACET_SOURCES = {
+		"location": "area",
+		"worker_type": "worker_type_key",
+		"amount": "amount_bucket",
+		"duration": "duration_bucket",
+	}
+	# Written alongside ``area`` whenever the location changes.
+	GEO_COLUMNS = ("latitude", "longitude", "geohash")
+
 	class Meta:
 		ordering = ["-created_at"]
+		indexes = [
+			models.Index(fields=["-created_at", "-id"], name="jobs_job_created_idx"),
+			models.Index(fields=["status", "-created_at", "-id"], name="jobs_job_status_created_idx"),
+			models.Index(fields=["poster", "status", "-created_at", "-id"], name="jobs_job_poster_created_idx"),
+			models.Index(fields=["status", "area", "-created_at", "-id"], name="jobs_job_facet_area_idx"),
+			models.Index(fields=["status", "worker_type_key", "-created_at", "-id"], name="jobs_job_facet_type_idx"),
+			models.Index(fields=["status", "amount_bucket", "-created_at", "-id"], name="jobs_job_facet_amount_idx"),
+			models.Index(fields=["status", "duration_bucket", "-created_at", "-id"], name="jobs_job_facet_duration_idx"),
+			models.Index(fields=["status", "is_filled", "-created_at", "-id"], name="jobs_job_facet_filled_idx"),
+			models.Index(fields=["status", "geohash", "-created_at", "-id"], name="jobs_job_geohash_idx"),
+		]
 
 	def __str__(self):
 		return self.work_title
 
+	@classmethod
+	def from_db(cls, db, field_names, values):
+		instance = super().from_db(db, field_names, values)
+		# Remember the persisted state so signal receivers can diff against it.
+		instance._loaded_values = dict(zip(field_names, values))
+		return instance
+
 	def save(self, *args, **kwargs):
 		if not self.tracking_code:
 			self.tracking_code = self._generate_tracking_code()
+		update_fields = kwargs.get("update_fields")
+		self.assign_facet_columns(update_fields)
+		if update_fields is not None:
+			derived = {column for source, column in self.FACET_SOURCES.items() if source in update_fields}
+			if "location" in update_fields:
+				derived.update(self.GEO_COLUMNS)
+			kwargs["update_fields"] = {*update_fields, *derived}
+		bump = not self._state.adding
+		if bump:
+			# Bump the stamp that keys this job's cached template fragments in
+			# the database, so two saves of copies loaded at the same version
+			# still end up under different stamps.
+			self.cache_version = models.F("cache_version") + 1
+			if update_fields is not None:
+				kwargs["update_fields"] = {*kwargs["update_fields"], "cache_version"}
 		super().save(*args, **kwargs)
+		if bump:
+			self.refresh_from_db(fields=["cache_version"])
+		# Receivers diffed the save against the loaded state; the next save
+		# diffs against what was just written.
+		saved = kwargs.get("update_fields") or [field.name for field in self._meta.concrete_fields]
+		attnames = [self._meta.get_field(name).attname for name in saved]
+		self._loaded_values = {
+			**getattr(self, "_loaded_values", {}),
+			**{attname: getattr(self, attname) for attname in attnames},
+		}
+
+	def assign_facet_columns(self, sources=None):
+		"""Recompute the columns derived from ``sources`` (by default all of them).
+
+		A save with ``update_fields`` only recomputes what it writes, so the
+		instance keeps the stored values the signal receivers count it under.
+		"""
+		from locations.geo import encode
+		from locations.services import area_point, match_area
+
+		if sources is None or "location" in sources:
+			self.area_id = match_area(self.location)
+			point = area_point(self.area_id)
+			self.latitude, self.longitude = point or (None, None)
+			self.geohash = encode(*point) if point else ""
+		if sources is None or "worker_type" in sources:
+			self.worker_type_key = facet_key(self.worker_type)
+		if sources is None or "amount" in sources:
+			self.amount_bucket = amount_bucket(self.amount)
+		if sources is None or "duration" in sources:
+			self.duration_bucket = duration_bucket(self.duration)
 
 	@staticmethod
 	def _generate_tracking_code():
-		"""Return a short unique tracking identifier like JB-0ABC12."""
-		prefix = "JB"
-		while True:
-			candidate = f"{prefix}-{get_random_string(6).upper()}"
-			if not Job.objects.filter(tracking_code=candidate).exists():
-				return candidate
+		"""Return a short unique tracking identifier like JB-00001AZ."""
+		return next_code(TRACKING_PREFIX)
+
+
+class FacetCount(models.Model):
+	"""Approved jobs carrying one facet value, maintained by ``jobs.facets``."""
+
+	facet = models.CharField(max_length=20)
+	value = models.CharField(max_length=120)
+	label = models.CharField(max_length=120)
+	count = models.IntegerField(default=0)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=["facet", "value"], name="jobs_facetcount_uniq"),
+		]
+		indexes = [
+			models.Index(fields=["facet", "-count", "value"], name="jobs_facetcount_top_idx"),
+		]
+
+	def __str__(self):
+		return f"{self.facet}={self.value}: {self.count}"
 
 
 class JobApplication(models.Model):
@@ -81,6 +290,10 @@ class JobApplication(models.Model):
 	class Meta:
 		unique_together = ("job", "applicant")
 		ordering = ["-created_at"]
+		indexes = [
+			models.Index(fields=["-created_at", "-id"], name="jobs_app_created_idx"),
+			models.Index(fields=["applicant", "status"], name="jobs_app_applicant_status_idx"),
+		]
 
 	def __str__(self):
 		return f"{self.applicant} -> {self.job}"
@@ -97,26 +310,26 @@ class JobApplication(models.Model):
 			self._notify_applicant()
 
 	def _notify_applicant(self):
-		Notification = apps.get_model("userprofile", "Notification")
+		from userprofile.dispatch import enqueue_direct
+
 		if self.status == self.Status.APPROVED:
 			message = (
 				f"Your application for '{self.job.work_title}' (Tracking {self.job.tracking_code}) has been approved."
 			)
-			Notification.objects.create(
-				user=self.applicant,
-				message=message,
-				link=reverse("job_list"),
-			)
-			Notification.objects.create(
-				user=self.job.poster,
-				message=(
-					f"{self.applicant.username} has been approved for '{self.job.work_title}' "
-					f"(Tracking {self.job.tracking_code})."
-				),
-				link=reverse("user-dashboard"),
-			)
+			notifications = [
+				{"user_id": self.applicant_id, "message": message, "link": reverse("job_list")},
+				{
+					"user_id": self.job.poster_id,
+					"message": (
+						f"{self.applicant.username} has been approved for '{self.job.work_title}' "
+						f"(Tracking {self.job.tracking_code})."
+					),
+					"link": reverse("user-dashboard"),
+				},
+			]
 		else:
 			message = (
 				f"Your application for '{self.job.work_title}' (Tracking {self.job.tracking_code}) was declined."
 			)
-			Notification.objects.create(user=self.applicant, message=message)
+			notifications = [{"user_id": self.applicant_id, "message": message}]
+		enqueue_direct(notifications)
@@ -0,0 +1,318 @@
+"""Distance search over geocoded jobs ("jobs near me").
+
+``Job.latitude``/``longitude`` hold the centre of the gazetteer area a job's
+location names and ``Job.geohash`` that point's geohash (``locations.geo``).
+A radius query turns the circle into the few geohash ranges covering it,
+each a range scan on ``jobs_job_geohash_idx``, and keeps the rows whose
+distance is within the radius; a k-nearest query widens the radius until it
+holds k jobs. SQLite builds with the R-tree module also keep the points in
+an ``rtree`` virtual table, created by a migration and kept current by the
+``Job`` signals in ``jobs.signals``, and look candidates up there instead. Backends are
+pluggable through ``settings.JOBFLICK_GEO_BACKEND``.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import ExpressionWrapper, F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from locations.geo import KM_PER_DEGREE, bounding_box, covering_ranges, decode, distance_km
+from locations.services import area_point, find_area
+
+from .search import sqlite_supports, sqlite_table_exists
+
+DEFAULT_BACKEND = "jobs.nearby.SQLiteRTreeBackend"
+NEAR_ME = "me"
+DEFAULT_RADIUS_KM = 5
+MAX_RADIUS_KM = 50
+# Most candidates a radius query lists by primary key (see BaseGeoBackend.within).
+WITHIN_LIMIT = 2000
+# Offered in the job list's distance filter.
+RADIUS_CHOICES = (2, 5, 10, 25, 50)
+# k-nearest starts with this radius and grows it NEAREST_GROWTH-fold up to NEAREST_MAX_KM.
+NEAREST_START_KM = 2
+NEAREST_GROWTH = 4
+NEAREST_MAX_KM = 1000
+# Most distinct points a k-nearest radius step visits; each costs a query or two.
+NEAREST_MAX_POINTS = 50
+
+
+@dataclass(frozen=True)
+class Origin:
+    label: str
+    latitude: float
+    longitude: float
+
+
+def resolve_origin(value: str, profile=None) -> Origin | None:
+    """The point a ``?near=`` value names: an area slug or spelling, or "me" for the profile's address."""
+    if value == NEAR_ME:
+        location = getattr(profile, "location", None)
+        return Origin("your address", *location) if location else None
+    area = find_area(value)
+    point = area_point(area.id) if area is not None else None
+    return Origin(area.name, *point) if point else None
+
+
+def radius_param(value: str) -> int:
+    """Parse a ``?radius=`` value in km, clamped to ``1..MAX_RADIUS_KM``."""
+    try:
+        radius = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_RADIUS_KM
+    return min(max(radius, 1), MAX_RADIUS_KM)
+
+
+def distance_expression(latitude: float, longitude: float):
+    """Squared distance from the point to each job, in degrees of latitude.
+
+    Equirectangular, so plain arithmetic any database evaluates; over the
+    distances searched here it is within a fraction of a percent of the
+    great-circle distance.
+    """
+    scale = math.cos(math.radians(latitude))
+    dlat = F("latitude") - Value(latitude)
+    dlng = (F("longitude") - Value(longitude)) * Value(scale)
+    return ExpressionWrapper(dlat * dlat + dlng * dlng, output_field=FloatField())
+
+
+def with_distances(jobs, origin: Origin):
+    """Set ``distance_km`` on each geocoded job in ``jobs``; returns ``jobs``."""
+    for job in jobs:
+        if job.latitude is not None:
+            job.distance_km = distance_km(origin.latitude, origin.longitude, job.latitude, job.longitude)
+    return jobs
+
+
+class BaseGeoBackend:
+    """Interface every geo backend implements."""
+
+    def __init__(self, using: str = "default"):
+        self.using = using
+
+    def index_job(self, job) -> None:
+        """Add, move or drop ``job``'s point in the index."""
+
+    def remove_job(self, job_id: int) -> None:
+        """Drop ``job_id`` from the index."""
+
+    def rebuild(self) -> int:
+        """Re-index every geocoded job and return the number of indexed rows."""
+        from .models import Job
+
+        return Job.objects.using(self.using).filter(latitude__isnull=False).count()
+
+    def candidates(self, queryset, latitude: float, longitude: float, radius_km: float):
+        """Narrow ``queryset`` to jobs that may lie within ``radius_km``; farther ones may remain."""
+        raise NotImplementedError
+
+    def candidate_ids(self, queryset, latitude: float, longitude: float, radius_km: float, limit: int) -> list[int]:
+        """Up to ``limit`` primary keys of jobs that may lie within ``radius_km``.
+
+        Backends may skip ``queryset``'s other filters; ``within`` applies them.
+        """
+        matches = self.candidates(queryset, latitude, longitude, radius_km)
+        return list(matches.order_by().values_list("pk", flat=True)[:limit])
+
+    def within(self, queryset, latitude: float, longitude: float, radius_km: float):
+        """Restrict ``queryset`` to jobs within ``radius_km`` of the point. Ordering is left untouched.
+
+        When the index holds at most ``WITHIN_LIMIT`` candidates they are
+        kept by primary key. A denser neighbourhood is left to the database,
+        which then walks the listing's own ordering and tests each row's
+        distance, finding a page of matches long before reading them all.
+        """
+        limit = (radius_km / KM_PER_DEGREE) ** 2
+        nearby = queryset.filter(latitude__isnull=False).alias(distance_sq=distance_expression(latitude, longitude))
+        nearby = nearby.filter(distance_sq__lte=limit)
+        ids = self.candidate_ids(queryset, latitude, longitude, radius_km, WITHIN_LIMIT + 1)
+        if len(ids) > WITHIN_LIMIT:
+            return nearby
+        return nearby.filter(pk__in=ids)
+
+    def nearest(
+        self,
+        queryset,
+        latitude: float,
+        longitude: float,
+        k: int,
+        *,
+        max_km: float = NEAREST_MAX_KM,
+        total: int | None = None,
+    ) -> list:
+        """The ``k`` jobs of ``queryset`` closest to the point, nearest first, with ``distance_km`` set.
+
+        Jobs share the few points their areas geocode to, so the radius is
+        widened until the points inside it hold ``k`` jobs, taking the
+        newest jobs at the nearest point first. Every step is a seek on
+        ``jobs_job_geohash_idx``, whichever backend filters radius queries,
+        and visits at most ``NEAREST_MAX_POINTS`` points, so where more
+        points crowd the radius some nearer ones may be passed over.
+        ``total``, when the caller knows how many jobs ``queryset`` holds
+        at most, stops the widening once that many have been found.
+        """
+        wanted = k if total is None else min(k, total)
+        radius = NEAREST_START_KM
+        while True:
+            jobs = []
+            for geohash in self.points_within(queryset, latitude, longitude, radius, limit=NEAREST_MAX_POINTS):
+                jobs.extend(queryset.filter(geohash=geohash).order_by("-created_at", "-id")[: k - len(jobs)])
+                if len(jobs) >= k:
+                    break
+            if len(jobs) >= wanted or radius >= max_km:
+                return with_distances(jobs, Origin("", latitude, longitude))
+            radius = min(radius * NEAREST_GROWTH, max_km)
+
+    def points_within(
+        self, queryset, latitude: float, longitude: float, radius_km: float, *, limit: int | None = None
+    ) -> list[str]:
+        """Geohashes within ``radius_km`` that jobs of ``queryset`` sit on, nearest first.
+
+        Seeks the index from one distinct geohash to the next, so the cost
+        follows the number of points rather than the number of jobs. With
+        ``limit`` it stops after visiting that many points, taking the
+        covering ranges nearest first.
+        """
+        rows = queryset.exclude(geohash="").order_by("geohash").values_list("geohash", flat=True)
+        ranges = covering_ranges(latitude, longitude, radius_km) or [("0", "~")]
+        ranges.sort(key=lambda cells: distance_km(latitude, longitude, *decode(cells[0])))
+        points = []
+        for low, high in ranges:
+            bound = Q(geohash__gte=low)
+            while limit is None or len(points) < limit:
+                geohash = rows.filter(bound, geohash__lt=high).first()
+                if geohash is None:
+                    break
+                points.append(geohash)
+                bound = Q(geohash__gt=geohash)
+        distances = {point: distance_km(latitude, longitude, *decode(point)) for point in points}
+        return sorted((point for point in points if distances[point] <= radius_km), key=distances.get)
+
+
+class GeohashBackend(BaseGeoBackend):
+    """Range scans over ``Job.geohash``; works on every database."""
+
+    def candidates(self, queryset, latitude, longitude, radius_km):
+        ranges = covering_ranges(latitude, longitude, radius_km)
+        if not ranges:
+            return queryset
+        cover = Q()
+        for low, high in ranges:
+            cover |= Q(geohash__gte=low, geohash__lt=high)
+        return queryset.filter(cover)
+
+    def candidate_ids(self, queryset, latitude, longitude, radius_km, limit):
+        # One query per range, nearest first: OR-ed ranges collect every row
+        # before the limit applies, so a dense centre cell would not stop them.
+        ranges = covering_ranges(latitude, longitude, radius_km)
+        if not ranges:
+            return super().candidate_ids(queryset, latitude, longitude, radius_km, limit)
+        ranges.sort(key=lambda cells: distance_km(latitude, longitude, *decode(cells[0])))
+        rows = queryset.order_by().values_list("pk", flat=True)
+        ids = []
+        for low, high in ranges:
+            ids.extend(rows.filter(geohash__gte=low, geohash__lt=high)[: limit - len(ids)])
+            if len(ids) >= limit:
+                break
+        return ids
+
+
+class SQLiteRTreeBackend(BaseGeoBackend):
+    """Bounding-box lookups in an R-tree virtual table keyed by job id."""
+
+    table = "jobs_job_geo"
+
+    def __init__(self, using: str = "default"):
+        super().__init__(using)
+        self.fallback = GeohashBackend(using)
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    @property
+    def available(self) -> bool:
+        return self.connection.vendor == "sqlite" and rtree_available(self.using)
+
+    def index_job(self, job) -> None:
+        if not self.available:
+            return
+        with self.connection.cursor() as cursor:
+            if job.latitude is None or job.longitude is None:
+                cursor.execute(f"DELETE FROM {self.table} WHERE id = %s", [job.pk])
+                return
+            cursor.execute(
+                f"INSERT OR REPLACE INTO {self.table} (id, min_lat, max_lat, min_lng, max_lng) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                [job.pk, job.latitude, job.latitude, job.longitude, job.longitude],
+            )
+
+    def remove_job(self, job_id: int) -> None:
+        if not self.available:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE id = %s", [job_id])
+
+    def rebuild(self) -> int:
+        if not self.available:
+            return super().rebuild()
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            cursor.execute(
+                f"INSERT INTO {self.table} (id, min_lat, max_lat, min_lng, max_lng) "
+                "SELECT id, latitude, latitude, longitude, longitude FROM jobs_job WHERE latitude IS NOT NULL"
+            )
+            cursor.execute(f"SELECT COUNT(*) FROM {self.table}")
+            return cursor.fetchone()[0]
+
+    def candidates(self, queryset, latitude, longitude, radius_km):
+        if not self.available:
+            return self.fallback.candidates(queryset, latitude, longitude, radius_km)
+        south, north, west, east = bounding_box(latitude, longitude, radius_km)
+        return queryset.filter(
+            pk__in=RawSQL(
+                f"SELECT id FROM {self.table} WHERE max_lat >= %s AND min_lat <= %s AND max_lng >= %s AND min_lng <= %s",
+                [south, north, west, east],
+            )
+        )
+
+    def candidate_ids(self, queryset, latitude, longitude, radius_km, limit):
+        if not self.available:
+            return self.fallback.candidate_ids(queryset, latitude, longitude, radius_km, limit)
+        # Read the R-tree alone: "pk IN (...)" would collect every id in the box
+        # before the limit applies. within() applies the queryset's filters.
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT id FROM {self.table} WHERE max_lat >= %s AND min_lat <= %s AND max_lng >= %s AND min_lng <= %s "
+                "LIMIT %s",
+                [*bounding_box(latitude, longitude, radius_km), limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+def rtree_available(using: str = "default") -> bool:
+    """Whether this process can use the R-tree table on ``using``.
+
+    The migration only creates the table where the library supports it, and
+    a database migrated elsewhere may lack it.
+    """
+    supported = sqlite_supports("CREATE VIRTUAL TABLE probe USING rtree(id, min_lat, max_lat)")
+    return supported and sqlite_table_exists(using, SQLiteRTreeBackend.table)
+
+
+@lru_cache(maxsize=None)
+def _backend_class(path: str):
+    return import_string(path)
+
+
+def get_geo_backend(using: str = "default") -> BaseGeoBackend:
+    """Return the configured geo backend bound to the ``using`` database."""
+    path = getattr(settings, "JOBFLICK_GEO_BACKEND", DEFAULT_BACKEND)
+    return _backend_class(path)(using)
@@ -0,0 +1,447 @@
+"""Skill-based job recommendations for the member dashboard.
+
+``RecommendationIndex`` is an in-memory inverted index over approved,
+unfilled jobs. Every term of ``work_title``, ``worker_type`` and ``skills``
+maps to a postings list of ``(row, weighted term frequency)`` pairs held in
+flat ``array`` buffers. A member's profile skills are scored against it with
+BM25: with NumPy installed, each skill term's postings are weighted in one
+vectorized pass and summed per job with ``numpy.bincount``; without it, the
+postings are walked best first and the walk stops as soon as the top K can
+no longer change.
+
+Each process keeps one index. Job writes append the job id to a change log
+in the default cache (``record_change``, called from ``jobs.signals``).
+Before serving, the index reloads only the jobs logged since it last synced.
+The first use and any gap in the log (evicted entries, a flushed cache) need
+a full rebuild instead. With ``JOBFLICK_RECOMMENDATION_BUILD = "thread"``
+that runs in the background while the previous index, or on first use an
+empty one, keeps serving; ``"inline"`` rebuilds in the calling request.
+Per-user top-K lists are cached under the index version they were computed
+at and dropped when the member's profile changes.
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import math
+import threading
+import time
+from array import array
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from jobflick import background
+
+from .models import Job
+from .search import tokenize
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional speed-up
+    np = None
+
+# Term frequency multiplier per field: a skill match outweighs a title match.
+FIELD_WEIGHTS = {"skills": 3.0, "worker_type": 2.0, "work_title": 1.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+TOP_K = 6
+
+EPOCH_KEY = "jobs:recommend:epoch"
+POSITION_KEY = "jobs:recommend:position"
+LOG_TIMEOUT = 24 * 60 * 60
+# Beyond this many unseen changes a full rebuild is cheaper than replaying them.
+MAX_REPLAY = 5000
+TOP_K_TIMEOUT = 300
+
+
+def _entry_key(position: int) -> str:
+    return f"jobs:recommend:change:{position}"
+
+
+def top_k_key(user_id: int) -> str:
+    return f"jobs:recommend:top:{user_id}"
+
+
+def document_terms(fields: dict) -> dict[str, float]:
+    """Weighted term frequencies of one job's indexed fields."""
+    terms = defaultdict(float)
+    for field, weight in FIELD_WEIGHTS.items():
+        for token in tokenize(fields.get(field, "")):
+            terms[token] += weight
+    return terms
+
+
+class _Postings:
+    __slots__ = ("rows", "tf", "impacts")
+
+    def __init__(self):
+        self.rows = array("i")
+        self.tf = array("d")
+        # ``(-BM25 term frequency part, row)`` sorted best first, built on
+        # demand for the pure Python scorer.
+        self.impacts = None
+
+
+class RecommendationIndex:
+    """Incrementally maintained BM25 index over job documents.
+
+    Rows are appended as jobs are added; removing a job only clears its
+    ``alive`` flag until ``compact`` renumbers the surviving rows. The
+    average document length BM25 normalizes by is frozen and refreshed when
+    the live average drifts by more than ``AVG_LENGTH_TOLERANCE``, so
+    per-term weights only change when postings do.
+    """
+
+    AVG_LENGTH_TOLERANCE = 0.1
+
+    def __init__(self, *, use_numpy: bool | None = None):
+        self.use_numpy = np is not None if use_numpy is None else use_numpy and np is not None
+        self._lock = threading.RLock()
+        self.version = None
+        self.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self.vocabulary: dict[str, int] = {}
+            self.postings: list[_Postings] = []
+            self.df = array("i")
+            # Per row: job id, poster id, document length, alive flag and the
+            # slice of ``row_terms``/``row_tf`` holding its terms.
+            self.row_job = array("q")
+            self.row_poster = array("q")
+            self.lengths = array("d")
+            self.alive = bytearray()
+            self.row_start = array("q", [0])
+            self.row_terms = array("i")
+            self.row_tf = array("d")
+            self.rows_by_job: dict[int, int] = {}
+            self.total_length = 0.0
+            self.avg_length = None
+            self.dead = 0
+
+    def __len__(self) -> int:
+        return len(self.rows_by_job)
+
+    def _term_id(self, term: str) -> int:
+        term_id = self.vocabulary.get(term)
+        if term_id is None:
+            term_id = self.vocabulary[term] = len(self.postings)
+            self.postings.append(_Postings())
+            self.df.append(0)
+        return term_id
+
+    def _tf_part(self, tf: float, length: float) -> float:
+        return tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / self.avg_length))
+
+    def add(self, job_id: int, poster_id: int, fields: dict) -> None:
+        """Index ``job_id`` (replacing any earlier version of it)."""
+        terms = document_terms(fields)
+        with self._lock:
+            self.remove(job_id)
+            row = len(self.row_job)
+            length = sum(terms.values())
+            self.row_job.append(job_id)
+            self.row_poster.append(poster_id)
+            self.lengths.append(length)
+            self.alive.append(1)
+            self.total_length += length
+            for term, tf in terms.items():
+                term_id = self._term_id(term)
+                postings = self.postings[term_id]
+                postings.rows.append(row)
+                postings.tf.append(tf)
+                if postings.impacts is not None:
+                    bisect.insort(postings.impacts, (-self._tf_part(tf, length), row))
+                self.df[term_id] += 1
+                self.row_terms.append(term_id)
+                self.row_tf.append(tf)
+            self.row_start.append(len(self.row_terms))
+            self.rows_by_job[job_id] = row
+
+    def remove(self, job_id: int) -> None:
+        with self._lock:
+            row = self.rows_by_job.pop(job_id, None)
+            if row is None:
+                return
+            self.alive[row] = 0
+            self.dead += 1
+            self.total_length -= self.lengths[row]
+            for term_id in self.row_terms[self.row_start[row] : self.row_start[row + 1]]:
+                self.df[term_id] -= 1
+            if self.dead > max(1000, len(self.rows_by_job) // 4):
+                self.compact()
+
+    def compact(self) -> None:
+        """Drop removed rows from every postings list and renumber the rest."""
+        with self._lock:
+            old = (self.row_job, self.row_poster, self.lengths, self.alive, self.row_start, self.row_terms, self.row_tf)
+            row_job, row_poster, lengths, alive, row_start, row_terms, row_tf = old
+            vocabulary = {term_id: term for term, term_id in self.vocabulary.items()}
+            self.clear()
+            for row, job_id in enumerate(row_job):
+                if not alive[row]:
+                    continue
+                new_row = len(self.row_job)
+                self.row_job.append(job_id)
+                self.row_poster.append(row_poster[row])
+                self.lengths.append(lengths[row])
+                self.alive.append(1)
+                self.total_length += lengths[row]
+                for offset in range(row_start[row], row_start[row + 1]):
+                    term_id = self._term_id(vocabulary[row_terms[offset]])
+                    postings = self.postings[term_id]
+                    postings.rows.append(new_row)
+                    postings.tf.append(row_tf[offset])
+                    self.df[term_id] += 1
+                    self.row_terms.append(term_id)
+                    self.row_tf.append(row_tf[offset])
+                self.row_start.append(len(self.row_terms))
+                self.rows_by_job[job_id] = new_row
+
+    def _refresh_avg_length(self) -> None:
+        live = self.total_length / len(self.rows_by_job)
+        if self.avg_length is None or abs(live - self.avg_length) > self.AVG_LENGTH_TOLERANCE * self.avg_length:
+            self.avg_length = live
+            for postings in self.postings:
+                postings.impacts = None
+
+    def _idf(self, term_id: int) -> float:
+        total, df = len(self.rows_by_job), self.df[term_id]
+        return math.log(1 + (total - df + 0.5) / (df + 0.5))
+
+    def top_k(self, terms, *, limit: int = TOP_K, exclude_poster: int | None = None) -> list[int]:
+        """Return up to ``limit`` job ids ranked by BM25 score against ``terms``.
+
+        Jobs posted by ``exclude_poster`` are left out; newer jobs (higher
+        ids) win ties.
+        """
+        with self._lock:
+            if not self.rows_by_job or limit <= 0:
+                return []
+            term_ids = [self.vocabulary[term] for term in dict.fromkeys(terms) if term in self.vocabulary]
+            term_ids = [term_id for term_id in term_ids if self.df[term_id]]
+            if not term_ids:
+                return []
+            self._refresh_avg_length()
+            if self.use_numpy:
+                return self._top_k_numpy(term_ids, limit, exclude_poster)
+            return self._top_k_python(term_ids, limit, exclude_poster)
+
+    def _top_k_numpy(self, term_ids, limit, exclude_poster) -> list[int]:
+        lengths = np.frombuffer(self.lengths, dtype=np.float64)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / self.avg_length)
+        rows, weights = [], []
+        for term_id in term_ids:
+            postings = self.postings[term_id]
+            term_rows = np.frombuffer(postings.rows, dtype=np.int32)
+            tf = np.frombuffer(postings.tf, dtype=np.float64)
+            rows.append(term_rows)
+            weights.append(self._idf(term_id) * tf * (BM25_K1 + 1) / (tf + norm[term_rows]))
+        scores = np.bincount(np.concatenate(rows), np.concatenate(weights), minlength=len(self.row_job))
+        scores *= np.frombuffer(self.alive, dtype=np.uint8)
+        if exclude_poster is not None:
+            scores[np.frombuffer(self.row_poster, dtype=np.int64) == exclude_poster] = 0
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            # Keep every row tied with the K-th score so the id tie-break below sees them all.
+            kth = -np.partition(-scores[candidates], limit - 1)[limit - 1]
+            candidates = candidates[scores[candidates] >= kth]
+        row_job = np.frombuffer(self.row_job, dtype=np.int64)
+        ordered = candidates[np.lexsort((-row_job[candidates], -scores[candidates]))][:limit]
+        return [int(job_id) for job_id in row_job[ordered]]
+
+    def _impacts(self, term_id: int) -> list:
+        postings = self.postings[term_id]
+        if postings.impacts is None:
+            lengths = self.lengths
+            postings.impacts = sorted(
+                (-self._tf_part(tf, lengths[row]), row) for row, tf in zip(postings.rows, postings.tf)
+            )
+        return postings.impacts
+
+    def _top_k_python(self, term_ids, limit, exclude_poster) -> list[int]:
+        # Fagin's threshold algorithm: walk every term's postings best first,
+        # score each new row exactly, and stop once the K-th best score
+        # exceeds the most any row further down the lists could still get.
+        # A row scoring exactly the threshold could still win on its job id.
+        idf = {term_id: self._idf(term_id) for term_id in term_ids}
+        lists = [(idf[term_id], self._impacts(term_id)) for term_id in term_ids]
+        alive, row_poster, row_job = self.alive, self.row_poster, self.row_job
+        row_start, row_terms, row_tf, lengths = self.row_start, self.row_terms, self.row_tf, self.lengths
+        best = []
+        seen = set()
+        depth = 0
+        while True:
+            threshold = 0.0
+            exhausted = True
+            for weight, impacts in lists:
+                if depth >= len(impacts):
+                    continue
+                exhausted = False
+                negative_part, row = impacts[depth]
+                threshold -= weight * negative_part
+                if row in seen or not alive[row] or row_poster[row] == exclude_poster:
+                    continue
+                seen.add(row)
+                score = 0.0
+                for offset in range(row_start[row], row_start[row + 1]):
+                    term_weight = idf.get(row_terms[offset])
+                    if term_weight is not None:
+                        score += term_weight * self._tf_part(row_tf[offset], lengths[row])
+                entry = (score, row_job[row])
+                if len(best) < limit:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+            if exhausted or (len(best) == limit and best[0][0] > threshold):
+                break
+            depth += 1
+        return [job_id for _, job_id in sorted(best, reverse=True)]
+
+    # ---------- Keeping the index in sync with the database ----------
+
+    def load(self, job_ids=None) -> None:
+        """Re-read ``job_ids`` (every job when ``None``) and index the recommendable ones."""
+        # Read from the primary: the change log can be ahead of a replica.
+        queryset = Job.objects.using("default").order_by()
+        if job_ids is not None:
+            queryset = queryset.filter(pk__in=job_ids)
+        fields = list(FIELD_WEIGHTS)
+        rows = queryset.filter(status=Job.Status.APPROVED, is_filled=False).values_list("pk", "poster_id", *fields)
+        with self._lock:
+            if job_ids is None:
+                self.clear()
+            else:
+                for job_id in job_ids:
+                    self.remove(job_id)
+            for job_id, poster_id, *values in rows.iterator(chunk_size=5000):
+                self.add(job_id, poster_id, dict(zip(fields, values)))
+
+    def sync(self, *, rebuild: bool = True) -> bool:
+        """Apply the changes logged since the last sync; return whether the index is current.
+
+        When only a full reload can catch up, it happens here if ``rebuild``
+        is set; otherwise the index is left as it is and ``False`` returned.
+        """
+        epoch, position = _log_state()
+        with self._lock:
+            if self.version is not None and epoch is None:
+                # The cache keeps no log (e.g. DummyCache); only this
+                # process's own changes reach the index, via record_change.
+                return True
+            if self.version is not None and self.version[0] == epoch:
+                seen = self.version[1]
+                if seen == position:
+                    return True
+                if seen < position <= seen + MAX_REPLAY:
+                    keys = [_entry_key(number) for number in range(seen + 1, position + 1)]
+                    logged = cache.get_many(keys)
+                    if len(logged) == len(keys):
+                        self.load(set(logged.values()))
+                        self.version = (epoch, position)
+                        return True
+            if not rebuild:
+                return False
+            self.load()
+            self.version = (epoch, position)
+            return True
+
+
+def _log_state():
+    """Return ``(epoch, position)`` of the change log, starting a new log when it was evicted.
+
+    A new log gets a new epoch, so every index built against the old one
+    rebuilds. Both are ``None`` when the cache does not keep values.
+    """
+    state = cache.get_many([EPOCH_KEY, POSITION_KEY])
+    if POSITION_KEY not in state:
+        cache.set(EPOCH_KEY, time.time_ns(), None)
+        cache.add(POSITION_KEY, 0, None)
+    elif EPOCH_KEY not in state:
+        cache.add(EPOCH_KEY, time.time_ns(), None)
+    else:
+        return state[EPOCH_KEY], state[POSITION_KEY]
+    state = cache.get_many([EPOCH_KEY, POSITION_KEY])
+    return state.get(EPOCH_KEY), state.get(POSITION_KEY)
+
+
+def record_change(job_id: int) -> None:
+    """Log that ``job_id`` was created, changed or deleted, and apply it to this process's index."""
+    if _index.version is not None:
+        _index.load([job_id])
+    _log_state()
+    try:
+        position = cache.incr(POSITION_KEY)
+    except ValueError:
+        # The log was evicted meanwhile; the next sync rebuilds anyway.
+        return
+    cache.set(_entry_key(position), job_id, LOG_TIMEOUT)
+
+
+_index = RecommendationIndex()
+_rebuild_lock = threading.Lock()
+_rebuilding = False
+
+
+def build_mode() -> str:
+    return getattr(settings, "JOBFLICK_RECOMMENDATION_BUILD", background.THREAD)
+
+
+def rebuild_index() -> RecommendationIndex:
+    """Build a new index from the database and make it the one served."""
+    global _index
+    fresh = RecommendationIndex(use_numpy=_index.use_numpy)
+    fresh.sync()
+    _index = fresh
+    return fresh
+
+
+def _rebuild_in_background() -> None:
+    global _rebuilding
+    try:
+        rebuild_index()
+    finally:
+        with _rebuild_lock:
+            _rebuilding = False
+
+
+def get_index() -> RecommendationIndex:
+    """Return this process's index, caught up with the change log where possible.
+
+    In ``"thread"`` mode a needed full rebuild is started in the background
+    (at most one at a time) and the current index is returned meanwhile.
+    """
+    global _rebuilding
+    index = _index
+    if index.sync(rebuild=build_mode() == background.INLINE):
+        return index
+    with _rebuild_lock:
+        if not _rebuilding:
+            _rebuilding = True
+            background.submit(_rebuild_in_background)
+    return index
+
+
+def recommended_job_ids(user, skills: str, *, limit: int = TOP_K) -> list[int]:
+    """Top ``limit`` job ids for ``user``'s ``skills``, excluding their own posts."""
+    terms = tokenize(skills)
+    if not terms:
+        return []
+    index = get_index()
+    cached = cache.get(top_k_key(user.pk))
+    if cached is not None and cached[0] == (index.version, limit):
+        return cached[1]
+    job_ids = index.top_k(terms, limit=limit, exclude_poster=user.pk)
+    cache.set(top_k_key(user.pk), ((index.version, limit), job_ids), TOP_K_TIMEOUT)
+    return job_ids
+
+
+def invalidate_recommendations(user_ids, *, using: str = "default") -> None:
+    """Drop the cached top-K lists of ``user_ids`` once the transaction commits."""
+    keys = [top_k_key(user_id) for user_id in user_ids]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys), using=using)
@@ -0,0 +1,289 @@
+"""Full-text search over job posts.
+
+The index covers ``work_title``, ``worker_type``, ``skills`` and ``location``
+and is kept current by the ``Job`` save/delete signals in ``jobs.signals``.
+Backends are pluggable through ``settings.JOBFLICK_SEARCH_BACKEND``: SQLite
+deployments use an FTS5 virtual table (created by migration
+``jobs.0006_job_search_index``) with the trigram tokenizer and BM25
+ranking, other databases fall back to ``icontains`` filtering. A trigram
+MATCH finds the same substrings ``icontains`` does, so both backends return
+the same rows; strings shorter than a trigram are matched with
+``icontains`` on either.
+"""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+SEARCH_FIELDS = ("work_title", "worker_type", "skills", "location")
+# BM25 column weights, in SEARCH_FIELDS order: a title hit outranks a location hit.
+FIELD_WEIGHTS = (10.0, 5.0, 3.0, 2.0)
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# Shortest string the trigram index can match; shorter ones use icontains.
+MIN_MATCH_LENGTH = 3
+# Most ranked matches ``ranked`` intersects with the listing's other filters.
+RANK_CANDIDATES = 2000
+
+DEFAULT_BACKEND = "jobs.search.SQLiteFTSBackend"
+
+
+def tokenize(text: str) -> list[str]:
+    """Split free text into case-folded search tokens."""
+    return [token.casefold() for token in TOKEN_RE.findall(text or "")]
+
+
+class BaseSearchBackend:
+    """Interface every search backend implements."""
+
+    def __init__(self, using: str = "default"):
+        self.using = using
+
+    def index_job(self, job) -> None:
+        """Add or refresh ``job`` in the index."""
+
+    def remove_job(self, job_id: int) -> None:
+        """Drop ``job_id`` from the index."""
+
+    def rebuild(self) -> int:
+        """Re-index every job and return the number of indexed rows."""
+        from .models import Job
+
+        return Job.objects.using(self.using).count()
+
+    def filter(self, queryset, *, query: str = "", location: str = "", category: str = ""):
+        """Restrict ``queryset`` to jobs matching every provided criterion.
+
+        ``query`` matches any indexed field, ``location`` and ``category`` are
+        scoped to ``location`` and ``worker_type``. Ordering is left untouched.
+        """
+        raise NotImplementedError
+
+    def search(self, query: str, *, limit: int = 50) -> list[int]:
+        """Return up to ``limit`` job ids matching ``query``, best match first."""
+        raise NotImplementedError
+
+    def ranked_ids(self, queryset, query: str) -> tuple[list[int], bool]:
+        """Return the ids of jobs in ``queryset`` matching ``query`` in rank order.
+
+        Only the best ``RANK_CANDIDATES`` matches are considered, so a
+        listing filtered down to jobs ranked below them shows fewer results;
+        the flag is set when matches were left out.
+        """
+        ids = self.search(query, limit=RANK_CANDIDATES + 1)
+        truncated = len(ids) > RANK_CANDIDATES
+        ids = ids[:RANK_CANDIDATES]
+        if not ids:
+            return [], truncated
+        kept = set(queryset.filter(pk__in=ids).values_list("pk", flat=True))
+        return [job_id for job_id in ids if job_id in kept], truncated
+
+    def ranked(self, queryset, query: str, *, limit: int = 50) -> list:
+        """Return up to ``limit`` jobs from ``queryset`` matching ``query`` in rank order."""
+        ids = self.ranked_ids(queryset, query)[0][:limit]
+        jobs = queryset.in_bulk(ids)
+        return [jobs[job_id] for job_id in ids if job_id in jobs]
+
+
+def contains_any_field(token: str) -> Q:
+    matches = Q()
+    for field in SEARCH_FIELDS:
+        matches |= Q(**{f"{field}__icontains": token})
+    return matches
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """Portable fallback that scans the job table with ``icontains``."""
+
+    def filter(self, queryset, *, query: str = "", location: str = "", category: str = ""):
+        for token in tokenize(query):
+            queryset = queryset.filter(contains_any_field(token))
+        if location:
+            queryset = queryset.filter(location__icontains=location)
+        if category:
+            queryset = queryset.filter(worker_type__icontains=category)
+        return queryset
+
+    def search(self, query: str, *, limit: int = 50) -> list[int]:
+        from .models import Job
+
+        if not tokenize(query):
+            return []
+        queryset = self.filter(Job.objects.using(self.using), query=query)
+        return list(queryset.order_by("-created_at", "-id").values_list("pk", flat=True)[:limit])
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """Inverted index stored in an FTS5 virtual table keyed by job id."""
+
+    table = "jobs_job_fts"
+
+    def __init__(self, using: str = "default"):
+        super().__init__(using)
+        self.fallback = DatabaseSearchBackend(using)
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    @property
+    def available(self) -> bool:
+        return self.connection.vendor == "sqlite" and fts_available(self.using)
+
+    def index_job(self, job) -> None:
+        if not self.available:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [job.pk])
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, {', '.join(SEARCH_FIELDS)}) VALUES (%s, %s, %s, %s, %s)",
+                [job.pk, *(getattr(job, field) or "" for field in SEARCH_FIELDS)],
+            )
+
+    def remove_job(self, job_id: int) -> None:
+        if not self.available:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [job_id])
+
+    def rebuild(self) -> int:
+        if not self.available:
+            return super().rebuild()
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, {', '.join(SEARCH_FIELDS)}) "
+                f"SELECT id, {', '.join(SEARCH_FIELDS)} FROM jobs_job"
+            )
+            cursor.execute(f"INSERT INTO {self.table} ({self.table}) VALUES ('optimize')")
+            cursor.execute(f"SELECT COUNT(*) FROM {self.table}")
+            return cursor.fetchone()[0]
+
+    def filter(self, queryset, *, query: str = "", location: str = "", category: str = ""):
+        if not self.available:
+            return self.fallback.filter(queryset, query=query, location=location, category=category)
+        expression, remainder = match_expression(query=query, location=location, category=category)
+        if expression:
+            queryset = queryset.filter(
+                pk__in=RawSQL(f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s", [expression])
+            )
+        return queryset.filter(remainder)
+
+    def search(self, query: str, *, limit: int = 50) -> list[int]:
+        if not self.available:
+            return self.fallback.search(query, limit=limit)
+        expression, remainder = match_expression(query=query)
+        if not expression:
+            # Only tokens too short for a trigram: nothing to rank by.
+            return self.fallback.search(query, limit=limit)
+        weights = ", ".join(str(weight) for weight in FIELD_WEIGHTS)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s "
+                f"ORDER BY bm25({self.table}, {weights}) LIMIT %s",
+                [expression, max(limit, RANK_CANDIDATES) if remainder else limit],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        if remainder:
+            from .models import Job
+
+            kept = set(Job.objects.using(self.using).filter(remainder, pk__in=ids).values_list("pk", flat=True))
+            ids = [job_id for job_id in ids if job_id in kept][:limit]
+        return ids
+
+
+def _phrase(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+
+def match_expression(*, query: str = "", location: str = "", category: str = "") -> tuple[str, Q]:
+    """Split the criteria into an FTS5 trigram MATCH expression and an ``icontains`` remainder.
+
+    Every ``query`` token must occur in some field and ``location`` and
+    ``category`` each as a whole in their own column, exactly as
+    ``DatabaseSearchBackend`` filters. The expression is empty when no
+    criterion is long enough for the index.
+    """
+    clauses = []
+    remainder = Q()
+    for token in tokenize(query):
+        if len(token) >= MIN_MATCH_LENGTH:
+            clauses.append(_phrase(token))
+        else:
+            remainder &= contains_any_field(token)
+    for column, text in (("location", location), ("worker_type", category)):
+        if len(text) >= MIN_MATCH_LENGTH:
+            clauses.append(f"{column} : {_phrase(text)}")
+        elif text:
+            remainder &= Q(**{f"{column}__icontains": text})
+    return " AND ".join(clauses), remainder
+
+
+@lru_cache(maxsize=None)
+def sqlite_supports(statement: str) -> bool:
+    """Whether this process's SQLite library can run ``statement`` (e.g. create a virtual table).
+
+    Probed once on a private in-memory database, so no connection the
+    application uses pays for it.
+    """
+    probe = sqlite3.connect(":memory:")
+    try:
+        probe.execute(statement)
+    except sqlite3.Error:
+        return False
+    finally:
+        probe.close()
+    return True
+
+
+# (alias, database name, table) for tables sqlite_table_exists has found.
+_found_tables: set[tuple[str, str, str]] = set()
+
+
+def sqlite_table_exists(using: str, table: str) -> bool:
+    """Whether ``table`` exists in the ``using`` SQLite database.
+
+    Tables that exist are remembered per database, so the lookup costs one
+    query per process; a missing table is looked up again on the next call,
+    so running the migration later takes effect without a restart.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return False
+    key = (using, str(connection.settings_dict["NAME"]), table)
+    if key in _found_tables:
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [table])
+        found = cursor.fetchone() is not None
+    if found:
+        _found_tables.add(key)
+    return found
+
+
+def fts_available(using: str = "default") -> bool:
+    """Whether this process can use the FTS5 index on ``using``.
+
+    The migration only creates the table where the library supports it, and
+    a database migrated elsewhere may lack it.
+    """
+    supported = sqlite_supports("CREATE VIRTUAL TABLE probe USING fts5(body, tokenize = 'trigram')")
+    return supported and sqlite_table_exists(using, SQLiteFTSBackend.table)
+
+
+@lru_cache(maxsize=None)
+def _backend_class(path: str):
+    return import_string(path)
+
+
+def get_search_backend(using: str = "default") -> BaseSearchBackend:
+    """Return the configured search backend bound to the ``using`` database."""
+    path = getattr(settings, "JOBFLICK_SEARCH_BACKEND", DEFAULT_BACKEND)
+    return _backend_class(path)(using)
@@ -0,0 +1,55 @@
+"""Signal receivers that keep job-derived data in sync with ``Job`` writes."""
+
+from collections import Counter
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import facets
+from .fragments import bump_listing_version
+from .models import Job
+from .nearby import get_geo_backend
+from .recommendations import FIELD_WEIGHTS, record_change
+from .search import SEARCH_FIELDS, get_search_backend
+
+# Fields that decide whether and how a job is recommended.
+RECOMMENDATION_FIELDS = {"status", "is_filled", "poster", *FIELD_WEIGHTS}
+
+
+def _facet_values(job):
+    return {column: getattr(job, column) for column in (*facets.VALUE_COLUMNS, *facets.LABEL_COLUMNS)}
+
+
+@receiver(post_save, sender=Job)
+def job_saved(sender, instance, created=False, raw=False, update_fields=None, using="default", **kwargs):
+    if raw:
+        return
+    transaction.on_commit(bump_listing_version, using=using)
+    previous = getattr(instance, "_loaded_values", None)
+    current = _facet_values(instance)
+    delta = Counter()
+    if created:
+        delta.update(facets.job_contribution(current))
+    elif previous is not None:
+        delta.update(facets.job_contribution(current))
+        delta.subtract(facets.job_contribution({**current, **previous}))
+    facets.adjust(delta, facets.job_labels(current))
+    if update_fields is None or set(update_fields) & RECOMMENDATION_FIELDS:
+        transaction.on_commit(partial(record_change, instance.pk), using=using)
+    if update_fields is None or set(update_fields) & set(Job.GEO_COLUMNS):
+        get_geo_backend(using).index_job(instance)
+    if update_fields is not None and not set(update_fields) & set(SEARCH_FIELDS):
+        return
+    get_search_backend(using).index_job(instance)
+
+
+@receiver(post_delete, sender=Job)
+def job_deleted(sender, instance, using="default", **kwargs):
+    transaction.on_commit(bump_listing_version, using=using)
+    state = facets.job_contribution({**_facet_values(instance), **(getattr(instance, "_loaded_values", None) or {})})
+    facets.adjust({bucket: -count for bucket, count in state.items()})
+    transaction.on_commit(partial(record_change, instance.pk), using=using)
+    get_search_backend(using).remove_job(instance.pk)
+    get_geo_backend(using).remove_job(instance.pk)
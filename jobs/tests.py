@@ -1,3 +1,309 @@
-from django.test import TestCase
+from importlib import import_module
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from locations.services import find_area
+from pages.models import PlatformStat
+from pages.stats import compute_platform_stats
+
+from . import facets, nearby, recommendations, search
+from .models import FacetCount, Job
+from .nearby import GeohashBackend, SQLiteRTreeBackend, resolve_origin
+from .recommendations import RecommendationIndex
+from .search import DatabaseSearchBackend, SQLiteFTSBackend
+
+
+def create_job(poster, **fields):
+	values = {
+		"work_title": "Electrician needed",
+		"worker_type": "Electrician",
+		"duration": "2 days",
+		"amount": 1500,
+		"location": "Uttara, Dhaka",
+		"skills": "Wiring",
+		"status": Job.Status.APPROVED,
+	}
+	values.update(fields)
+	return Job.objects.create(poster=poster, **values)
+
+
+class JobSearchTests(TestCase):
+	def setUp(self):
+		self.poster = get_user_model().objects.create_user("search-poster", "poster@example.com", "pass")
+		self.mirpur = create_job(self.poster, location="Mirpur-10, Dhaka", work_title="Cook for a family")
+		self.uttara = create_job(self.poster, location="Uttara Sector 7", worker_type="Plumber", skills="Pipes")
+		self.wiring = create_job(self.poster, work_title="Wiring repair", location="Banani", skills="Wiring, Panels")
+		self.fts = SQLiteFTSBackend()
+		self.assertTrue(self.fts.available)
+
+	def matches(self, backend, **criteria):
+		return set(backend.filter(Job.objects.all(), **criteria).values_list("pk", flat=True))
+
+	def test_filters_match_the_rows_icontains_matches(self):
+		for criteria in (
+			{"location": "pur"},
+			{"location": "mirpur-10"},
+			{"location": "10"},
+			{"location": "sector 7"},
+			{"category": "lect"},
+			{"query": "wir dhaka"},
+			{"query": "pipes uttara"},
+			{"query": "co"},
+			{"query": "nowhere"},
+		):
+			with self.subTest(**criteria):
+				self.assertEqual(self.matches(self.fts, **criteria), self.matches(DatabaseSearchBackend(), **criteria))
+		self.assertEqual(self.matches(self.fts, location="pur"), {self.mirpur.pk})
+
+	def test_ranked_puts_title_matches_first(self):
+		ranked = self.fts.ranked(Job.objects.all(), "wiring")
+		self.assertEqual(ranked[0], self.wiring)
+		self.assertEqual({job.pk for job in ranked}, {self.wiring.pk, self.mirpur.pk})
+
+	def test_index_follows_edits_and_deletes(self):
+		self.uttara.location = "Gulshan"
+		self.uttara.save()
+		self.assertEqual(self.matches(self.fts, location="gulshan"), {self.uttara.pk})
+		self.uttara.delete()
+		self.assertEqual(self.matches(self.fts, location="gulshan"), set())
+
+	def test_job_list_keyword_search_lists_best_match_first(self):
+		member = get_user_model().objects.create_user("search-member", "member@example.com", "pass")
+		self.client.force_login(member)
+		response = self.client.get("/jobs/", {"q": "wiring"})
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual([job.pk for job in response.context["jobs"]], [self.wiring.pk, self.mirpur.pk])
+
+	def test_keyword_results_page_through_every_match(self):
+		extra = [create_job(self.poster, work_title=f"Wiring job {index}") for index in range(22)]
+		self.client.force_login(get_user_model().objects.create_user("paging-member", "paging@example.com", "pass"))
+		first = self.client.get("/jobs/", {"q": "wiring"}).context["jobs"]
+		self.assertEqual(len(first), 20)
+		self.assertFalse(first.has_previous)
+		second = self.client.get("/jobs/" + first.next_url).context["jobs"]
+		self.assertFalse(second.has_next)
+		listed = [job.pk for job in first] + [job.pk for job in second]
+		self.assertEqual(sorted(listed), sorted([self.wiring.pk, self.mirpur.pk, *(job.pk for job in extra)]))
+		self.assertEqual(listed[-1], self.mirpur.pk, "a skills-only match outranked title matches")
+		self.assertEqual([job.pk for job in self.client.get("/jobs/" + second.previous_url).context["jobs"]], listed[:20])
+
+	def test_a_database_without_the_index_falls_back_to_icontains(self):
+		self.addCleanup(search._found_tables.clear)
+		with connection.cursor() as cursor:
+			cursor.execute(f"DROP TABLE {SQLiteFTSBackend.table}")
+		search._found_tables.clear()
+		self.assertFalse(self.fts.available)
+		self.assertEqual(self.matches(self.fts, location="pur"), {self.mirpur.pk})
+		self.uttara.save()
+
+
+class JobCardCacheTests(TestCase):
+	def setUp(self):
+		caches["fragments"].clear()
+		self.job = create_job(get_user_model().objects.create_user("card-poster", "card@example.com", "pass"))
+		self.client.force_login(get_user_model().objects.create_user("card-member", "card-member@example.com", "pass"))
+
+	def card_titles(self):
+		content = self.client.get("/jobs/").content.decode()
+		return [title for title in ("Electrician needed", "Rewiring a flat", "Panel upgrade") if title in content]
+
+	def test_edited_cards_re_render(self):
+		self.assertEqual(self.card_titles(), ["Electrician needed"])
+		first, second = Job.objects.get(pk=self.job.pk), Job.objects.get(pk=self.job.pk)
+		first.work_title = "Rewiring a flat"
+		first.save()
+		self.assertEqual(self.card_titles(), ["Rewiring a flat"])
+		# A copy loaded before the first save must not reuse its stamp.
+		second.work_title = "Panel upgrade"
+		second.save()
+		self.assertNotEqual(first.cache_version, second.cache_version)
+		self.assertEqual(self.card_titles(), ["Panel upgrade"])
+
+
+class RecommendationTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		self.addCleanup(setattr, recommendations, "_index", recommendations._index)
+		recommendations._index = RecommendationIndex()
+		self.poster = get_user_model().objects.create_user("rec-poster", "rec-poster@example.com", "pass")
+		self.member = get_user_model().objects.create_user("rec-member", "rec-member@example.com", "pass")
+		self.wiring = create_job(self.poster, work_title="Wiring repair", skills="Wiring, Panels")
+
+	def test_newer_jobs_win_ties_on_both_engines(self):
+		for use_numpy in (False, True):
+			index = RecommendationIndex(use_numpy=use_numpy)
+			for job_id in (3, 9, 5, 7):
+				index.add(job_id, 1, {"work_title": "Wiring", "worker_type": "Electrician", "skills": "Wiring"})
+			index.add(11, 1, {"work_title": "Painting", "skills": "Paint"})
+			with self.subTest(engine="numpy" if index.use_numpy else "python"):
+				self.assertEqual(index.top_k(["wiring"], limit=2), [9, 7])
+				self.assertEqual(index.top_k(["wiring"], limit=2, exclude_poster=1), [])
+
+	@override_settings(JOBFLICK_RECOMMENDATION_BUILD="inline")
+	def test_inline_mode_builds_and_follows_job_writes(self):
+		self.assertEqual(recommendations.recommended_job_ids(self.member, "wiring"), [self.wiring.pk])
+		with self.captureOnCommitCallbacks(execute=True):
+			newer = create_job(self.poster, work_title="Wiring and panels", skills="Wiring")
+		self.assertEqual(recommendations.recommended_job_ids(self.member, "wiring"), [newer.pk, self.wiring.pk])
+		self.assertEqual(recommendations.recommended_job_ids(self.poster, "wiring"), [])
+
+	@override_settings(JOBFLICK_RECOMMENDATION_BUILD="thread")
+	def test_full_rebuilds_run_in_the_background(self):
+		with mock.patch("jobflick.background.submit") as submit:
+			self.assertEqual(recommendations.recommended_job_ids(self.member, "wiring"), [])
+			recommendations.get_index()
+		submit.assert_called_once()
+		submit.call_args.args[0]()
+		self.assertEqual(recommendations.recommended_job_ids(self.member, "wiring"), [self.wiring.pk])
+
+		# A gap in the change log keeps serving the current index until the rebuild lands.
+		cache.clear()
+		served = recommendations._index
+		with mock.patch("jobflick.background.submit") as submit:
+			self.assertIs(recommendations.get_index(), served)
+		submit.assert_called_once()
+		self.assertEqual(served.top_k(["wiring"]), [self.wiring.pk])
+
+
+class FacetCountTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		self.poster = get_user_model().objects.create_user("facet-poster", "facet@example.com", "pass")
+		self.plumber = create_job(self.poster, worker_type="Plumber", amount=6000)
+		self.electrician = create_job(self.poster)
+		create_job(self.poster, worker_type="Plumber", status=Job.Status.PENDING)
+
+	def stored(self, facet):
+		return dict(FacetCount.objects.filter(facet=facet, count__gt=0).values_list("value", "count"))
+
+	def test_counts_follow_job_writes(self):
+		self.assertEqual(self.stored(facets.WORKER_TYPE), {"plumber": 1, "electrician": 1})
+		self.plumber.is_filled = True
+		self.plumber.save()
+		self.assertEqual(self.stored(facets.STATE), {"open": 1, "filled": 1})
+		self.electrician.delete()
+		self.assertEqual(self.stored(facets.WORKER_TYPE), {"plumber": 1})
+
+	def test_partial_saves_keep_the_stored_area(self):
+		job = Job.objects.get(pk=self.plumber.pk)
+		# As after a gazetteer edit: the location now resolves elsewhere.
+		with mock.patch("locations.services.match_area", return_value=find_area("Mirpur 10").id):
+			job.status = Job.Status.PENDING
+			job.save(update_fields=["status"])
+		self.assertEqual(job.area_id, find_area("Uttara").id)
+		self.assertEqual(facets.reconcile_facet_counts(), {})
+
+	def test_reconcile_corrects_drift(self):
+		FacetCount.objects.filter(facet=facets.WORKER_TYPE, value="plumber").update(count=9)
+		self.assertEqual(facets.reconcile_facet_counts(), {(facets.WORKER_TYPE, "plumber"): (9, 1)})
+		self.assertEqual(facets.reconcile_facet_counts(), {})
+
+	def test_reading_counts_never_rebuilds_them(self):
+		FacetCount.objects.all().delete()
+		self.assertEqual(facets.get_facet_counts(), {facet.name: [] for facet in facets.FACETS})
+		self.assertFalse(FacetCount.objects.exists())
+
+	def test_missing_counts_fall_back_to_the_plain_filter(self):
+		approved = Job.objects.filter(status=Job.Status.APPROVED)
+		FacetCount.objects.all().delete()
+		result = facets.apply_facets(approved, {facets.WORKER_TYPE: "plumber", facets.AMOUNT: "3"})
+		self.assertEqual(list(result.queryset), [self.plumber])
+		self.assertFalse(result.bounded)
+
+
+class JobAreaMigrationTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		poster = get_user_model().objects.create_user("area-poster", "area@example.com", "pass")
+		self.mirpur = create_job(poster, location="House 4, Mirpur-10, Dhaka")
+		self.filled = create_job(poster, location="mirpur 10", is_filled=True)
+		self.nowhere = create_job(poster, location="Somewhere unknown")
+		# As left by the schema change: no areas, no location counts.
+		Job.objects.update(area=None)
+		FacetCount.objects.filter(facet=facets.LOCATION).delete()
+		PlatformStat.objects.filter(key__startswith="area:").delete()
+		migration = import_module("jobs.migrations.0004_job_area")
+		migration.resolve_job_areas(apps, SimpleNamespace(connection=connection))
+
+	def test_existing_jobs_get_their_area_and_counts(self):
+		area = find_area("Mirpur 10")
+		self.assertEqual(dict(Job.objects.values_list("pk", "area")), {self.mirpur.pk: area.id, self.filled.pk: area.id, self.nowhere.pk: None})
+		self.assertEqual(
+			list(FacetCount.objects.filter(facet=facets.LOCATION).values_list("value", "label", "count")),
+			[(area.slug, area.name, 2)],
+		)
+		stored = dict(PlatformStat.objects.filter(key__startswith="area:").values_list("key", "value"))
+		self.assertEqual(stored, {key: value for key, value in compute_platform_stats().items() if key.startswith("area:")})
+		self.assertEqual(facets.reconcile_facet_counts(), {})
+
+	def test_location_filter_lists_pre_migration_jobs(self):
+		self.client.force_login(get_user_model().objects.create_user("area-member", "area-member@example.com", "pass"))
+		response = self.client.get("/jobs/", {"location": "mirpur-10"})
+		self.assertEqual({job.pk for job in response.context["jobs"]}, {self.mirpur.pk, self.filled.pk})
+
+
+class GeoSearchTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		self.poster = get_user_model().objects.create_user("geo-poster", "geo@example.com", "pass")
+		self.mirpur = create_job(self.poster, location="Mirpur-10, Dhaka")
+		self.uttara = create_job(self.poster, location="Uttara, Dhaka")
+		self.unknown = create_job(self.poster, location="Somewhere unknown")
+		self.origin = resolve_origin("mirpur")
+		self.rtree = SQLiteRTreeBackend()
+		self.assertTrue(self.rtree.available)
+
+	def within(self, backend, radius):
+		jobs = backend.within(Job.objects.all(), self.origin.latitude, self.origin.longitude, radius)
+		return set(jobs.values_list("pk", flat=True))
+
+	def test_backends_agree_on_radius_queries(self):
+		for radius in (2, 25):
+			with self.subTest(radius=radius):
+				self.assertEqual(self.within(self.rtree, radius), self.within(GeohashBackend(), radius))
+		self.assertEqual(self.within(self.rtree, 2), {self.mirpur.pk})
+		self.assertEqual(self.within(self.rtree, 25), {self.mirpur.pk, self.uttara.pk})
+
+	def test_index_follows_moves_and_deletes(self):
+		self.uttara.location = "Mirpur 10"
+		self.uttara.save()
+		self.assertEqual(self.within(self.rtree, 2), {self.mirpur.pk, self.uttara.pk})
+		self.mirpur.delete()
+		self.assertEqual(self.within(self.rtree, 2), {self.uttara.pk})
+
+	def test_nearest_lists_closest_first(self):
+		nearest = self.rtree.nearest(Job.objects.all(), self.origin.latitude, self.origin.longitude, 5)
+		self.assertEqual([job.pk for job in nearest], [self.mirpur.pk, self.uttara.pk])
+		self.assertLess(nearest[0].distance_km, nearest[1].distance_km)
+
+	def test_nearest_visits_a_bounded_number_of_points(self):
+		latitude, longitude = self.origin.latitude, self.origin.longitude
+		self.assertEqual(len(self.rtree.points_within(Job.objects.all(), latitude, longitude, 25)), 2)
+		self.assertEqual(len(self.rtree.points_within(Job.objects.all(), latitude, longitude, 25, limit=1)), 1)
+		with mock.patch.object(nearby, "NEAREST_MAX_POINTS", 1):
+			nearest = self.rtree.nearest(Job.objects.all(), latitude, longitude, 5, max_km=25)
+		self.assertEqual([job.pk for job in nearest], [self.mirpur.pk])
+
+	def test_a_database_without_the_index_falls_back_to_geohashes(self):
+		self.addCleanup(search._found_tables.clear)
+		with connection.cursor() as cursor:
+			cursor.execute(f"DROP TABLE {SQLiteRTreeBackend.table}")
+		search._found_tables.clear()
+		self.assertFalse(self.rtree.available)
+		self.uttara.location = "Mirpur 10"
+		self.uttara.save()
+		self.mirpur.delete()
+		self.assertEqual(self.within(self.rtree, 2), {self.uttara.pk})
+
+	def test_migration_indexes_existing_jobs(self):
+		with connection.cursor() as cursor:
+			cursor.execute(f"DELETE FROM {SQLiteRTreeBackend.table}")
+		migration = import_module("jobs.migrations.0007_job_geo_index")
+		migration.create_geo_index(apps, SimpleNamespace(connection=connection))
+		self.assertEqual(self.within(self.rtree, 25), {self.mirpur.pk, self.uttara.pk})
@@ -7,17 +7,22 @@ from django.urls import reverse
 from django.utils import timezone
 from django.views.decorators.cache import never_cache
 
-from userprofile.models import UserProfile
+from jobflick.pagination import paginate, paginate_ids
+from jobflick.routers import replica_reads
+from locations.services import area_ids_within, find_area
+from skills.services import find_skill
 from userprofile.utils import notify_staff
 
+from .facets import apply_facets, facet_sidebar, selected_facets
 from .forms import JobForm
 from .models import Job, JobApplication
-
+from .nearby import RADIUS_CHOICES, get_geo_backend, radius_param, resolve_origin, with_distances
+from .search import RANK_CANDIDATES, get_search_backend
 
 @login_required
 @never_cache
 def post_job(request):
-    profile, _ = UserProfile.objects.get_or_create(user=request.user)
+    profile = request.profile
     if not profile.has_active_subscription:
         messages.warning(request, "You need an active subscription to post jobs.")
         return redirect("userprofile-subscription")
@@ -27,6 +32,7 @@ def post_job(request):
             job = form.save(commit=False)
             job.poster = request.user
             job.save()
+            form.save_m2m()
             notify_staff(
                 message=(
                     f"{request.user.username} submitted '{job.work_title}' (Tracking {job.tracking_code}) for approval."
@@ -46,13 +52,18 @@ def post_job(request):
 
 @login_required
 @never_cache
+@replica_reads
 def job_list(request):
-    profile, _ = UserProfile.objects.get_or_create(user=request.user)
+    profile = request.profile
+    search_query = request.GET.get("q", "").strip()
     location_filter = request.GET.get("location", "").strip()
     category_filter = request.GET.get("category", "").strip()
+    skill_filter = request.GET.get("skill", "").strip()
+    near_filter = request.GET.get("near", "").strip()
     jobs = (
         Job.objects.filter(status=Job.Status.APPROVED)
         .exclude(poster=request.user)
+        .select_related("poster")
         .prefetch_related(
             Prefetch(
                 "applications",
@@ -61,24 +72,66 @@ def job_list(request):
             )
         )
     )
-    active_location = None
-    if location_filter:
-        jobs = jobs.filter(location__icontains=location_filter)
-        active_location = location_filter
-    active_category = None
-    if category_filter:
-        jobs = jobs.filter(worker_type__icontains=category_filter)
-        active_category = category_filter
+    area = find_area(location_filter) if location_filter else None
+    if area is not None:
+        # A known area is an indexed lookup on Job.area, not a text match.
+        jobs = jobs.filter(area_id__in=area_ids_within(area.id))
+        location_filter = ""
+    search = get_search_backend()
+    jobs = search.filter(jobs, query=search_query, location=location_filter, category=category_filter)
+    active_skill = None
+    if skill_filter:
+        # An index join on the skill's through-table rows, not a LIKE scan.
+        active_skill = find_skill(skill_filter)
+        jobs = jobs.filter(job_skills__skill=active_skill) if active_skill else jobs.none()
+    origin = resolve_origin(near_filter, profile) if near_filter else None
+    radius = radius_param(request.GET.get("radius"))
+    if origin is not None:
+        jobs = get_geo_backend().within(jobs, origin.latitude, origin.longitude, radius)
+    elif near_filter:
+        jobs = jobs.none()
+    faceted = apply_facets(jobs, selected_facets(request.GET))
+    if search_query:
+        # Keyword results are listed best match first rather than paged by date.
+        ranked_ids, truncated = search.ranked_ids(faceted.queryset, search_query)
+
+        def load(ids):
+            jobs = faceted.queryset.in_bulk(ids)
+            return [jobs[job_id] for job_id in ids if job_id in jobs]
+
+        page = paginate_ids(
+            request,
+            ranked_ids,
+            load,
+            previous_label="Better matches",
+            next_label="More matches",
+            truncated=truncated,
+        )
+    else:
+        page = paginate(request, faceted.queryset)
+    if origin is not None:
+        with_distances(page, origin)
+    active_location = area.name if area is not None else location_filter or None
+    active_category = category_filter or None
     return render(
         request,
         "jobs/job_list.html",
         {
-            "jobs": jobs,
+            "jobs": page,
+            "facet_groups": facet_sidebar(request.GET, faceted),
             "profile": profile,
             "hide_nav": True,
             "hide_footer": True,
+            "paginated": True,
+            "rank_candidates": RANK_CANDIDATES,
+            "active_query": search_query or None,
             "active_location": active_location,
             "active_category": active_category,
+            "active_skill": active_skill or skill_filter or None,
+            "active_near": (origin.label if origin else near_filter) or None,
+            "near_radius": radius,
+            "radius_choices": RADIUS_CHOICES,
+            "near_me_available": profile.location is not None,
         },
     )
 
@@ -87,7 +140,7 @@ def job_list(request):
 @never_cache
 def apply_to_job(request, job_id):
     job = get_object_or_404(Job, pk=job_id, status=Job.Status.APPROVED)
-    profile, _ = UserProfile.objects.get_or_create(user=request.user)
+    profile = request.profile
     redirect_target = request.POST.get("redirect_to")
     if redirect_target and not redirect_target.startswith("/"):
         redirect_target = None
@@ -123,10 +176,10 @@ def apply_to_job(request, job_id):
 @staff_member_required
 @never_cache
 def manage_applications(request):
-    profile, _ = UserProfile.objects.get_or_create(user=request.user)
-    applications = (
-        JobApplication.objects.select_related("job", "applicant", "decided_by")
-        .order_by("-created_at")
+    profile = request.profile
+    applications = paginate(
+        request,
+        JobApplication.objects.select_related("job", "applicant", "decided_by"),
     )
     return render(
         request,
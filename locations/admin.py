@@ -0,0 +1,17 @@
+from django.contrib import admin
+
+from .models import Area, AreaAlias
+
+
+class AreaAliasInline(admin.TabularInline):
+    model = AreaAlias
+    extra = 1
+
+
+@admin.register(Area)
+class AreaAdmin(admin.ModelAdmin):
+    list_display = ("name", "kind", "city", "slug", "latitude", "longitude")
+    list_filter = ("kind",)
+    search_fields = ("name", "slug", "aliases__alias")
+    prepopulated_fields = {"slug": ("name",)}
+    inlines = [AreaAliasInline]
@@ -0,0 +1,188 @@
+"""The bundled gazetteer: Bangladeshi cities, the areas within them and their spellings.
+
+Each entry lists the English and Bangla spellings members commonly type,
+and ``COORDINATES`` the approximate centre of each place for distance
+search. ``load_gazetteer`` and ``load_coordinates`` write them into
+``Area``/``AreaAlias`` (the data migrations do this); staff can add areas,
+spellings and coordinates in the admin.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+
+from django.utils.text import slugify
+
+# Characters that separate words in a location: "Mirpur-10, Dhaka" -> "mirpur 10 dhaka".
+SEPARATORS = re.compile(r"[\s,.;:/\\|()\[\]{}\-_#&+\"`]+")
+
+# City -> (aliases, [(area, aliases), ...])
+GAZETTEER = {
+    "Dhaka": (
+        ["dacca", "ঢাকা"],
+        [
+            ("Uttara", ["uttara model town", "উত্তরা"]),
+            ("Mirpur", ["মিরপুর"]),
+            ("Banani", ["বনানী"]),
+            ("Dhanmondi", ["dhanmandi", "ধানমন্ডি"]),
+            ("Gulshan", ["gulshan 1", "gulshan 2", "গুলশান"]),
+            ("Motijheel", ["motijhil", "মতিঝিল"]),
+            ("Mohammadpur", ["mohammedpur", "মোহাম্মদপুর"]),
+            ("Badda", ["বাড্ডা"]),
+            ("Bashundhara", ["bashundhara r a", "basundhara", "বসুন্ধরা"]),
+            ("Baridhara", ["বারিধারা"]),
+            ("Tejgaon", ["tejgaon industrial area", "তেজগাঁও"]),
+            ("Farmgate", ["farm gate", "ফার্মগেট"]),
+            ("Khilgaon", ["খিলগাঁও"]),
+            ("Rampura", ["রামপুরা"]),
+            ("Malibagh", ["মালিবাগ"]),
+            ("Mohakhali", ["মহাখালী"]),
+            ("Jatrabari", ["যাত্রাবাড়ী"]),
+            ("Lalbagh", ["লালবাগ"]),
+            ("Old Dhaka", ["puran dhaka", "পুরান ঢাকা"]),
+            ("Shyamoli", ["shyamol", "শ্যামলী"]),
+            ("Khilkhet", ["খিলক্ষেত"]),
+            ("Banasree", ["banashree", "বনশ্রী"]),
+            ("Wari", ["ওয়ারী"]),
+            ("Azimpur", ["আজিমপুর"]),
+            ("Paltan", ["purana paltan", "পল্টন"]),
+            ("Shahbagh", ["শাহবাগ"]),
+            ("Karwan Bazar", ["kawran bazar", "kawran bazaar", "karwan bazaar", "কারওয়ান বাজার"]),
+            ("Savar", ["সাভার"]),
+            ("Keraniganj", ["কেরানীগঞ্জ"]),
+        ],
+    ),
+    "Chattogram": (
+        ["chittagong", "chattagram", "ctg", "চট্টগ্রাম"],
+        [
+            ("Agrabad", ["আগ্রাবাদ"]),
+            ("GEC Circle", ["gec", "gec mor", "জিইসি"]),
+            ("Nasirabad", ["নাসিরাবাদ"]),
+            ("Halishahar", ["হালিশহর"]),
+            ("Panchlaish", ["পাঁচলাইশ"]),
+        ],
+    ),
+    "Sylhet": (
+        ["সিলেট"],
+        [
+            ("Zindabazar", ["জিন্দাবাজার"]),
+            ("Amberkhana", ["আম্বরখানা"]),
+        ],
+    ),
+    "Khulna": (["খুলনা"], [("Sonadanga", ["সোনাডাঙ্গা"])]),
+    "Rajshahi": (["রাজশাহী"], [("Shaheb Bazar", ["saheb bazar", "সাহেব বাজার"])]),
+    "Barishal": (["barisal", "বরিশাল"], []),
+    "Rangpur": (["রংপুর"], []),
+    "Mymensingh": (["ময়মনসিংহ"], []),
+    "Cumilla": (["comilla", "কুমিল্লা"], []),
+    "Gazipur": (["tongi", "গাজীপুর"], []),
+    "Narayanganj": (["narayangonj", "নারায়ণগঞ্জ"], []),
+    "Cox's Bazar": (["coxs bazar", "cox bazar", "কক্সবাজার"], []),
+}
+
+# Approximate centre (latitude, longitude) of every gazetteer entry.
+COORDINATES = {
+    "Dhaka": (23.8103, 90.4125),
+    "Uttara": (23.8759, 90.3795),
+    "Mirpur": (23.8223, 90.3654),
+    "Banani": (23.7937, 90.4043),
+    "Dhanmondi": (23.7465, 90.3760),
+    "Gulshan": (23.7925, 90.4162),
+    "Motijheel": (23.7330, 90.4172),
+    "Mohammadpur": (23.7662, 90.3589),
+    "Badda": (23.7806, 90.4264),
+    "Bashundhara": (23.8193, 90.4526),
+    "Baridhara": (23.8011, 90.4206),
+    "Tejgaon": (23.7639, 90.3930),
+    "Farmgate": (23.7577, 90.3897),
+    "Khilgaon": (23.7517, 90.4262),
+    "Rampura": (23.7613, 90.4214),
+    "Malibagh": (23.7485, 90.4130),
+    "Mohakhali": (23.7778, 90.4051),
+    "Jatrabari": (23.7104, 90.4349),
+    "Lalbagh": (23.7189, 90.3882),
+    "Old Dhaka": (23.7115, 90.4070),
+    "Shyamoli": (23.7747, 90.3653),
+    "Khilkhet": (23.8311, 90.4243),
+    "Banasree": (23.7639, 90.4370),
+    "Wari": (23.7186, 90.4196),
+    "Azimpur": (23.7284, 90.3847),
+    "Paltan": (23.7346, 90.4126),
+    "Shahbagh": (23.7383, 90.3958),
+    "Karwan Bazar": (23.7509, 90.3935),
+    "Savar": (23.8583, 90.2667),
+    "Keraniganj": (23.6989, 90.3453),
+    "Chattogram": (22.3569, 91.7832),
+    "Agrabad": (22.3260, 91.8120),
+    "GEC Circle": (22.3590, 91.8215),
+    "Nasirabad": (22.3660, 91.8230),
+    "Halishahar": (22.3265, 91.7800),
+    "Panchlaish": (22.3630, 91.8320),
+    "Sylhet": (24.8949, 91.8687),
+    "Zindabazar": (24.8960, 91.8680),
+    "Amberkhana": (24.9045, 91.8700),
+    "Khulna": (22.8456, 89.5403),
+    "Sonadanga": (22.8170, 89.5400),
+    "Rajshahi": (24.3745, 88.6042),
+    "Shaheb Bazar": (24.3660, 88.5990),
+    "Barishal": (22.7010, 90.3535),
+    "Rangpur": (25.7439, 89.2752),
+    "Mymensingh": (24.7471, 90.4203),
+    "Cumilla": (23.4607, 91.1809),
+    "Gazipur": (23.9999, 90.4203),
+    "Narayanganj": (23.6238, 90.5000),
+    "Cox's Bazar": (21.4272, 92.0058),
+}
+
+
+def location_key(text: str) -> str:
+    """Fold case, width and punctuation: "  Mirpur-10, DHAKA" -> "mirpur 10 dhaka"."""
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    return " ".join(part for part in SEPARATORS.split(text) if part)
+
+
+def entries():
+    """Yield ``(name, kind, city name or None, aliases)`` for every gazetteer entry."""
+    for city, (city_aliases, areas) in GAZETTEER.items():
+        yield city, "city", None, city_aliases
+        for area, aliases in areas:
+            yield area, "area", city, aliases
+
+
+def load_gazetteer(area_model, alias_model, *, using: str = "default") -> int:
+    """Create missing areas and spellings from ``GAZETTEER``; returns areas created.
+
+    Takes the models as arguments so data migrations can pass their
+    historical versions. Existing rows are left as they are.
+    """
+    areas = area_model.objects.using(using)
+    existing = set(areas.values_list("slug", flat=True))
+    created = 0
+    by_name = {}
+    for name, kind, city, aliases in entries():
+        slug = slugify(name)
+        if slug not in existing:
+            areas.create(name=name, slug=slug, kind=kind, city=by_name.get(city))
+            created += 1
+        by_name[name] = areas.get(slug=slug)
+    alias_model.objects.using(using).bulk_create(
+        [
+            alias_model(alias=location_key(alias), area=by_name[name])
+            for name, kind, city, aliases in entries()
+            for alias in {name, *aliases}
+        ],
+        ignore_conflicts=True,
+    )
+    return created
+
+
+def load_coordinates(area_model, *, using: str = "default") -> int:
+    """Fill in ``COORDINATES`` for gazetteer areas that have none; returns areas updated."""
+    points = {slugify(name): point for name, point in COORDINATES.items()}
+    updated = 0
+    for area in area_model.objects.using(using).filter(latitude__isnull=True, slug__in=points):
+        area.latitude, area.longitude = points[area.slug]
+        area.save(update_fields=["latitude", "longitude"])
+        updated += 1
+    return updated
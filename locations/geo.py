@@ -0,0 +1,134 @@
+"""Coordinates arithmetic: geohashes, distances and the cells covering a circle.
+
+A geohash interleaves longitude and latitude bits into a base32 string, so
+every prefix names a rectangular cell and all points inside it share that
+prefix. Stored on a row it turns "points inside this cell" into one range
+scan on an ordinary index: ``prefix <= geohash < successor(prefix)``.
+"""
+
+from __future__ import annotations
+
+import math
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+# Characters stored per point: cells of about 4.8 m x 4.8 m.
+PRECISION = 9
+# Most cells a circle is covered with; finer cells mean more, tighter ranges.
+MAX_CELLS = 16
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def encode(latitude: float, longitude: float, precision: int = PRECISION) -> str:
+    """Return the geohash of a point with ``precision`` characters."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = value = 0
+    even = True
+    while len(chars) < precision:
+        span, coordinate = (lng_range, longitude) if even else (lat_range, latitude)
+        middle = (span[0] + span[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            span[0] = middle
+        else:
+            span[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = value = 0
+    return "".join(chars)
+
+
+def decode(geohash: str) -> tuple[float, float]:
+    """Centre ``(latitude, longitude)`` of a geohash cell."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = BASE32.index(char)
+        for shift in range(4, -1, -1):
+            span = lng_range if even else lat_range
+            middle = (span[0] + span[1]) / 2
+            if value >> shift & 1:
+                span[0] = middle
+            else:
+                span[1] = middle
+            even = not even
+    return (lat_range[0] + lat_range[1]) / 2, (lng_range[0] + lng_range[1]) / 2
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    """``(height, width)`` in degrees of a geohash cell with ``precision`` characters."""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2**lat_bits, 360.0 / 2**lng_bits
+
+
+def successor(prefix: str) -> str:
+    """The smallest geohash sorting after every hash that starts with ``prefix``."""
+    chars = list(prefix)
+    while chars:
+        index = BASE32.index(chars[-1])
+        if index + 1 < len(BASE32):
+            chars[-1] = BASE32[index + 1]
+            return "".join(chars)
+        chars.pop()
+    return "~"
+
+
+def distance_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle (haversine) distance between two points."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> tuple[float, float, float, float]:
+    """``(south, north, west, east)`` of the box around a circle of ``radius_km``."""
+    dlat = radius_km / KM_PER_DEGREE
+    dlng = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6))
+    return (
+        max(latitude - dlat, -90.0),
+        min(latitude + dlat, 90.0),
+        max(longitude - dlng, -180.0),
+        min(longitude + dlng, 180.0),
+    )
+
+
+def covering_ranges(
+    latitude: float, longitude: float, radius_km: float, *, max_cells: int = MAX_CELLS
+) -> list[tuple[str, str]]:
+    """``[(low, high), ...]`` geohash ranges whose union covers the circle.
+
+    Uses the finest precision at which at most ``max_cells`` cells cover
+    the circle's bounding box, merging cells that are adjacent in geohash
+    order into one range. An empty list means the circle is too large for
+    any cell and every point qualifies.
+    """
+    south, north, west, east = bounding_box(latitude, longitude, radius_km)
+    for precision in range(PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        rows = range(math.floor((south + 90) / height), math.floor((north + 90) / height) + 1)
+        columns = range(math.floor((west + 180) / width), math.floor((east + 180) / width) + 1)
+        if len(rows) * len(columns) <= max_cells:
+            break
+    else:
+        return []
+    prefixes = {
+        encode(min(-90 + (row + 0.5) * height, 90.0), min(-180 + (column + 0.5) * width, 180.0), precision)
+        for row in rows
+        for column in columns
+    }
+    ranges = []
+    for prefix in sorted(prefixes):
+        if ranges and ranges[-1][1] == prefix:
+            ranges[-1] = (ranges[-1][0], successor(prefix))
+        else:
+            ranges.append((prefix, successor(prefix)))
+    return ranges
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobs.facets import reconcile_facet_counts
+from jobs.fragments import bump_listing_version
+from jobs.models import Job
+from jobs.nearby import get_geo_backend
+from locations import services
+from locations.gazetteer import load_coordinates, load_gazetteer
+from locations.geo import encode
+from locations.models import Area, AreaAlias
+from pages.stats import reconcile_platform_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Load any new gazetteer entries, resolve every job's location to an area and its "
+        "coordinates in primary key order, then recount the facet and home page area counters "
+        "and rebuild the distance index. Safe to rerun."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--missing", action="store_true", help="Only jobs that have no area yet.")
+
+    def handle(self, *args, **options):
+        created = load_gazetteer(Area, AreaAlias)
+        load_coordinates(Area)
+        services.reset()
+        jobs = Job.objects.order_by("pk").only("pk", "location", "area", *Job.GEO_COLUMNS)
+        if options["missing"]:
+            jobs = jobs.filter(area__isnull=True)
+        processed = changed = unmatched = 0
+        last_pk = 0
+        while True:
+            batch = list(jobs.filter(pk__gt=last_pk)[: options["batch_size"]])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            updated = []
+            for job in batch:
+                area_id = services.match_area(job.location)
+                unmatched += area_id is None
+                point = services.area_point(area_id) if area_id is not None else None
+                latitude, longitude = point or (None, None)
+                geohash = encode(*point) if point else ""
+                if (area_id, latitude, longitude, geohash) != (job.area_id, job.latitude, job.longitude, job.geohash):
+                    job.area_id, job.latitude, job.longitude, job.geohash = area_id, latitude, longitude, geohash
+                    updated.append(job)
+            with transaction.atomic():
+                Job.objects.bulk_update(updated, ["area", *Job.GEO_COLUMNS])
+            processed += len(batch)
+            changed += len(updated)
+        reconcile_facet_counts()
+        reconcile_platform_stats()
+        get_geo_backend().rebuild()
+        bump_listing_version()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Added {created} gazetteer areas. Checked {processed} jobs: "
+                f"{changed} changed area or coordinates, {unmatched} matched no area."
+            )
+        )
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from locations import services
+from userprofile.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Geocode every profile's present address against the gazetteer in primary key order, "
+        "so \"near my address\" searches have an origin. Safe to rerun."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--missing", action="store_true", help="Only profiles that have no coordinates yet.")
+
+    def handle(self, *args, **options):
+        services.reset()
+        profiles = UserProfile.objects.exclude(present_address="").order_by("pk")
+        profiles = profiles.only("pk", "present_address", "latitude", "longitude")
+        if options["missing"]:
+            profiles = profiles.filter(latitude__isnull=True)
+        processed = changed = unmatched = 0
+        last_pk = 0
+        while True:
+            batch = list(profiles.filter(pk__gt=last_pk)[: options["batch_size"]])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            updated = []
+            for profile in batch:
+                latitude, longitude = services.geocode(profile.present_address) or (None, None)
+                unmatched += latitude is None
+                if (latitude, longitude) != (profile.latitude, profile.longitude):
+                    profile.latitude, profile.longitude = latitude, longitude
+                    updated.append(profile)
+            with transaction.atomic():
+                UserProfile.objects.bulk_update(updated, ["latitude", "longitude"])
+            processed += len(batch)
+            changed += len(updated)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Checked {processed} addresses: {changed} changed coordinates, {unmatched} matched no area."
+            )
+        )
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Area',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('slug', models.SlugField(max_length=100, unique=True)),
+                ('kind', models.CharField(choices=[('city', 'City'), ('area', 'Area')], default='area', max_length=8)),
+                ('city', models.ForeignKey(blank=True, limit_choices_to={'kind': 'city'}, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='areas', to='locations.area')),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AreaAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.CharField(max_length=100, unique=True)),
+                ('area', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='locations.area')),
+            ],
+            options={
+                'verbose_name_plural': 'area aliases',
+            },
+        ),
+    ]
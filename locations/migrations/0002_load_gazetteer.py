@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from locations.gazetteer import load_gazetteer
+
+
+def load(apps, schema_editor):
+    load_gazetteer(
+        apps.get_model("locations", "Area"),
+        apps.get_model("locations", "AreaAlias"),
+        using=schema_editor.connection.alias,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("locations", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(load, migrations.RunPython.noop),
+    ]
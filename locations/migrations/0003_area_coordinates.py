@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:22
+
+from django.db import migrations, models
+
+from locations.gazetteer import load_coordinates
+
+
+def load(apps, schema_editor):
+    load_coordinates(apps.get_model("locations", "Area"), using=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0002_load_gazetteer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='area',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='area',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.RunPython(load, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+from django.db import models
+
+
+class Area(models.Model):
+    """A city, or a neighbourhood within one, that job locations resolve to."""
+
+    class Kind(models.TextChoices):
+        CITY = "city", "City"
+        AREA = "area", "Area"
+
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=100, unique=True)
+    kind = models.CharField(max_length=8, choices=Kind.choices, default=Kind.AREA)
+    city = models.ForeignKey(
+        "self",
+        related_name="areas",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        limit_choices_to={"kind": Kind.CITY},
+    )
+    # Approximate centre; jobs and profiles located here take these coordinates.
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self) -> str:
+        return f"{self.name}, {self.city.name}" if self.city_id else self.name
+
+
+class AreaAlias(models.Model):
+    """A spelling of an area (``locations.gazetteer.location_key`` form), English or Bangla."""
+
+    alias = models.CharField(max_length=100, unique=True)
+    area = models.ForeignKey(Area, related_name="aliases", on_delete=models.CASCADE)
+
+    class Meta:
+        verbose_name_plural = "area aliases"
+
+    def __str__(self) -> str:
+        return f"{self.alias} -> {self.area.name}"
@@ -0,0 +1,130 @@
+"""Resolving free-text locations to ``Area`` rows.
+
+Every process keeps the gazetteer (areas and their spellings) in memory and
+reloads it every ``RELOAD_SECONDS``; edits made in the admin reset the copy
+of the process that made them at once. ``match_area`` looks every run of up
+to ``MAX_WORDS`` words of a location up in it and prefers the most specific
+hit: an area over a city, then the earliest, longest phrase. ``geocode``
+turns a location into the coordinates of the area it names.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+
+from .gazetteer import location_key
+from .models import Area, AreaAlias
+
+RELOAD_SECONDS = 300
+MAX_WORDS = 3
+
+
+@dataclass(frozen=True)
+class AreaInfo:
+    id: int
+    name: str
+    slug: str
+    kind: str
+    city_id: int | None
+    latitude: float | None
+    longitude: float | None
+
+
+@dataclass(frozen=True)
+class Gazetteer:
+    areas: dict[int, AreaInfo]
+    aliases: dict[str, int]
+    by_slug: dict[str, int]
+    children: dict[int, list[int]]
+    loaded_at: float
+
+
+_snapshot: Gazetteer | None = None
+_lock = threading.Lock()
+
+
+def _load() -> Gazetteer:
+    areas = {
+        row[0]: AreaInfo(*row)
+        for row in Area.objects.values_list("pk", "name", "slug", "kind", "city_id", "latitude", "longitude")
+    }
+    children = {}
+    for area in areas.values():
+        if area.city_id is not None:
+            children.setdefault(area.city_id, []).append(area.id)
+    return Gazetteer(
+        areas=areas,
+        aliases=dict(AreaAlias.objects.values_list("alias", "area_id")),
+        by_slug={area.slug: area.id for area in areas.values()},
+        children=children,
+        loaded_at=time.monotonic(),
+    )
+
+
+def gazetteer() -> Gazetteer:
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is None or time.monotonic() - snapshot.loaded_at > RELOAD_SECONDS:
+        with _lock:
+            snapshot = _snapshot = _load()
+    return snapshot
+
+
+def reset() -> None:
+    global _snapshot
+    _snapshot = None
+
+
+def match_area(text: str) -> int | None:
+    """Return the id of the area ``text`` names, or ``None``."""
+    words = location_key(text).split()
+    if not words:
+        return None
+    known = gazetteer()
+    best = None
+    for start in range(len(words)):
+        for size in range(min(MAX_WORDS, len(words) - start), 0, -1):
+            area_id = known.aliases.get(" ".join(words[start : start + size]))
+            if area_id is None:
+                continue
+            rank = (known.areas[area_id].kind != Area.Kind.AREA, start, -size)
+            if best is None or rank < best[0]:
+                best = (rank, area_id)
+            break
+    return best[1] if best else None
+
+
+def find_area(value: str) -> AreaInfo | None:
+    """Resolve a filter value: an area slug, or any spelling of an area."""
+    known = gazetteer()
+    area_id = known.by_slug.get(value) or match_area(value)
+    return known.areas.get(area_id)
+
+
+def area_ids_within(area_id: int) -> list[int]:
+    """``area_id`` and, for a city, the ids of its areas."""
+    return [area_id, *gazetteer().children.get(area_id, [])]
+
+
+def area_name(area_id) -> str:
+    area = gazetteer().areas.get(int(area_id))
+    return area.name if area else "Unknown area"
+
+
+def area_point(area_id) -> tuple[float, float] | None:
+    """Coordinates of an area, or of its city when the area has none."""
+    known = gazetteer()
+    area = known.areas.get(area_id)
+    while area is not None:
+        if area.latitude is not None and area.longitude is not None:
+            return area.latitude, area.longitude
+        area = known.areas.get(area.city_id)
+    return None
+
+
+def geocode(text: str) -> tuple[float, float] | None:
+    """``(latitude, longitude)`` of the area a free-text location names, or ``None``."""
+    area_id = match_area(text)
+    return area_point(area_id) if area_id is not None else None
@@ -0,0 +1,13 @@
+"""Drop this process's in-memory gazetteer when areas or spellings change."""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import services
+from .models import Area, AreaAlias
+
+
+@receiver([post_save, post_delete], sender=Area)
+@receiver([post_save, post_delete], sender=AreaAlias)
+def gazetteer_changed(sender, **kwargs):
+    services.reset()
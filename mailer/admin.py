@@ -0,0 +1,23 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ("subject", "status", "priority", "attempts", "next_attempt_at", "sent_at", "created_at")
+    list_filter = ("status", "priority")
+    search_fields = ("subject", "to")
+    readonly_fields = ("claim_token", "claimed_at", "sent_at", "last_error", "created_at")
+    actions = ["requeue"]
+
+    @admin.action(description="Requeue selected messages")
+    def requeue(self, request, queryset):
+        updated = queryset.exclude(status__in=[OutboundEmail.Status.SENT, OutboundEmail.Status.EXPIRED]).update(
+            status=OutboundEmail.Status.PENDING,
+            attempts=0,
+            next_attempt_at=timezone.now(),
+            claim_token="",
+        )
+        self.message_user(request, f"Requeued {updated} messages.")
@@ -0,0 +1,34 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from mailer.services import BATCH_SIZE, purge_sent, requeue_dead, send_pending
+
+
+class Command(BaseCommand):
+    help = "Send queued outbound email, reusing one mail connection per batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new messages.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls with --loop.")
+        parser.add_argument("--requeue-dead", action="store_true", help="Retry dead letters before sending.")
+        parser.add_argument("--purge-days", type=int, help="Also delete messages sent or expired more than this many days ago.")
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        if options["requeue_dead"]:
+            self.stdout.write(f"Requeued {requeue_dead(using=using)} dead letters.")
+        while True:
+            report = send_pending(batch_size=options["batch_size"], using=using)
+            if report.sent or report.failed or report.dead or not options["loop"]:
+                self.stdout.write(f"Sent {report.sent}, failed {report.failed}, dead-lettered {report.dead}.")
+            if options["purge_days"] is not None:
+                purged = purge_sent(older_than=timedelta(days=options["purge_days"]), using=using)
+                if purged:
+                    self.stdout.write(f"Purged {purged} sent or expired messages.")
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
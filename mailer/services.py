@@ -0,0 +1,237 @@
+"""Outbound mail queue.
+
+Views call ``enqueue_email``, which only inserts an ``OutboundEmail`` row.
+Delivery happens after the surrounding transaction commits (in a background
+thread or inline, see ``settings.JOBFLICK_MAIL_DELIVERY``) or from the
+``send_queued_mail`` worker. Each batch is sent over one connection from
+the configured ``EMAIL_BACKEND``, so SMTP deployments pay for one TCP/TLS
+handshake and login per batch instead of per message. Failed messages are
+retried with exponential backoff and parked as dead letters after
+``MAX_ATTEMPTS``.
+
+Bodies can carry one-time codes, so they are blanked as soon as a message
+is sent. Messages queued with ``not_after`` (a code's own expiry) are
+expired and blanked instead of sent once that time passes, however many
+retries are still left.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from jobflick import background
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+MAX_ATTEMPTS = 6
+RETRY_BASE = timedelta(minutes=1)
+RETRY_CAP = timedelta(hours=1)
+# A batch claimed by a worker that died is handed out again after this long.
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def delivery_mode() -> str:
+    return getattr(settings, "JOBFLICK_MAIL_DELIVERY", background.THREAD)
+
+
+def enqueue_email(
+    subject: str,
+    body: str,
+    to,
+    *,
+    from_email: str | None = None,
+    reply_to=(),
+    priority: int = OutboundEmail.Priority.NORMAL,
+    not_after=None,
+    using: str = "default",
+) -> OutboundEmail:
+    """Queue a plain-text email and schedule delivery once the transaction commits.
+
+    Pass ``not_after`` for messages that are useless late, such as one-time
+    codes; they are dropped rather than sent after that time.
+    """
+    email = OutboundEmail.objects.using(using).create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(to),
+        reply_to=list(reply_to),
+        priority=priority,
+        not_after=not_after,
+    )
+    background.dispatch(functools.partial(send_pending, using=using), mode=delivery_mode(), using=using)
+    return email
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return min(RETRY_BASE * 2 ** max(attempts - 1, 0), RETRY_CAP)
+
+
+@dataclass
+class SendReport:
+    sent: int = 0
+    failed: int = 0
+    dead: int = 0
+
+
+def _ready(now):
+    due = Q(status__in=[OutboundEmail.Status.PENDING, OutboundEmail.Status.FAILED], next_attempt_at__lte=now) | Q(
+        status=OutboundEmail.Status.SENDING, claimed_at__lt=now - CLAIM_TIMEOUT
+    )
+    return due & (Q(not_after__isnull=True) | Q(not_after__gt=now))
+
+
+def expire_stale(*, using: str = "default") -> int:
+    """Drop unsent messages whose ``not_after`` has passed; returns rows expired."""
+    now = timezone.now()
+    unsent = [
+        OutboundEmail.Status.PENDING,
+        OutboundEmail.Status.FAILED,
+        OutboundEmail.Status.DEAD,
+    ]
+    return (
+        OutboundEmail.objects.using(using)
+        .filter(Q(status__in=unsent) | Q(status=OutboundEmail.Status.SENDING, claimed_at__lt=now - CLAIM_TIMEOUT))
+        .filter(not_after__lte=now)
+        .update(status=OutboundEmail.Status.EXPIRED, body="", claim_token="")
+    )
+
+
+def claim_batch(*, batch_size: int = BATCH_SIZE, using: str = "default") -> list[OutboundEmail]:
+    """Atomically mark up to ``batch_size`` due messages as ours and return them."""
+    expire_stale(using=using)
+    now = timezone.now()
+    emails = OutboundEmail.objects.using(using)
+    ids = list(
+        emails.filter(_ready(now)).order_by("priority", "next_attempt_at", "id").values_list("pk", flat=True)[:batch_size]
+    )
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    emails.filter(_ready(now), pk__in=ids).update(
+        status=OutboundEmail.Status.SENDING, claim_token=token, claimed_at=now
+    )
+    return list(emails.filter(claim_token=token, status=OutboundEmail.Status.SENDING).order_by("priority", "id"))
+
+
+def _as_message(email: OutboundEmail, connection) -> EmailMessage:
+    return EmailMessage(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.to,
+        reply_to=email.reply_to or None,
+        connection=connection,
+    )
+
+
+def _record_failure(email: OutboundEmail, error: Exception, *, using: str) -> bool:
+    """Schedule a retry for ``email``; returns True when it became a dead letter."""
+    attempts = email.attempts + 1
+    dead = attempts >= MAX_ATTEMPTS
+    OutboundEmail.objects.using(using).filter(pk=email.pk).update(
+        status=OutboundEmail.Status.DEAD if dead else OutboundEmail.Status.FAILED,
+        attempts=attempts,
+        next_attempt_at=timezone.now() + retry_delay(attempts),
+        claim_token="",
+        last_error=repr(error),
+    )
+    return dead
+
+
+def send_batch(emails, *, connection=None, using: str = "default") -> SendReport:
+    """Send claimed ``emails`` over a single backend connection."""
+    report = SendReport()
+    connection = connection or get_connection(fail_silently=False)
+    remaining = list(emails)
+    sent_ids = []
+
+    def fail(email, exc):
+        logger.warning("Sending queued email %s failed: %r", email.pk, exc)
+        if _record_failure(email, exc, using=using):
+            report.dead += 1
+        else:
+            report.failed += 1
+
+    try:
+        connection.open()
+        while remaining:
+            email = remaining.pop(0)
+            try:
+                connection.send_messages([_as_message(email, connection)])
+            except Exception as exc:
+                fail(email, exc)
+                # The session may be unusable after an SMTP error; reconnect.
+                connection.close()
+                connection.open()
+            else:
+                sent_ids.append(email.pk)
+    except Exception as exc:
+        # Could not (re)connect: retry everything that was not attempted.
+        for email in remaining:
+            fail(email, exc)
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            logger.debug("Closing the mail connection failed.", exc_info=True)
+        if sent_ids:
+            OutboundEmail.objects.using(using).filter(pk__in=sent_ids).update(
+                status=OutboundEmail.Status.SENT,
+                body="",
+                attempts=F("attempts") + 1,
+                sent_at=timezone.now(),
+                claim_token="",
+                last_error="",
+            )
+            report.sent += len(sent_ids)
+    return report
+
+
+def send_pending(*, batch_size: int = BATCH_SIZE, connection=None, using: str = "default") -> SendReport:
+    """Send due messages batch by batch until none are left."""
+    total = SendReport()
+    while True:
+        emails = claim_batch(batch_size=batch_size, using=using)
+        if not emails:
+            return total
+        report = send_batch(emails, connection=connection, using=using)
+        total.sent += report.sent
+        total.failed += report.failed
+        total.dead += report.dead
+
+
+def requeue_dead(*, using: str = "default") -> int:
+    """Give every dead letter a fresh set of attempts; returns rows requeued.
+
+    Expired time-sensitive messages stay expired.
+    """
+    expire_stale(using=using)
+    return OutboundEmail.objects.using(using).filter(status=OutboundEmail.Status.DEAD).update(
+        status=OutboundEmail.Status.PENDING,
+        attempts=0,
+        next_attempt_at=timezone.now(),
+        claim_token="",
+    )
+
+
+def purge_sent(*, older_than: timedelta, using: str = "default") -> int:
+    """Delete messages sent or expired before ``older_than`` ago; returns rows removed."""
+    cutoff = timezone.now() - older_than
+    deleted, _ = OutboundEmail.objects.using(using).filter(
+        Q(status=OutboundEmail.Status.SENT, sent_at__lt=cutoff)
+        | Q(status=OutboundEmail.Status.EXPIRED, not_after__lt=cutoff)
+    ).delete()
+    return deleted
@@ -0,0 +1,111 @@
+from datetime import timedelta
+from smtplib import SMTPRecipientsRefused
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts.views import OTP_EXPIRY, _send_verification_email
+
+from .models import OutboundEmail
+from .services import MAX_ATTEMPTS, RETRY_BASE, claim_batch, enqueue_email, purge_sent, requeue_dead, send_pending
+
+
+class CountingBackend(EmailBackend):
+    """locmem backend that counts connections and refuses one recipient."""
+
+    opened = 0
+    refused = "refused@example.com"
+
+    def open(self):
+        CountingBackend.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        for message in messages:
+            if self.refused in message.to:
+                raise SMTPRecipientsRefused({self.refused: (550, b"No such user")})
+        return super().send_messages(messages)
+
+
+def queue(count, *, to="member@example.com"):
+    for index in range(count):
+        enqueue_email(f"Code {index}", "Your code is 123456", [to])
+
+
+@override_settings(JOBFLICK_MAIL_DELIVERY="worker")
+class MailQueueTests(TestCase):
+    def setUp(self):
+        CountingBackend.opened = 0
+
+    @override_settings(JOBFLICK_MAIL_DELIVERY="inline")
+    def test_enqueue_sends_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            queue(1)
+        self.assertEqual(mail.outbox, [])
+        for callback in callbacks:
+            callback()
+        self.assertEqual([message.subject for message in mail.outbox], ["Code 0"])
+        self.assertEqual(OutboundEmail.objects.get().status, OutboundEmail.Status.SENT)
+
+    def test_a_batch_shares_one_connection(self):
+        queue(5)
+        report = send_pending(connection=CountingBackend())
+        self.assertEqual(report.sent, 5)
+        self.assertEqual(CountingBackend.opened, 1)
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_failures_back_off_and_become_dead_letters(self):
+        queue(1, to=CountingBackend.refused)
+        queue(1)
+        with self.assertLogs("mailer.services", "WARNING"):
+            report = send_pending(connection=CountingBackend())
+        self.assertEqual((report.sent, report.failed), (1, 1))
+        failed = OutboundEmail.objects.get(to=[CountingBackend.refused])
+        self.assertEqual((failed.status, failed.attempts), (OutboundEmail.Status.FAILED, 1))
+        self.assertGreater(failed.next_attempt_at, timezone.now() + RETRY_BASE - timedelta(seconds=5))
+        self.assertEqual(send_pending(connection=CountingBackend()).failed, 0, "retried before its backoff")
+        with self.assertLogs("mailer.services", "WARNING"):
+            for _ in range(MAX_ATTEMPTS - 1):
+                OutboundEmail.objects.filter(pk=failed.pk).update(next_attempt_at=timezone.now())
+                send_pending(connection=CountingBackend())
+        failed.refresh_from_db()
+        self.assertEqual((failed.status, failed.attempts), (OutboundEmail.Status.DEAD, MAX_ATTEMPTS))
+
+    def test_stale_claims_are_handed_out_again(self):
+        queue(1)
+        self.assertEqual(len(claim_batch()), 1)
+        self.assertEqual(claim_batch(), [])
+        OutboundEmail.objects.update(claimed_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(len(claim_batch()), 1)
+
+    def test_sent_bodies_are_blanked(self):
+        queue(1)
+        send_pending(connection=CountingBackend())
+        self.assertEqual(mail.outbox[0].body, "Your code is 123456")
+        self.assertEqual(OutboundEmail.objects.get().body, "")
+
+    def test_time_sensitive_mail_expires_instead_of_retrying(self):
+        not_after = timezone.now() + timedelta(minutes=10)
+        enqueue_email("Code", "Your code is 123456", [CountingBackend.refused], not_after=not_after)
+        with self.assertLogs("mailer.services", "WARNING"):
+            send_pending(connection=CountingBackend())
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        with mock.patch("django.utils.timezone.now", return_value=not_after + timedelta(seconds=1)):
+            self.assertEqual(claim_batch(), [])
+            self.assertEqual(requeue_dead(), 0)
+        email = OutboundEmail.objects.get()
+        self.assertEqual((email.status, email.body), (OutboundEmail.Status.EXPIRED, ""))
+        with mock.patch("django.utils.timezone.now", return_value=not_after + timedelta(days=2)):
+            self.assertEqual(purge_sent(older_than=timedelta(days=1)), 1)
+
+    def test_verification_codes_expire_with_the_code(self):
+        user = User.objects.create_user("member", "member@example.com", "pw")
+        before = timezone.now()
+        _send_verification_email(user, "123456")
+        email = OutboundEmail.objects.get()
+        self.assertGreaterEqual(email.not_after, before + OTP_EXPIRY)
+        self.assertLessEqual(email.not_after, timezone.now() + OTP_EXPIRY)
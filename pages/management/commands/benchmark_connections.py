@@ -0,0 +1,97 @@
+import io
+import time
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory, override_settings
+
+from jobflick.benchmarking import (
+    ANONYMOUS,
+    MEASUREMENT_SETTINGS,
+    MEMBER,
+    STAFF,
+    ViewCase,
+    client_for,
+    isolated_database,
+    seed_dataset,
+    summarize,
+)
+
+CASES = [
+    ViewCase("pages", ANONYMOUS, "/"),
+    ViewCase("jobs", MEMBER, "/jobs/"),
+    ViewCase("userprofile", MEMBER, "/profile/dashboard/"),
+    ViewCase("adminpanel", STAFF, "/admin-panel/?section=jobs"),
+]
+
+# CONN_MAX_AGE per mode: 0 closes the connection when each request ends,
+# None keeps it open for the life of the process.
+MODES = [("per-request", 0), ("persistent", None)]
+
+
+def _ignore_start_response(status, headers, exc_info=None):
+    return lambda data: None
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve requests through the WSGI handler against an on-disk database and compare "
+        "requests/sec with a new connection per request versus persistent connections."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", type=int, default=200, help="Rows of each kind to seed.")
+        parser.add_argument("--requests", type=int, default=200, help="Requests per view and mode.")
+
+    def handle(self, *args, **options):
+        opened = []
+
+        def count_connection(sender, connection, **kwargs):
+            opened.append(connection.alias)
+
+        with isolated_database(file_based=True), override_settings(**MEASUREMENT_SETTINGS):
+            dataset = seed_dataset(scale=options["scale"])
+            handler = WSGIHandler()
+            factory = RequestFactory()
+            environs = []
+            for case in CASES:
+                cookies = client_for(case.role, dataset).cookies
+                cookie_header = "; ".join(f"{name}={morsel.value}" for name, morsel in cookies.items())
+                environs.append(factory.get(case.url(dataset), HTTP_COOKIE=cookie_header).environ)
+
+            connection = connections["default"]
+            vendor = connection.vendor
+            previous_max_age = connection.settings_dict["CONN_MAX_AGE"]
+            connection_created.connect(count_connection)
+            self.stdout.write(f"{'mode':<12} {'requests':>8} {'connections':>11} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+            try:
+                for mode, max_age in MODES:
+                    connection.settings_dict["CONN_MAX_AGE"] = max_age
+                    connection.close()
+                    opened.clear()
+                    samples = []
+                    for _ in range(options["requests"]):
+                        for base in environs:
+                            environ = {**base, "wsgi.input": io.BytesIO()}
+                            started = time.perf_counter()
+                            response = handler(environ, _ignore_start_response)
+                            b"".join(response)
+                            response.close()
+                            samples.append(time.perf_counter() - started)
+                            if response.status_code != 200:
+                                raise CommandError(f"{environ['PATH_INFO']} returned {response.status_code}.")
+                    summary = summarize(samples)
+                    self.stdout.write(
+                        f"{mode:<12} {summary.count:>8} {len(opened):>11} {summary.count / sum(samples):>8.1f} "
+                        f"{summary.p50_ms:>8.2f} {summary.p95_ms:>8.2f}"
+                    )
+            finally:
+                connection_created.disconnect(count_connection)
+                connection.settings_dict["CONN_MAX_AGE"] = previous_max_age
+                connection.close()
+        self.stdout.write(
+            f"Measured on {vendor}; against PostgreSQL each new connection also pays the TCP, "
+            "TLS and authentication round trips."
+        )
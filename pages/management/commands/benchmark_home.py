@@ -0,0 +1,72 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from jobflick.benchmarking import isolated_database
+from jobs.models import Job
+
+LOCATIONS = ["Uttara", "Mirpur", "Banani", "Dhanmondi", "Gulshan", "Motijheel"]
+
+
+class Command(BaseCommand):
+    help = "Measure anonymous home page throughput with and without template fragment caching."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jobs", type=int, default=2000, help="Approved jobs to seed.")
+        parser.add_argument("--requests", type=int, default=500, help="Requests issued per scenario.")
+
+    def handle(self, *args, **options):
+        with isolated_database():
+            self._seed(options["jobs"])
+            client = Client()
+            paths = ["/"] + [f"/?location={city}" for city in LOCATIONS]
+            with override_settings(CACHES=self._caches(fragments_enabled=False)):
+                uncached = self._measure(client, paths, options["requests"])
+            with override_settings(CACHES=self._caches(fragments_enabled=True)):
+                cached = self._measure(client, paths, options["requests"])
+        self.stdout.write(f"without fragment cache: {uncached:.1f} req/s")
+        self.stdout.write(f"with fragment cache   : {cached:.1f} req/s ({cached / uncached:.2f}x)")
+
+    def _caches(self, *, fragments_enabled):
+        from django.conf import settings
+
+        configured = {alias: dict(config) for alias, config in settings.CACHES.items()}
+        if not fragments_enabled:
+            configured["fragments"] = {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+        return configured
+
+    def _seed(self, count):
+        poster = get_user_model().objects.create_user(username="bench-poster", password="unused")
+        rng = random.Random(7)
+        Job.objects.bulk_create(
+            [
+                Job(
+                    poster=poster,
+                    work_title=f"Short gig #{index}",
+                    worker_type=rng.choice(["Electrician", "Tutor", "Driver", "Designer"]),
+                    duration=f"{rng.randint(1, 10)} days",
+                    amount=rng.randint(500, 20000),
+                    location=f"{rng.choice(LOCATIONS)}, Dhaka",
+                    skills="Punctual, Friendly",
+                    tracking_code=f"BN-{index:010d}",
+                    status=Job.Status.APPROVED,
+                )
+                for index in range(count)
+            ],
+            batch_size=1000,
+        )
+
+    def _measure(self, client, paths, total):
+        for alias in ("default", "fragments"):
+            caches[alias].clear()
+        for path in paths:
+            client.get(path)
+        started = time.perf_counter()
+        for index in range(total):
+            response = client.get(paths[index % len(paths)])
+            assert response.status_code == 200, response.status_code
+        return total / (time.perf_counter() - started)
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from jobflick.benchmarking import (
+    MEASUREMENT_SETTINGS,
+    VIEW_CASES,
+    client_for,
+    count_queries,
+    isolated_database,
+    measure_view,
+    seed_dataset,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway database and report query count, p50/p95 latency and peak memory for "
+        "every GET view as anonymous, member and staff users."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", type=int, default=300, help="Rows of each kind to seed.")
+        parser.add_argument("--iterations", type=int, default=20, help="Timed requests per view.")
+        parser.add_argument("--app", action="append", help="Only benchmark views of this app (repeatable).")
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Double the data afterwards and fail if any view's query count changed.",
+        )
+
+    def handle(self, *args, **options):
+        cases = [case for case in VIEW_CASES if not options["app"] or case.app in options["app"]]
+        with isolated_database(), override_settings(**MEASUREMENT_SETTINGS):
+            dataset = seed_dataset(scale=options["scale"])
+            self.stdout.write(
+                f"{'app':<12} {'role':<10} {'url':<44} {'status':>6} {'queries':>7} "
+                f"{'p50 ms':>8} {'p95 ms':>8} {'peak KiB':>9}"
+            )
+            baseline = {}
+            for case in cases:
+                result = measure_view(case, dataset, iterations=options["iterations"])
+                baseline[case] = result.queries
+                self.stdout.write(
+                    f"{case.app:<12} {case.role:<10} {result.url:<44} {result.status:>6} {result.queries:>7} "
+                    f"{result.latency.p50_ms:>8.2f} {result.latency.p95_ms:>8.2f} {result.peak_kib:>9.1f}"
+                )
+            if not options["check"]:
+                return
+            seed_dataset(dataset, scale=options["scale"])
+            grown = []
+            for case in cases:
+                _, queries = count_queries(client_for(case.role, dataset), case.url(dataset))
+                if queries != baseline[case]:
+                    grown.append(f"{case.role} {case.url(dataset)}: {baseline[case]} -> {queries} queries")
+        if grown:
+            raise CommandError("Query counts changed with data volume:\n  " + "\n  ".join(grown))
+        self.stdout.write(self.style.SUCCESS("Query counts are independent of data volume."))
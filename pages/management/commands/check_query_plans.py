@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from jobflick.benchmarking import MEASUREMENT_SETTINGS, VIEW_CASES, isolated_database, seed_dataset
+from jobflick.query_plans import SMALL_TABLES, explain_view_queries
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway database, request every GET view and run EXPLAIN on each query it "
+        "executes. Fails if any plan reads a whole table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", type=int, default=50, help="Rows of each kind to seed.")
+        parser.add_argument("--app", action="append", help="Only check views of this app (repeatable).")
+        parser.add_argument(
+            "--allow",
+            action="append",
+            default=[],
+            metavar="TABLE",
+            help="Accept full scans of this table (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        cases = [case for case in VIEW_CASES if not options["app"] or case.app in options["app"]]
+        allowed = SMALL_TABLES | set(options["allow"])
+        with isolated_database(), override_settings(**MEASUREMENT_SETTINGS):
+            dataset = seed_dataset(scale=options["scale"])
+            findings = explain_view_queries(dataset, cases, allowed=allowed)
+        for finding in findings:
+            self.stdout.write(str(finding))
+        if findings:
+            raise CommandError(f"{len(findings)} view queries read a whole table.")
+        self.stdout.write(self.style.SUCCESS(f"No full table scans in {len(cases)} views."))
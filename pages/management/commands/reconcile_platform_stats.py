@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from pages.stats import reconcile_platform_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the home page statistics from the raw tables and correct any drift."
+
+    def handle(self, *args, **options):
+        drift = reconcile_platform_stats()
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Platform statistics are in sync."))
+            return
+        for key, (stored, actual) in sorted(drift.items()):
+            self.stdout.write(f"{key}: {stored} -> {actual}")
+        self.stdout.write(self.style.WARNING(f"Corrected {len(drift)} drifted counters."))
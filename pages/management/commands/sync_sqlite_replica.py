@@ -0,0 +1,29 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from jobflick.routers import PRIMARY, REPLICA
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database into the replica file (JOBFLICK_DB_REPLICA_NAME). "
+        "Stands in for replication when trying the read routing locally."
+    )
+
+    def handle(self, *args, **options):
+        if REPLICA not in settings.DATABASES:
+            raise CommandError("No replica configured; set JOBFLICK_DB_REPLICA_NAME.")
+        primary = connections[PRIMARY]
+        target_name = settings.DATABASES[REPLICA]["NAME"]
+        if primary.vendor != "sqlite" or connections[REPLICA].vendor != "sqlite":
+            raise CommandError("sync_sqlite_replica only copies SQLite databases.")
+        primary.ensure_connection()
+        target = sqlite3.connect(target_name)
+        try:
+            primary.connection.backup(target)
+        finally:
+            target.close()
+        self.stdout.write(self.style.SUCCESS(f"Copied {primary.settings_dict['NAME']} to {target_name}."))
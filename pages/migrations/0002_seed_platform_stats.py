@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.db import migrations
+
+# Frozen copy of the counter keys in pages.stats at the time of writing.
+TOTAL_USERS = "total_users"
+TOTAL_JOBS = "total_jobs"
+TOTAL_APPLICATIONS = "total_applications"
+TOTAL_COMPLETED = "total_completed"
+
+
+def seed_platform_stats(apps, schema_editor):
+    # The home page only reads PlatformStat, so count the rows that existed
+    # before the signal receivers started maintaining the totals. The
+    # per-area counters were filled by jobs.0004; later drift is corrected
+    # by the reconcile_platform_stats command.
+    PlatformStat = apps.get_model("pages", "PlatformStat")
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Job = apps.get_model("jobs", "Job")
+    JobApplication = apps.get_model("jobs", "JobApplication")
+    using = schema_editor.connection.alias
+    stats = PlatformStat.objects.using(using)
+    approved = Job.objects.using(using).filter(status="approved")
+    counters = {
+        TOTAL_USERS: lambda: User.objects.using(using).count(),
+        TOTAL_JOBS: approved.count,
+        TOTAL_APPLICATIONS: lambda: JobApplication.objects.using(using).count(),
+        TOTAL_COMPLETED: approved.filter(is_filled=True).count,
+    }
+    present = set(stats.filter(key__in=counters).values_list("key", flat=True))
+    stats.bulk_create([PlatformStat(key=key, value=count()) for key, count in counters.items() if key not in present])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('jobs', '0004_job_area'),
+        ('pages', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_platform_stats, migrations.RunPython.noop),
+    ]
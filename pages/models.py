@@ -1,3 +1,25 @@
 from django.db import models
 
-# Create your models here.
+
+class PlatformStat(models.Model):
+	"""Materialized counter shown on the public pages, maintained by ``pages.stats``."""
+
+	key = models.CharField(max_length=64, unique=True)
+	value = models.BigIntegerField(default=0)
+	updated_at = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		ordering = ["key"]
+
+	def __str__(self):
+		return f"{self.key} = {self.value}"
+
+
+class IdentifierSequence(models.Model):
+	"""High-water mark of a named identifier sequence, handed out in blocks by ``jobflick.identifiers``."""
+
+	name = models.CharField(max_length=32, primary_key=True)
+	last_value = models.BigIntegerField(default=0)
+
+	def __str__(self):
+		return f"{self.name} @ {self.last_value}"
@@ -0,0 +1,70 @@
+"""Keep the materialized platform statistics in step with model writes."""
+
+from collections import Counter
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from jobs.models import Job, JobApplication
+
+from . import stats
+
+
+def _job_state(values):
+    return stats.job_contribution(
+        status=values.get("status"),
+        is_filled=values.get("is_filled"),
+        area_id=values.get("area_id"),
+    )
+
+
+def _current_values(job):
+    return {"status": job.status, "is_filled": job.is_filled, "area_id": job.area_id}
+
+
+@receiver(post_save, sender=Job)
+def job_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_loaded_values", None)
+    current = _current_values(instance)
+    delta = Counter()
+    if created:
+        delta.update(_job_state(current))
+    elif previous is not None:
+        delta.update(_job_state(current))
+        delta.subtract(_job_state({**current, **previous}))
+    # Saves of instances that were never loaded leave the counters alone;
+    # reconcile_platform_stats corrects them. Job.save() then records the
+    # new state in ``_loaded_values``.
+    stats.adjust(delta)
+
+
+@receiver(post_delete, sender=Job)
+def job_deleted(sender, instance, **kwargs):
+    previous = getattr(instance, "_loaded_values", None) or {}
+    state = _job_state({**_current_values(instance), **previous})
+    stats.adjust({key: -value for key, value in state.items()})
+
+
+@receiver(post_save, sender=JobApplication)
+def application_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        stats.adjust({stats.TOTAL_APPLICATIONS: 1})
+
+
+@receiver(post_delete, sender=JobApplication)
+def application_deleted(sender, instance, **kwargs):
+    stats.adjust({stats.TOTAL_APPLICATIONS: -1})
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        stats.adjust({stats.TOTAL_USERS: 1})
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_deleted(sender, instance, **kwargs):
+    stats.adjust({stats.TOTAL_USERS: -1})
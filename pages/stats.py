@@ -0,0 +1,145 @@
+"""Materialized platform statistics for the public home page.
+
+Counters live in ``PlatformStat`` rows and are adjusted incrementally by the
+signal receivers in ``pages.signals`` after migrations seeded them;
+``get_platform_stats`` serves all of them from one cached lookup and never
+counts the raw tables itself. The ``reconcile_platform_stats`` command
+recomputes the counters from the raw tables to correct any drift.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+
+from jobs.models import Job, JobApplication
+from locations.services import gazetteer
+
+from .models import PlatformStat
+
+# Area tiles shown on the home page, busiest first.
+TOP_AREAS = 6
+
+TOTAL_USERS = "total_users"
+TOTAL_JOBS = "total_jobs"
+TOTAL_APPLICATIONS = "total_applications"
+TOTAL_COMPLETED = "total_completed"
+COUNTER_KEYS = (TOTAL_USERS, TOTAL_JOBS, TOTAL_APPLICATIONS, TOTAL_COMPLETED)
+AREA_PREFIX = "area:"
+
+CACHE_KEY = "pages:platform-stats"
+CACHE_TIMEOUT = 300
+
+
+def area_key(area_id: int) -> str:
+    return f"{AREA_PREFIX}{area_id}"
+
+
+def job_contribution(*, status, is_filled, area_id) -> Counter:
+    """Return the counters a job in the given state contributes to."""
+    contribution = Counter()
+    if status != Job.Status.APPROVED:
+        return contribution
+    contribution[TOTAL_JOBS] += 1
+    if is_filled:
+        contribution[TOTAL_COMPLETED] += 1
+    elif area_id is not None:
+        # Open jobs per area rank the home page's area tiles.
+        contribution[area_key(area_id)] += 1
+    return contribution
+
+
+def adjust(deltas) -> None:
+    """Apply counter ``deltas`` atomically and drop the cached snapshot on commit."""
+    changed = {key: delta for key, delta in deltas.items() if delta}
+    if not changed:
+        return
+    with transaction.atomic():
+        for key, delta in changed.items():
+            updated = PlatformStat.objects.filter(key=key).update(value=F("value") + delta)
+            if not updated:
+                PlatformStat.objects.get_or_create(key=key)
+                PlatformStat.objects.filter(key=key).update(value=F("value") + delta)
+    transaction.on_commit(invalidate)
+
+
+def invalidate() -> None:
+    cache.delete(CACHE_KEY)
+
+
+def compute_platform_stats() -> dict[str, int]:
+    """Count every statistic from the raw tables."""
+    approved = Job.objects.filter(status=Job.Status.APPROVED)
+    values = {
+        TOTAL_USERS: get_user_model().objects.count(),
+        TOTAL_JOBS: approved.count(),
+        TOTAL_APPLICATIONS: JobApplication.objects.count(),
+        TOTAL_COMPLETED: approved.filter(is_filled=True).count(),
+    }
+    open_by_area = (
+        approved.filter(is_filled=False, area__isnull=False)
+        .order_by()
+        .values_list("area")
+        .annotate(total=Count("id"))
+    )
+    for area_id, total in open_by_area:
+        values[area_key(area_id)] = total
+    return values
+
+
+def reconcile_platform_stats() -> dict[str, tuple[int, int]]:
+    """Overwrite the counters with freshly computed values.
+
+    Returns ``{key: (stored, actual)}`` for every counter that had drifted.
+    """
+    actual = compute_platform_stats()
+    with transaction.atomic():
+        stored = dict(PlatformStat.objects.select_for_update().values_list("key", "value"))
+        drift = {}
+        for key, value in actual.items():
+            if stored.get(key) == value:
+                continue
+            if stored.get(key, 0) != value:
+                drift[key] = (stored.get(key, 0), value)
+            PlatformStat.objects.update_or_create(key=key, defaults={"value": value})
+        PlatformStat.objects.exclude(key__in=actual).delete()
+    transaction.on_commit(invalidate)
+    return drift
+
+
+def top_areas(values) -> list[dict]:
+    """The ``TOP_AREAS`` areas with the most open jobs, from the stored counters."""
+    known = gazetteer().areas
+    counts = [
+        (value, int(key[len(AREA_PREFIX) :]))
+        for key, value in values.items()
+        if key.startswith(AREA_PREFIX) and value > 0
+    ]
+    counts = [(value, area_id) for value, area_id in counts if area_id in known]
+    counts.sort(key=lambda item: (-item[0], known[item[1]].name))
+    return [
+        {"name": known[area_id].name, "slug": known[area_id].slug, "job_count": value}
+        for value, area_id in counts[:TOP_AREAS]
+    ]
+
+
+def get_platform_stats() -> dict:
+    """Return the home page statistics from cache, falling back to one query.
+
+    Counters without a row read as zero.
+    """
+    stats = cache.get(CACHE_KEY)
+    if stats is not None:
+        return stats
+    values = dict(PlatformStat.objects.values_list("key", "value"))
+    stats = {key: values.get(key, 0) for key in COUNTER_KEYS}
+    # Keys the home page fragments rendered from this snapshot.
+    stats["version"] = time.time_ns()
+    stats["areas"] = top_areas(values)
+    cache.set(CACHE_KEY, stats, CACHE_TIMEOUT)
+    return stats
@@ -1,3 +1,258 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from importlib import import_module
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections, router, transaction
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from jobflick import identifiers
+from jobflick.pagination import CURSOR_SALT, InvalidCursor, KeysetPaginator, approximate_count, paginate
+from jobflick.benchmarking import MEASUREMENT_SETTINGS, VIEW_CASES, client_for, count_queries, seed_dataset
+from jobflick.query_plans import explain_view_queries
+from jobflick.routers import PRIMARY, REPLICA, reading_from_replica
+from adminpanel.views import ADMIN_SESSION_KEY
+from jobs.models import Job, JobApplication
+from locations.services import find_area, gazetteer
+from userprofile.models import Notification
+
+from . import stats
+from .models import PlatformStat
+
+
+@override_settings(**MEASUREMENT_SETTINGS)
+class ViewQueryCountTests(TestCase):
+	"""Every benchmarked view runs the same number of queries however many rows it lists.
+
+	A difference means the view issues queries per row, e.g. a missing
+	``select_related``.
+	"""
+
+	def test_query_count_does_not_grow_with_result_size(self):
+		dataset = seed_dataset(scale=2)
+		small = {case: count_queries(client_for(case.role, dataset), case.url(dataset)) for case in VIEW_CASES}
+		seed_dataset(dataset, scale=3)
+		for case in VIEW_CASES:
+			with self.subTest(app=case.app, role=case.role, url=case.url(dataset)):
+				status, queries = count_queries(client_for(case.role, dataset), case.url(dataset))
+				self.assertEqual(status, 200)
+				self.assertEqual(queries, small[case][1], "query count grew with the number of rows")
+
+
+@override_settings(**MEASUREMENT_SETTINGS)
+class QueryPlanTests(TestCase):
+	def test_no_view_query_reads_a_whole_table(self):
+		dataset = seed_dataset(scale=2)
+		findings = explain_view_queries(dataset, VIEW_CASES)
+		self.assertEqual([str(finding) for finding in findings], [])
+
+
+class PlatformStatsTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		self.poster = get_user_model().objects.create_user("stats-poster", "stats@example.com", "pass")
+
+	def create_job(self, **fields):
+		values = {
+			"work_title": "Electrician needed",
+			"worker_type": "Electrician",
+			"duration": "2 days",
+			"amount": 1500,
+			"location": "Uttara, Dhaka",
+			"status": Job.Status.APPROVED,
+		}
+		values.update(fields)
+		return Job.objects.create(poster=self.poster, **values)
+
+	def assertInStep(self):
+		stored = {key: value for key, value in PlatformStat.objects.values_list("key", "value") if value}
+		self.assertEqual(stored, {key: value for key, value in stats.compute_platform_stats().items() if value})
+
+	def test_signals_keep_the_counters_in_step(self):
+		job = self.create_job()
+		pending = self.create_job(status=Job.Status.PENDING, location="Mirpur 10")
+		self.assertEqual(PlatformStat.objects.get(key=stats.area_key(find_area("Uttara").id)).value, 1)
+		application = JobApplication.objects.create(job=job, applicant=self.poster)
+		self.assertInStep()
+		job.is_filled = True
+		job.save()
+		pending.status = Job.Status.APPROVED
+		pending.save()
+		self.assertInStep()
+		application.delete()
+		job.delete()
+		get_user_model().objects.create_user("stats-member", "member@example.com", "pass")
+		self.assertInStep()
+
+	def test_reconcile_corrects_drift(self):
+		self.create_job()
+		PlatformStat.objects.filter(key=stats.TOTAL_JOBS).update(value=40)
+		PlatformStat.objects.create(key=stats.area_key(0), value=3)
+		drift = stats.reconcile_platform_stats()
+		self.assertEqual(drift, {stats.TOTAL_JOBS: (40, 1)})
+		self.assertInStep()
+		self.assertFalse(PlatformStat.objects.filter(key=stats.area_key(0)).exists())
+		self.assertEqual(stats.reconcile_platform_stats(), {})
+
+	def test_home_page_stats_never_count_the_raw_tables(self):
+		PlatformStat.objects.all().delete()
+		gazetteer()
+		with self.assertNumQueries(1):
+			snapshot = stats.get_platform_stats()
+		self.assertEqual([snapshot[key] for key in stats.COUNTER_KEYS], [0, 0, 0, 0])
+		self.assertFalse(PlatformStat.objects.exists())
+
+	def test_migration_seeds_missing_totals(self):
+		self.create_job(is_filled=True)
+		PlatformStat.objects.filter(key__in=stats.COUNTER_KEYS).delete()
+		PlatformStat.objects.create(key=stats.TOTAL_USERS, value=7)
+		migration = import_module("pages.migrations.0002_seed_platform_stats")
+		migration.seed_platform_stats(apps, SimpleNamespace(connection=connection))
+		seeded = dict(PlatformStat.objects.filter(key__in=stats.COUNTER_KEYS).values_list("key", "value"))
+		self.assertEqual(seeded, {stats.TOTAL_USERS: 7, stats.TOTAL_JOBS: 1, stats.TOTAL_APPLICATIONS: 0, stats.TOTAL_COMPLETED: 1})
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+	"""Routing against a second SQLite file, refreshed with ``sync_sqlite_replica``."""
+
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		directory = tempfile.mkdtemp()
+		cls.addClassCleanup(shutil.rmtree, directory)
+		# The alias only exists while this class runs, so it is added after
+		# the test runner has set up its databases.
+		replica = {**connections.settings[PRIMARY], "NAME": os.path.join(directory, "replica.sqlite3")}
+		cls.enterClassContext(mock.patch.dict(settings.DATABASES, {REPLICA: replica}))
+		cls.enterClassContext(mock.patch.dict(connections.settings, {REPLICA: replica}))
+		cls.addClassCleanup(cls.close_replica)
+		cls.databases = cls.databases | {REPLICA}
+
+	@classmethod
+	def close_replica(cls):
+		connections[REPLICA].close()
+		del connections[REPLICA]
+
+	def setUp(self):
+		self.user_model = get_user_model()
+		self.staff = self.user_model.objects.create_user("replica-staff", "staff@example.com", "pass", is_staff=True)
+
+	def sync(self):
+		call_command("sync_sqlite_replica", stdout=open(os.devnull, "w"))
+
+	def test_reads_go_to_the_replica_and_writes_to_the_primary(self):
+		self.sync()
+		self.user_model.objects.create_user("after-sync", "after@example.com", "pass")
+		users = self.user_model.objects.filter(username="after-sync")
+		with reading_from_replica():
+			self.assertEqual(router.db_for_read(self.user_model), REPLICA)
+			self.assertFalse(users.exists())
+			self.assertTrue(self.user_model.objects.filter(pk=self.staff.pk).exists())
+			self.assertEqual(users.select_for_update().db, PRIMARY)
+			self.user_model.objects.create_user("written", "written@example.com", "pass")
+			with transaction.atomic():
+				self.assertTrue(users.exists(), "reads in a primary transaction stay on the primary")
+		self.assertTrue(self.user_model.objects.filter(username="written").exists())
+		self.assertFalse(self.user_model.objects.using(REPLICA).filter(username="written").exists())
+
+	def test_dashboard_marks_notifications_read_from_the_primary(self):
+		self.client.force_login(self.staff)
+		session = self.client.session
+		session[ADMIN_SESSION_KEY] = self.staff.pk
+		session.save()
+		self.sync()
+		note = Notification.objects.create(user=self.staff, message="Newer than the replica", is_staff_only=True)
+		response = self.client.get("/admin-panel/?section=notifications")
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual([item.pk for item in response.context["notifications"]], [note.pk])
+		note.refresh_from_db()
+		self.assertTrue(note.is_read)
+
+
+class IdentifierTests(TestCase):
+	def setUp(self):
+		patcher = mock.patch.object(identifiers, "_blocks", identifiers._Blocks())
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def test_a_committed_block_is_served_from_memory(self):
+		with self.captureOnCommitCallbacks(execute=True):
+			self.assertEqual(identifiers.next_values("TEST", 2), [1, 2])
+		with self.assertNumQueries(0):
+			self.assertEqual(identifiers.next_values("TEST", 3), [3, 4, 5])
+
+	def test_a_rolled_back_block_is_never_handed_out(self):
+		try:
+			with transaction.atomic():
+				identifiers.next_values("TEST", 1)
+				raise RuntimeError
+		except RuntimeError:
+			pass
+		issued = identifiers.next_values("TEST", 2)
+		# Another process reserving now must not overlap anything this one issues.
+		elsewhere = set(identifiers._reserve("TEST", identifiers.DEFAULT_BLOCK_SIZE, "default"))
+		issued += identifiers.next_values("TEST", 2)
+		self.assertEqual(len(set(issued)), 4)
+		self.assertFalse(elsewhere & set(issued))
+
+
+class KeysetPaginationTests(TestCase):
+	ordering = ("-date_joined", "-id")
+
+	def setUp(self):
+		User = get_user_model()
+		for index in range(5):
+			User.objects.create_user(f"paged-{index}")
+		# Every row shares one timestamp, so only the id breaks the tie.
+		User.objects.update(date_joined=timezone.now())
+		self.users = User.objects.all()
+		self.expected = list(self.users.order_by("-id").values_list("pk", flat=True))
+		self.paginator = KeysetPaginator(self.users, per_page=2, ordering=self.ordering)
+
+	def pks(self, page):
+		return [user.pk for user in page]
+
+	def test_cursors_walk_forward_and_back_through_ties(self):
+		pages, page = [], self.paginator.page()
+		while True:
+			pages.append(self.pks(page))
+			if not page.has_next:
+				break
+			page = self.paginator.page(page.next_cursor)
+		self.assertEqual(pages, [self.expected[0:2], self.expected[2:4], self.expected[4:]])
+		self.assertTrue(page.has_previous)
+		back = self.paginator.page(page.previous_cursor)
+		self.assertEqual(self.pks(back), self.expected[2:4])
+		self.assertEqual(self.pks(self.paginator.page(back.previous_cursor)), self.expected[0:2])
+
+	def test_bad_cursors_fall_back_to_the_first_page(self):
+		token = self.paginator.page().next_cursor
+		wrong_shape = signing.dumps({"v": ["1"], "f": True}, salt=CURSOR_SALT)
+		wrong_value = signing.dumps({"v": ["not a date", "1"], "f": True}, salt=CURSOR_SALT)
+		for bad in (token[:-2] + "xx", "garbage", wrong_shape, wrong_value):
+			with self.subTest(cursor=bad):
+				with self.assertRaises(InvalidCursor):
+					self.paginator.decode_cursor(bad)
+				page = self.paginator.page(bad)
+				self.assertEqual(self.pks(page), self.expected[0:2])
+				self.assertFalse(page.has_previous)
+
+	def test_urls_keep_other_parameters_and_labels_come_from_the_view(self):
+		request = RequestFactory().get("/", {"section": "users"})
+		page = paginate(request, self.users, per_page=2, ordering=self.ordering, previous_label="Sooner", next_label="Later")
+		self.assertTrue(page.next_url.startswith("?section=users&cursor="))
+		self.assertEqual((page.previous_label, page.next_label), ("Sooner", "Later"))
+
+	def test_approximate_count_stops_at_the_cap(self):
+		self.assertEqual(str(approximate_count(self.users, cap=10)), "5")
+		estimate = approximate_count(self.users, cap=3)
+		self.assertEqual((estimate.value, estimate.exact, str(estimate)), (3, False, "3+"))
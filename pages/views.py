@@ -1,30 +1,47 @@
 from types import SimpleNamespace
 
 from django.conf import settings
-from django.contrib.auth import get_user_model
-from django.core.mail import EmailMessage
 from django.db.models import Prefetch
 from django.shortcuts import redirect, render
 from django.urls import reverse
 
+from jobflick.pagination import paginate
+from jobflick.routers import replica_reads
+from jobs.fragments import listing_version
 from jobs.models import Job, JobApplication
-from userprofile.models import UserProfile
+from jobs.nearby import get_geo_backend, resolve_origin
+from jobs.search import get_search_backend
+from locations.services import area_ids_within, find_area
+from mailer.services import enqueue_email
+
+from .stats import (
+    TOTAL_APPLICATIONS,
+    TOTAL_COMPLETED,
+    TOTAL_JOBS,
+    TOTAL_USERS,
+    get_platform_stats,
+)
+
+
+# Job cards per home page, and how many of the nearest jobs ``?near=`` shows.
+HOME_JOB_CARDS = 6
 
-TOP_CITY_NAMES = ["Uttara", "Mirpur", "Banani", "Dhanmondi", "Gulshan", "Motijheel"]
 
 def _page_context(request):
     embed_mode = request.GET.get("embed") == "1"
     return {"hide_nav": embed_mode, "hide_footer": embed_mode}
 
 
+@replica_reads
 def home(request):
     if request.user.is_authenticated and not request.user.is_staff:
         return redirect('user-dashboard')
     base_jobs = Job.objects.filter(status=Job.Status.APPROVED).select_related("poster").order_by("-created_at")
-    location_filter = request.GET.get("location", "").strip()
+    location_filter = request.GET.get("area", "").strip() or request.GET.get("location", "").strip()
+    near_filter = request.GET.get("near", "").strip()
     profile = None
     if request.user.is_authenticated:
-        profile, _ = UserProfile.objects.get_or_create(user=request.user)
+        profile = request.profile
         jobs = base_jobs.prefetch_related(
             Prefetch(
                 "applications",
@@ -34,56 +51,40 @@ def home(request):
         )
     else:
         jobs = base_jobs
-    active_location = None
-    if location_filter:
-        jobs = jobs.filter(location__icontains=location_filter)
-        active_location = location_filter
+    area = find_area(location_filter) if location_filter else None
+    if area is not None:
+        jobs = jobs.filter(area_id__in=area_ids_within(area.id))
+        active_location = area.name
+    else:
+        jobs = get_search_backend().filter(jobs, location=location_filter)
+        active_location = location_filter or None
     apply_profile = profile or SimpleNamespace(has_active_subscription=False, wallet_balance=0)
-    all_locations = [
-        (loc or "").lower()
-        for loc in Job.objects.filter(status=Job.Status.APPROVED).values_list("location", flat=True)
-        if loc
-    ]
-    top_cities = [
-        {
-            "name": city,
-            "has_jobs": any(city.lower() in location for location in all_locations),
-        }
-        for city in TOP_CITY_NAMES
-    ]
-    page_size = 6
-    page = request.GET.get("page", "1")
-    try:
-        page = max(1, int(page))
-    except ValueError:
-        page = 1
-    total_jobs = jobs.count()
-    total_pages = max(1, (total_jobs + page_size - 1) // page_size)
-    page = min(page, total_pages)
-    start = (page - 1) * page_size
-    stop = page * page_size
-    job_cards = list(jobs[start:stop])
-    page_numbers = range(1, total_pages + 1)
-    featured_jobs = base_jobs[:6]
-    stats = {
-        "total_users": get_user_model().objects.count(),
-        "total_jobs": Job.objects.filter(status=Job.Status.APPROVED).count(),
-        "total_applications": JobApplication.objects.count(),
-        "total_completed": Job.objects.filter(status=Job.Status.APPROVED, is_filled=True).count(),
-    }
+    stats = get_platform_stats()
+    origin = resolve_origin(near_filter, profile) if near_filter else None
+    if origin is not None:
+        job_cards = get_geo_backend().nearest(
+            jobs, origin.latitude, origin.longitude, HOME_JOB_CARDS, total=stats[TOTAL_JOBS]
+        )
+    elif near_filter:
+        job_cards = []
+    else:
+        job_cards = paginate(request, jobs, per_page=HOME_JOB_CARDS)
+    featured_jobs = base_jobs[:HOME_JOB_CARDS]
     context = {
         "featured_jobs": featured_jobs,
         "job_cards": job_cards,
-        "page": page,
-        "page_numbers": page_numbers,
-        "total_pages": total_pages,
-        "total_jobs": total_jobs,
         "profile": profile,
         "apply_profile": apply_profile,
         "apply_redirect_path": reverse('job_list'),
-        "top_cities": top_cities,
+        "top_areas": stats["areas"],
+        "stats_version": stats["version"],
+        "listing_version": listing_version(),
         "active_location": active_location,
-        **stats,
+        "active_near": (origin.label if origin else near_filter) or None,
+        "total_users": stats[TOTAL_USERS],
+        "total_jobs": stats[TOTAL_JOBS],
+        "total_applications": stats[TOTAL_APPLICATIONS],
+        "total_completed": stats[TOTAL_COMPLETED],
     }
     return render(request, 'pages/home.html', context)
 
@@ -132,27 +133,12 @@ def contact(request):
 
             sender = getattr(settings, "DEFAULT_FROM_EMAIL", "no-reply@jobflick.com")
 
-            mail = EmailMessage(
-                subject=subject,
-                body=email_body,
-                from_email=sender,
-                to=[recipient],
-                reply_to=[email],
-            )
-
-            try:
-                mail.send(fail_silently=False)
-            except Exception:
-                context["contact_status"] = {
-                    "level": "error",
-                    "message": "We couldn't deliver your note just now. Please try again in a moment."
-                }
-            else:
-                context["contact_status"] = {
-                    "level": "success",
-                    "message": "Thanks! Your message is en route to the Jobflick inbox. We'll reply soon."
-                }
-                context["form_data"] = {"user_name": "", "user_email": "", "message": ""}
+            enqueue_email(subject, email_body, [recipient], from_email=sender, reply_to=[email])
+            context["contact_status"] = {
+                "level": "success",
+                "message": "Thanks! Your message is en route to the Jobflick inbox. We'll reply soon."
+            }
+            context["form_data"] = {"user_name": "", "user_email": "", "message": ""}
 
     return render(request, 'pages/contact.html', context)
 
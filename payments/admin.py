@@ -1,6 +1,7 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 
 from .models import WalletTransaction
+from .services import complete_transactions_bulk
 
 
 @admin.register(WalletTransaction)
@@ -17,3 +18,14 @@ class WalletTransactionAdmin(admin.ModelAdmin):
     list_filter = ("direction", "category", "status")
     search_fields = ("reference", "user__username", "user__email")
     readonly_fields = ("reference", "created_at", "processed_at")
+    actions = ["complete_selected"]
+
+    @admin.action(description="Mark selected transactions as completed")
+    def complete_selected(self, request, queryset):
+        pending = list(queryset.exclude(status=WalletTransaction.Status.COMPLETED).order_by("created_at", "pk"))
+        results = complete_transactions_bulk(pending, acting_user=request.user)
+        completed = sum(1 for result in results if result.ok)
+        self.message_user(request, f"{completed} transactions completed.", messages.SUCCESS)
+        for result in results:
+            if not result.ok:
+                self.message_user(request, f"{result.transaction.reference}: {result.error}", messages.ERROR)
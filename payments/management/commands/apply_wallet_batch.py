@@ -0,0 +1,106 @@
+import csv
+import json
+import sys
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from payments.models import WalletTransaction
+from payments.services import BulkRowResult, WalletInstruction, apply_wallet_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply a CSV or JSONL file of wallet transactions in one pass. Each row either names a "
+        "pending transaction by `reference` to settle it, or gives `user` (id, username or email), "
+        "`amount`, `direction`, and optionally `category`, `note` and `job`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSONL file; '-' reads CSV from stdin.")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension.")
+        parser.add_argument("--initiated-by", help="Username recorded as the initiator of every row.")
+        parser.add_argument("--dry-run", action="store_true", help="Report the outcome without committing it.")
+
+    def handle(self, *args, **options):
+        rows = self._read(options["path"], options["format"])
+        initiated_by = None
+        if options["initiated_by"]:
+            initiated_by = get_user_model().objects.filter(username=options["initiated_by"]).first()
+            if initiated_by is None:
+                raise CommandError(f"Unknown user {options['initiated_by']!r}.")
+
+        instructions, errors = self._instructions(rows)
+        with transaction.atomic():
+            applied = apply_wallet_batch([instruction for _, instruction in instructions], initiated_by=initiated_by)
+            if options["dry_run"]:
+                transaction.set_rollback(True)
+
+        results = dict(errors)
+        for (line, _), result in zip(instructions, applied):
+            results[line] = result
+        writer = csv.writer(self.stdout)
+        writer.writerow(["line", "status", "reference", "error"])
+        for line in sorted(results):
+            result = results[line]
+            reference = result.transaction.reference if result.transaction else ""
+            writer.writerow([line, "ok" if result.ok else "failed", reference, result.error])
+        succeeded = sum(1 for result in results.values() if result.ok)
+        summary = f"{succeeded} of {len(results)} rows applied"
+        self.stderr.write(f"{summary} (dry run, nothing committed)." if options["dry_run"] else f"{summary}.")
+
+    def _read(self, path, fmt):
+        fmt = fmt or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+        handle = sys.stdin if path == "-" else Path(path).open(newline="", encoding="utf-8")
+        with handle:
+            if fmt == "csv":
+                return list(csv.DictReader(handle))
+            return [json.loads(line) for line in handle if line.strip()]
+
+    def _instructions(self, rows):
+        """Resolve users and references in bulk; returns ``[(line, instruction)]`` and ``{line: error}``."""
+        User = get_user_model()
+        keys = {str(row.get("user", "")).strip() for row in rows if row.get("user")}
+        users = {}
+        if keys:
+            ids = [int(key) for key in keys if key.isdigit()]
+            for user in User.objects.filter(Q(pk__in=ids) | Q(username__in=keys) | Q(email__in=keys)):
+                users[str(user.pk)] = user
+                users[user.username] = user
+                users.setdefault(user.email, user)
+        references = [row["reference"] for row in rows if row.get("reference")]
+        pending = WalletTransaction.objects.in_bulk(references, field_name="reference") if references else {}
+
+        instructions, errors, first_seen = [], {}, {}
+        for line, row in enumerate(rows, start=1):
+            try:
+                if row.get("reference"):
+                    txn = pending.get(row["reference"])
+                    if txn is None:
+                        raise ValueError(f"Unknown transaction {row['reference']!r}.")
+                    if txn.pk in first_seen:
+                        raise ValueError(f"Transaction {row['reference']!r} is already settled by line {first_seen[txn.pk]}.")
+                    first_seen[txn.pk] = line
+                    instruction = WalletInstruction.settle(txn)
+                else:
+                    user = users.get(str(row.get("user", "")).strip())
+                    if user is None:
+                        raise ValueError(f"Unknown user {row.get('user')!r}.")
+                    instruction = WalletInstruction(
+                        user_id=user.pk,
+                        amount=int(row["amount"]),
+                        direction=row["direction"],
+                        category=row.get("category") or WalletTransaction.Category.OTHER,
+                        note=row.get("note") or "",
+                        job_id=int(row["job"]) if row.get("job") else None,
+                    )
+            except KeyError as exc:
+                errors[line] = BulkRowResult(line, error=f"Missing column {exc}.")
+            except (ValueError, TypeError) as exc:
+                errors[line] = BulkRowResult(line, error=str(exc))
+            else:
+                instructions.append((line, instruction))
+        return instructions, errors
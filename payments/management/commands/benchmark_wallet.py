@@ -0,0 +1,122 @@
+import random
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections
+from django.test import override_settings
+
+from jobflick.benchmarking import isolated_database, summarize
+from payments.models import PlatformWallet, PlatformWalletShard, WalletTransaction
+from payments.services import (
+    InsufficientBalanceError,
+    apply_wallet_transaction,
+    ensure_platform_shards,
+    sequence_platform_balances,
+)
+from userprofile.models import UserProfile
+
+# SQLite only allows one writer at a time; take the write lock up front and
+# wait for it instead of failing, the way a PostgreSQL row lock would.
+SQLITE_OPTIONS = {
+    "init_command": "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;",
+    "transaction_mode": "IMMEDIATE",
+    "timeout": 30,
+}
+
+
+class Command(BaseCommand):
+    help = "Run concurrent apply_wallet_transaction calls for several platform wallet shard counts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--ops", type=int, default=200, help="Transactions per thread.")
+        parser.add_argument("--users", type=int, default=64)
+        parser.add_argument("--shards", default="1,8", help="Comma-separated shard counts to compare.")
+        parser.add_argument("--payout-ratio", type=float, default=0.1, help="Share of operations that are payouts.")
+
+    def handle(self, *args, **options):
+        connection = connections["default"]
+        previous_options = connection.settings_dict.get("OPTIONS", {})
+        if connection.vendor == "sqlite":
+            connection.close()
+            connection.settings_dict["OPTIONS"] = {**previous_options, **SQLITE_OPTIONS}
+        try:
+            with isolated_database(file_based=True):
+                user_ids = self._seed(options["users"])
+                for shards in [int(value) for value in options["shards"].split(",") if value]:
+                    self._reset()
+                    with override_settings(JOBFLICK_PLATFORM_WALLET_SHARDS=shards):
+                        self._run(shards, user_ids, options)
+        finally:
+            connection.settings_dict["OPTIONS"] = previous_options
+
+    def _seed(self, count):
+        User = get_user_model()
+        users = User.objects.bulk_create([User(username=f"wallet-bench-{index}") for index in range(count)])
+        UserProfile.objects.bulk_create([UserProfile(user=user) for user in users])
+        return [user.pk for user in users]
+
+    def _reset(self):
+        WalletTransaction.objects.all().delete()
+        PlatformWalletShard.objects.all().delete()
+        PlatformWallet.objects.all().delete()
+        UserProfile.objects.update(wallet_balance=1_000_000)
+        ensure_platform_shards()
+
+    def _run(self, shards, user_ids, options):
+        User = get_user_model()
+        users = list(User.objects.filter(pk__in=user_ids))
+        samples, errors, lock = [], [], threading.Lock()
+
+        def worker(seed):
+            rng = random.Random(seed)
+            local = []
+            try:
+                for _ in range(options["ops"]):
+                    payout = rng.random() < options["payout_ratio"]
+                    started = time.perf_counter()
+                    try:
+                        apply_wallet_transaction(
+                            user=rng.choice(users),
+                            amount=rng.randint(1, 50),
+                            direction=(
+                                WalletTransaction.Direction.JOBFLICK_TO_USER
+                                if payout
+                                else WalletTransaction.Direction.USER_TO_JOBFLICK
+                            ),
+                            category=WalletTransaction.Category.PAYOUT if payout else WalletTransaction.Category.SUBSCRIPTION,
+                        )
+                    except InsufficientBalanceError:
+                        pass
+                    except OperationalError as exc:
+                        with lock:
+                            errors.append(exc)
+                        continue
+                    local.append(time.perf_counter() - started)
+            finally:
+                connections.close_all()
+            with lock:
+                samples.extend(local)
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(options["threads"])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        collected = self._total(WalletTransaction.Direction.USER_TO_JOBFLICK)
+        paid_out = self._total(WalletTransaction.Direction.JOBFLICK_TO_USER)
+        balance = PlatformWallet.current_balance()
+        consistent = balance == collected - paid_out == sequence_platform_balances().balance
+        self.stdout.write(
+            f"shards={shards:<3} threads={options['threads']} {len(samples) / elapsed:8.1f} tx/s  "
+            f"{summarize(samples)}  errors={len(errors)}  "
+            f"balance={'consistent' if consistent else f'DRIFT {balance} != {collected - paid_out}'}"
+        )
+
+    def _total(self, direction):
+        return sum(WalletTransaction.objects.filter(direction=direction).values_list("amount", flat=True))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from payments.models import PlatformWallet
+from payments.services import sequence_platform_balances
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill in the platform balance before/after of newly completed transactions and "
+        "carry the PlatformWallet row forward to their total."
+    )
+
+    def handle(self, *args, **options):
+        wallet = sequence_platform_balances()
+        self.stdout.write(self.style.SUCCESS(f"Jobflick balance: {wallet.balance} BDT"))
+        live = PlatformWallet.current_balance()
+        if live != wallet.balance:
+            self.stdout.write(f"Shards hold {live} BDT; transactions committed since are sequenced on the next run.")
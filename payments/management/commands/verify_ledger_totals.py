@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.totals import reconcile
+
+
+class Command(BaseCommand):
+    help = "Check the maintained ledger totals against the raw transaction and subscription ledgers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Rebuild the totals from the ledger if they drifted.")
+
+    def handle(self, *args, **options):
+        drift = reconcile(fix=options["fix"])
+        if not drift:
+            self.stdout.write("Ledger totals match the ledger.")
+            return
+        for (key, day), (stored, actual) in sorted(drift.items(), key=lambda item: (item[0][0], str(item[0][1]))):
+            self.stdout.write(
+                f"{key} {day or 'all time'}: stored {stored[0]} BDT/{stored[1]} rows, "
+                f"ledger {actual[0]} BDT/{actual[1]} rows"
+            )
+        if options["fix"]:
+            self.stdout.write(f"Rebuilt ledger totals ({len(drift)} buckets had drifted).")
+        else:
+            raise CommandError(f"{len(drift)} ledger total buckets drifted; rerun with --fix to rebuild.")
@@ -0,0 +1,81 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformWallet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('balance', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Jobflick wallet',
+                'verbose_name_plural': 'Jobflick wallet',
+            },
+        ),
+        migrations.CreateModel(
+            name='PlatformWalletShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot', models.PositiveSmallIntegerField(unique=True)),
+                ('balance', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['slot'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LedgerTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64)),
+                ('day', models.DateField(blank=True, null=True)),
+                ('slot', models.PositiveSmallIntegerField(default=0)),
+                ('amount', models.BigIntegerField(default=0)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('key', 'day', 'slot'), name='payments_ledgertotal_bucket_uniq'), models.UniqueConstraint(condition=models.Q(('day__isnull', True)), fields=('key', 'slot'), name='payments_ledgertotal_alltime_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='WalletTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reference', models.CharField(editable=False, max_length=20, unique=True)),
+                ('direction', models.CharField(choices=[('user_to_jobflick', 'User -> Jobflick'), ('jobflick_to_user', 'Jobflick -> User')], max_length=32)),
+                ('category', models.CharField(choices=[('subscription', 'Subscription'), ('service_fee', 'Service Fee'), ('top_up', 'Wallet Top-up'), ('payout', 'Payout'), ('refund', 'Refund'), ('other', 'Other')], default='other', max_length=32)),
+                ('amount', models.PositiveIntegerField()),
+                ('balance_before', models.PositiveIntegerField(blank=True, null=True)),
+                ('balance_after', models.PositiveIntegerField(blank=True, null=True)),
+                ('platform_balance_before', models.PositiveIntegerField(blank=True, null=True)),
+                ('platform_balance_after', models.PositiveIntegerField(blank=True, null=True)),
+                ('note', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=16)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('initiated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='initiated_wallet_transactions', to=settings.AUTH_USER_MODEL)),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='wallet_transactions', to='jobs.job')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='wallet_transactions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['-created_at', '-id'], name='payments_txn_created_idx'), models.Index(fields=['user', '-created_at', '-id'], name='payments_txn_user_created_idx'), models.Index(fields=['direction', 'status'], name='payments_txn_direction_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seed_platform_shards(apps, schema_editor):
+    # Until shards exist PlatformWallet.current_balance reads 0, so move the
+    # pre-sharding balance into slot 0 now rather than on the first wallet write.
+    PlatformWallet = apps.get_model("payments", "PlatformWallet")
+    PlatformWalletShard = apps.get_model("payments", "PlatformWalletShard")
+    using = schema_editor.connection.alias
+    shards = PlatformWalletShard.objects.using(using)
+    if shards.exists():
+        return
+    legacy = PlatformWallet.objects.using(using).filter(pk=1).values_list("balance", flat=True).first() or 0
+    count = max(1, getattr(settings, "JOBFLICK_PLATFORM_WALLET_SHARDS", 8))
+    shards.bulk_create(
+        [PlatformWalletShard(slot=slot, balance=legacy if slot == 0 else 0) for slot in range(count)]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='wallettransaction',
+            index=models.Index(condition=models.Q(('platform_balance_before__isnull', True), ('status', 'completed')), fields=['processed_at', 'id'], name='payments_txn_unsequenced_idx'),
+        ),
+        migrations.RunPython(seed_platform_shards, migrations.RunPython.noop),
+    ]
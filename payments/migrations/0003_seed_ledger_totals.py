@@ -0,0 +1,68 @@
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+# Frozen copy of the metric keys in payments.totals at the time of writing.
+DIRECTION_KEYS = {"jobflick_to_user": "payout", "user_to_jobflick": "collection"}
+
+
+def seed_ledger_totals(apps, schema_editor):
+    # The admin dashboard reads its totals from LedgerTotal only, so build them
+    # from the ledger that existed before the totals were maintained. Like
+    # ``reconcile(fix=True)``, everything goes into slot 0.
+    LedgerTotal = apps.get_model("payments", "LedgerTotal")
+    WalletTransaction = apps.get_model("payments", "WalletTransaction")
+    SubscriptionLedgerEntry = apps.get_model("adminpanel", "SubscriptionLedgerEntry")
+    using = schema_editor.connection.alias
+    if LedgerTotal.objects.using(using).exists():
+        return
+
+    computed = defaultdict(lambda: [0, 0])
+
+    def add(keys, day, total, entries):
+        for key in keys:
+            for bucket in ((key, None), (key, day)):
+                computed[bucket][0] += total
+                computed[bucket][1] += entries
+
+    completed = (
+        WalletTransaction.objects.using(using)
+        .filter(status="completed")
+        .order_by()
+        .annotate(day=TruncDate(Coalesce("processed_at", "created_at")))
+        .values_list("direction", "category", "day")
+        .annotate(total=Sum("amount"), entries=Count("id"))
+    )
+    for direction, category, day, total, entries in completed:
+        add([DIRECTION_KEYS[direction], f"category:{category}"], day, total, entries)
+    subscriptions = (
+        SubscriptionLedgerEntry.objects.using(using)
+        .order_by()
+        .annotate(day=TruncDate("created_at"))
+        .values_list("plan", "day")
+        .annotate(total=Sum("amount"), entries=Count("id"))
+    )
+    for plan, day, total, entries in subscriptions:
+        add(["subscription", f"plan:{plan}"], day, total, entries)
+
+    LedgerTotal.objects.using(using).bulk_create(
+        [
+            LedgerTotal(key=key, day=day, slot=0, amount=amount, count=count)
+            for (key, day), (amount, count) in computed.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminpanel', '0001_initial'),
+        ('payments', '0002_platform_wallet_shards'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_ledger_totals, migrations.RunPython.noop),
+    ]
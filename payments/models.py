@@ -1,7 +1,17 @@
 from django.conf import settings
 from django.db import models
 from django.utils import timezone
-from django.utils.crypto import get_random_string
+
+from jobflick.identifiers import assign_codes, next_code
+
+REFERENCE_PREFIX = "TX"
+
+
+class WalletTransactionQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        assign_codes(objs, "reference", REFERENCE_PREFIX, using=self.db)
+        return super().bulk_create(objs, *args, **kwargs)
 
 
 class WalletTransaction(models.Model):
@@ -48,6 +58,9 @@ class WalletTransaction(models.Model):
     amount = models.PositiveIntegerField()
     balance_before = models.PositiveIntegerField(null=True, blank=True)
     balance_after = models.PositiveIntegerField(null=True, blank=True)
+    # The platform total before and after this transaction, chaining row to
+    # row in ledger order. Writes leave them empty so that collections only
+    # lock their own wallet shard; ``sequence_platform_balances`` fills them in.
     platform_balance_before = models.PositiveIntegerField(null=True, blank=True)
     platform_balance_after = models.PositiveIntegerField(null=True, blank=True)
     note = models.CharField(max_length=255, blank=True)
@@ -55,8 +68,20 @@ class WalletTransaction(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     processed_at = models.DateTimeField(null=True, blank=True)
 
+    objects = WalletTransactionQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="payments_txn_created_idx"),
+            models.Index(fields=["user", "-created_at", "-id"], name="payments_txn_user_created_idx"),
+            models.Index(fields=["direction", "status"], name="payments_txn_direction_idx"),
+            models.Index(
+                fields=["processed_at", "id"],
+                condition=models.Q(status="completed", platform_balance_before__isnull=True),
+                name="payments_txn_unsequenced_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.reference} ({self.user})"
@@ -68,7 +93,7 @@ class WalletTransaction(models.Model):
 
     @staticmethod
     def _generate_reference() -> str:
-        return f"TX-{get_random_string(8).upper()}"
+        return next_code(REFERENCE_PREFIX)
 
     @property
     def is_credit(self) -> bool:
@@ -94,6 +119,14 @@ class WalletTransaction(models.Model):
 
 
 class PlatformWallet(models.Model):
+    """The Jobflick balance as of the last sequenced transaction.
+
+    The live balance is striped across ``PlatformWalletShard`` rows so that
+    unrelated transactions do not queue on one row lock. This row is where
+    ``payments.services.sequence_platform_balances`` continues the
+    ``platform_balance_before/after`` chain from.
+    """
+
     balance = models.PositiveIntegerField(default=0)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -114,5 +147,46 @@ class PlatformWallet(models.Model):
 
     @classmethod
     def current_balance(cls) -> int:
-        wallet = cls.objects.order_by("pk").first()
-        return wallet.balance if wallet else 0
+        return PlatformWalletShard.objects.aggregate(total=models.Sum("balance"))["total"] or 0
+
+
+class PlatformWalletShard(models.Model):
+    """One stripe of the Jobflick balance; the platform balance is the sum of all slots."""
+
+    slot = models.PositiveSmallIntegerField(unique=True)
+    balance = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["slot"]
+
+    def __str__(self) -> str:
+        return f"Jobflick wallet shard {self.slot}: {self.balance} BDT"
+
+
+class LedgerTotal(models.Model):
+    """Running amount and count for one ledger metric, maintained by ``payments.totals``.
+
+    ``day`` is null for the all-time total and a local date for daily
+    buckets. Like the platform wallet, each metric is striped across
+    ``slot`` rows so concurrent writers rarely touch the same row.
+    """
+
+    key = models.CharField(max_length=64)
+    day = models.DateField(null=True, blank=True)
+    slot = models.PositiveSmallIntegerField(default=0)
+    amount = models.BigIntegerField(default=0)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["key", "day", "slot"], name="payments_ledgertotal_bucket_uniq"),
+            models.UniqueConstraint(
+                fields=["key", "slot"],
+                condition=models.Q(day__isnull=True),
+                name="payments_ledgertotal_alltime_uniq",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.key} {self.day or 'all time'}: {self.amount} BDT"
@@ -2,10 +2,13 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
-from django.db import transaction as db_transaction
+from django.conf import settings
+from django.db import IntegrityError, connections, router, transaction as db_transaction
+from django.db.models import Sum
 from django.utils import timezone
 
-from .models import PlatformWallet, WalletTransaction
+from .models import PlatformWallet, PlatformWalletShard, WalletTransaction
+from .totals import record_transactions
 
 
 class InsufficientBalanceError(Exception):
@@ -38,7 +41,7 @@ def apply_wallet_transaction(*, user, amount: int, direction: str, category: str
         profile, _ = UserProfile.objects.select_for_update().get_or_create(user=user)
         balance_before = profile.wallet_balance
         balance_after = _calculate_balance(balance_before, amount, direction)
-        platform_balance_before, platform_balance_after = _update_platform_balance(amount, direction)
+        _update_platform_balance(amount, direction, user_id=user.pk)
         profile.wallet_balance = balance_after
         profile.save(update_fields=["wallet_balance"])
         txn = WalletTransaction.objects.create(
@@ -50,12 +53,11 @@ def apply_wallet_transaction(*, user, amount: int, direction: str, category: str
             amount=amount,
             balance_before=balance_before,
             balance_after=balance_after,
-            platform_balance_before=platform_balance_before,
-            platform_balance_after=platform_balance_after,
             status=WalletTransaction.Status.COMPLETED,
             processed_at=timezone.now(),
             note=note,
         )
+        record_transactions([txn])
     return TransactionResult(transaction=txn, balance_before=balance_before, balance_after=balance_after)
 
 
@@ -72,13 +74,11 @@ def mark_transaction_completed(transaction: WalletTransaction, acting_user=None)
         profile, _ = UserProfile.objects.select_for_update().get_or_create(user=transaction.user)
         balance_before = profile.wallet_balance
         balance_after = _calculate_balance(balance_before, transaction.amount, transaction.direction)
-        platform_balance_before, platform_balance_after = _update_platform_balance(transaction.amount, transaction.direction)
+        _update_platform_balance(transaction.amount, transaction.direction, user_id=transaction.user_id)
         profile.wallet_balance = balance_after
         profile.save(update_fields=["wallet_balance"])
         transaction.balance_before = balance_before
         transaction.balance_after = balance_after
-        transaction.platform_balance_before = platform_balance_before
-        transaction.platform_balance_after = platform_balance_after
         transaction.status = WalletTransaction.Status.COMPLETED
         transaction.processed_at = timezone.now()
         if acting_user and not transaction.initiated_by:
@@ -86,12 +86,11 @@ def mark_transaction_completed(transaction: WalletTransaction, acting_user=None)
         transaction.save(update_fields=[
             "balance_before",
             "balance_after",
-            "platform_balance_before",
-            "platform_balance_after",
             "status",
             "processed_at",
             "initiated_by",
         ])
+        record_transactions([transaction])
     return TransactionResult(transaction=transaction, balance_before=balance_before, balance_after=balance_after)
 
 
@@ -103,14 +102,393 @@ def _calculate_balance(balance_before: int, amount: int, direction: str) -> int:
     return balance_before + amount
 
 
-def _update_platform_balance(amount: int, direction: str) -> tuple[int, int]:
-    wallet = PlatformWallet.load(for_update=True)
-    balance_before = wallet.balance
+def shard_count() -> int:
+    return max(1, getattr(settings, "JOBFLICK_PLATFORM_WALLET_SHARDS", 8))
+
+
+def ensure_platform_shards() -> None:
+    """Create any missing shard rows.
+
+    Migration 0002 creates the shards; this only runs when
+    JOBFLICK_PLATFORM_WALLET_SHARDS is raised later. The first time shards
+    are created, slot 0 takes over the balance held by the pre-sharding
+    ``PlatformWallet`` row.
+    """
+    count = shard_count()
+    existing = set(PlatformWalletShard.objects.values_list("slot", flat=True))
+    if len(existing) >= count and existing.issuperset(range(count)):
+        return
+    try:
+        with db_transaction.atomic():
+            seed = 0 if existing else PlatformWallet.load(for_update=True).balance
+            PlatformWalletShard.objects.bulk_create(
+                [
+                    PlatformWalletShard(slot=slot, balance=seed if slot == 0 else 0)
+                    for slot in range(count)
+                    if slot not in existing
+                ]
+            )
+    except IntegrityError:
+        # Another process created the shards first.
+        pass
+
+
+def _lock_all_shards() -> list[PlatformWalletShard]:
+    shards = list(PlatformWalletShard.objects.select_for_update().order_by("slot"))
+    if len(shards) < shard_count():
+        ensure_platform_shards()
+        shards = list(PlatformWalletShard.objects.select_for_update().order_by("slot"))
+    return shards
+
+
+def _update_platform_balance(amount: int, direction: str, *, user_id: int) -> None:
+    """Apply ``amount`` to the platform balance.
+
+    Collections lock only the shard the user maps to, so payments from
+    different users commit in parallel. Payouts must see the whole balance:
+    they lock every shard in slot order (the same order everywhere, so they
+    cannot deadlock) and drain the fullest shards first. The platform
+    balance columns of the transaction are filled in later by
+    ``sequence_platform_balances``.
+    """
+    shards = PlatformWalletShard.objects.select_for_update()
     if direction == WalletTransaction.Direction.USER_TO_JOBFLICK:
-        wallet.balance = balance_before + amount
-    else:
-        if wallet.balance < amount:
-            raise InsufficientBalanceError("Jobflick does not have enough balance for this payout.")
-        wallet.balance = balance_before - amount
-    wallet.save(update_fields=["balance", "updated_at"])
-    return balance_before, wallet.balance
+        slot = user_id % shard_count()
+        try:
+            shard = shards.get(slot=slot)
+        except PlatformWalletShard.DoesNotExist:
+            ensure_platform_shards()
+            shard = shards.get(slot=slot)
+        shard.balance += amount
+        shard.save(update_fields=["balance", "updated_at"])
+        return
+    locked = _lock_all_shards()
+    if sum(shard.balance for shard in locked) < amount:
+        raise InsufficientBalanceError("Jobflick does not have enough balance for this payout.")
+    remaining = amount
+    touched = []
+    for shard in sorted(locked, key=lambda shard: shard.balance, reverse=True):
+        if not remaining:
+            break
+        taken = min(shard.balance, remaining)
+        shard.balance -= taken
+        shard.updated_at = timezone.now()
+        remaining -= taken
+        touched.append(shard)
+    PlatformWalletShard.objects.bulk_update(touched, ["balance", "updated_at"])
+
+
+# ---------- Bulk API ----------
+
+BULK_CHUNK_SIZE = 500
+
+
+@dataclass(frozen=True)
+class WalletInstruction:
+    """One row of a bulk wallet batch.
+
+    Set ``transaction`` to settle an existing pending ``WalletTransaction``;
+    otherwise a completed transaction is created from the other fields.
+    """
+
+    user_id: int
+    amount: int
+    direction: str
+    category: str = WalletTransaction.Category.OTHER
+    note: str = ""
+    job_id: int | None = None
+    transaction: WalletTransaction | None = None
+
+    @classmethod
+    def settle(cls, transaction: WalletTransaction) -> "WalletInstruction":
+        return cls(
+            user_id=transaction.user_id,
+            amount=transaction.amount,
+            direction=transaction.direction,
+            category=transaction.category,
+            note=transaction.note,
+            job_id=transaction.job_id,
+            transaction=transaction,
+        )
+
+
+@dataclass(frozen=True)
+class BulkRowResult:
+    index: int
+    transaction: WalletTransaction | None = None
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+
+def _chunks(items, size: int = BULK_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _lock_profiles(user_ids):
+    """Lock the profiles of ``user_ids`` in ascending user order, creating missing ones."""
+    from userprofile.models import UserProfile
+
+    ordered = sorted(user_ids)
+    existing = set()
+    for chunk in _chunks(ordered):
+        existing.update(UserProfile.objects.filter(user_id__in=chunk).values_list("user_id", flat=True))
+    missing = [user_id for user_id in ordered if user_id not in existing]
+    if missing:
+        UserProfile.objects.bulk_create([UserProfile(user_id=user_id) for user_id in missing], ignore_conflicts=True)
+    balances = {}
+    for chunk in _chunks(ordered):
+        balances.update(
+            UserProfile.objects.select_for_update()
+            .filter(user_id__in=chunk)
+            .order_by("user_id")
+            .values_list("user_id", "wallet_balance")
+        )
+    return balances
+
+
+def _update_int_columns(model, key_field: str, rows, fields) -> None:
+    """Write integer ``fields`` for many rows with one ``UPDATE ... CASE`` per chunk.
+
+    ``rows`` is a list of ``(key, {field: value})``. A hand-written simple
+    ``CASE key WHEN ...`` keeps statement building linear, unlike the
+    per-row expression resolution of ``QuerySet.bulk_update``. Values must
+    be non-null integers so the statement is portable across backends.
+    """
+    opts = model._meta
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    key_column = quote(opts.get_field(key_field).column)
+    with connection.cursor() as cursor:
+        for chunk in _chunks(rows):
+            assignments, params = [], []
+            for name in fields:
+                params.extend(value for key, values in chunk for value in (key, int(values[name])))
+                whens = " ".join(["WHEN %s THEN %s"] * len(chunk))
+                assignments.append(f"{quote(opts.get_field(name).column)} = CASE {key_column} {whens} END")
+            params.extend(key for key, _ in chunk)
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(
+                f"UPDATE {quote(opts.db_table)} SET {', '.join(assignments)} WHERE {key_column} IN ({placeholders})",
+                params,
+            )
+
+
+def _lock_pending(valid, results):
+    """Re-read the transactions ``valid`` settles under a lock, keeping only pending ones.
+
+    Settle instructions are rebuilt from the locked rows, so amounts and
+    owners come from the database rather than the caller's copies.
+    """
+    ids = sorted(instruction.transaction.pk for _, instruction in valid if instruction.transaction is not None)
+    pending = {}
+    for chunk in _chunks(ids):
+        pending.update(
+            (txn.pk, txn)
+            for txn in WalletTransaction.objects.select_for_update()
+            .filter(pk__in=chunk, status=WalletTransaction.Status.PENDING)
+            .order_by("pk")
+        )
+    kept = []
+    for index, instruction in valid:
+        if instruction.transaction is None:
+            kept.append((index, instruction))
+        elif instruction.transaction.pk in pending:
+            kept.append((index, WalletInstruction.settle(pending[instruction.transaction.pk])))
+        else:
+            results[index] = BulkRowResult(index, instruction.transaction, "Transaction is not pending.")
+    return kept
+
+
+def _drop_unknown_references(valid, results):
+    """Fail rows whose user or job does not exist, checking all ids in bulk."""
+    from django.contrib.auth import get_user_model
+
+    from jobs.models import Job
+
+    def existing(model, ids):
+        found = set()
+        for chunk in _chunks(sorted(ids)):
+            found.update(model.objects.filter(pk__in=chunk).values_list("pk", flat=True))
+        return found
+
+    users = existing(get_user_model(), {instruction.user_id for _, instruction in valid})
+    jobs = existing(Job, {instruction.job_id for _, instruction in valid if instruction.job_id is not None})
+    kept = []
+    for index, instruction in valid:
+        if instruction.user_id not in users:
+            results[index] = BulkRowResult(index, instruction.transaction, f"Unknown user {instruction.user_id!r}.")
+        elif instruction.job_id is not None and instruction.job_id not in jobs:
+            results[index] = BulkRowResult(index, instruction.transaction, f"Unknown job {instruction.job_id!r}.")
+        else:
+            kept.append((index, instruction))
+    return kept
+
+
+def apply_wallet_batch(instructions, *, initiated_by=None) -> list[BulkRowResult]:
+    """Apply many wallet instructions in one transaction.
+
+    Profiles are locked once, in user order, and the platform shards once, in
+    slot order, so concurrent batches and single transactions cannot deadlock.
+    Transactions to settle are re-read under a row lock and only those still
+    pending are applied, so a stale copy or a repeated row cannot credit twice.
+    Rows naming an unknown direction, category, user or job fail on their
+    own. Rows are then evaluated in input order against running balances; a row
+    that would overdraw the user or the platform fails with the
+    ``InsufficientBalanceError`` message and the others still apply. Balances
+    are written back with one ``CASE`` update per chunk, new ledger rows are
+    inserted with ``bulk_create`` and settled ones updated in chunks.
+    """
+    instructions = list(instructions)
+    results: list[BulkRowResult | None] = [None] * len(instructions)
+    valid, seen = [], set()
+    for index, instruction in enumerate(instructions):
+        if instruction.amount <= 0:
+            results[index] = BulkRowResult(index, instruction.transaction, "Amount must be positive.")
+        elif instruction.direction not in WalletTransaction.Direction.values:
+            results[index] = BulkRowResult(index, instruction.transaction, f"Unknown direction {instruction.direction!r}.")
+        elif instruction.category not in WalletTransaction.Category.values:
+            results[index] = BulkRowResult(index, instruction.transaction, f"Unknown category {instruction.category!r}.")
+        elif instruction.transaction is not None and instruction.transaction.pk in seen:
+            results[index] = BulkRowResult(index, instruction.transaction, "Transaction appears more than once in this batch.")
+        else:
+            if instruction.transaction is not None:
+                seen.add(instruction.transaction.pk)
+            valid.append((index, instruction))
+    if not valid:
+        return results
+
+    with db_transaction.atomic():
+        valid = _drop_unknown_references(_lock_pending(valid, results), results)
+        balances = _lock_profiles({instruction.user_id for _, instruction in valid})
+        shards = _lock_all_shards()
+        platform_total = sum(shard.balance for shard in shards)
+        slots = shard_count()
+        by_slot = {shard.slot: shard for shard in shards}
+        now = timezone.now()
+        created, settled, changed_users = [], [], set()
+
+        for index, instruction in valid:
+            user_before = balances[instruction.user_id]
+            try:
+                user_after = _calculate_balance(user_before, instruction.amount, instruction.direction)
+                if instruction.direction == WalletTransaction.Direction.JOBFLICK_TO_USER:
+                    if platform_total < instruction.amount:
+                        raise InsufficientBalanceError("Jobflick does not have enough balance for this payout.")
+                    remaining = instruction.amount
+                    for shard in sorted(shards, key=lambda shard: shard.balance, reverse=True):
+                        taken = min(shard.balance, remaining)
+                        shard.balance -= taken
+                        remaining -= taken
+                        if not remaining:
+                            break
+                    platform_after = platform_total - instruction.amount
+                else:
+                    by_slot[instruction.user_id % slots].balance += instruction.amount
+                    platform_after = platform_total + instruction.amount
+            except InsufficientBalanceError as exc:
+                results[index] = BulkRowResult(index, instruction.transaction, str(exc))
+                continue
+            txn = instruction.transaction or WalletTransaction(
+                user_id=instruction.user_id,
+                job_id=instruction.job_id,
+                direction=instruction.direction,
+                category=instruction.category,
+                amount=instruction.amount,
+                note=instruction.note,
+            )
+            txn.balance_before = user_before
+            txn.balance_after = user_after
+            txn.status = WalletTransaction.Status.COMPLETED
+            txn.processed_at = now
+            if initiated_by and not txn.initiated_by_id:
+                txn.initiated_by = initiated_by
+            (settled if instruction.transaction else created).append(txn)
+            balances[instruction.user_id] = user_after
+            platform_total = platform_after
+            changed_users.add(instruction.user_id)
+            results[index] = BulkRowResult(index, txn)
+
+        from userprofile.models import UserProfile
+        from userprofile.profiles import invalidate_profiles
+
+        _update_int_columns(
+            UserProfile,
+            "user",
+            [(user_id, {"wallet_balance": balances[user_id]}) for user_id in sorted(changed_users)],
+            ["wallet_balance"],
+        )
+        invalidate_profiles(changed_users)
+        for shard in shards:
+            shard.updated_at = now
+        PlatformWalletShard.objects.bulk_update(shards, ["balance", "updated_at"])
+        WalletTransaction.objects.bulk_create(created, batch_size=BULK_CHUNK_SIZE)
+        _update_int_columns(
+            WalletTransaction,
+            "id",
+            [
+                (
+                    txn.pk,
+                    {
+                        "balance_before": txn.balance_before,
+                        "balance_after": txn.balance_after,
+                    },
+                )
+                for txn in settled
+            ],
+            ["balance_before", "balance_after"],
+        )
+        settled_ids = [txn.pk for txn in settled]
+        for chunk in _chunks(settled_ids):
+            WalletTransaction.objects.filter(pk__in=chunk, status=WalletTransaction.Status.PENDING).update(
+                status=WalletTransaction.Status.COMPLETED, processed_at=now
+            )
+            if initiated_by:
+                WalletTransaction.objects.filter(pk__in=chunk, initiated_by__isnull=True).update(
+                    initiated_by=initiated_by
+                )
+        record_transactions(created + settled)
+    return results
+
+
+def complete_transactions_bulk(transactions, *, acting_user=None) -> list[BulkRowResult]:
+    """Settle many pending transactions in one pass (see ``apply_wallet_batch``)."""
+    return apply_wallet_batch(
+        [WalletInstruction.settle(transaction) for transaction in transactions],
+        initiated_by=acting_user,
+    )
+
+
+def sequence_platform_balances(*, batch_size: int = BULK_CHUNK_SIZE) -> PlatformWallet:
+    """Fill in ``platform_balance_before/after`` for completed transactions that lack them.
+
+    Unsequenced rows are chained in ``(processed_at, id)`` order from the
+    balance stored on the ``PlatformWallet`` row, which then moves on to the
+    new total; the wallet row lock keeps two runs from chaining the same
+    rows. The chain never goes below zero: a payout locks every shard, so
+    each collection it could spend had committed, and taken an earlier
+    ``processed_at``, before the payout started. Once every committed
+    transaction is sequenced the stored balance equals the sum of the
+    shards.
+    """
+    unsequenced = WalletTransaction.objects.filter(
+        status=WalletTransaction.Status.COMPLETED, platform_balance_before__isnull=True
+    ).order_by("processed_at", "id")
+    while True:
+        with db_transaction.atomic():
+            wallet = PlatformWallet.load(for_update=True)
+            batch = list(unsequenced.values_list("id", "direction", "amount")[:batch_size])
+            if not batch:
+                return wallet
+            balance = wallet.balance
+            rows = []
+            for pk, direction, amount in batch:
+                after = balance - amount if direction == WalletTransaction.Direction.JOBFLICK_TO_USER else balance + amount
+                rows.append((pk, {"platform_balance_before": balance, "platform_balance_after": after}))
+                balance = after
+            _update_int_columns(WalletTransaction, "id", rows, ["platform_balance_before", "platform_balance_after"])
+            wallet.balance = balance
+            wallet.save(update_fields=["balance", "updated_at"])
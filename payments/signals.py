@@ -0,0 +1,19 @@
+"""Signal receivers for the payments app."""
+
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from adminpanel.models import SubscriptionLedgerEntry
+
+from . import totals
+from .models import WalletTransaction
+
+
+@receiver(post_delete, sender=WalletTransaction)
+def transaction_deleted(sender, instance, **kwargs):
+    totals.forget_transactions([instance])
+
+
+@receiver(post_delete, sender=SubscriptionLedgerEntry)
+def subscription_entry_deleted(sender, instance, **kwargs):
+    totals.forget_subscription_entries([instance])
@@ -0,0 +1,205 @@
+import os
+from importlib import import_module
+from io import StringIO
+from tempfile import NamedTemporaryFile
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from adminpanel.models import SubscriptionLedgerEntry
+from userprofile.models import UserProfile
+
+from .models import LedgerTotal, PlatformWallet, PlatformWalletShard, WalletTransaction
+from .services import (
+    InsufficientBalanceError,
+    WalletInstruction,
+    apply_wallet_batch,
+    apply_wallet_transaction,
+    complete_transactions_bulk,
+    create_pending_transaction,
+    mark_transaction_completed,
+    sequence_platform_balances,
+    shard_count,
+)
+from .totals import compute_from_ledger, reconcile, record_subscription_entries, stored_totals, totals
+
+Direction = WalletTransaction.Direction
+Category = WalletTransaction.Category
+
+
+def create_member(username, balance=0):
+    user = get_user_model().objects.create_user(username, f"{username}@example.com", "pass")
+    UserProfile.objects.create(user=user, wallet_balance=balance)
+    return user
+
+
+class PlatformWalletTests(TestCase):
+    def test_migration_seeds_the_shards_from_the_legacy_balance(self):
+        self.assertEqual(PlatformWalletShard.objects.count(), shard_count())
+        PlatformWalletShard.objects.all().delete()
+        PlatformWallet.objects.update_or_create(pk=1, defaults={"balance": 700})
+        migration = import_module("payments.migrations.0002_platform_wallet_shards")
+        migration.seed_platform_shards(apps, SimpleNamespace(connection=connection))
+        self.assertEqual(PlatformWallet.current_balance(), 700)
+        self.assertEqual(PlatformWalletShard.objects.get(slot=0).balance, 700)
+
+    def test_collections_and_payouts_keep_the_striped_total(self):
+        payers = [create_member(f"payer-{index}", balance=1000) for index in range(3)]
+        for payer in payers:
+            apply_wallet_transaction(user=payer, amount=300, direction=Direction.USER_TO_JOBFLICK, category=Category.SERVICE_FEE)
+        self.assertEqual(PlatformWallet.current_balance(), 900)
+        self.assertGreater(PlatformWalletShard.objects.filter(balance__gt=0).count(), 1)
+        payee = create_member("payee")
+        apply_wallet_transaction(user=payee, amount=700, direction=Direction.JOBFLICK_TO_USER, category=Category.PAYOUT)
+        self.assertEqual(PlatformWallet.current_balance(), 200)
+        self.assertEqual(UserProfile.objects.get(user=payee).wallet_balance, 700)
+
+    def test_sequencing_chains_the_platform_balance_row_to_row(self):
+        PlatformWallet.objects.update_or_create(pk=1, defaults={"balance": 50})
+        PlatformWalletShard.objects.filter(slot=0).update(balance=50)
+        payers = [create_member(f"payer-{index}", balance=1000) for index in range(3)]
+        for payer in payers:
+            apply_wallet_transaction(user=payer, amount=300, direction=Direction.USER_TO_JOBFLICK, category=Category.SERVICE_FEE)
+        payee = create_member("payee")
+        apply_wallet_transaction(user=payee, amount=700, direction=Direction.JOBFLICK_TO_USER, category=Category.PAYOUT)
+        pending = create_pending_transaction(user=payers[0], amount=100, direction=Direction.USER_TO_JOBFLICK, category=Category.TOP_UP)
+        ledger = WalletTransaction.objects.order_by("processed_at", "id")
+        self.assertEqual(set(ledger.values_list("platform_balance_before", flat=True)), {None})
+
+        self.assertEqual(sequence_platform_balances().balance, 250)
+        chain = list(ledger.filter(status=WalletTransaction.Status.COMPLETED).values_list("platform_balance_before", "platform_balance_after"))
+        self.assertEqual(chain, [(50, 350), (350, 650), (650, 950), (950, 250)])
+        self.assertEqual(PlatformWallet.current_balance(), 250)
+
+        mark_transaction_completed(pending)
+        self.assertEqual(sequence_platform_balances().balance, 350)
+        pending.refresh_from_db()
+        self.assertEqual((pending.platform_balance_before, pending.platform_balance_after), (250, 350))
+
+    def test_payouts_cannot_overdraw_the_platform(self):
+        payee = create_member("payee")
+        with self.assertRaises(InsufficientBalanceError):
+            apply_wallet_transaction(user=payee, amount=1, direction=Direction.JOBFLICK_TO_USER, category=Category.PAYOUT)
+        self.assertEqual(UserProfile.objects.get(user=payee).wallet_balance, 0)
+        self.assertFalse(WalletTransaction.objects.exists())
+
+
+class BulkSettlementTests(TestCase):
+    def setUp(self):
+        self.payer = create_member("bulk-payer", balance=1000)
+        self.pending = create_pending_transaction(
+            user=self.payer, amount=300, direction=Direction.USER_TO_JOBFLICK, category=Category.SERVICE_FEE
+        )
+
+    def balance(self):
+        return UserProfile.objects.get(user=self.payer).wallet_balance
+
+    def test_a_repeated_transaction_settles_once(self):
+        results = complete_transactions_bulk([self.pending, self.pending])
+        self.assertEqual([result.ok for result in results], [True, False])
+        self.assertEqual(results[1].error, "Transaction appears more than once in this batch.")
+        self.assertEqual(self.balance(), 700)
+        self.assertEqual(PlatformWallet.current_balance(), 300)
+
+    def test_a_stale_copy_does_not_settle_again(self):
+        stale = WalletTransaction.objects.get(pk=self.pending.pk)
+        self.assertTrue(complete_transactions_bulk([self.pending])[0].ok)
+        self.assertEqual(stale.status, WalletTransaction.Status.PENDING)
+        [result] = complete_transactions_bulk([stale])
+        self.assertEqual(result.error, "Transaction is not pending.")
+        self.assertEqual(self.balance(), 700)
+        self.assertEqual(PlatformWallet.current_balance(), 300)
+
+    def test_rows_that_overdraw_fail_and_the_rest_apply(self):
+        second = create_pending_transaction(
+            user=self.payer, amount=800, direction=Direction.USER_TO_JOBFLICK, category=Category.SERVICE_FEE
+        )
+        results = complete_transactions_bulk([self.pending, second])
+        self.assertEqual([result.ok for result in results], [True, False])
+        self.assertEqual(results[1].error, "Insufficient wallet balance for this payment.")
+        second.refresh_from_db()
+        self.assertEqual(second.status, WalletTransaction.Status.PENDING)
+        self.assertEqual(self.balance(), 700)
+
+    def test_rows_naming_unknown_users_jobs_or_categories_fail_alone(self):
+        fee = {"amount": 100, "direction": Direction.USER_TO_JOBFLICK, "category": Category.SERVICE_FEE}
+        results = apply_wallet_batch(
+            [
+                WalletInstruction(user_id=self.payer.pk + 1000, **fee),
+                WalletInstruction(user_id=self.payer.pk, job_id=987654, **fee),
+                WalletInstruction(user_id=self.payer.pk, amount=100, direction=Direction.USER_TO_JOBFLICK, category="bribe"),
+                WalletInstruction(user_id=self.payer.pk, **fee),
+            ]
+        )
+        self.assertEqual(
+            [result.error for result in results],
+            [f"Unknown user {self.payer.pk + 1000}.", "Unknown job 987654.", "Unknown category 'bribe'.", ""],
+        )
+        self.assertEqual(self.balance(), 900)
+        self.assertEqual(WalletTransaction.objects.filter(status=WalletTransaction.Status.COMPLETED).count(), 1)
+
+    def test_command_reports_unknown_jobs_per_row(self):
+        with NamedTemporaryFile("w", suffix=".csv", delete=False) as handle:
+            handle.write(f"user,amount,direction,job\n{self.payer.pk},50,user_to_jobflick,987654\n{self.payer.pk},50,user_to_jobflick,\n")
+        self.addCleanup(os.unlink, handle.name)
+        out, err = StringIO(), StringIO()
+        call_command("apply_wallet_batch", handle.name, stdout=out, stderr=err)
+        self.assertIn("Unknown job 987654.", out.getvalue())
+        self.assertIn("1 of 2 rows applied", err.getvalue())
+        self.assertEqual(self.balance(), 950)
+
+    def test_command_reports_repeated_references(self):
+        with NamedTemporaryFile("w", suffix=".csv", delete=False) as handle:
+            handle.write(f"reference\n{self.pending.reference}\n{self.pending.reference}\n")
+        self.addCleanup(os.unlink, handle.name)
+        out, err = StringIO(), StringIO()
+        call_command("apply_wallet_batch", handle.name, stdout=out, stderr=err)
+        self.assertIn("already settled by line 1", out.getvalue())
+        self.assertIn("1 of 2 rows applied", err.getvalue())
+        self.assertEqual(self.balance(), 700)
+
+
+class LedgerTotalTests(TestCase):
+    def setUp(self):
+        self.member = create_member("ledger-member", balance=5000)
+        for amount in (300, 200):
+            apply_wallet_transaction(user=self.member, amount=amount, direction=Direction.USER_TO_JOBFLICK, category=Category.SERVICE_FEE)
+        apply_wallet_transaction(user=self.member, amount=100, direction=Direction.JOBFLICK_TO_USER, category=Category.PAYOUT)
+        entry = SubscriptionLedgerEntry.objects.create(user=self.member, plan="one_month", amount=150, wallet_before=5000)
+        record_subscription_entries([entry])
+
+    def test_writes_keep_the_totals_in_step_with_the_ledger(self):
+        self.assertEqual(
+            totals(),
+            {"collection": 500, "category:service_fee": 500, "payout": 100, "category:payout": 100, "subscription": 150, "plan:one_month": 150},
+        )
+        self.assertEqual(stored_totals(), compute_from_ledger())
+        self.assertEqual(reconcile(), {})
+
+    def test_reconcile_reports_and_rebuilds_drift(self):
+        LedgerTotal.objects.filter(key="collection", day__isnull=True).update(amount=1)
+        drift = reconcile()
+        self.assertEqual(drift, {("collection", None): ((1, 2), (500, 2))})
+        self.assertEqual(reconcile(fix=True), drift)
+        self.assertEqual(reconcile(), {})
+        self.assertEqual(totals(["collection"]), {"collection": 500})
+
+    def test_deleting_ledger_rows_takes_them_out_of_the_totals(self):
+        other = create_member("ledger-other", balance=1000)
+        apply_wallet_transaction(user=other, amount=400, direction=Direction.USER_TO_JOBFLICK, category=Category.SERVICE_FEE)
+        WalletTransaction.objects.filter(user=other).delete()
+        self.assertEqual(totals(["collection"]), {"collection": 500})
+        self.member.delete()
+        self.assertEqual(set(totals().values()), {0})
+        self.assertEqual(reconcile(), {})
+
+    def test_migration_seeds_totals_from_the_existing_ledger(self):
+        LedgerTotal.objects.all().delete()
+        migration = import_module("payments.migrations.0003_seed_ledger_totals")
+        migration.seed_ledger_totals(apps, SimpleNamespace(connection=connection))
+        self.assertEqual(stored_totals(), compute_from_ledger())
+        self.assertEqual(totals(["payout", "subscription"]), {"payout": 100, "subscription": 150})
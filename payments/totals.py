@@ -0,0 +1,230 @@
+"""Incrementally maintained ledger totals for the admin dashboard.
+
+Every completed ``WalletTransaction`` and every ``SubscriptionLedgerEntry``
+adds its amount to a few ``LedgerTotal`` metrics, both all-time and for
+its local day:
+
+- ``payout`` and ``collection``, by direction;
+- ``category:<name>``;
+- ``subscription`` and ``plan:<name>``, by subscription plan.
+
+The additions happen inside the same atomic block that writes the ledger
+row (see ``payments.services`` and ``userprofile.views.subscription_view``).
+Deleted ledger rows, including those removed by a user deletion's cascade,
+are subtracted again by the receivers in ``payments.signals``.
+Reading a total therefore costs one small grouped query, whatever the
+ledger size. ``reconcile`` recomputes everything from the raw ledger, for
+the ``verify_ledger_totals`` command.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import LedgerTotal, WalletTransaction
+
+PAYOUT = "payout"
+COLLECTION = "collection"
+SUBSCRIPTION = "subscription"
+CATEGORY_PREFIX = "category:"
+PLAN_PREFIX = "plan:"
+
+DIRECTION_KEYS = {
+    WalletTransaction.Direction.JOBFLICK_TO_USER: PAYOUT,
+    WalletTransaction.Direction.USER_TO_JOBFLICK: COLLECTION,
+}
+
+
+def category_key(category: str) -> str:
+    return f"{CATEGORY_PREFIX}{category}"
+
+
+def plan_key(plan: str) -> str:
+    return f"{PLAN_PREFIX}{plan}"
+
+
+def _slot(user_id: int) -> int:
+    from .services import shard_count
+
+    return user_id % shard_count()
+
+
+def _add(deltas, keys, day, amount: int, count: int = 1) -> None:
+    for key in keys:
+        for bucket in ((key, None), (key, day)):
+            deltas[bucket][0] += amount
+            deltas[bucket][1] += count
+
+
+def adjust(deltas, *, slot: int = 0) -> None:
+    """Add ``{(key, day): [amount, count]}`` to the totals in ``slot``.
+
+    Must run inside the transaction that writes the ledger rows. Buckets are
+    updated in sorted order so concurrent writers cannot deadlock.
+    """
+    ordered = sorted(deltas.items(), key=lambda item: (item[0][0], item[0][1] is not None, item[0][1] or 0))
+    for (key, day), (amount, count) in ordered:
+        if not (amount or count):
+            continue
+        bucket = LedgerTotal.objects.filter(key=key, day=day, slot=slot)
+        changes = {"amount": F("amount") + amount, "count": F("count") + count}
+        if bucket.update(**changes):
+            continue
+        try:
+            with transaction.atomic():
+                LedgerTotal.objects.create(key=key, day=day, slot=slot, amount=amount, count=count)
+        except IntegrityError:
+            bucket.update(**changes)
+
+
+def transaction_keys(direction: str, category: str) -> list[str]:
+    return [DIRECTION_KEYS[direction], category_key(category)]
+
+
+def _transaction_deltas(transactions, sign: int):
+    per_slot = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+    for txn in transactions:
+        if txn.status != WalletTransaction.Status.COMPLETED:
+            continue
+        day = timezone.localdate(txn.processed_at or txn.created_at or timezone.now())
+        _add(per_slot[_slot(txn.user_id)], transaction_keys(txn.direction, txn.category), day, sign * txn.amount, sign)
+    return per_slot
+
+
+def _subscription_deltas(entries, sign: int):
+    per_slot = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+    for entry in entries:
+        day = timezone.localdate(entry.created_at or timezone.now())
+        _add(per_slot[_slot(entry.user_id)], [SUBSCRIPTION, plan_key(entry.plan)], day, sign * entry.amount, sign)
+    return per_slot
+
+
+def _apply(per_slot) -> None:
+    for slot in sorted(per_slot):
+        adjust(per_slot[slot], slot=slot)
+
+
+def record_transactions(transactions) -> None:
+    """Count completed ``transactions`` into the totals (call within their atomic block)."""
+    _apply(_transaction_deltas(transactions, 1))
+
+
+def forget_transactions(transactions) -> None:
+    """Take deleted completed ``transactions`` back out of the totals."""
+    _apply(_transaction_deltas(transactions, -1))
+
+
+def record_subscription_entries(entries) -> None:
+    """Count new ``SubscriptionLedgerEntry`` rows into the totals."""
+    _apply(_subscription_deltas(entries, 1))
+
+
+def forget_subscription_entries(entries) -> None:
+    """Take deleted ``SubscriptionLedgerEntry`` rows back out of the totals."""
+    _apply(_subscription_deltas(entries, -1))
+
+
+def totals(keys=None) -> dict[str, int]:
+    """All-time amount per metric, summed over slots."""
+    rows = LedgerTotal.objects.filter(day__isnull=True)
+    if keys is not None:
+        rows = rows.filter(key__in=keys)
+    return dict(rows.order_by().values_list("key").annotate(total=Sum("amount")))
+
+
+def totals_with_counts(keys) -> dict[str, tuple[int, int]]:
+    """All-time ``(amount, count)`` per metric in ``keys``, summed over slots."""
+    rows = (
+        LedgerTotal.objects.filter(key__in=keys, day__isnull=True)
+        .order_by()
+        .values_list("key")
+        .annotate(total=Sum("amount"), entries=Sum("count"))
+    )
+    return {key: (total, entries) for key, total, entries in rows}
+
+
+def daily_totals(key: str, *, days: int = 30) -> list[tuple]:
+    """``(day, amount, count)`` for ``key`` over the last ``days`` local days, oldest first."""
+    since = timezone.localdate() - timedelta(days=days - 1)
+    return list(
+        LedgerTotal.objects.filter(key=key, day__gte=since)
+        .order_by("day")
+        .values_list("day")
+        .annotate(total=Sum("amount"), entries=Sum("count"))
+    )
+
+
+def compute_from_ledger() -> dict[tuple, tuple[int, int]]:
+    """Recompute ``{(key, day): (amount, count)}`` from the raw ledger tables."""
+    from adminpanel.models import SubscriptionLedgerEntry
+
+    computed = defaultdict(lambda: [0, 0])
+    completed = (
+        WalletTransaction.objects.filter(status=WalletTransaction.Status.COMPLETED)
+        .order_by()
+        .annotate(day=TruncDate(Coalesce("processed_at", "created_at")))
+        .values_list("direction", "category", "day")
+        .annotate(total=Sum("amount"), entries=Count("id"))
+    )
+    for direction, category, day, total, entries in completed:
+        for key in transaction_keys(direction, category):
+            for bucket in ((key, None), (key, day)):
+                computed[bucket][0] += total
+                computed[bucket][1] += entries
+    subscriptions = (
+        SubscriptionLedgerEntry.objects.order_by()
+        .annotate(day=TruncDate("created_at"))
+        .values_list("plan", "day")
+        .annotate(total=Sum("amount"), entries=Count("id"))
+    )
+    for plan, day, total, entries in subscriptions:
+        for key in (SUBSCRIPTION, plan_key(plan)):
+            for bucket in ((key, None), (key, day)):
+                computed[bucket][0] += total
+                computed[bucket][1] += entries
+    return {bucket: tuple(values) for bucket, values in computed.items()}
+
+
+def stored_totals() -> dict[tuple, tuple[int, int]]:
+    return {
+        (key, day): (amount, count)
+        for key, day, amount, count in LedgerTotal.objects.order_by()
+        .values_list("key", "day")
+        .annotate(total=Sum("amount"), entries=Sum("count"))
+    }
+
+
+def reconcile(*, fix: bool = False) -> dict[tuple, tuple]:
+    """Compare the totals with the raw ledger.
+
+    Returns ``{(key, day): (stored, actual)}`` for every bucket that
+    differs, where each side is an ``(amount, count)`` pair. With ``fix``
+    the totals are rebuilt from the ledger, all in slot 0.
+    """
+    with transaction.atomic():
+        if fix:
+            # Lock the totals so no writer commits between the scan and the rebuild.
+            list(LedgerTotal.objects.select_for_update().values_list("pk"))
+        actual = compute_from_ledger()
+        stored = stored_totals()
+        drift = {
+            bucket: (stored.get(bucket, (0, 0)), actual.get(bucket, (0, 0)))
+            for bucket in stored.keys() | actual.keys()
+            if stored.get(bucket, (0, 0)) != actual.get(bucket, (0, 0))
+        }
+        if fix and drift:
+            LedgerTotal.objects.all().delete()
+            LedgerTotal.objects.bulk_create(
+                [
+                    LedgerTotal(key=key, day=day, slot=0, amount=amount, count=count)
+                    for (key, day), (amount, count) in actual.items()
+                ],
+                batch_size=1000,
+            )
+    return drift
@@ -0,0 +1,87 @@
+"""Turning free-text skill lists into canonical skill keys.
+
+``canonical_key`` folds case, Unicode width and spacing so that "React JS",
+"react-js" and "ＲＥＡＣＴ ＪＳ" compare equal. ``SYNONYMS`` maps the spellings
+members commonly use to one canonical skill name; anything else becomes a
+skill of its own the first time it is seen, and staff can merge it later by
+adding an alias in the admin.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+
+# Separators between skills in ``Job.skills`` / ``UserProfile.skills``.
+SEPARATORS = re.compile(r"[,;\n\r\t|]+")
+SPACING = re.compile(r"[\s_\-]+")
+# Punctuation that carries meaning inside a skill name: C++, C#, Node.js.
+EDGE_PUNCTUATION = "\"'`.:!?()[]{}*•·"
+
+MAX_LENGTH = 100
+
+SYNONYMS = {
+    "JavaScript": ["js", "java script", "javascript es6", "es6"],
+    "TypeScript": ["ts"],
+    "React": ["reactjs", "react js", "react.js"],
+    "Node.js": ["node", "nodejs", "node js"],
+    "Vue.js": ["vue", "vuejs", "vue js"],
+    "Python": ["py", "python3"],
+    "Django": ["django framework"],
+    "PostgreSQL": ["postgres", "psql"],
+    "HTML": ["html5"],
+    "CSS": ["css3"],
+    "UI Design": ["ui", "ui designer", "user interface design"],
+    "UX Design": ["ux", "ux designer", "user experience design"],
+    "Graphic Design": ["graphics design", "graphic designer"],
+    "Microsoft Excel": ["excel", "ms excel"],
+    "Data Entry": ["data entry operator"],
+    "Electrical Wiring": ["wiring", "house wiring", "electric wiring"],
+    "Plumbing": ["plumber", "plumbing work"],
+    "Driving": ["driver", "car driving", "ড্রাইভিং"],
+    "Cooking": ["cook", "chef", "রান্না"],
+    "Cleaning": ["cleaner", "house cleaning"],
+    "Painting": ["painter", "wall painting"],
+    "Carpentry": ["carpenter", "wood work", "woodwork"],
+    "Tutoring": ["tutor", "home tutor", "teaching"],
+    "Communication": ["communication skills"],
+    "Bangla": ["bengali", "বাংলা"],
+    "English": ["spoken english", "english speaking"],
+}
+
+
+def canonical_key(name: str) -> str:
+    """Return the comparison key of one skill name ("" when nothing is left)."""
+    name = unicodedata.normalize("NFKC", name).casefold()
+    name = SPACING.sub(" ", name).strip(f" {EDGE_PUNCTUATION}")
+    return name[:MAX_LENGTH]
+
+
+def clean_name(name: str) -> str:
+    """Tidy the display form of a skill that has no canonical name yet."""
+    name = " ".join(unicodedata.normalize("NFKC", name).split()).strip(EDGE_PUNCTUATION)
+    return name[:MAX_LENGTH]
+
+
+def split_skills(text: str) -> list[str]:
+    """Split a comma-separated skill list, dropping blanks and repeated skills."""
+    names = {}
+    for part in SEPARATORS.split(text or ""):
+        key = canonical_key(part)
+        if key:
+            names.setdefault(SYNONYM_KEYS.get(key, key), clean_name(part))
+    return list(names.values())
+
+
+def _synonym_keys() -> dict[str, str]:
+    keys = {}
+    for name, aliases in SYNONYMS.items():
+        target = canonical_key(name)
+        for alias in [name, *aliases]:
+            keys[canonical_key(alias)] = target
+    return keys
+
+
+# Canonical key of every bundled spelling -> canonical key of its skill.
+SYNONYM_KEYS = _synonym_keys()
+CANONICAL_NAMES = {canonical_key(name): name for name in SYNONYMS}
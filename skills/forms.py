@@ -0,0 +1,19 @@
+from .services import canonical_text, sync_skills
+
+
+class SkillsFormMixin:
+    """``ModelForm`` mixin that writes a ``skills`` field both ways.
+
+    The text column is saved in canonical spelling and ``skill_link_model``
+    rows are written with the form's many-to-many data, so views that call
+    ``save(commit=False)`` must follow up with ``form.save_m2m()``.
+    """
+
+    skill_link_model = None
+
+    def clean_skills(self):
+        return canonical_text(self.cleaned_data["skills"])
+
+    def _save_m2m(self):
+        super()._save_m2m()
+        sync_skills([self.instance], self.skill_link_model, using=self.instance._state.db or "default")
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from jobs.models import Job
+from skills.models import JobSkill, ProfileSkill
+from skills.services import sync_skills
+from userprofile.models import UserProfile
+
+TARGETS = {
+    "jobs": (Job, JobSkill),
+    "profiles": (UserProfile, ProfileSkill),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Parse the comma-separated skills of existing jobs and profiles into the skill "
+        "tables, in primary key order and one transaction per batch. Safe to rerun."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--only", choices=sorted(TARGETS), help="Backfill just jobs or just profiles.")
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        for label, (model, link_model) in TARGETS.items():
+            if options["only"] and options["only"] != label:
+                continue
+            rows = model.objects.using(using).order_by("pk").only("pk", "skills")
+            processed = links = 0
+            last_pk = 0
+            while True:
+                batch = list(rows.filter(pk__gt=last_pk)[: options["batch_size"]])
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+                links += sync_skills(batch, link_model, using=using)
+                processed += len(batch)
+            self.stdout.write(self.style.SUCCESS(f"{label}: {processed} rows, {links} skill links written."))
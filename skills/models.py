@@ -0,0 +1,61 @@
+from django.db import models
+
+
+class Skill(models.Model):
+    """One canonical skill; every spelling of it resolves here through ``SkillAlias``."""
+
+    name = models.CharField(max_length=100)
+    key = models.CharField(max_length=100, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class SkillAlias(models.Model):
+    """A canonicalized spelling (``skills.canonical.canonical_key``) of a skill."""
+
+    alias = models.CharField(max_length=100, unique=True)
+    skill = models.ForeignKey(Skill, related_name="aliases", on_delete=models.CASCADE)
+
+    class Meta:
+        verbose_name_plural = "skill aliases"
+
+    def __str__(self) -> str:
+        return f"{self.alias} -> {self.skill}"
+
+
+class JobSkill(models.Model):
+    job = models.ForeignKey("jobs.Job", related_name="job_skills", on_delete=models.CASCADE)
+    skill = models.ForeignKey(Skill, related_name="job_links", on_delete=models.CASCADE)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["job", "skill"], name="skills_jobskill_unique"),
+        ]
+        indexes = [
+            # "Jobs requiring <skill>" walks this index instead of the job table.
+            models.Index(fields=["skill", "job"], name="skills_jobskill_skill_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.job_id}: {self.skill_id}"
+
+
+class ProfileSkill(models.Model):
+    profile = models.ForeignKey("userprofile.UserProfile", related_name="profile_skills", on_delete=models.CASCADE)
+    skill = models.ForeignKey(Skill, related_name="profile_links", on_delete=models.CASCADE)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["profile", "skill"], name="skills_profileskill_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["skill", "profile"], name="skills_profileskill_skill_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.profile_id}: {self.skill_id}"
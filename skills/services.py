@@ -0,0 +1,109 @@
+"""Resolving skill names to ``Skill`` rows and keeping the through tables in sync.
+
+``Job.skills`` and ``UserProfile.skills`` stay the text the member typed
+(in canonical spelling); ``JobSkill`` and ``ProfileSkill`` hold the same
+list as indexed rows. Forms write both (``skills.forms.SkillsFormMixin``)
+and ``manage.py backfill_skills`` fills the tables for existing rows.
+"""
+
+from __future__ import annotations
+
+from django.db import transaction
+
+from .canonical import CANONICAL_NAMES, SYNONYM_KEYS, canonical_key, split_skills
+from .models import JobSkill, ProfileSkill, Skill, SkillAlias
+
+# Through model -> name of its owner foreign key.
+LINK_FIELDS = {JobSkill: "job", ProfileSkill: "profile"}
+
+
+def resolve(names, *, create: bool = True, using: str = "default") -> dict[str, Skill]:
+    """Map the canonical key of each name to its ``Skill``.
+
+    Unknown names become new skills (with their spelling registered as an
+    alias) when ``create`` is true and are left out otherwise.
+    """
+    targets = {}
+    for name in names:
+        key = canonical_key(name)
+        if key:
+            targets.setdefault(key, (SYNONYM_KEYS.get(key, key), name))
+    if not targets:
+        return {}
+    lookup = set(targets) | {target for target, _ in targets.values()}
+    aliases = dict(SkillAlias.objects.using(using).filter(alias__in=lookup).values_list("alias", "skill_id"))
+    missing = {
+        target: name
+        for key, (target, name) in targets.items()
+        if key not in aliases and target not in aliases
+    }
+    by_key = {}
+    if missing:
+        if create:
+            Skill.objects.using(using).bulk_create(
+                [Skill(name=CANONICAL_NAMES.get(target, name), key=target) for target, name in missing.items()],
+                ignore_conflicts=True,
+            )
+        by_key = dict(Skill.objects.using(using).filter(key__in=missing).values_list("key", "pk"))
+    resolved = {}
+    for key, (target, _) in targets.items():
+        skill_id = aliases.get(key, aliases.get(target, by_key.get(target)))
+        if skill_id is not None:
+            resolved[key] = skill_id
+    if create:
+        # Register new spellings so the next lookup is a single alias hit.
+        SkillAlias.objects.using(using).bulk_create(
+            [
+                SkillAlias(alias=alias, skill_id=resolved[key])
+                for key, (target, _) in targets.items()
+                for alias in {key, target}
+                if alias not in aliases
+            ],
+            ignore_conflicts=True,
+        )
+    skills = Skill.objects.using(using).in_bulk(set(resolved.values()))
+    return {key: skills[skill_id] for key, skill_id in resolved.items()}
+
+
+def find_skill(name: str, *, using: str = "default") -> Skill | None:
+    """The existing skill ``name`` spells, if any."""
+    return resolve([name], create=False, using=using).get(canonical_key(name))
+
+
+def canonical_text(text: str, *, using: str = "default") -> str:
+    """Rewrite a skill list with known skills in their canonical spelling."""
+    names = split_skills(text)
+    known = resolve(names, create=False, using=using)
+    spelled = []
+    for name in names:
+        key = canonical_key(name)
+        if key in known:
+            spelled.append(known[key].name)
+        else:
+            spelled.append(CANONICAL_NAMES.get(SYNONYM_KEYS.get(key, key), name))
+    return ", ".join(spelled)
+
+
+def sync_skills(owners, link_model, *, using: str = "default") -> int:
+    """Make ``link_model`` rows match the ``skills`` text of each owner; returns links written."""
+    owner_field = f"{LINK_FIELDS[link_model]}_id"
+    names = {owner.pk: split_skills(owner.skills) for owner in owners}
+    if not names:
+        return 0
+    skills = resolve([name for owner_names in names.values() for name in owner_names], using=using)
+    wanted = {
+        (owner_id, skills[canonical_key(name)].pk)
+        for owner_id, owner_names in names.items()
+        for name in owner_names
+    }
+    links = link_model.objects.using(using)
+    with transaction.atomic(using=using):
+        existing = set(links.filter(**{f"{owner_field}__in": names}).values_list(owner_field, "skill_id"))
+        stale = {}
+        for owner_id, skill_id in existing - wanted:
+            stale.setdefault(owner_id, []).append(skill_id)
+        for owner_id, skill_ids in stale.items():
+            links.filter(**{owner_field: owner_id, "skill_id__in": skill_ids}).delete()
+        added = [link_model(**{owner_field: owner_id, "skill_id": skill_id}) for owner_id, skill_id in wanted - existing]
+        links.bulk_create(added, ignore_conflicts=True)
+    return len(added)
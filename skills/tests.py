@@ -0,0 +1,70 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from jobs.models import Job
+
+from .canonical import canonical_key, split_skills
+from .models import JobSkill, Skill, SkillAlias
+from .services import canonical_text, find_skill, sync_skills
+
+
+class CanonicalTests(SimpleTestCase):
+    def test_spellings_fold_to_one_key(self):
+        self.assertEqual({canonical_key(name) for name in ("React JS", "react-js", "ＲＥＡＣＴ ＪＳ", " react_js. ")}, {"react js"})
+        self.assertEqual(canonical_key("C++"), "c++")
+
+    def test_split_drops_blanks_and_repeats_of_the_same_skill(self):
+        self.assertEqual(split_skills("React JS, reactjs;; wiring,\nHouse Wiring | C#"), ["React JS", "wiring", "C#"])
+
+
+class SkillLinkTests(TestCase):
+    def setUp(self):
+        self.poster = get_user_model().objects.create_user("skills-poster", "skills@example.com", "pass")
+
+    def create_job(self, skills):
+        return Job.objects.create(
+            poster=self.poster,
+            work_title="Help needed",
+            worker_type="Helper",
+            duration="1 day",
+            amount=500,
+            location="Dhaka",
+            skills=skills,
+            status=Job.Status.APPROVED,
+        )
+
+    def linked(self, job):
+        return set(JobSkill.objects.filter(job=job).values_list("skill__name", flat=True))
+
+    def test_known_skills_get_their_canonical_spelling(self):
+        self.assertEqual(canonical_text("reactjs, house wiring, Welding"), "React, Electrical Wiring, Welding")
+
+    def test_sync_adds_and_removes_links(self):
+        job = self.create_job("wiring, Welding")
+        self.assertEqual(sync_skills([job], JobSkill), 2)
+        self.assertEqual(self.linked(job), {"Electrical Wiring", "Welding"})
+        job.skills = "Electric wiring, Plumber"
+        self.assertEqual(sync_skills([job], JobSkill), 1)
+        self.assertEqual(self.linked(job), {"Electrical Wiring", "Plumbing"})
+        self.assertEqual(Skill.objects.filter(key="electrical wiring").count(), 1)
+
+    def test_aliases_added_by_staff_merge_new_spellings(self):
+        welding = Skill.objects.create(name="Welding", key="welding")
+        SkillAlias.objects.create(alias="arc welding", skill=welding)
+        self.assertEqual(find_skill("Arc-Welding"), welding)
+        self.assertIsNone(find_skill("glass blowing"))
+        self.assertFalse(Skill.objects.filter(key="glass blowing").exists())
+
+    def test_backfill_is_rerunnable_and_feeds_the_skill_filter(self):
+        wiring = self.create_job("House wiring")
+        self.create_job("Cooking")
+        for expected in ("jobs: 2 rows, 2 skill links written.", "jobs: 2 rows, 0 skill links written."):
+            out = StringIO()
+            call_command("backfill_skills", only="jobs", batch_size=1, stdout=out)
+            self.assertIn(expected, out.getvalue())
+        self.client.force_login(get_user_model().objects.create_user("skills-member", "member@example.com", "pass"))
+        response = self.client.get("/jobs/", {"skill": "electric wiring"})
+        self.assertEqual([job.pk for job in response.context["jobs"]], [wiring.pk])
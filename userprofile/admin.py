@@ -1,11 +1,34 @@
+from django import forms
 from django.contrib import admin
-from .models import Notification, UserProfile
+
+from skills.forms import SkillsFormMixin
+from skills.models import ProfileSkill
+
+from .models import GroupNotification, Notification, NotificationEvent, UserProfile
+
+
+class UserProfileAdminForm(SkillsFormMixin, forms.ModelForm):
+	skill_link_model = ProfileSkill
+
+	class Meta:
+		model = UserProfile
+		fields = "__all__"
 
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
-	list_display = ("user", "display_name", "wallet_balance", "subscription_plan", "subscription_expires_at")
+	form = UserProfileAdminForm
+	list_display = (
+		"user",
+		"display_name",
+		"wallet_balance",
+		"subscription_plan",
+		"subscription_status",
+		"subscription_expires_at",
+	)
+	list_filter = ("subscription_status", "subscription_plan")
 	search_fields = ("user__username", "display_name")
+	readonly_fields = ("subscription_status", "subscription_reminder_sent_for")
 
 
 @admin.register(Notification)
@@ -13,3 +36,17 @@ class NotificationAdmin(admin.ModelAdmin):
 	list_display = ("user", "message", "is_read", "created_at")
 	list_filter = ("is_read", "created_at")
 	search_fields = ("user__username", "message")
+
+
+@admin.register(GroupNotification)
+class GroupNotificationAdmin(admin.ModelAdmin):
+	list_display = ("audience", "message", "created_at")
+	list_filter = ("audience", "created_at")
+	search_fields = ("message",)
+
+
+@admin.register(NotificationEvent)
+class NotificationEventAdmin(admin.ModelAdmin):
+	list_display = ("id", "kind", "status", "attempts", "available_at", "delivered_at")
+	list_filter = ("kind", "status")
+	readonly_fields = ("claim_token", "claimed_at", "delivered_at", "last_error", "created_at")
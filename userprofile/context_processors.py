@@ -1,6 +1,9 @@
+from .counters import group_unread_count, unread_count
+
+
 def unread_notifications(request):
     if request.user.is_authenticated:
-        count = request.user.notifications.filter(is_read=False).count()
+        count = unread_count(request.user.pk) + group_unread_count(request.user)
     else:
         count = 0
     return {"unread_notifications_count": count}
@@ -0,0 +1,149 @@
+"""Per-user unread notification counters.
+
+``NotificationCounter`` rows are the source of truth. The ``Notification``
+signal receivers and ``bulk_create`` adjust them with ``F()`` updates;
+``NotificationQuerySet.update`` recounts the users it touched. Reads go through
+``jobflick.versioned_cache`` so rendering the unread badge costs no query on a
+warm cache, and a write's invalidation reaches every worker because that
+cache must be shared (``settings_production`` refuses locmem).
+
+Staff also count the ``GroupNotification`` rows they can see and have not
+dismissed (``group_unread_count``), cached per user and invalidated for
+every staff member when a group notification is added or removed.
+"""
+
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from jobflick import versioned_cache
+
+from .models import GroupNotification, Notification, NotificationCounter
+
+CACHE_TIMEOUT = 600
+
+
+def cache_key(user_id: int) -> str:
+    return f"userprofile:unread:{user_id}"
+
+
+def adjust_unread(deltas, *, using: str = "default") -> None:
+    """Apply ``{user_id: delta}`` to the counters and drop their cached values on commit.
+
+    Users without a counter row are skipped: the row is seeded from the
+    notifications table the next time the count is read.
+    """
+    changed = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not changed:
+        return
+    for user_id, delta in changed.items():
+        NotificationCounter.objects.using(using).filter(user_id=user_id).update(unread=F("unread") + delta)
+    keys = [cache_key(user_id) for user_id in changed]
+    transaction.on_commit(lambda: versioned_cache.invalidate(keys), using=using)
+
+
+def recount_unread(user_ids, *, using: str = "default") -> None:
+    """Set the counters of ``user_ids`` from the notifications table.
+
+    The counter rows are locked before counting, so a concurrent change for
+    the same users either committed first and is counted, or waits and
+    applies its own delta afterwards.
+    """
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return
+    counters = NotificationCounter.objects.using(using)
+    with transaction.atomic(using=using):
+        list(counters.select_for_update().filter(user_id__in=user_ids).order_by("user_id").values_list("pk"))
+        counts = dict(
+            Notification.objects.using(using)
+            .filter(user_id__in=user_ids, is_read=False)
+            .order_by()
+            .values_list("user_id")
+            .annotate(total=Count("id"))
+        )
+        for user_id in user_ids:
+            counters.filter(user_id=user_id).update(unread=counts.get(user_id, 0))
+    keys = [cache_key(user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: versioned_cache.invalidate(keys), using=using)
+
+
+def _seed_counter(user_id: int) -> int:
+    unread = Notification.objects.filter(user_id=user_id, is_read=False).count()
+    try:
+        with transaction.atomic():
+            NotificationCounter.objects.create(user_id=user_id, unread=unread)
+    except IntegrityError:
+        return NotificationCounter.objects.values_list("unread", flat=True).get(user_id=user_id)
+    return unread
+
+
+def unread_count(user_id: int) -> int:
+    """Return the unread count from cache, falling back to the counter row."""
+    key = cache_key(user_id)
+    unread, token = versioned_cache.get(key)
+    if unread is not None:
+        return unread
+    unread = NotificationCounter.objects.filter(user_id=user_id).values_list("unread", flat=True).first()
+    if unread is None:
+        unread = _seed_counter(user_id)
+    unread = max(unread, 0)
+    versioned_cache.store(key, unread, token, CACHE_TIMEOUT)
+    return unread
+
+
+def group_cache_key(user_id: int) -> str:
+    return f"userprofile:group-unread:{user_id}"
+
+
+def group_unread_count(user) -> int:
+    """Return how many group notifications ``user`` can see and has not dismissed."""
+    if not user.is_staff:
+        return 0
+    key = group_cache_key(user.pk)
+    count, token = versioned_cache.get(key)
+    if count is None:
+        count = GroupNotification.visible_to(user).count()
+        versioned_cache.store(key, count, token, CACHE_TIMEOUT)
+    return count
+
+
+def invalidate_group_unread(user_ids=None, *, using: str = "default") -> None:
+    """Invalidate the cached group counts of ``user_ids``, or of every staff member, on commit."""
+
+    def invalidate():
+        ids = user_ids
+        if ids is None:
+            ids = get_user_model().objects.using(using).filter(is_staff=True).values_list("pk", flat=True)
+        versioned_cache.invalidate([group_cache_key(user_id) for user_id in ids])
+
+    transaction.on_commit(invalidate, using=using)
+
+
+def rebuild_unread_counters(*, batch_size: int = 1000) -> int:
+    """Recompute every user's counter from the notifications table; returns users processed."""
+    user_ids = get_user_model().objects.order_by("pk").values_list("pk", flat=True)
+    processed = 0
+    last_pk = 0
+    while True:
+        batch = list(user_ids.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return processed
+        last_pk = batch[-1]
+        counts = dict(
+            Notification.objects.filter(user_id__in=batch, is_read=False)
+            .order_by()
+            .values_list("user_id")
+            .annotate(total=Count("id"))
+        )
+        with transaction.atomic():
+            NotificationCounter.objects.bulk_create(
+                [NotificationCounter(user_id=user_id, unread=counts.get(user_id, 0)) for user_id in batch],
+                update_conflicts=True,
+                unique_fields=["user"],
+                update_fields=["unread"],
+            )
+        versioned_cache.invalidate([cache_key(user_id) for user_id in batch])
+        processed += len(batch)
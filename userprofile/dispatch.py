@@ -0,0 +1,212 @@
+"""Durable, batched delivery of notifications.
+
+Callers enqueue ``NotificationEvent`` rows, which is a single insert inside
+whatever transaction they hold. Once that transaction commits, the events
+are fanned out into ``Notification`` rows in batches: in the request thread,
+in a background thread, or by the ``deliver_notifications`` worker, according
+to ``settings.JOBFLICK_NOTIFICATION_DELIVERY``.
+
+Staff events are either copied into one ``Notification`` per active staff
+account (``JOBFLICK_STAFF_NOTIFICATIONS = "fanout"``) or stored once as a
+``GroupNotification`` that every staff member reads (``"group"``).
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from jobflick import background
+
+from .counters import invalidate_group_unread
+from .models import GroupNotification, Notification, NotificationEvent
+
+logger = logging.getLogger(__name__)
+
+FANOUT = "fanout"
+GROUP = "group"
+
+BATCH_SIZE = 200
+MAX_ATTEMPTS = 5
+# A claimed batch whose worker died is handed out again after this long.
+CLAIM_TIMEOUT = timedelta(minutes=5)
+
+
+def delivery_mode() -> str:
+    return getattr(settings, "JOBFLICK_NOTIFICATION_DELIVERY", background.THREAD)
+
+
+def staff_mode() -> str:
+    return getattr(settings, "JOBFLICK_STAFF_NOTIFICATIONS", FANOUT)
+
+
+def enqueue(kind: str, payload: dict, *, using: str = "default") -> NotificationEvent:
+    """Record an event and schedule its delivery after the current transaction commits."""
+    event = NotificationEvent.objects.using(using).create(kind=kind, payload=payload)
+    background.dispatch(functools.partial(deliver_pending, using=using), mode=delivery_mode(), using=using)
+    return event
+
+
+def enqueue_staff(message: str, link: str = "", *, using: str = "default") -> NotificationEvent:
+    return enqueue(NotificationEvent.Kind.STAFF, {"message": message, "link": link}, using=using)
+
+
+def enqueue_direct(notifications, *, using: str = "default") -> NotificationEvent:
+    """Queue ``notifications``, an iterable of ``{"user_id", "message", "link"}`` dicts, as one event."""
+    items = [
+        {"user_id": item["user_id"], "message": item["message"], "link": item.get("link", "")}
+        for item in notifications
+    ]
+    return enqueue(NotificationEvent.Kind.DIRECT, {"notifications": items}, using=using)
+
+
+@dataclass
+class DeliveryReport:
+    events: int = 0
+    notifications: int = 0
+    failed: int = 0
+
+
+def _ready(now):
+    return Q(status=NotificationEvent.Status.PENDING, available_at__lte=now) | Q(
+        status=NotificationEvent.Status.PROCESSING, claimed_at__lt=now - CLAIM_TIMEOUT
+    )
+
+
+def claim_batch(*, batch_size: int = BATCH_SIZE, using: str = "default") -> list[NotificationEvent]:
+    """Atomically mark up to ``batch_size`` ready events as ours and return them."""
+    now = timezone.now()
+    events = NotificationEvent.objects.using(using)
+    ids = list(events.filter(_ready(now)).order_by("id").values_list("pk", flat=True)[:batch_size])
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    # Re-checking readiness in the UPDATE means concurrent workers never claim the same row.
+    events.filter(_ready(now), pk__in=ids).update(
+        status=NotificationEvent.Status.PROCESSING, claim_token=token, claimed_at=now
+    )
+    return list(events.filter(claim_token=token, status=NotificationEvent.Status.PROCESSING).order_by("id"))
+
+
+def _build(events, *, using: str):
+    rows, groups = [], []
+    staff_ids = None
+    for event in events:
+        payload = event.payload
+        if event.kind == NotificationEvent.Kind.DIRECT:
+            rows.extend(
+                Notification(user_id=item["user_id"], message=item["message"], link=item.get("link", ""))
+                for item in payload["notifications"]
+            )
+        elif staff_mode() == GROUP:
+            groups.append(GroupNotification(message=payload["message"], link=payload.get("link", "")))
+        else:
+            if staff_ids is None:
+                staff_ids = list(
+                    get_user_model()
+                    .objects.using(using)
+                    .filter(is_staff=True, is_active=True)
+                    .values_list("id", flat=True)
+                )
+            rows.extend(
+                Notification(
+                    user_id=user_id,
+                    message=payload["message"],
+                    link=payload.get("link", ""),
+                    is_staff_only=True,
+                )
+                for user_id in staff_ids
+            )
+    return rows, groups
+
+
+def _mark_failed(events, error: Exception, *, using: str) -> None:
+    now = timezone.now()
+    for event in events:
+        attempts = event.attempts + 1
+        exhausted = attempts >= MAX_ATTEMPTS
+        # An event reclaimed by another worker is no longer ours to reschedule.
+        NotificationEvent.objects.using(using).filter(pk=event.pk, claim_token=event.claim_token).update(
+            status=NotificationEvent.Status.FAILED if exhausted else NotificationEvent.Status.PENDING,
+            attempts=attempts,
+            available_at=now + timedelta(seconds=30 * 2 ** attempts),
+            claim_token="",
+            last_error=repr(error),
+        )
+
+
+def deliver_batch(events, *, using: str = "default") -> int:
+    """Write the notifications for claimed ``events`` in one transaction; returns rows written.
+
+    Events are first marked delivered under the claim token they were
+    handed out with, swapping it for a fresh one that identifies this
+    delivery. An event reclaimed as stale in the meantime carries another
+    token, is not marked and is left to its new worker.
+    """
+    queued = NotificationEvent.objects.using(using)
+    ids = [event.pk for event in events]
+    delivery = uuid.uuid4().hex
+    with transaction.atomic(using=using):
+        queued.filter(
+            pk__in=ids,
+            claim_token__in={event.claim_token for event in events},
+            status=NotificationEvent.Status.PROCESSING,
+        ).update(
+            status=NotificationEvent.Status.DELIVERED,
+            claim_token=delivery,
+            delivered_at=timezone.now(),
+            last_error="",
+        )
+        ours = set(queued.filter(pk__in=ids, claim_token=delivery).values_list("pk", flat=True))
+        if len(ours) < len(events):
+            logger.warning("Skipped %d notification events claimed by another worker.", len(events) - len(ours))
+        rows, groups = _build([event for event in events if event.pk in ours], using=using)
+        Notification.objects.using(using).bulk_create(rows, batch_size=500)
+        GroupNotification.objects.using(using).bulk_create(groups)
+        if groups:
+            invalidate_group_unread(using=using)
+    return len(rows) + len(groups)
+
+
+def deliver_pending(*, batch_size: int = BATCH_SIZE, using: str = "default") -> DeliveryReport:
+    """Deliver ready events batch by batch until the queue is drained."""
+    report = DeliveryReport()
+    while True:
+        events = claim_batch(batch_size=batch_size, using=using)
+        if not events:
+            return report
+        try:
+            report.notifications += deliver_batch(events, using=using)
+        except Exception:
+            logger.exception("Delivering %d notification events failed; retrying one by one.", len(events))
+        else:
+            report.events += len(events)
+            continue
+        # Isolate the bad event so it cannot hold back the rest of the batch.
+        for event in events:
+            try:
+                report.notifications += deliver_batch([event], using=using)
+            except Exception as exc:
+                logger.exception("Delivering notification event %s failed.", event.pk)
+                _mark_failed([event], exc, using=using)
+                report.failed += 1
+            else:
+                report.events += 1
+
+
+def purge_delivered(*, older_than: timedelta, using: str = "default") -> int:
+    """Delete delivered events older than ``older_than``; returns rows removed."""
+    cutoff = timezone.now() - older_than
+    deleted, _ = NotificationEvent.objects.using(using).filter(
+        status=NotificationEvent.Status.DELIVERED, delivered_at__lt=cutoff
+    ).delete()
+    return deleted
@@ -1,11 +1,15 @@
 from django import forms
 
 from payments.models import WalletTransaction
+from skills.forms import SkillsFormMixin
+from skills.models import ProfileSkill
 
 from .models import UserProfile
 
 
-class UserProfileForm(forms.ModelForm):
+class UserProfileForm(SkillsFormMixin, forms.ModelForm):
+    skill_link_model = ProfileSkill
+
     class Meta:
         model = UserProfile
         fields = [
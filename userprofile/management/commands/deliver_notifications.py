@@ -0,0 +1,38 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from userprofile.dispatch import BATCH_SIZE, deliver_pending, purge_delivered
+
+
+class Command(BaseCommand):
+    help = "Fan out queued notification events into per-user and group notifications."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new events.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds between polls with --loop.")
+        parser.add_argument(
+            "--purge-days",
+            type=int,
+            help="Also delete delivered events older than this many days.",
+        )
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        while True:
+            report = deliver_pending(batch_size=options["batch_size"], using=using)
+            if report.events or report.failed or not options["loop"]:
+                self.stdout.write(
+                    f"Delivered {report.events} events ({report.notifications} notifications), "
+                    f"{report.failed} failed."
+                )
+            if options["purge_days"] is not None:
+                purged = purge_delivered(older_than=timedelta(days=options["purge_days"]), using=using)
+                if purged:
+                    self.stdout.write(f"Purged {purged} delivered events.")
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
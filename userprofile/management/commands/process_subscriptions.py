@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from userprofile.subscriptions import BATCH_SIZE, process_subscriptions
+
+
+class Command(BaseCommand):
+    help = "Expire lapsed subscriptions and send renewal reminders."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--loop", action="store_true", help="Keep running, e.g. under a process supervisor.")
+        parser.add_argument("--interval", type=float, default=3600.0, help="Seconds between runs with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            report = process_subscriptions(batch_size=options["batch_size"])
+            self.stdout.write(
+                f"Expired {report.expired} subscriptions, sent {report.reminded} renewal reminders"
+                f"{f', backfilled {report.synced} statuses' if report.synced else ''}."
+            )
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
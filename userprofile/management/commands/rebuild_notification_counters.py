@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from userprofile.counters import rebuild_unread_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute every user's unread notification counter from the notifications table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        processed = rebuild_unread_counters(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt unread counters for {processed} users."))
@@ -0,0 +1,14 @@
+from django.utils.functional import SimpleLazyObject
+
+from .profiles import get_profile
+
+
+class ProfileMiddleware:
+    """Sets a lazy ``request.profile`` for the signed-in user (``None`` for anonymous users)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.profile = SimpleLazyObject(lambda: get_profile(request))
+        return self.get_response(request)
@@ -0,0 +1,25 @@
+from django.db import migrations
+from django.utils import timezone
+
+
+def backfill_subscription_status(apps, schema_editor):
+    # Profiles that predate subscription_status read "none" until the next
+    # process_subscriptions run; derive it from the expiry date right away.
+    UserProfile = apps.get_model("userprofile", "UserProfile")
+    profiles = UserProfile.objects.using(schema_editor.connection.alias).filter(
+        subscription_status="none", subscription_expires_at__isnull=False
+    )
+    today = timezone.now().date()
+    profiles.filter(subscription_expires_at__gte=today).update(subscription_status="active")
+    profiles.filter(subscription_expires_at__lt=today).update(subscription_status="expired")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('userprofile', '0003_profile_coordinates'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_subscription_status, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,8 @@
+from collections import Counter
 from datetime import timedelta
 
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 
 
@@ -12,6 +13,11 @@ class UserProfile(models.Model):
 		SIX_MONTHS = "six_months", "6 Months"
 		ONE_YEAR = "one_year", "12 Months"
 
+	class SubscriptionStatus(models.TextChoices):
+		NONE = "none", "No Subscription"
+		ACTIVE = "active", "Active"
+		EXPIRED = "expired", "Expired"
+
 	SUBSCRIPTION_DETAILS = {
 		SubscriptionPlan.ONE_MONTH: {
 			"price": 120,
@@ -38,7 +44,11 @@ class UserProfile(models.Model):
 	photo = models.ImageField(upload_to="profile_photos/", blank=True, null=True)
 	occupation = models.CharField(max_length=150, blank=True)
 	skills = models.TextField(blank=True)
+	skill_tags = models.ManyToManyField("skills.Skill", through="skills.ProfileSkill", related_name="profiles", blank=True)
 	present_address = models.CharField(max_length=255, blank=True)
+	# Centre of the area ``present_address`` names; the origin of "jobs near me".
+	latitude = models.FloatField(null=True, blank=True, editable=False)
+	longitude = models.FloatField(null=True, blank=True, editable=False)
 	bio = models.TextField(blank=True)
 	wallet_balance = models.PositiveIntegerField(default=2000)
 	subscription_plan = models.CharField(
@@ -47,16 +57,64 @@ class UserProfile(models.Model):
 		default=SubscriptionPlan.NONE,
 	)
 	subscription_expires_at = models.DateField(blank=True, null=True)
+	# Maintained by save() and by ``userprofile.subscriptions.process_subscriptions``.
+	subscription_status = models.CharField(
+		max_length=10,
+		choices=SubscriptionStatus.choices,
+		default=SubscriptionStatus.NONE,
+	)
+	subscription_reminder_sent_for = models.DateField(blank=True, null=True)
+
+	class Meta:
+		indexes = [
+			models.Index(fields=["subscription_status", "subscription_expires_at"], name="userprofile_sub_expiry_idx"),
+		]
 
 	def __str__(self):
 		if self.display_name:
 			return self.display_name
 		return self.user.get_username()
 
+	def save(self, *args, **kwargs):
+		self.subscription_status = self.compute_subscription_status()
+		update_fields = kwargs.get("update_fields")
+		if update_fields is not None and "subscription_expires_at" in update_fields:
+			kwargs["update_fields"] = {*update_fields, "subscription_status"}
+		if update_fields is None or "present_address" in update_fields:
+			self.geocode_address()
+			if update_fields is not None:
+				kwargs["update_fields"] = {*kwargs["update_fields"], "latitude", "longitude"}
+		super().save(*args, **kwargs)
+
+	def geocode_address(self) -> None:
+		from locations.services import geocode
+
+		self.latitude, self.longitude = geocode(self.present_address) or (None, None)
+
 	@property
-	def has_active_subscription(self) -> bool:
-		"""Return True when the subscription is current."""
+	def location(self) -> tuple[float, float] | None:
+		if self.latitude is None or self.longitude is None:
+			return None
+		return self.latitude, self.longitude
+
+	def compute_subscription_status(self, today=None) -> str:
 		if not self.subscription_expires_at:
+			return self.SubscriptionStatus.NONE
+		if self.subscription_expires_at >= (today or timezone.now().date()):
+			return self.SubscriptionStatus.ACTIVE
+		return self.SubscriptionStatus.EXPIRED
+
+	@property
+	def has_active_subscription(self) -> bool:
+		"""Return True when the subscription is current.
+
+		Reads the stored status; the expiry date guard only matters between
+		midnight and the next ``process_subscriptions`` run. A row whose status
+		was never computed is judged by its expiry date alone.
+		"""
+		if self.subscription_status == self.SubscriptionStatus.NONE:
+			return self.compute_subscription_status() == self.SubscriptionStatus.ACTIVE
+		if self.subscription_status != self.SubscriptionStatus.ACTIVE:
 			return False
 		return self.subscription_expires_at >= timezone.now().date()
 
@@ -86,6 +144,31 @@ class UserProfile(models.Model):
 		]
 
 
+class NotificationQuerySet(models.QuerySet):
+	"""Keeps ``NotificationCounter`` in step with bulk writes that bypass signals."""
+
+	def bulk_create(self, objs, *args, **kwargs):
+		from .counters import adjust_unread
+
+		created = super().bulk_create(objs, *args, **kwargs)
+		adjust_unread(Counter(obj.user_id for obj in created if not obj.is_read), using=self.db)
+		return created
+
+	def update(self, **kwargs):
+		if "is_read" not in kwargs:
+			return super().update(**kwargs)
+		from .counters import recount_unread
+
+		with transaction.atomic(using=self.db):
+			# Recount rather than subtract: two overlapping mark-read calls
+			# would both subtract the rows they saw unread.
+			flipping = self.filter(is_read=not kwargs["is_read"]).order_by()
+			user_ids = list(flipping.values_list("user_id", flat=True).distinct())
+			updated = super().update(**kwargs)
+			recount_unread(user_ids, using=self.db)
+		return updated
+
+
 class Notification(models.Model):
 	user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="notifications")
 	message = models.TextField()
@@ -101,8 +184,116 @@ class Notification(models.Model):
 	is_read = models.BooleanField(default=False)
 	created_at = models.DateTimeField(auto_now_add=True)
 
+	objects = NotificationQuerySet.as_manager()
+
 	class Meta:
 		ordering = ["-created_at"]
+		# Partial indexes: SQLite cannot use a bare boolean term such as
+		# ``WHERE is_staff_only`` as an index equality, but it does match it
+		# against an index condition.
+		indexes = [
+			models.Index(
+				fields=["user", "-created_at", "-id"],
+				condition=models.Q(is_staff_only=False),
+				name="userprofile_notif_feed_idx",
+			),
+			models.Index(
+				fields=["user", "-created_at", "-id"],
+				condition=models.Q(is_staff_only=True),
+				name="userprofile_notif_staff_idx",
+			),
+			models.Index(
+				fields=["user", "is_staff_only", "created_at"],
+				condition=models.Q(is_read=False),
+				name="userprofile_notif_unread_idx",
+			),
+		]
+
+	def __str__(self):
+		return f"Notification for {self.user}"
+
+	@classmethod
+	def from_db(cls, db, field_names, values):
+		instance = super().from_db(db, field_names, values)
+		instance._loaded_is_read = dict(zip(field_names, values)).get("is_read")
+		return instance
+
+
+class NotificationCounter(models.Model):
+	"""Denormalized unread notification count per user, maintained by ``userprofile.counters``."""
+
+	user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="notification_counter")
+	unread = models.IntegerField(default=0)
 
 	def __str__(self):
-		return f"Notification for {self.user}" 
+		return f"{self.user}: {self.unread} unread"
+
+
+class NotificationEvent(models.Model):
+	"""Outbox row describing notifications still to be fanned out by ``userprofile.dispatch``."""
+
+	class Kind(models.TextChoices):
+		DIRECT = "direct", "Direct"
+		STAFF = "staff", "All staff"
+
+	class Status(models.TextChoices):
+		PENDING = "pending", "Pending"
+		PROCESSING = "processing", "Processing"
+		DELIVERED = "delivered", "Delivered"
+		FAILED = "failed", "Failed"
+
+	kind = models.CharField(max_length=10, choices=Kind.choices)
+	payload = models.JSONField(default=dict)
+	status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+	attempts = models.PositiveSmallIntegerField(default=0)
+	available_at = models.DateTimeField(default=timezone.now)
+	claim_token = models.CharField(max_length=32, blank=True)
+	claimed_at = models.DateTimeField(blank=True, null=True)
+	delivered_at = models.DateTimeField(blank=True, null=True)
+	last_error = models.TextField(blank=True)
+	created_at = models.DateTimeField(auto_now_add=True)
+
+	class Meta:
+		ordering = ["id"]
+		indexes = [models.Index(fields=["status", "available_at"], name="userprofile_event_queue_idx")]
+
+	def __str__(self):
+		return f"{self.get_kind_display()} event #{self.pk} ({self.status})"
+
+
+class GroupNotification(models.Model):
+	"""A notification stored once and shown to every member of ``audience``."""
+
+	class Audience(models.TextChoices):
+		STAFF = "staff", "Staff"
+
+	audience = models.CharField(max_length=10, choices=Audience.choices, default=Audience.STAFF)
+	message = models.TextField()
+	link = models.CharField(max_length=255, blank=True)
+	created_at = models.DateTimeField(auto_now_add=True)
+
+	class Meta:
+		ordering = ["-created_at"]
+		indexes = [models.Index(fields=["audience", "-created_at", "-id"], name="userprofile_group_feed_idx")]
+
+	def __str__(self):
+		return f"{self.get_audience_display()} notification #{self.pk}"
+
+	@classmethod
+	def visible_to(cls, user):
+		"""Group notifications addressed to ``user`` that they have not dismissed."""
+		if not user.is_staff:
+			return cls.objects.none()
+		return cls.objects.filter(
+			audience=cls.Audience.STAFF,
+			created_at__gte=user.date_joined,
+		).exclude(dismissals__user=user)
+
+
+class GroupNotificationDismissal(models.Model):
+	notification = models.ForeignKey(GroupNotification, on_delete=models.CASCADE, related_name="dismissals")
+	user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="dismissed_group_notifications")
+	created_at = models.DateTimeField(auto_now_add=True)
+
+	class Meta:
+		unique_together = ("notification", "user")
@@ -0,0 +1,68 @@
+"""Cached ``UserProfile`` loading for the signed-in user.
+
+``ProfileMiddleware`` exposes the profile as a lazy ``request.profile``; the
+first access reads a cached copy of the row, or loads and caches it with one
+query. Cached copies are invalidated on commit whenever the row changes: by
+the ``UserProfile`` save/delete receivers in ``userprofile.signals``, and by
+``invalidate_profiles`` for bulk writes that bypass signals. Copies are
+versioned through ``jobflick.versioned_cache``, so a load that raced a
+write never outlives it.
+
+Cached values are for display and pre-checks only. Anything that moves
+money locks the row itself (see ``payments.services``).
+"""
+
+from __future__ import annotations
+
+from django.db import transaction
+
+from jobflick import versioned_cache
+
+from .models import UserProfile
+
+CACHE_TIMEOUT = 300
+
+
+def cache_key(user_id: int) -> str:
+    return f"userprofile:profile:{user_id}"
+
+
+def _attnames() -> list[str]:
+    return [field.attname for field in UserProfile._meta.concrete_fields]
+
+
+def _from_cache(values: dict, using: str):
+    names = _attnames()
+    try:
+        return UserProfile.from_db(using, names, [values[name] for name in names])
+    except KeyError:
+        # Cached before a schema change; treat as a miss.
+        return None
+
+
+def load_profile(user, *, using: str = "default") -> UserProfile:
+    """Return ``user``'s profile, creating it for accounts that predate profiles."""
+    key = cache_key(user.pk)
+    values, token = versioned_cache.get(key)
+    profile = _from_cache(values, using) if values is not None else None
+    if profile is None:
+        profile = UserProfile.objects.using(using).filter(user=user).first()
+        if profile is None:
+            profile, _ = UserProfile.objects.using(using).get_or_create(user=user)
+        versioned_cache.store(key, {name: getattr(profile, name) for name in _attnames()}, token, CACHE_TIMEOUT)
+    profile.user = user
+    return profile
+
+
+def get_profile(request):
+    """Return the signed-in user's profile, loading it at most once per request."""
+    if not hasattr(request, "_cached_profile"):
+        request._cached_profile = load_profile(request.user) if request.user.is_authenticated else None
+    return request._cached_profile
+
+
+def invalidate_profiles(user_ids, *, using: str = "default") -> None:
+    """Invalidate the cached profiles of ``user_ids`` once the current transaction commits."""
+    keys = [cache_key(user_id) for user_id in user_ids]
+    if keys:
+        transaction.on_commit(lambda: versioned_cache.invalidate(keys), using=using)
@@ -0,0 +1,58 @@
+"""Signal receivers for the userprofile app."""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from jobs.recommendations import invalidate_recommendations
+
+from .counters import adjust_unread, invalidate_group_unread
+from .models import GroupNotification, GroupNotificationDismissal, Notification, UserProfile
+from .profiles import invalidate_profiles
+
+
+@receiver(post_save, sender=Notification)
+def notification_saved(sender, instance, created, raw=False, using="default", **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_loaded_is_read", None)
+    if created:
+        delta = 0 if instance.is_read else 1
+    elif previous is None or previous == instance.is_read:
+        delta = 0
+    else:
+        delta = 1 if previous else -1
+    instance._loaded_is_read = instance.is_read
+    adjust_unread({instance.user_id: delta}, using=using)
+
+
+@receiver(post_delete, sender=Notification)
+def notification_deleted(sender, instance, using="default", **kwargs):
+    was_read = getattr(instance, "_loaded_is_read", instance.is_read)
+    if not was_read:
+        adjust_unread({instance.user_id: -1}, using=using)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def profile_changed(sender, instance, raw=False, using="default", update_fields=None, **kwargs):
+    if raw:
+        return
+    invalidate_profiles([instance.user_id], using=using)
+    if update_fields is None or "skills" in update_fields:
+        invalidate_recommendations([instance.user_id], using=using)
+
+
+@receiver(post_save, sender=GroupNotification)
+@receiver(post_delete, sender=GroupNotification)
+def group_notification_changed(sender, instance, raw=False, using="default", **kwargs):
+    if raw:
+        return
+    invalidate_group_unread(using=using)
+
+
+@receiver(post_save, sender=GroupNotificationDismissal)
+@receiver(post_delete, sender=GroupNotificationDismissal)
+def group_notification_dismissed(sender, instance, raw=False, using="default", **kwargs):
+    if raw:
+        return
+    invalidate_group_unread([instance.user_id], using=using)
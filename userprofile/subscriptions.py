@@ -0,0 +1,163 @@
+"""Scheduled subscription upkeep.
+
+``UserProfile.subscription_status`` is set on every save, but nothing is
+saved when a subscription simply runs out. ``process_subscriptions`` runs
+from the ``process_subscriptions`` management command (cron, or ``--loop``).
+It works through the ``(subscription_status, subscription_expires_at)``
+index in batches:
+
+- it marks lapsed subscriptions expired and notifies their owners;
+- it sends one renewal reminder per expiry date to subscribers whose plan
+  ends within ``JOBFLICK_SUBSCRIPTION_REMINDER_DAYS``;
+- it backfills the status of rows that predate the column.
+
+Each batch locks its rows, updates them with one statement and writes the
+notifications with one bulk insert.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Notification, UserProfile
+from .profiles import invalidate_profiles
+
+BATCH_SIZE = 500
+
+Status = UserProfile.SubscriptionStatus
+
+
+@dataclass(frozen=True)
+class SubscriptionReport:
+    synced: int = 0
+    expired: int = 0
+    reminded: int = 0
+
+
+def reminder_days() -> int:
+    return getattr(settings, "JOBFLICK_SUBSCRIPTION_REMINDER_DAYS", 7)
+
+
+def expiring_between(start, end):
+    """Active subscriptions ending between ``start`` and ``end`` (inclusive), soonest first."""
+    return UserProfile.objects.filter(
+        subscription_status=Status.ACTIVE,
+        subscription_expires_at__range=(start, end),
+    ).order_by("subscription_expires_at", "pk")
+
+
+def _plan_label(plan: str) -> str:
+    return UserProfile.SUBSCRIPTION_DETAILS.get(plan, {}).get("label", "subscription")
+
+
+def _process_batches(queryset, update, build_notification, *, batch_size: int) -> int:
+    """Lock, update and notify ``queryset`` rows in batches; returns rows processed.
+
+    ``update`` must take the rows out of ``queryset`` so the loop ends.
+    """
+    processed = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                queryset.select_for_update().values(
+                    "pk", "user_id", "subscription_plan", "subscription_expires_at"
+                )[:batch_size]
+            )
+            if not rows:
+                return processed
+            UserProfile.objects.filter(pk__in=[row["pk"] for row in rows]).update(**update)
+            notifications = [build_notification(row) for row in rows]
+            Notification.objects.bulk_create([note for note in notifications if note is not None])
+            invalidate_profiles([row["user_id"] for row in rows])
+        processed += len(rows)
+
+
+def sync_statuses(*, today=None, batch_size: int = BATCH_SIZE) -> int:
+    """Set the status of rows that have an expiry date but no status yet."""
+    today = today or timezone.now().date()
+    pending = UserProfile.objects.filter(
+        subscription_status=Status.NONE,
+        subscription_expires_at__isnull=False,
+    ).order_by("pk")
+    synced = _process_batches(
+        pending.filter(subscription_expires_at__gte=today),
+        {"subscription_status": Status.ACTIVE},
+        lambda row: None,
+        batch_size=batch_size,
+    )
+    # Subscriptions that lapsed before the status existed are not announced.
+    return synced + _process_batches(
+        pending.filter(subscription_expires_at__lt=today),
+        {"subscription_status": Status.EXPIRED},
+        lambda row: None,
+        batch_size=batch_size,
+    )
+
+
+def expire_subscriptions(*, today=None, batch_size: int = BATCH_SIZE) -> int:
+    """Mark subscriptions that ended before ``today`` expired and notify their owners."""
+    today = today or timezone.now().date()
+    link = reverse("userprofile-subscription")
+
+    def notification(row):
+        return Notification(
+            user_id=row["user_id"],
+            message=(
+                f"Your {_plan_label(row['subscription_plan'])} ended on "
+                f"{row['subscription_expires_at']}. Renew to keep posting and applying for jobs."
+            ),
+            link=link,
+        )
+
+    lapsed = UserProfile.objects.filter(
+        subscription_status=Status.ACTIVE,
+        subscription_expires_at__lt=today,
+    ).order_by("subscription_expires_at", "pk")
+    return _process_batches(
+        lapsed,
+        {"subscription_status": Status.EXPIRED},
+        notification,
+        batch_size=batch_size,
+    )
+
+
+def send_renewal_reminders(*, today=None, days: int | None = None, batch_size: int = BATCH_SIZE) -> int:
+    """Remind subscribers whose plan ends within ``days``, once per expiry date."""
+    today = today or timezone.now().date()
+    days = reminder_days() if days is None else days
+    link = reverse("userprofile-subscription")
+
+    def notification(row):
+        left = (row["subscription_expires_at"] - today).days
+        when = "today" if left == 0 else f"in {left} day{'s' if left != 1 else ''}"
+        return Notification(
+            user_id=row["user_id"],
+            message=f"Your {_plan_label(row['subscription_plan'])} ends {when} ({row['subscription_expires_at']}).",
+            link=link,
+        )
+
+    due = expiring_between(today, today + timedelta(days=days)).exclude(
+        subscription_reminder_sent_for=F("subscription_expires_at")
+    )
+    return _process_batches(
+        due,
+        {"subscription_reminder_sent_for": F("subscription_expires_at")},
+        notification,
+        batch_size=batch_size,
+    )
+
+
+def process_subscriptions(*, today=None, batch_size: int = BATCH_SIZE) -> SubscriptionReport:
+    today = today or timezone.now().date()
+    return SubscriptionReport(
+        synced=sync_statuses(today=today, batch_size=batch_size),
+        expired=expire_subscriptions(today=today, batch_size=batch_size),
+        reminded=send_renewal_reminders(today=today, batch_size=batch_size),
+    )
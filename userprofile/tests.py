@@ -1,3 +1,205 @@
-from django.test import TestCase
+from datetime import timedelta
+from importlib import import_module
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from jobflick import versioned_cache
+
+from . import counters, dispatch
+from .counters import group_unread_count, unread_count
+from .models import (
+	GroupNotification,
+	GroupNotificationDismissal,
+	Notification,
+	NotificationCounter,
+	NotificationEvent,
+	UserProfile,
+)
+from .profiles import invalidate_profiles, load_profile
+
+
+class UnreadCounterTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		self.user = get_user_model().objects.create_user("counter-member", "counter@example.com", "pass")
+		Notification.objects.bulk_create([Notification(user=self.user, message=f"Note {index}") for index in range(3)])
+		self.assertEqual(unread_count(self.user.pk), 3)
+
+	def stored(self):
+		return NotificationCounter.objects.get(user=self.user).unread
+
+	def test_marking_read_twice_subtracts_once(self):
+		unread = Notification.objects.filter(user=self.user, is_read=False)
+		stale = list(unread)
+		with self.captureOnCommitCallbacks(execute=True):
+			unread.update(is_read=True)
+			Notification.objects.filter(pk__in=[note.pk for note in stale]).update(is_read=True)
+		self.assertEqual(self.stored(), 0)
+		self.assertEqual(unread_count(self.user.pk), 0)
+
+	def test_update_recounts_a_drifted_counter(self):
+		NotificationCounter.objects.filter(user=self.user).update(unread=-4)
+		first = Notification.objects.filter(user=self.user).first()
+		Notification.objects.filter(pk=first.pk).update(is_read=True)
+		self.assertEqual(self.stored(), 2)
+
+	def test_single_saves_and_deletes_adjust_the_counter(self):
+		note = Notification.objects.filter(user=self.user).first()
+		note.is_read = True
+		note.save()
+		self.assertEqual(self.stored(), 2)
+		Notification.objects.filter(user=self.user, is_read=False).first().delete()
+		self.assertEqual(self.stored(), 1)
+		with self.captureOnCommitCallbacks(execute=True):
+			Notification.objects.create(user=self.user, message="New")
+		self.assertEqual(unread_count(self.user.pk), 2)
+
+	def test_a_count_loaded_before_a_write_is_not_cached_over_it(self):
+		key = counters.cache_key(self.user.pk)
+		cache.clear()
+		_, token = versioned_cache.get(key)
+		with self.captureOnCommitCallbacks(execute=True):
+			Notification.objects.create(user=self.user, message="New")
+		versioned_cache.store(key, 3, token, counters.CACHE_TIMEOUT)
+		self.assertEqual(unread_count(self.user.pk), 4)
+
+
+class SubscriptionStatusTests(TestCase):
+	def setUp(self):
+		today = timezone.now().date()
+		self.profiles = {}
+		for name, expires in (("current", today + timedelta(days=10)), ("lapsed", today - timedelta(days=1)), ("never", None)):
+			user = get_user_model().objects.create_user(f"sub-{name}", f"{name}@example.com", "pass")
+			self.profiles[name] = UserProfile.objects.create(user=user, subscription_expires_at=expires)
+		# Rows written before the column existed all read "none".
+		UserProfile.objects.update(subscription_status=UserProfile.SubscriptionStatus.NONE)
+
+	def statuses(self):
+		return dict(UserProfile.objects.values_list("user__username", "subscription_status"))
+
+	def test_uncomputed_status_falls_back_to_the_expiry_date(self):
+		access = {name: UserProfile.objects.get(pk=profile.pk).has_active_subscription for name, profile in self.profiles.items()}
+		self.assertEqual(access, {"current": True, "lapsed": False, "never": False})
+
+	def test_migration_backfills_the_status(self):
+		migration = import_module("userprofile.migrations.0004_backfill_subscription_status")
+		migration.backfill_subscription_status(apps, SimpleNamespace(connection=connection))
+		self.assertEqual(self.statuses(), {"sub-current": "active", "sub-lapsed": "expired", "sub-never": "none"})
+
+
+class ProfileCacheTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		self.user = get_user_model().objects.create_user("cached-member", "cached@example.com", "pass")
+		UserProfile.objects.create(user=self.user, wallet_balance=100)
+
+	def test_loads_are_cached_until_the_profile_changes(self):
+		self.assertEqual(load_profile(self.user).wallet_balance, 100)
+		with self.assertNumQueries(0):
+			self.assertEqual(load_profile(self.user).wallet_balance, 100)
+		with self.captureOnCommitCallbacks(execute=True):
+			profile = UserProfile.objects.get(user=self.user)
+			profile.wallet_balance = 250
+			profile.save()
+		self.assertEqual(load_profile(self.user).wallet_balance, 250)
+
+	def test_bulk_writes_invalidate_on_commit(self):
+		load_profile(self.user)
+		with self.captureOnCommitCallbacks(execute=True):
+			UserProfile.objects.filter(user=self.user).update(wallet_balance=40)
+			invalidate_profiles([self.user.pk])
+			self.assertEqual(load_profile(self.user).wallet_balance, 100, "invalidated before commit")
+		self.assertEqual(load_profile(self.user).wallet_balance, 40)
+
+	def test_a_load_that_races_a_write_is_not_served_afterwards(self):
+		store = versioned_cache.store
+
+		def write_then_store(*args):
+			# The write commits between the load's query and its cache write.
+			with self.captureOnCommitCallbacks(execute=True):
+				UserProfile.objects.filter(user=self.user).update(wallet_balance=900)
+				invalidate_profiles([self.user.pk])
+			store(*args)
+
+		with mock.patch.object(versioned_cache, "store", write_then_store):
+			self.assertEqual(load_profile(self.user).wallet_balance, 100)
+		self.assertEqual(load_profile(self.user).wallet_balance, 900)
+
+
+@override_settings(JOBFLICK_NOTIFICATION_DELIVERY="worker")
+class NotificationOutboxTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		self.member = get_user_model().objects.create_user("outbox-member", "outbox@example.com", "pass")
+		self.staff = [
+			get_user_model().objects.create_user(f"outbox-staff-{index}", f"staff{index}@example.com", "pass", is_staff=True)
+			for index in range(2)
+		]
+
+	def direct(self, message):
+		dispatch.enqueue_direct([{"user_id": self.member.pk, "message": message}])
+
+	def test_events_are_delivered_in_batches(self):
+		for index in range(5):
+			self.direct(f"Note {index}")
+		self.assertFalse(Notification.objects.exists())
+		report = dispatch.deliver_pending(batch_size=2)
+		self.assertEqual((report.events, report.notifications, report.failed), (5, 5, 0))
+		self.assertEqual(set(NotificationEvent.objects.values_list("status", flat=True)), {NotificationEvent.Status.DELIVERED})
+		self.assertEqual(unread_count(self.member.pk), 5)
+
+	def test_a_reclaimed_batch_is_delivered_once(self):
+		self.direct("Only once")
+		stale = dispatch.claim_batch()
+		NotificationEvent.objects.update(claimed_at=timezone.now() - dispatch.CLAIM_TIMEOUT - timedelta(seconds=1))
+		fresh = dispatch.claim_batch()
+		self.assertEqual([event.pk for event in fresh], [event.pk for event in stale])
+		with self.assertLogs("userprofile.dispatch", "WARNING"):
+			self.assertEqual(dispatch.deliver_batch(stale), 0)
+		self.assertEqual(dispatch.deliver_batch(fresh), 1)
+		with self.assertLogs("userprofile.dispatch", "WARNING"):
+			self.assertEqual(dispatch.deliver_batch(fresh), 0)
+		self.assertEqual(Notification.objects.filter(user=self.member).count(), 1)
+
+	def test_a_bad_event_does_not_hold_back_the_batch(self):
+		self.direct("Fine")
+		NotificationEvent.objects.create(kind=NotificationEvent.Kind.DIRECT, payload={"unexpected": True})
+		self.direct("Also fine")
+		with self.assertLogs("userprofile.dispatch", "ERROR"):
+			report = dispatch.deliver_pending()
+		self.assertEqual((report.events, report.failed), (2, 1))
+		failed = NotificationEvent.objects.get(status=NotificationEvent.Status.PENDING)
+		self.assertEqual((failed.attempts, failed.claim_token), (1, ""))
+
+	def test_staff_events_fan_out_to_every_staff_member(self):
+		dispatch.enqueue_staff("Job submitted")
+		dispatch.deliver_pending()
+		self.assertEqual(
+			sorted(Notification.objects.filter(is_staff_only=True).values_list("user_id", flat=True)),
+			sorted(user.pk for user in self.staff),
+		)
+
+	@override_settings(JOBFLICK_STAFF_NOTIFICATIONS="group")
+	def test_group_notifications_count_towards_the_staff_badge(self):
+		staff = self.staff[0]
+		self.assertEqual(group_unread_count(staff), 0)
+		with self.captureOnCommitCallbacks(execute=True):
+			dispatch.enqueue_staff("Job submitted")
+			dispatch.deliver_pending()
+		self.assertEqual(GroupNotification.objects.count(), 1)
+		self.assertFalse(Notification.objects.exists())
+		self.assertEqual(group_unread_count(staff), 1)
+		self.assertEqual(group_unread_count(self.member), 0)
+		self.client.force_login(staff)
+		self.assertEqual(self.client.get("/profile/about/").context["unread_notifications_count"], 1)
+		with self.captureOnCommitCallbacks(execute=True):
+			GroupNotificationDismissal.objects.create(notification=GroupNotification.objects.get(), user=staff)
+		self.assertEqual(group_unread_count(staff), 0)
+		self.assertEqual(group_unread_count(self.staff[1]), 1)
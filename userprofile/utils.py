@@ -1,27 +1,12 @@
 """Utility helpers for user profile workflows."""
 
-from django.contrib.auth import get_user_model
-
-from .models import Notification
+from .dispatch import enqueue_staff
 
 
 def notify_staff(message: str, link: str = "") -> None:
-    """Send a notification to every active staff account."""
-    staff_ids = list(
-        get_user_model()
-        .objects.filter(is_staff=True, is_active=True)
-        .values_list("id", flat=True)
-    )
-    if not staff_ids:
-        return
-    Notification.objects.bulk_create(
-        [
-            Notification(
-                user_id=user_id,
-                message=message,
-                link=link,
-                is_staff_only=True,
-            )
-            for user_id in staff_ids
-        ]
-    )
+    """Queue a notification for every active staff account.
+
+    Only the outbox row is written here; the per-staff fan-out happens after
+    the caller's transaction commits (see ``userprofile.dispatch``).
+    """
+    enqueue_staff(message, link)
@@ -7,7 +7,10 @@ from django.urls import reverse
 from django.utils import timezone
 from django.views.decorators.cache import never_cache
 
+from jobflick.pagination import paginate
+from jobflick.routers import replica_reads
 from jobs.models import Job, JobApplication
+from jobs.recommendations import recommended_job_ids
 from adminpanel.models import SubscriptionLedgerEntry
 from payments.models import WalletTransaction
 from payments.services import (
@@ -15,6 +18,7 @@ from payments.services import (
 	apply_wallet_transaction,
 	create_pending_transaction,
 )
+from payments.totals import record_subscription_entries
 
 from .forms import UserProfileForm, WalletPaymentForm, WalletPayoutRequestForm
 from .models import Notification, UserProfile
@@ -23,30 +27,41 @@ from .utils import notify_staff
 
 @login_required
 @never_cache
+@replica_reads
 def dashboard_view(request):
-	profile, _ = UserProfile.objects.get_or_create(user=request.user)
+	profile = request.profile
 	skills = [skill.strip() for skill in profile.skills.split(",") if skill.strip()]
+	user_applications = Prefetch(
+		"applications",
+		queryset=JobApplication.objects.filter(applicant=request.user),
+		to_attr="app_for_user",
+	)
 	live_jobs = (
 		Job.objects.filter(status=Job.Status.APPROVED)
 		.exclude(poster=request.user)
-		.prefetch_related(
-			Prefetch(
-				"applications",
-				queryset=JobApplication.objects.filter(applicant=request.user),
-				to_attr="app_for_user",
-			)
-		)
+		.select_related("poster")
+		.prefetch_related(user_applications)
 	)
-	my_jobs = Job.objects.filter(poster=request.user).select_related("poster").order_by("-created_at")
+	recommended_jobs = []
+	recommended_ids = recommended_job_ids(request.user, profile.skills)
+	if recommended_ids:
+		found = (
+			Job.objects.filter(status=Job.Status.APPROVED, is_filled=False)
+			.select_related("poster")
+			.prefetch_related(user_applications)
+			.in_bulk(recommended_ids)
+		)
+		recommended_jobs = [found[job_id] for job_id in recommended_ids if job_id in found]
+	my_jobs = Job.objects.filter(poster=request.user).select_related("poster")
 	my_live_jobs = my_jobs.filter(status=Job.Status.APPROVED)
-	pending_jobs = my_jobs.exclude(status=Job.Status.APPROVED)
+	pending_jobs = my_jobs.filter(status=Job.Status.PENDING)
 	context = {
 		"profile": profile,
 		"skills": skills,
-		"jobs": live_jobs,
-		"job_count": live_jobs.count(),
-		"my_live_jobs": my_live_jobs,
-		"pending_jobs": pending_jobs,
+		"recommended_jobs": recommended_jobs,
+		"jobs": paginate(request, live_jobs),
+		"my_live_jobs": paginate(request, my_live_jobs, per_page=10, cursor_param="live_cursor"),
+		"pending_jobs": paginate(request, pending_jobs, per_page=10, cursor_param="pending_cursor"),
 		"hide_nav": True,
 		"hide_footer": True,
 	}
@@ -56,11 +71,12 @@ def dashboard_view(request):
 @login_required
 @never_cache
 def edit_profile_view(request):
-	profile, _ = UserProfile.objects.get_or_create(user=request.user)
+	profile = request.profile
 	if request.method == "POST":
 		form = UserProfileForm(request.POST, request.FILES, instance=profile)
 		if form.is_valid():
-			form.save()
+			form.save(commit=False).save(update_fields=UserProfileForm.Meta.fields)
+			form.save_m2m()
 			messages.success(request, "Profile updated successfully.")
 			return redirect("user-dashboard")
 	else:
@@ -76,7 +92,7 @@ def edit_profile_view(request):
 @login_required
 @never_cache
 def chat_view(request):
-	profile, _ = UserProfile.objects.get_or_create(user=request.user)
+	profile = request.profile
 	return render(
 		request,
 		"userprofile/chat_placeholder.html",
@@ -87,7 +103,7 @@ def chat_view(request):
 @login_required
 @never_cache
 def activity_view(request):
-	profile, _ = UserProfile.objects.get_or_create(user=request.user)
+	profile = request.profile
 	return render(
 		request,
 		"userprofile/activity_placeholder.html",
@@ -98,7 +114,7 @@ def activity_view(request):
 @login_required
 @never_cache
 def help_view(request):
-	profile, _ = UserProfile.objects.get_or_create(user=request.user)
+	profile = request.profile
 	return render(
 		request,
 		"userprofile/help_placeholder.html",
@@ -109,7 +125,7 @@ def help_view(request):
 @login_required
 @never_cache
 def dashboard_about_view(request):
-	profile, _ = UserProfile.objects.get_or_create(user=request.user)
+	profile = request.profile
 	return render(
 		request,
 		"userprofile/about_panel.html",
@@ -120,7 +136,7 @@ def dashboard_about_view(request):
 @login_required
 @never_cache
 def dashboard_contact_view(request):
-	profile, _ = UserProfile.objects.get_or_create(user=request.user)
+	profile = request.profile
 	return render(
 		request,
 		"userprofile/contact_panel.html",
@@ -131,7 +147,7 @@ def dashboard_contact_view(request):
 @login_required
 @never_cache
 def transactions_view(request):
-	profile, _ = UserProfile.objects.get_or_create(user=request.user)
+	profile = request.profile
 	transactions = (
 		WalletTransaction.objects.filter(user=request.user)
 		.select_related("initiated_by", "job")
@@ -200,7 +216,7 @@ def transactions_view(request):
 @login_required
 @never_cache
 def notifications_view(request):
-	profile, _ = UserProfile.objects.get_or_create(user=request.user)
+	profile = request.profile
 	notifications = request.user.notifications.filter(is_staff_only=False)
 	notifications.filter(is_read=False).update(is_read=True)
 	return render(
@@ -218,7 +234,7 @@ def notifications_view(request):
 @login_required
 @never_cache
 def notification_detail_view(request, pk):
-	profile, _ = UserProfile.objects.get_or_create(user=request.user)
+	profile = request.profile
 	notification = get_object_or_404(
 		Notification,
 		pk=pk,
@@ -272,7 +288,7 @@ def delete_notification_view(request, pk):
 @login_required
 @never_cache
 def subscription_view(request):
-	profile, _ = UserProfile.objects.get_or_create(user=request.user)
+	profile = request.profile
 	plans = UserProfile.serialize_subscription_plans()
 	if request.method == "POST":
 		selected_plan = request.POST.get("plan")
@@ -293,15 +309,18 @@ def subscription_view(request):
 							note=f"{plan['label']} subscription",
 							initiated_by=request.user,
 						)
+						# The wallet update above locked the row; extend from its current expiry.
+						profile.refresh_from_db(fields=["subscription_plan", "subscription_expires_at", "subscription_status"])
 						profile.wallet_balance = txn_result.balance_after
 						profile.apply_subscription(selected_plan)
-						profile.save()
+						profile.save(update_fields=["subscription_plan", "subscription_expires_at"])
 						entry = SubscriptionLedgerEntry.objects.create(
 							user=request.user,
 							plan=selected_plan,
 							amount=plan["price"],
 							wallet_before=txn_result.balance_before,
 						)
+						record_subscription_entries([entry])
 						Notification.objects.create(
 							user=request.user,
 							message=(
@@ -340,7 +359,7 @@ def subscription_view(request):
 @login_required
 @never_cache
 def subscription_status_view(request):
-	profile, _ = UserProfile.objects.get_or_create(user=request.user)
+	profile = request.profile
 	plan_details = UserProfile.SUBSCRIPTION_DETAILS.get(profile.subscription_plan)
 	latest_entry = None
 	wallet_after_purchase = None